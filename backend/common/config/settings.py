@@ -73,8 +73,10 @@ class BaseServiceSettings(BaseSettings):
         CORS_ORIGINS (list[str]): List of allowed CORS origins. Can be set via comma-separated string or list.
         SCHEDULER_API_URL (str): Base URL for the Cronicle scheduler API.
         
-        DATABASE_POOL_SIZE (int): Number of connections to maintain in the pool. Default: 10
-        DATABASE_MAX_OVERFLOW (int): Maximum overflow connections beyond pool_size. Default: 5
+        DATABASE_POOL_SIZE (int): Unused for tenant engines, which are sized by
+            DATABASE_POOL_BUDGET and DATABASE_TENANT_POOL_MIN_SIZE/MAX_SIZE
+            (see common.database.pool_manager). Default: 10
+        DATABASE_MAX_OVERFLOW (int): Unused for tenant engines (see above). Default: 5
         
         DEFAULT_PAGE_SIZE (int): Default number of items per page for pagination. Default: 50
         MAX_PAGE_SIZE (int): Maximum allowed page size for pagination. Default: 1000
@@ -350,6 +352,8 @@ class DataServiceSettings(BaseServiceSettings):
             Default: 300 (5 minutes).
         JOB_STUCK_TIMEOUT_MINUTES (int): Minutes before a processing job is considered stuck.
             Default: 10.
+        JOB_MONITOR_CONCURRENCY (int): Maximum number of tenants checked at the same
+            time by the job status monitor. Default: 8.
 
     Example:
         ```python
@@ -384,6 +388,7 @@ class DataServiceSettings(BaseServiceSettings):
     JOB_MONITOR_ENABLED: bool = True
     JOB_MONITOR_INTERVAL_SECONDS: int = 300  # 5 minutes
     JOB_STUCK_TIMEOUT_MINUTES: int = 10
+    JOB_MONITOR_CONCURRENCY: int = 8
 
 
 class AuthServiceSettings(BaseServiceSettings):
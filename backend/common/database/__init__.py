@@ -8,7 +8,8 @@ provisioning utilities.
 Key Features:
     - Multi-tenant database isolation (SOC2 compliant)
     - Async and sync database session support
-    - Connection pooling with automatic reconnection
+    - Connection pooling with automatic reconnection, bounded by a
+      process-wide connection budget
     - Database provisioning and schema initialization
     - Tenant configuration management
 
@@ -20,8 +21,10 @@ Architecture:
 Main Components:
     - Base: SQLAlchemy declarative base class for all ORM models
     - session: Database connection and session management
+    - pool_manager: Process-wide tenant engine cache with a connection budget
     - tenant_config: Tenant service configuration retrieval
     - tenant_provisioning: Database creation and schema initialization
+    - tenant_registry: Cached, async lookup of provisioned tenant databases
 
 Usage:
     ```python
@@ -43,6 +46,7 @@ from .session import (
     create_sqlalchemy_url,
     # Database utilities
     database_exists,
+    dispose_database_engines,
     get_async_db_session,
     get_async_engine,
     get_async_session_maker,
@@ -50,6 +54,7 @@ from .session import (
     get_db_session,
     # Core functions
     get_engine,
+    get_pool_metrics,
     # Session makers
     get_session_maker,
 )
@@ -60,14 +65,18 @@ from .tenant_provisioning import (
     provision_tenant_database,
     tenant_database_exists,
 )
+from .tenant_registry import TenantRegistry, tenant_registry
 
 __all__ = [
     # Base
     "Base",
+    # Tenant registry
+    "TenantRegistry",
     "create_database",
     "create_sqlalchemy_url",
     # Database utilities
     "database_exists",
+    "dispose_database_engines",
     "drop_tenant_database",
     "get_async_db_session",
     "get_async_engine",
@@ -76,6 +85,7 @@ __all__ = [
     "get_db_session",
     # Core engine functions
     "get_engine",
+    "get_pool_metrics",
     # Session makers
     "get_session_maker",
     # Tenant provisioning
@@ -84,4 +94,5 @@ __all__ = [
     "get_tenant_service_status",
     "provision_tenant_database",
     "tenant_database_exists",
+    "tenant_registry",
 ]
@@ -0,0 +1,501 @@
+"""
+Process-wide, size-bounded connection pool manager for tenant databases.
+
+Every tenant has its own PostgreSQL database, so a service that talks to
+hundreds of tenants would otherwise keep one fully sized connection pool per
+tenant for the lifetime of the process. The TenantPoolManager caps the total
+number of connections all cached engines may open (the global budget) and
+disposes the least recently used idle engines to make room for new ones.
+
+Key Features:
+    - Global connection budget shared by all sync and async engines
+    - Per-tenant minimum (kept open) and maximum (burst) pool sizes
+    - LRU eviction of idle engines, disposing their connections
+    - Leases: engines in use by a sync or async session are never evicted
+    - Metrics for hits, misses, evictions and time spent waiting for budget
+
+Budget Accounting:
+    Each cached engine reserves its maximum pool size against the budget.
+    When a new engine does not fit, idle engines (no active lease and no
+    checked-out connection) are disposed in LRU order. If nothing can be
+    evicted, leasing callers wait for a lease to be released (polling, up to
+    DATABASE_POOL_TIMEOUT seconds) and then fail with TimeoutError. Callers
+    that take an engine without a lease (get_engine) fail immediately
+    instead, since they may be running on the event loop and cannot wait.
+
+Environment Variables:
+    - DATABASE_POOL_BUDGET: Total connections across all engines (default: 200)
+    - DATABASE_TENANT_POOL_MIN_SIZE: Connections kept open per engine (default: 2)
+    - DATABASE_TENANT_POOL_MAX_SIZE: Maximum connections per engine (default: 10)
+    - DATABASE_POOL_TIMEOUT: Seconds to wait for budget or a connection (default: 30)
+
+    Engine pools are sized only by these settings. DATABASE_POOL_SIZE,
+    DATABASE_MAX_OVERFLOW, DATABASE_ASYNC_POOL_SIZE and
+    DATABASE_ASYNC_MAX_OVERFLOW no longer control the size of tenant engines.
+
+Usage:
+    ```python
+    from common.database import get_pool_metrics
+
+    get_pool_metrics()
+    # {"budget": 200, "reserved": 40, "engines": 4, "hits": 812, ...}
+    ```
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+import os
+import threading
+import time
+from typing import Any
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+DEFAULT_POOL_BUDGET = 200
+DEFAULT_TENANT_POOL_MIN_SIZE = 2
+DEFAULT_TENANT_POOL_MAX_SIZE = 10
+DEFAULT_POOL_TIMEOUT = 30
+
+# Seconds between budget checks while waiting for an engine to be released
+BUDGET_POLL_INTERVAL = 0.05
+
+# Builds an engine for (pool_size, max_overflow)
+EngineFactory = Callable[[int, int], Any]
+
+
+class _PoolEntry:
+    """A cached engine with its budget reservation and active lease count."""
+
+    __slots__ = ("database_name", "engine", "leases", "max_size")
+
+    def __init__(self, engine: Any, database_name: str, max_size: int) -> None:
+        self.engine = engine
+        self.database_name = database_name
+        self.max_size = max_size
+        self.leases = 0
+
+    def is_idle(self) -> bool:
+        """True when no session holds a lease and no connection is checked out."""
+        if self.leases:
+            return False
+        pool = (
+            self.engine.sync_engine.pool
+            if isinstance(self.engine, AsyncEngine)
+            else self.engine.pool
+        )
+        checkedout = getattr(pool, "checkedout", None)
+        return checkedout is None or checkedout() == 0
+
+
+class TenantPoolManager:
+    """
+    LRU cache of database engines bounded by a global connection budget.
+
+    Engines are keyed by an opaque cache key (service, driver and database)
+    and created on demand through a factory that receives the pool size and
+    max overflow to use. Bookkeeping is guarded by a thread lock so the
+    manager can be shared by sync code running in worker threads and async
+    code on the event loop.
+
+    Attributes:
+        budget: Maximum total connections across all cached engines.
+        min_size: Pool size (connections kept open) per engine.
+        max_size: Maximum connections per engine (pool size + overflow).
+        timeout: Seconds a leasing caller waits for budget before failing.
+    """
+
+    def __init__(
+        self,
+        budget: int | None = None,
+        min_size: int | None = None,
+        max_size: int | None = None,
+        timeout: float | None = None,
+    ) -> None:
+        """
+        Initialize the manager, reading unset limits from the environment.
+
+        Args:
+            budget: Global connection budget (DATABASE_POOL_BUDGET).
+            min_size: Per-engine pool size (DATABASE_TENANT_POOL_MIN_SIZE).
+            max_size: Per-engine maximum size (DATABASE_TENANT_POOL_MAX_SIZE).
+            timeout: Budget wait timeout in seconds (DATABASE_POOL_TIMEOUT).
+
+        Raises:
+            ValueError: If the sizes are inconsistent.
+        """
+        self.budget = budget or int(
+            os.getenv("DATABASE_POOL_BUDGET", DEFAULT_POOL_BUDGET)
+        )
+        self.min_size = min_size or int(
+            os.getenv("DATABASE_TENANT_POOL_MIN_SIZE", DEFAULT_TENANT_POOL_MIN_SIZE)
+        )
+        self.max_size = max_size or int(
+            os.getenv("DATABASE_TENANT_POOL_MAX_SIZE", DEFAULT_TENANT_POOL_MAX_SIZE)
+        )
+        self.timeout = timeout or float(
+            os.getenv("DATABASE_POOL_TIMEOUT", DEFAULT_POOL_TIMEOUT)
+        )
+
+        if not 0 < self.min_size <= self.max_size <= self.budget:
+            msg = (
+                "Pool sizes must satisfy 0 < DATABASE_TENANT_POOL_MIN_SIZE <= "
+                "DATABASE_TENANT_POOL_MAX_SIZE <= DATABASE_POOL_BUDGET, got "
+                f"{self.min_size}, {self.max_size}, {self.budget}"
+            )
+            raise ValueError(msg)
+
+        self._entries: OrderedDict[str, _PoolEntry] = OrderedDict()
+        self._reserved = 0
+        self._lock = threading.Lock()
+        self._pending_disposal: list[Any] = []
+        # Disposals scheduled from sync code, referenced until they finish
+        self._disposal_tasks: set[asyncio.Task[None]] = set()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._waits = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+
+    def get_engine(
+        self, key: str, database_name: str, factory: EngineFactory
+    ) -> Any:
+        """
+        Return the cached engine for ``key`` without a lease.
+
+        The engine can be evicted and disposed as soon as it has no checked-out
+        connection, so callers should use it right away and not hold on to
+        it; prefer lease_engine() or lease_async_engine(). Never blocks: when
+        the budget is exhausted by engines in use, no engine is created.
+
+        Args:
+            key: Cache key identifying the engine.
+            database_name: Database the engine connects to.
+            factory: Callable building the engine from (pool_size, max_overflow).
+
+        Returns:
+            The sync Engine or AsyncEngine built by ``factory``.
+
+        Raises:
+            RuntimeError: If the engine is not cached and the budget has no
+                room for it.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                max_size = self._make_room(self.max_size)
+                if max_size:
+                    entry = self._create(key, database_name, factory, max_size)
+        self._dispose_pending_sync()
+        if entry is None:
+            msg = (
+                f"Connection budget of {self.budget} exhausted, cannot connect "
+                f"to {database_name}"
+            )
+            raise RuntimeError(msg)
+        return entry.engine
+
+    @contextmanager
+    def lease_engine(
+        self, key: str, database_name: str, factory: EngineFactory
+    ) -> Iterator[Any]:
+        """
+        Hold a sync engine for the duration of a session.
+
+        A leased engine is never evicted. When the budget is exhausted by
+        leased engines, blocks the calling thread until one is released.
+
+        Args:
+            key: Cache key identifying the engine.
+            database_name: Database the engine connects to.
+            factory: Callable building the engine from (pool_size, max_overflow).
+
+        Yields:
+            Engine: The cached engine.
+
+        Raises:
+            TimeoutError: If no budget frees up within ``timeout`` seconds.
+        """
+        entry = self._acquire_sync(key, database_name, factory)
+        try:
+            yield entry.engine
+        finally:
+            with self._lock:
+                entry.leases -= 1
+
+    @asynccontextmanager
+    async def lease_async_engine(
+        self, key: str, database_name: str, factory: EngineFactory
+    ) -> AsyncIterator[Any]:
+        """
+        Hold an async engine for the duration of a session.
+
+        A leased engine is never evicted. When the budget is exhausted by
+        leased engines, waits until one is released.
+
+        Args:
+            key: Cache key identifying the engine.
+            database_name: Database the engine connects to.
+            factory: Callable building the engine from (pool_size, max_overflow).
+
+        Yields:
+            AsyncEngine: The cached engine.
+
+        Raises:
+            TimeoutError: If no budget frees up within ``timeout`` seconds.
+        """
+        entry = await self._acquire(key, database_name, factory)
+        try:
+            yield entry.engine
+        finally:
+            with self._lock:
+                entry.leases -= 1
+
+    def discard_database(self, database_name: str) -> int:
+        """
+        Drop every cached engine connected to ``database_name``.
+
+        Used before a database is dropped, so pooled connections do not keep
+        it open.
+
+        Args:
+            database_name: Database whose engines are discarded.
+
+        Returns:
+            Number of engines discarded.
+        """
+        with self._lock:
+            keys = [
+                key
+                for key, entry in self._entries.items()
+                if entry.database_name == database_name
+            ]
+            for key in keys:
+                self._evict(key)
+        self._dispose_pending_sync()
+        return len(keys)
+
+    def metrics(self) -> dict[str, Any]:
+        """
+        Snapshot of pool manager counters.
+
+        Returns:
+            dict[str, Any]: budget, reserved connections, cached engines,
+            leased engines, hits, misses, evictions, waits and wait seconds
+            (total and max).
+        """
+        with self._lock:
+            return {
+                "budget": self.budget,
+                "reserved": self._reserved,
+                "engines": len(self._entries),
+                "leased_engines": sum(1 for e in self._entries.values() if e.leases),
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "waits": self._waits,
+                "wait_seconds_total": round(self._wait_seconds_total, 3),
+                "wait_seconds_max": round(self._wait_seconds_max, 3),
+            }
+
+    async def _acquire(
+        self, key: str, database_name: str, factory: EngineFactory
+    ) -> _PoolEntry:
+        """Look up or create an entry and take a lease, waiting for budget."""
+        started: float | None = None
+        deadline = time.monotonic() + self.timeout
+
+        while True:
+            entry = self._try_lease(key, database_name, factory)
+            await self._dispose_pending()
+
+            if entry is not None:
+                if started is not None:
+                    self._record_wait(time.monotonic() - started)
+                return entry
+
+            started = self._check_wait(started, deadline, database_name)
+            await asyncio.sleep(BUDGET_POLL_INTERVAL)
+
+    def _acquire_sync(
+        self, key: str, database_name: str, factory: EngineFactory
+    ) -> _PoolEntry:
+        """Look up or create an entry and take a lease, blocking for budget."""
+        started: float | None = None
+        deadline = time.monotonic() + self.timeout
+
+        while True:
+            entry = self._try_lease(key, database_name, factory)
+            self._dispose_pending_sync()
+
+            if entry is not None:
+                if started is not None:
+                    self._record_wait(time.monotonic() - started)
+                return entry
+
+            started = self._check_wait(started, deadline, database_name)
+            time.sleep(BUDGET_POLL_INTERVAL)
+
+    def _try_lease(
+        self, key: str, database_name: str, factory: EngineFactory
+    ) -> _PoolEntry | None:
+        """Look up or create an entry and take a lease, or None if it does not fit."""
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                max_size = self._make_room(self.max_size)
+                if max_size:
+                    entry = self._create(key, database_name, factory, max_size)
+            if entry is not None:
+                entry.leases += 1
+        return entry
+
+    def _check_wait(
+        self, started: float | None, deadline: float, database_name: str
+    ) -> float:
+        """
+        Track a caller waiting for budget, failing once the deadline passes.
+
+        Returns:
+            float: Monotonic time the wait started.
+
+        Raises:
+            TimeoutError: If the deadline has passed.
+        """
+        now = time.monotonic()
+        if started is None:
+            started = now
+            logger.info(
+                f"Connection budget of {self.budget} exhausted, waiting for "
+                f"an engine to be released before connecting to {database_name}"
+            )
+        if now >= deadline:
+            self._record_wait(now - started)
+            msg = (
+                f"Timed out after {self.timeout}s waiting for connection "
+                f"budget for {database_name}"
+            )
+            raise TimeoutError(msg)
+        return started
+
+    def _lookup(self, key: str) -> _PoolEntry | None:
+        """Return the entry for ``key`` and mark it most recently used (lock held)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry
+
+    def _create(
+        self, key: str, database_name: str, factory: EngineFactory, max_size: int
+    ) -> _PoolEntry:
+        """Build and cache a new engine reserving ``max_size`` (lock held)."""
+        pool_size = min(self.min_size, max_size)
+        engine = factory(pool_size, max_size - pool_size)
+        entry = _PoolEntry(engine, database_name, max_size)
+        self._entries[key] = entry
+        self._reserved += max_size
+        self._misses += 1
+        logger.info(
+            f"Created engine for {database_name} with pool_size={pool_size}, "
+            f"max_overflow={max_size - pool_size} "
+            f"({self._reserved}/{self.budget} connections reserved)"
+        )
+        return entry
+
+    def _make_room(self, wanted: int) -> int:
+        """
+        Evict idle LRU engines until up to ``wanted`` connections fit (lock held).
+
+        Returns:
+            int: Connections available for the new engine, capped at
+            ``wanted``; 0 if fewer than min_size could be freed.
+        """
+        for key in list(self._entries):
+            if self._reserved + wanted <= self.budget:
+                break
+            if self._entries[key].is_idle():
+                self._evict(key)
+
+        available = min(wanted, self.budget - self._reserved)
+        return available if available >= self.min_size else 0
+
+    def _evict(self, key: str) -> None:
+        """Remove an entry and queue its engine for disposal (lock held)."""
+        entry = self._entries.pop(key)
+        self._reserved -= entry.max_size
+        self._evictions += 1
+        self._pending_disposal.append(entry.engine)
+        logger.info(
+            f"Evicted engine for {entry.database_name} "
+            f"({self._reserved}/{self.budget} connections reserved)"
+        )
+
+    def _take_pending(self) -> list[Any]:
+        """Hand over the engines queued for disposal."""
+        with self._lock:
+            engines = list(self._pending_disposal)
+            self._pending_disposal.clear()
+        return engines
+
+    async def _dispose_pending(self) -> None:
+        """Dispose evicted engines outside the lock."""
+        for engine in self._take_pending():
+            try:
+                if isinstance(engine, AsyncEngine):
+                    await engine.dispose()
+                else:
+                    await asyncio.to_thread(engine.dispose)
+            except Exception as e:
+                logger.warning(f"Error disposing evicted engine: {e}")
+
+    def _dispose_pending_sync(self) -> None:
+        """
+        Dispose evicted engines from sync code.
+
+        Async engines are disposed in a task on the running event loop when
+        there is one; otherwise they stay queued until the next async acquire
+        disposes them, instead of leaking their connections.
+        """
+        deferred: list[Any] = []
+        for engine in self._take_pending():
+            try:
+                if isinstance(engine, AsyncEngine):
+                    try:
+                        loop = asyncio.get_running_loop()
+                    except RuntimeError:
+                        deferred.append(engine)
+                        continue
+                    task = loop.create_task(self._dispose_async_engine(engine))
+                    self._disposal_tasks.add(task)
+                    task.add_done_callback(self._disposal_tasks.discard)
+                else:
+                    engine.dispose()
+            except Exception as e:
+                logger.warning(f"Error disposing evicted engine: {e}")
+
+        if deferred:
+            with self._lock:
+                self._pending_disposal.extend(deferred)
+
+    @staticmethod
+    async def _dispose_async_engine(engine: AsyncEngine) -> None:
+        """Dispose an evicted async engine from a background task."""
+        try:
+            await engine.dispose()
+        except Exception as e:
+            logger.warning(f"Error disposing evicted engine: {e}")
+
+    def _record_wait(self, seconds: float) -> None:
+        """Accumulate time a leasing caller spent waiting for budget."""
+        with self._lock:
+            self._waits += 1
+            self._wait_seconds_total += seconds
+            self._wait_seconds_max = max(self._wait_seconds_max, seconds)
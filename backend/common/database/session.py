@@ -10,12 +10,14 @@ Key Features:
     - Automatic connection health checks and reconnection
     - Support for both sync and async operations
     - Tenant-aware database connections
-    - Engine caching to avoid duplicate connections
+    - Engine caching bounded by a global connection budget
     - Context managers for automatic session cleanup
 
 Connection Pooling:
-    - Sync pools: Default 20 connections, max overflow 30
-    - Async pools: Default 15 connections, max overflow 25
+    - Engines are cached by the TenantPoolManager (see pool_manager)
+    - Per-engine pools: Default 2 connections kept open, 10 maximum
+    - Global budget: Default 200 connections across all engines, idle
+      engines are disposed in LRU order to stay within it
     - Automatic connection recycling (1 hour)
     - Pre-ping enabled for connection validation
 
@@ -43,7 +45,6 @@ Usage:
 from __future__ import annotations
 
 from contextlib import asynccontextmanager, contextmanager
-from functools import lru_cache
 import os
 from typing import Any
 
@@ -56,11 +57,12 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_asyn
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import QueuePool
 
+from common.database.pool_manager import EngineFactory, TenantPoolManager
+
 load_dotenv()
 
-# Global engine cache to avoid creating multiple engines
-_engines: dict[str, Engine] = {}
-_async_engines: dict[str, Any] = {}
+# Process-wide engine cache bounded by a global connection budget
+_pool_manager = TenantPoolManager()
 
 
 def create_sqlalchemy_url(database_name: str, async_driver: bool = False) -> URL:
@@ -233,24 +235,8 @@ def create_database(database_name: str) -> bool:
         return False
 
 
-@lru_cache(maxsize=10)
-def get_engine(
-    service_name: str | None = None, database_name: str | None = None, tenant_id: str | None = None
-) -> Engine:
-    """
-    Get cached database engine with optimized connection pooling.
-
-    Args:
-        service_name: Name of the service (for logging)
-        database_name: Explicit database name
-        tenant_id: Tenant ID (will be converted to database name)
-
-    Returns:
-        SQLAlchemy Engine instance
-
-    Note:
-        Either database_name or tenant_id must be provided for tenant-isolated architecture.
-    """
+def _resolve_database_name(database_name: str | None, tenant_id: str | None) -> str:
+    """Return the explicit database name, or the tenant database for tenant_id."""
     # If tenant_id is provided, use tenant-specific database
     if tenant_id and not database_name:
         from common.database.tenant_provisioning import get_tenant_database_name
@@ -265,61 +251,111 @@ def get_engine(
         raise ValueError(
             msg
         )
+    return database_name
 
-    cache_key = f"{service_name or 'default'}_{database_name}"
-
-    if cache_key in _engines:
-        return _engines[cache_key]
 
+def _sync_engine_factory(
+    service_name: str | None, database_name: str
+) -> tuple[str, EngineFactory]:
+    """Cache key and pool-manager factory for a sync engine."""
     url = create_sqlalchemy_url(database_name)
-
-    # Enhanced connection pool settings
-    pool_size = int(os.getenv("DATABASE_POOL_SIZE", 20))  # Increased default
-    max_overflow = int(os.getenv("DATABASE_MAX_OVERFLOW", 30))  # Increased default
     pool_timeout = int(os.getenv("DATABASE_POOL_TIMEOUT", 30))
     pool_recycle = int(os.getenv("DATABASE_POOL_RECYCLE", 3600))  # 1 hour
 
-    engine = create_engine(
-        url,
-        # Connection pool settings
-        poolclass=QueuePool,
-        pool_size=pool_size,
-        max_overflow=max_overflow,
-        pool_timeout=pool_timeout,
-        pool_recycle=pool_recycle,
-        pool_pre_ping=True,
-        # Performance settings
-        echo=os.getenv("DATABASE_ECHO", "false").lower() == "true",
-        echo_pool=os.getenv("DATABASE_ECHO_POOL", "false").lower() == "true",
-        # Connection settings
-        connect_args={
-            "connect_timeout": int(os.getenv("DATABASE_CONNECT_TIMEOUT", 10)),
-            "server_settings": {
-                "application_name": service_name or "analytics-service",
-                "jit": "off",  # Disable JIT for faster connection times
+    def factory(pool_size: int, max_overflow: int) -> Engine:
+        engine = create_engine(
+            url,
+            # Connection pool settings
+            poolclass=QueuePool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=True,
+            # Performance settings
+            echo=os.getenv("DATABASE_ECHO", "false").lower() == "true",
+            echo_pool=os.getenv("DATABASE_ECHO_POOL", "false").lower() == "true",
+            # Connection settings
+            connect_args={
+                "connect_timeout": int(os.getenv("DATABASE_CONNECT_TIMEOUT", 10)),
+                "server_settings": {
+                    "application_name": service_name or "analytics-service",
+                    "jit": "off",  # Disable JIT for faster connection times
+                },
             },
-        },
-    )
+        )
+        # Setup connection monitoring
+        _setup_engine_events(engine)
+        return engine
 
-    # Setup connection monitoring
-    _setup_engine_events(engine)
+    return f"{service_name or 'default'}_{database_name}", factory
 
-    # Cache the engine
-    _engines[cache_key] = engine
 
-    logger.info(
-        f"Created database engine for {service_name or 'default'} with pool_size={pool_size}, max_overflow={max_overflow}"
-    )
+def _async_engine_factory(
+    service_name: str | None, database_name: str
+) -> tuple[str, EngineFactory]:
+    """Cache key and pool-manager factory for an async engine."""
+    url = create_sqlalchemy_url(database_name, async_driver=True)
+    pool_timeout = int(os.getenv("DATABASE_POOL_TIMEOUT", 30))
+    pool_recycle = int(os.getenv("DATABASE_POOL_RECYCLE", 3600))
+
+    def factory(pool_size: int, max_overflow: int) -> Any:
+        return create_async_engine(
+            url,
+            # Connection pool settings (no poolclass needed for async engines)
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=True,
+            # Performance settings
+            echo=os.getenv("DATABASE_ECHO", "false").lower() == "true",
+            # Async-specific settings
+            connect_args={
+                "server_settings": {
+                    "application_name": f"async-{service_name or 'analytics-service'}",
+                    "jit": "off",
+                }
+            },
+        )
+
+    return f"async_{service_name or 'default'}_{database_name}", factory
+
+
+def get_engine(
+    service_name: str | None = None, database_name: str | None = None, tenant_id: str | None = None
+) -> Engine:
+    """
+    Get a pooled database engine from the tenant pool manager.
+
+    Args:
+        service_name: Name of the service (for logging)
+        database_name: Explicit database name
+        tenant_id: Tenant ID (will be converted to database name)
+
+    Returns:
+        SQLAlchemy Engine instance
+
+    Raises:
+        RuntimeError: If the connection budget has no room for a new engine.
 
-    return engine
+    Note:
+        Either database_name or tenant_id must be provided for tenant-isolated architecture.
+        The engine is not leased: it counts against the global connection
+        budget and may be disposed once idle (see common.database.pool_manager),
+        so callers should not hold on to it. Prefer get_db_session(), which
+        leases the engine for the lifetime of the session.
+    """
+    database_name = _resolve_database_name(database_name, tenant_id)
+    cache_key, factory = _sync_engine_factory(service_name, database_name)
+    return _pool_manager.get_engine(cache_key, database_name, factory)
 
 
-@lru_cache(maxsize=10)
 def get_async_engine(
     service_name: str | None = None, database_name: str | None = None, tenant_id: str | None = None
 ) -> Any:
     """
-    Get cached async database engine with optimized connection pooling.
+    Get a pooled async database engine from the tenant pool manager.
 
     Args:
         service_name: Name of the service (for logging)
@@ -331,69 +367,50 @@ def get_async_engine(
 
     Note:
         Either database_name or tenant_id must be provided for tenant-isolated architecture.
+        Prefer get_async_db_session(), which leases the engine so it cannot
+        be evicted while the session is open.
     """
-    # If tenant_id is provided, use tenant-specific database
-    if tenant_id and not database_name:
-        from common.database.tenant_provisioning import get_tenant_database_name
-
-        database_name = get_tenant_database_name(tenant_id)
-
-    if not database_name:
-        msg = (
-            "Either database_name or tenant_id must be provided. "
-            "Master database concept removed for SOC2 compliance."
-        )
-        raise ValueError(
-            msg
-        )
+    database_name = _resolve_database_name(database_name, tenant_id)
+    cache_key, factory = _async_engine_factory(service_name, database_name)
+    return _pool_manager.get_engine(cache_key, database_name, factory)
 
-    cache_key = f"async_{service_name or 'default'}_{database_name}"
 
-    if cache_key in _async_engines:
-        return _async_engines[cache_key]
+def dispose_database_engines(database_name: str) -> int:
+    """
+    Discard every pooled engine connected to a database.
 
-    url = create_sqlalchemy_url(database_name, async_driver=True)
+    Call before dropping a database so pooled connections don't keep it open.
 
-    # Enhanced connection pool settings for async
-    pool_size = int(os.getenv("DATABASE_ASYNC_POOL_SIZE", 15))
-    max_overflow = int(os.getenv("DATABASE_ASYNC_MAX_OVERFLOW", 25))
-    pool_timeout = int(os.getenv("DATABASE_POOL_TIMEOUT", 30))
-    pool_recycle = int(os.getenv("DATABASE_POOL_RECYCLE", 3600))
+    Args:
+        database_name: Database whose engines are discarded.
 
-    async_engine = create_async_engine(
-        url,
-        # Connection pool settings (no poolclass needed for async engines)
-        pool_size=pool_size,
-        max_overflow=max_overflow,
-        pool_timeout=pool_timeout,
-        pool_recycle=pool_recycle,
-        pool_pre_ping=True,
-        # Performance settings
-        echo=os.getenv("DATABASE_ECHO", "false").lower() == "true",
-        # Async-specific settings
-        connect_args={
-            "server_settings": {
-                "application_name": f"async-{service_name or 'analytics-service'}",
-                "jit": "off",
-            }
-        },
-    )
+    Returns:
+        Number of engines discarded.
+    """
+    return _pool_manager.discard_database(database_name)
 
-    # Cache the async engine
-    _async_engines[cache_key] = async_engine
 
-    logger.info(
-        f"Created async database engine for {service_name or 'default'} with pool_size={pool_size}, max_overflow={max_overflow}"
-    )
+def get_pool_metrics() -> dict[str, Any]:
+    """
+    Get tenant pool manager metrics.
 
-    return async_engine
+    Returns:
+        Dictionary with the connection budget, reserved connections, cached
+        and leased engine counts, hits, misses, evictions and budget wait
+        statistics.
+    """
+    return _pool_manager.metrics()
 
 
 # Session makers
-@lru_cache(maxsize=10)
 def get_session_maker(service_name: str | None = None, tenant_id: str | None = None) -> sessionmaker:
-    """Get cached session maker for sync operations."""
+    """Get a session maker for sync operations bound to the pooled engine."""
     engine = get_engine(service_name, tenant_id=tenant_id)
+    return _session_maker(engine)
+
+
+def _session_maker(engine: Engine) -> sessionmaker:
+    """Build a sync session maker with the shared session settings."""
     return sessionmaker(
         bind=engine,
         autoflush=False,
@@ -402,12 +419,16 @@ def get_session_maker(service_name: str | None = None, tenant_id: str | None = N
     )
 
 
-@lru_cache(maxsize=10)
 def get_async_session_maker(
     service_name: str | None = None, tenant_id: str | None = None
 ) -> async_sessionmaker:
-    """Get cached async session maker for async operations."""
+    """Get a session maker for async operations bound to the pooled engine."""
     async_engine = get_async_engine(service_name, tenant_id=tenant_id)
+    return _async_session_maker(async_engine)
+
+
+def _async_session_maker(async_engine: Any) -> async_sessionmaker:
+    """Build an async session maker with the shared session settings."""
     return async_sessionmaker(
         bind=async_engine,
         class_=AsyncSession,
@@ -464,6 +485,10 @@ def get_db_session(service_name: str | None = None, tenant_id: str | None = None
         - Sessions automatically rollback on exceptions
         - Sessions are automatically closed when exiting the context
         - Tenant databases are auto-provisioned if they don't exist
+        - The tenant engine is leased from the pool manager for the lifetime
+          of the session, so it is never evicted while in use; when the
+          connection budget is exhausted, waits up to DATABASE_POOL_TIMEOUT
+          seconds for a leased engine to be released
         - This is a synchronous operation - use get_async_db_session for async code
     """
     # Auto-provision tenant database if it doesn't exist
@@ -486,17 +511,20 @@ def get_db_session(service_name: str | None = None, tenant_id: str | None = None
                     msg
                 )
 
-    session_maker = get_session_maker(service_name, tenant_id=tenant_id)
-    session = session_maker()
-    try:
-        yield session
-        session.commit()
-    except Exception as e:
-        session.rollback()
-        logger.error(f"Database session error: {e}")
-        raise
-    finally:
-        session.close()
+    database_name = _resolve_database_name(None, tenant_id)
+    cache_key, factory = _sync_engine_factory(service_name, database_name)
+
+    with _pool_manager.lease_engine(cache_key, database_name, factory) as engine:
+        session = _session_maker(engine)()
+        try:
+            yield session
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Database session error: {e}")
+            raise
+        finally:
+            session.close()
 
 
 @asynccontextmanager
@@ -551,17 +579,24 @@ async def get_async_db_session(service_name: str | None = None, tenant_id: str |
         - Sessions automatically rollback on exceptions
         - Sessions are automatically closed when exiting the context
         - Tenant databases are auto-provisioned if they don't exist
+        - The tenant engine is leased from the pool manager for the lifetime
+          of the session, so it is never evicted while in use
         - This is an asynchronous operation - use get_db_session for sync code
         - All database operations must be awaited
     """
-    session_maker = get_async_session_maker(service_name, tenant_id=tenant_id)
-    session = session_maker()
-    try:
-        yield session
-        await session.commit()
-    except Exception as e:
-        await session.rollback()
-        logger.error(f"Async database session error: {e}")
-        raise
-    finally:
-        await session.close()
+    database_name = _resolve_database_name(None, tenant_id)
+    cache_key, factory = _async_engine_factory(service_name, database_name)
+
+    async with _pool_manager.lease_async_engine(
+        cache_key, database_name, factory
+    ) as async_engine:
+        session = _async_session_maker(async_engine)()
+        try:
+            yield session
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            logger.error(f"Async database session error: {e}")
+            raise
+        finally:
+            await session.close()
@@ -17,12 +17,26 @@ Database Naming:
 
 Schema Initialization:
     Tables are created in a specific order to respect foreign key dependencies:
+    0. extensions (pg_trgm, used by the search indexes)
     1. tenant_config (base configuration)
     2. branch_email_mappings
     3. email_sending_jobs, email_send_history
-    4. users, locations
+    4. users, user_identities, locations
     5. processing_jobs
     6. Event tables (page_view, add_to_cart, purchase, etc.)
+    7. Dashboard rollups (daily_branch_stats, daily_branch_sessions,
+       daily_branch_users, converted_sessions, sessions)
+
+    Event tables are range-partitioned by event_date with one partition per
+    day; partitions for the coming week are created during initialization.
+    Event tables created before partitioning was introduced are converted
+    when initialization is re-run: the old table is renamed aside, the
+    partitioned table is created in its place and the rows are moved into
+    daily partitions, all in the initialization transaction.
+
+    Schema files are idempotent, so re-running initialization on an existing
+    tenant adds new tables and functions, then backfills the derived tables
+    from the event data already loaded (backfill_derived_tables()).
 
 Usage:
     ```python
@@ -44,13 +58,15 @@ Note:
 """
 
 import contextlib
+from datetime import date, timedelta
 from pathlib import Path
 
 from loguru import logger
 from sqlalchemy import create_engine, text
-from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
 
-from common.database.session import create_sqlalchemy_url
+from common.database.session import create_sqlalchemy_url, dispose_database_engines
+from common.database.tenant_registry import tenant_registry
 
 # Define paths to SQL files
 BASE_DIR = Path(__file__).parent.resolve()
@@ -60,21 +76,48 @@ FUNCTIONS_DIR = DB_DIR / "functions"
 
 # Define the correct order for table creation to respect dependencies
 TABLE_CREATION_ORDER = [
+    "extensions.sql",
     "tenant_config.sql",
     "branch_email_mappings.sql",
     "email_sending_jobs.sql",
     "email_send_history.sql",
     "users.sql",
+    "user_identities.sql",
     "locations.sql",
     "processing_jobs.sql",
+    "event_ingestion_watermarks.sql",
     "page_view.sql",
     "add_to_cart.sql",
     "purchase.sql",
     "view_item.sql",
     "view_search_results.sql",
     "no_search_results.sql",
+    "daily_branch_stats.sql",
+    "daily_branch_sessions.sql",
+    "daily_branch_users.sql",
+    "converted_sessions.sql",
+    "sessions.sql",
 ]
 
+# GA4 event tables, range-partitioned by event_date into daily partitions
+EVENT_TABLES = [
+    "purchase",
+    "add_to_cart",
+    "page_view",
+    "view_search_results",
+    "no_search_results",
+    "view_item",
+]
+
+# Daily partitions created ahead of time when a schema is initialized.
+# Ingestion creates (or swaps in) partitions for the days it loads, so this
+# only covers days written before the first ingestion job runs.
+EVENT_PARTITION_PREMAKE_DAYS = 7
+
+# Suffix of an unpartitioned event table (and its indexes) while its rows are
+# moved into the partitioned table that replaces it
+LEGACY_EVENT_TABLE_SUFFIX = "_legacy"
+
 
 def get_tenant_database_name(tenant_id: str) -> str:
     """
@@ -306,6 +349,10 @@ async def initialize_tenant_schema(tenant_id: str) -> bool:
 
         async with async_engine.begin() as connection:
             try:
+                legacy_tables = await _set_aside_unpartitioned_event_tables(
+                    connection
+                )
+
                 for filepath in sql_files_to_execute:
                     try:
                         with Path(filepath).open(encoding="utf-8") as f:
@@ -359,6 +406,15 @@ async def initialize_tenant_schema(tenant_id: str) -> bool:
                         logger.error(f"Error executing file {filepath}: {e}")
                         raise  # This will trigger the rollback of the transaction
 
+                today = date.today()
+                await _ensure_event_partitions(
+                    connection,
+                    today,
+                    today + timedelta(days=EVENT_PARTITION_PREMAKE_DAYS),
+                )
+                await _migrate_unpartitioned_event_tables(connection, legacy_tables)
+                await _backfill_derived_tables(connection, tenant_id)
+
                 logger.info(
                     f"Schema initialization completed successfully for tenant database '{db_name}'."
                 )
@@ -377,6 +433,177 @@ async def initialize_tenant_schema(tenant_id: str) -> bool:
         return False
 
 
+async def _ensure_event_partitions(
+    connection: AsyncConnection, start_date: date, end_date: date
+) -> int:
+    """
+    Create missing daily partitions for every event table on a connection.
+
+    Args:
+        connection: Open connection to the tenant database.
+        start_date: First day to cover (inclusive).
+        end_date: Last day to cover (inclusive).
+
+    Returns:
+        Number of partitions created.
+    """
+    created = 0
+    for table in EVENT_TABLES:
+        result = await connection.execute(
+            text("SELECT ensure_event_partitions(:table, :start_date, :end_date)"),
+            {"table": table, "start_date": start_date, "end_date": end_date},
+        )
+        created += result.scalar() or 0
+
+    if created:
+        logger.info(
+            f"Created {created} event partitions for {start_date} to {end_date}"
+        )
+    return created
+
+
+async def _set_aside_unpartitioned_event_tables(
+    connection: AsyncConnection,
+) -> list[str]:
+    """
+    Rename event tables created before partitioning out of the way.
+
+    The table files then create the partitioned tables under the original
+    names and _migrate_unpartitioned_event_tables() moves the rows over.
+    Indexes (including the primary key) are renamed with the table so the
+    partitioned table's indexes can take their names.
+
+    Args:
+        connection: Open connection to the tenant database.
+
+    Returns:
+        Names of the event tables that were set aside.
+    """
+    set_aside = []
+    for table in EVENT_TABLES:
+        result = await connection.execute(
+            text("""
+                SELECT EXISTS (
+                    SELECT 1
+                    FROM pg_class
+                    WHERE relname = :table
+                    AND relnamespace = 'public'::regnamespace
+                    AND relkind = 'r'
+                )
+            """),
+            {"table": table},
+        )
+        if not result.scalar():
+            continue
+
+        indexes = await connection.execute(
+            text("""
+                SELECT c.relname
+                FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE i.indrelid = CAST(:table AS regclass)
+            """),
+            {"table": f"public.{table}"},
+        )
+        max_length = 63 - len(LEGACY_EVENT_TABLE_SUFFIX)
+        for (index_name,) in indexes.all():
+            await connection.execute(
+                text(
+                    f'ALTER INDEX "{index_name}" RENAME TO '
+                    f'"{index_name[:max_length]}{LEGACY_EVENT_TABLE_SUFFIX}"'
+                )
+            )
+        await connection.execute(
+            text(
+                f'ALTER TABLE "{table}" RENAME TO "{table}{LEGACY_EVENT_TABLE_SUFFIX}"'
+            )
+        )
+        set_aside.append(table)
+
+    if set_aside:
+        logger.warning(
+            f"Converting unpartitioned event tables to daily partitions: {set_aside}"
+        )
+    return set_aside
+
+
+async def _migrate_unpartitioned_event_tables(
+    connection: AsyncConnection, tables: list[str]
+) -> None:
+    """
+    Move the rows of set-aside event tables into their partitioned tables.
+
+    Creates the daily partitions the rows need, copies every column the two
+    tables share (generated columns are recomputed) and drops the old table.
+
+    Args:
+        connection: Open connection to the tenant database.
+        tables: Event tables returned by _set_aside_unpartitioned_event_tables().
+    """
+    for table in tables:
+        legacy_table = f"{table}{LEGACY_EVENT_TABLE_SUFFIX}"
+
+        bounds = await connection.execute(
+            text(f'SELECT MIN(event_date), MAX(event_date) FROM "{legacy_table}"')
+        )
+        first_day, last_day = bounds.one()
+        if first_day is not None:
+            await connection.execute(
+                text("SELECT ensure_event_partitions(:table, :start_date, :end_date)"),
+                {"table": table, "start_date": first_day, "end_date": last_day},
+            )
+
+        columns = await connection.execute(
+            text("""
+                SELECT a.attname
+                FROM pg_attribute a
+                WHERE a.attrelid = CAST(:table AS regclass)
+                  AND a.attnum > 0
+                  AND NOT a.attisdropped
+                  AND a.attgenerated = ''
+                  AND EXISTS (
+                      SELECT 1
+                      FROM pg_attribute l
+                      WHERE l.attrelid = CAST(:legacy_table AS regclass)
+                        AND l.attname = a.attname
+                        AND NOT l.attisdropped
+                  )
+                ORDER BY a.attnum
+            """),
+            {"table": f"public.{table}", "legacy_table": f"public.{legacy_table}"},
+        )
+        column_list = ", ".join(f'"{name}"' for (name,) in columns.all())
+
+        moved = await connection.execute(
+            text(
+                f'INSERT INTO "{table}" ({column_list}) '
+                f'SELECT {column_list} FROM "{legacy_table}"'
+            )
+        )
+        await connection.execute(text(f'DROP TABLE "{legacy_table}"'))
+        logger.info(f"Moved {moved.rowcount} {table} rows into daily partitions")
+
+
+async def _backfill_derived_tables(connection: AsyncConnection, tenant_id: str) -> None:
+    """
+    Derive the rollup tables for event data ingested before they existed.
+
+    Ingestion only refreshes the date ranges it loads, so days ingested before
+    an upgrade would otherwise stay missing from the derived tables. No-op on
+    a new tenant or once every day with events has been derived.
+
+    Args:
+        connection: Open connection to the tenant database.
+        tenant_id: The tenant ID
+    """
+    result = await connection.execute(
+        text("SELECT backfill_derived_tables(:tenant_id)"), {"tenant_id": tenant_id}
+    )
+    backfilled = result.scalar() or {}
+    if any(backfilled.values()):
+        logger.info(f"Backfilled derived tables for tenant {tenant_id}: {backfilled}")
+
+
 def drop_tenant_database(tenant_id: str) -> bool:
     """
     Drop a tenant database (use with caution - for rollback scenarios).
@@ -396,6 +623,10 @@ def drop_tenant_database(tenant_id: str) -> bool:
 
         logger.warning(f"Dropping tenant database '{db_name}'...")
 
+        # Release pooled connections held by this process
+        dispose_database_engines(db_name)
+        tenant_registry.discard(tenant_id)
+
         # Connect to postgres database (default) to drop the target database
         postgres_url = create_sqlalchemy_url("postgres")
         engine = create_engine(postgres_url, isolation_level="AUTOCOMMIT")
@@ -495,6 +726,7 @@ async def provision_tenant_database(
                 logger.info(
                     f"Tenant database '{db_name}' already exists and is initialized. Skipping."
                 )
+                tenant_registry.add(tenant_id)
                 return True
             else:
                 logger.info(
@@ -513,6 +745,7 @@ async def provision_tenant_database(
             return False
 
         logger.info(f"Successfully provisioned tenant database '{db_name}'")
+        tenant_registry.add(tenant_id)
         return True
 
     except Exception as e:
@@ -0,0 +1,181 @@
+"""
+In-memory registry of provisioned tenant databases.
+
+API services validate the X-Tenant-Id header of every request against the
+set of tenant databases. Checking pg_database directly costs a blocking
+connection to the ``postgres`` database per request, so this module keeps
+the set of tenant database names in memory and refreshes it asynchronously.
+
+Key Features:
+    - Async lookups that never block the event loop
+    - TTL-based refresh; once loaded, stale entries are served while a
+      background task reloads them (stale-while-revalidate)
+    - Misses trigger an immediate reload (rate-limited), so tenants
+      provisioned by another service are picked up without waiting for the
+      TTL to expire
+    - Invalidated locally by provision_tenant_database() and
+      drop_tenant_database()
+
+Environment Variables:
+    - TENANT_REGISTRY_TTL_SECONDS: Seconds before the set is reloaded (default: 60)
+    - TENANT_REGISTRY_MISS_REFRESH_SECONDS: Minimum seconds between reloads
+      triggered by unknown tenant IDs (default: 5)
+
+Usage:
+    ```python
+    from common.database import tenant_registry
+
+    if not await tenant_registry.exists(tenant_id):
+        raise HTTPException(status_code=404, detail="Tenant not found")
+    ```
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Any
+
+from loguru import logger
+from sqlalchemy import text
+
+from common.database.session import get_async_engine
+
+DATABASE_PREFIX = "google-analytics-"
+DEFAULT_TTL_SECONDS = 60
+DEFAULT_MISS_REFRESH_SECONDS = 5
+
+
+class TenantRegistry:
+    """
+    TTL cache of the tenant database names present on the PostgreSQL server.
+
+    Attributes:
+        ttl: Seconds a loaded set is considered fresh.
+        miss_refresh_interval: Minimum seconds between miss-triggered reloads.
+    """
+
+    def __init__(
+        self, ttl: float | None = None, miss_refresh_interval: float | None = None
+    ) -> None:
+        """
+        Initialize an empty registry.
+
+        Args:
+            ttl: Freshness window in seconds (TENANT_REGISTRY_TTL_SECONDS).
+            miss_refresh_interval: Miss reload interval in seconds
+                (TENANT_REGISTRY_MISS_REFRESH_SECONDS).
+        """
+        self.ttl = ttl or float(
+            os.getenv("TENANT_REGISTRY_TTL_SECONDS", DEFAULT_TTL_SECONDS)
+        )
+        self.miss_refresh_interval = miss_refresh_interval or float(
+            os.getenv("TENANT_REGISTRY_MISS_REFRESH_SECONDS", DEFAULT_MISS_REFRESH_SECONDS)
+        )
+        self._databases: set[str] | None = None
+        self._loaded_at = 0.0
+        self._refresh_task: asyncio.Task[None] | None = None
+
+    async def exists(self, tenant_id: str) -> bool:
+        """
+        Check whether a tenant database exists.
+
+        Args:
+            tenant_id: The tenant ID.
+
+        Returns:
+            True if the tenant database is known to exist, False otherwise
+            (including when the registry cannot be loaded).
+        """
+        db_name = f"{DATABASE_PREFIX}{tenant_id}"
+        age = time.monotonic() - self._loaded_at
+
+        if self._databases is None:
+            await self.refresh()
+        elif age > self.ttl:
+            self._refresh_in_background()
+
+        if self._databases is not None and db_name in self._databases:
+            return True
+
+        # Unknown tenant: it may have been provisioned since the last load
+        if time.monotonic() - self._loaded_at > self.miss_refresh_interval:
+            await self.refresh()
+
+        return self._databases is not None and db_name in self._databases
+
+    async def tenant_ids(self) -> list[str]:
+        """
+        List the tenant IDs of every known tenant database.
+
+        The set is reloaded first when it is older than the TTL, so callers
+        that sweep all tenants see databases provisioned since the last load.
+
+        Returns:
+            Sorted tenant IDs (empty when the registry cannot be loaded).
+        """
+        if self._databases is None or time.monotonic() - self._loaded_at > self.ttl:
+            await self.refresh()
+        return sorted(
+            name[len(DATABASE_PREFIX):]
+            for name in self._databases or ()
+            if name.startswith(DATABASE_PREFIX)
+        )
+
+    async def refresh(self) -> None:
+        """
+        Reload the set of tenant databases, sharing an in-flight reload.
+
+        Errors are logged and the previous set is kept.
+        """
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._load())
+        await asyncio.shield(self._refresh_task)
+
+    def add(self, tenant_id: str) -> None:
+        """Record a newly provisioned tenant database."""
+        if self._databases is not None:
+            self._databases.add(f"{DATABASE_PREFIX}{tenant_id}")
+
+    def discard(self, tenant_id: str) -> None:
+        """Forget a dropped tenant database."""
+        if self._databases is not None:
+            self._databases.discard(f"{DATABASE_PREFIX}{tenant_id}")
+
+    def stats(self) -> dict[str, Any]:
+        """Number of known tenant databases and age of the loaded set."""
+        return {
+            "tenants": len(self._databases or ()),
+            "age_seconds": (
+                round(time.monotonic() - self._loaded_at, 1)
+                if self._databases is not None
+                else None
+            ),
+        }
+
+    def _refresh_in_background(self) -> None:
+        """Start a reload without waiting for it."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._load())
+
+    async def _load(self) -> None:
+        """Query pg_database for every tenant database name."""
+        try:
+            engine = get_async_engine("tenant-registry", database_name="postgres")
+            async with engine.connect() as connection:
+                result = await connection.execute(
+                    text("SELECT datname FROM pg_database WHERE datname LIKE :prefix"),
+                    {"prefix": f"{DATABASE_PREFIX}%"},
+                )
+                databases = {row[0] for row in result}
+        except Exception as e:
+            logger.error(f"Error loading tenant database registry: {e}")
+            return
+
+        self._databases = databases
+        self._loaded_at = time.monotonic()
+        logger.debug(f"Loaded {len(databases)} tenant databases into registry")
+
+
+tenant_registry = TenantRegistry()
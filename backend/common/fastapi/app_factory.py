@@ -19,7 +19,7 @@ Middleware:
 
 Endpoints:
     - GET /: Root endpoint with service information
-    - GET /health: Health check endpoint
+    - GET /health: Health check endpoint (with database pool metrics)
     - GET /docs: Swagger UI documentation
     - GET /redoc: ReDoc documentation
 
@@ -54,6 +54,7 @@ from fastapi.responses import JSONResponse, Response
 from loguru import logger
 
 from common.config import BaseServiceSettings, get_settings
+from common.database import get_pool_metrics
 from common.logging import setup_logging
 
 
@@ -215,12 +216,13 @@ def create_fastapi_app(
     # Standard health check endpoint
     @app.get("/health")
     async def health_check() -> dict[str, Any]:
-        """Health check endpoint."""
+        """Health check endpoint, including tenant connection pool metrics."""
         return {
             "service": settings.SERVICE_NAME,
             "version": settings.SERVICE_VERSION,
             "status": "healthy",
             "timestamp": time.time(),
+            "database_pool": get_pool_metrics(),
         }
 
     # Standard root endpoint
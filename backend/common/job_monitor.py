@@ -16,19 +16,31 @@ Features:
     - Azure Queue statistics logging for monitoring
     - Multi-tenant support (queries all tenant databases)
 
+Sweep:
+    Tenants come from the shared tenant registry and are checked
+    concurrently, at most ``concurrency`` at a time. Each tenant is handled
+    on one pooled session (the pool manager's tenant engines, shared with
+    request handling) and both job tables are fetched in a single query.
+    Sweeps run at a fixed rate; a sweep that overruns the interval delays
+    the next one, which shows up as lag in the metrics.
+
 Usage:
     ```python
     from common.job_monitor import JobStatusMonitor
-    
+
     monitor = JobStatusMonitor(
         azure_connection_string="...",
         interval_seconds=300,
-        stuck_timeout_minutes=10
+        stuck_timeout_minutes=10,
+        concurrency=8,
     )
-    
+
     # Start monitoring (typically in FastAPI lifespan)
     await monitor.start()
-    
+
+    # Sweep duration, lag and job counters
+    monitor.stats()
+
     # Stop monitoring (on shutdown)
     await monitor.stop()
     ```
@@ -37,44 +49,36 @@ Usage:
 import asyncio
 from datetime import datetime, timedelta, timezone
 import json
-import os
+import time
 from typing import Any
 
 from azure.storage.queue.aio import QueueClient
 from dotenv import load_dotenv
 from loguru import logger
-from sqlalchemy import create_engine, text
-from sqlalchemy.engine import URL
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 
-load_dotenv()
+from common.database import get_async_db_session, tenant_registry
 
+load_dotenv()
 
-def _create_sqlalchemy_url(database_name: str, async_driver: bool = False) -> URL:
-    """Create SQLAlchemy URL for a specific database."""
-    driver = "postgresql+asyncpg" if async_driver else "postgresql+pg8000"
-    return URL.create(
-        drivername=driver,
-        username=os.getenv("POSTGRES_USER"),
-        password=os.getenv("POSTGRES_PASSWORD"),
-        host=os.getenv("POSTGRES_HOST"),
-        port=int(os.getenv("POSTGRES_PORT", 5432)),
-        database=database_name,
-    )
+MAX_RETRIGGERS = 3
 
 
 class JobStatusMonitor:
     """
     Background monitor for detecting and handling stuck jobs.
-    
+
     This class runs as an asyncio background task within the FastAPI process,
     periodically checking for jobs that have been stuck in 'processing' status
     for too long and marking them as failed.
-    
+
     Attributes:
         azure_connection_string: Connection string for Azure Storage Queue.
         interval_seconds: Polling interval in seconds (default: 300 = 5 minutes).
         stuck_timeout_minutes: Minutes after which a processing job is considered stuck.
+        concurrency: Maximum number of tenants checked at the same time.
+        service_name: Service name the pooled tenant engines are keyed by.
     """
 
     def __init__(
@@ -82,32 +86,45 @@ class JobStatusMonitor:
         azure_connection_string: str,
         interval_seconds: int = 300,
         stuck_timeout_minutes: int = 15,
+        concurrency: int = 8,
+        service_name: str = "job-monitor",
     ) -> None:
         """
         Initialize the job status monitor.
-        
+
         Args:
             azure_connection_string: Azure Storage connection string for queue access.
             interval_seconds: How often to check job statuses (default: 300 seconds).
             stuck_timeout_minutes: Minutes before a job is considered stuck (default: 10).
+            concurrency: Maximum tenants checked concurrently (default: 8).
+            service_name: Service whose pooled tenant engines are reused.
         """
         self.azure_connection_string = azure_connection_string
         self.interval_seconds = interval_seconds
         self.stuck_timeout_minutes = stuck_timeout_minutes
+        self.concurrency = max(1, concurrency)
+        self.service_name = service_name
         self._running = False
         self._task: asyncio.Task[None] | None = None
 
+        self.sweeps = 0
+        self.jobs_failed = 0
+        self.jobs_retriggered = 0
+        self.tenant_errors = 0
+        self.last_sweep: dict[str, Any] | None = None
+
     async def start(self) -> None:
         """Start the background monitoring task."""
         if self._running:
             logger.warning("Job status monitor is already running")
             return
-            
+
         self._running = True
         self._task = asyncio.create_task(self._run_loop())
         logger.info(
             f"Job status monitor started (interval={self.interval_seconds}s, "
-            f"stuck_timeout={self.stuck_timeout_minutes}min)"
+            f"stuck_timeout={self.stuck_timeout_minutes}min, "
+            f"concurrency={self.concurrency})"
         )
 
     async def stop(self) -> None:
@@ -121,198 +138,214 @@ class JobStatusMonitor:
                 pass
         logger.info("Job status monitor stopped")
 
+    def stats(self) -> dict[str, Any]:
+        """
+        Sweep metrics for monitoring.
+
+        Returns:
+            dict[str, Any]: Configuration, totals since start and the last
+            sweep's tenants, duration, lag (seconds it started after its
+            scheduled time) and results.
+        """
+        return {
+            "running": self._running,
+            "interval_seconds": self.interval_seconds,
+            "concurrency": self.concurrency,
+            "sweeps": self.sweeps,
+            "jobs_failed": self.jobs_failed,
+            "jobs_retriggered": self.jobs_retriggered,
+            "tenant_errors": self.tenant_errors,
+            "last_sweep": self.last_sweep,
+        }
+
     async def _run_loop(self) -> None:
-        """Main monitoring loop - runs until stopped."""
+        """Main monitoring loop - runs sweeps at a fixed rate until stopped."""
         # Wait a bit before first check to let the service fully start
         await asyncio.sleep(30)
-        
+
+        scheduled_at = time.monotonic()
         while self._running:
+            lag = max(0.0, time.monotonic() - scheduled_at)
             try:
-                await self._check_all_jobs()
+                await self._check_all_jobs(lag)
             except Exception as e:
                 logger.error(f"Job monitor error: {e}", exc_info=True)
-            
-            # Wait for next interval
-            await asyncio.sleep(self.interval_seconds)
 
-    async def _check_all_jobs(self) -> None:
-        """Check job statuses across all tenants."""
+            # Next sweep on the fixed schedule; run immediately if overdue
+            scheduled_at += self.interval_seconds
+            await asyncio.sleep(max(0.0, scheduled_at - time.monotonic()))
+
+    async def _check_all_jobs(self, lag: float = 0.0) -> None:
+        """
+        Check job statuses across all tenants.
+
+        Args:
+            lag: Seconds this sweep started after its scheduled time.
+        """
         logger.debug("Starting job status check...")
+        started = time.monotonic()
 
         # Get queue statistics
         await self._log_queue_stats()
 
-        # Get all tenant database names
-        tenant_ids = await self._get_all_tenant_ids()
+        tenant_ids = await tenant_registry.tenant_ids()
 
         if not tenant_ids:
             logger.debug("No tenant databases found")
             return
 
-        total_failed = 0
-        total_retriggered = 0
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def check(tenant_id: str) -> tuple[int, int] | None:
+            async with semaphore:
+                try:
+                    return await self._check_tenant(tenant_id)
+                except Exception as e:
+                    logger.warning(f"Error checking jobs for tenant {tenant_id}: {e}")
+                    return None
+
+        results = await asyncio.gather(*(check(tenant_id) for tenant_id in tenant_ids))
+
+        total_failed = sum(r[0] for r in results if r is not None)
+        total_retriggered = sum(r[1] for r in results if r is not None)
+        errors = sum(1 for r in results if r is None)
+        duration = time.monotonic() - started
+
+        self.sweeps += 1
+        self.jobs_failed += total_failed
+        self.jobs_retriggered += total_retriggered
+        self.tenant_errors += errors
+        self.last_sweep = {
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "tenants": len(tenant_ids),
+            "duration_seconds": round(duration, 3),
+            "lag_seconds": round(lag, 3),
+            "failed": total_failed,
+            "retriggered": total_retriggered,
+            "tenant_errors": errors,
+        }
+
+        if duration > self.interval_seconds:
+            logger.warning(
+                f"Job monitor sweep of {len(tenant_ids)} tenants took {duration:.1f}s, "
+                f"longer than the {self.interval_seconds}s interval"
+            )
 
-        # Check each tenant database for stuck jobs
-        for tenant_id in tenant_ids:
-            try:
-                # Check ingestion jobs
-                stuck_ingestion = await self._get_stuck_jobs(tenant_id, "ingestion")
-                for job in stuck_ingestion:
-                    status = job.get("status", "unknown")
+        if total_failed > 0 or total_retriggered > 0:
+            logger.info(
+                f"Job monitor: marked {total_failed} jobs as failed, "
+                f"re-triggered {total_retriggered} stuck queued jobs "
+                f"({len(tenant_ids)} tenants in {duration:.1f}s)"
+            )
+        else:
+            logger.debug(
+                f"Job monitor: no stuck jobs found "
+                f"({len(tenant_ids)} tenants in {duration:.1f}s)"
+            )
 
-                    if status == "queued":
-                        progress = job.get("progress") or {}
-                        retrigger_count = progress.get("retrigger_count", 0)
-                        max_retriggers = 3
-
-                        if retrigger_count < max_retriggers:
-                            # Attempt re-trigger (up to 3 times)
-                            retriggered = await self._retrigger_queued_job(tenant_id, job, retrigger_count + 1)
-                            if retriggered:
-                                logger.info(
-                                    f"Re-trigger attempt {retrigger_count + 1}/{max_retriggers} "
-                                    f"for job {job['job_id']} (tenant {tenant_id})"
-                                )
-                                total_retriggered += 1
-                                continue
-
-                        # Exhausted all 3 retries or re-trigger failed — mark as failed
-                        await self._mark_job_failed(
-                            tenant_id=tenant_id,
-                            job_id=job["job_id"],
-                            job_type="ingestion",
-                            error_message=f"Job failed after {max_retriggers} re-trigger attempts — worker never picked it up successfully",
-                        )
-                        total_failed += 1
+    async def _check_tenant(self, tenant_id: str) -> tuple[int, int]:
+        """
+        Fail or re-trigger the stuck jobs of one tenant on a single pooled session.
 
-                    else:
-                        # processing — killed mid-job (OOM, SIGKILL)
-                        progress = job.get("progress") or {}
-                        current_step = progress.get("current", "unknown step")
-                        await self._mark_job_failed(
-                            tenant_id=tenant_id,
-                            job_id=job["job_id"],
-                            job_type="ingestion",
-                            error_message=f"Worker was killed (OOM or crash) while processing '{current_step}' after {self.stuck_timeout_minutes} minutes",
-                        )
-                        total_failed += 1
+        Args:
+            tenant_id: The tenant ID to check.
+
+        Returns:
+            tuple[int, int]: Jobs marked failed and jobs re-triggered.
+        """
+        failed = 0
+        retriggered = 0
 
-                # Check email jobs (mark failed only — no re-trigger for email)
-                stuck_email = await self._get_stuck_jobs(tenant_id, "email")
-                for job in stuck_email:
-                    status = job.get("status", "unknown")
+        async with get_async_db_session(self.service_name, tenant_id=tenant_id) as session:
+            for job in await self._get_stuck_jobs(session):
+                status = job.get("status", "unknown")
+
+                if job["job_type"] == "email":
+                    # Mark failed only — no re-trigger for email
                     if status == "queued":
                         error_msg = f"Email job was never picked up by worker after {self.stuck_timeout_minutes} minutes"
                     else:
                         error_msg = f"Email worker was killed (OOM or crash) after {self.stuck_timeout_minutes} minutes"
                     await self._mark_job_failed(
-                        tenant_id=tenant_id,
-                        job_id=job["job_id"],
-                        job_type="email",
-                        error_message=error_msg,
+                        session, tenant_id, job["job_id"], "email", error_msg
                     )
-                    total_failed += 1
-
-            except Exception as e:
-                logger.warning(f"Error checking jobs for tenant {tenant_id}: {e}")
-                continue
+                    failed += 1
+                    continue
+
+                progress = job.get("progress") or {}
+                if status == "queued":
+                    retrigger_count = progress.get("retrigger_count", 0)
+
+                    # Attempt re-trigger (up to 3 times)
+                    if (
+                        retrigger_count < MAX_RETRIGGERS
+                        and await self._retrigger_queued_job(
+                            session, tenant_id, job, retrigger_count + 1
+                        )
+                    ):
+                        retriggered += 1
+                        continue
 
-        if total_failed > 0 or total_retriggered > 0:
-            logger.info(
-                f"Job monitor: marked {total_failed} jobs as failed, "
-                f"re-triggered {total_retriggered} stuck queued jobs"
-            )
-        else:
-            logger.debug("Job monitor: no stuck jobs found")
+                    # Exhausted all 3 retries or re-trigger failed — mark as failed
+                    await self._mark_job_failed(
+                        session,
+                        tenant_id,
+                        job["job_id"],
+                        "ingestion",
+                        f"Job failed after {MAX_RETRIGGERS} re-trigger attempts — worker never picked it up successfully",
+                    )
+                else:
+                    # processing — killed mid-job (OOM, SIGKILL)
+                    current_step = progress.get("current", "unknown step")
+                    await self._mark_job_failed(
+                        session,
+                        tenant_id,
+                        job["job_id"],
+                        "ingestion",
+                        f"Worker was killed (OOM or crash) while processing '{current_step}' after {self.stuck_timeout_minutes} minutes",
+                    )
+                failed += 1
 
-    async def _get_all_tenant_ids(self) -> list[str]:
-        """Get all tenant IDs from existing tenant databases."""
-        try:
-            # Connect to postgres database to list all tenant databases
-            postgres_url = _create_sqlalchemy_url("postgres")
-            engine = create_engine(postgres_url)
-            
-            with engine.connect() as connection:
-                result = connection.execute(
-                    text("""
-                        SELECT datname FROM pg_database 
-                        WHERE datname LIKE 'google-analytics-%'
-                        AND datistemplate = false
-                    """)
-                )
-                databases = [row[0] for row in result.fetchall()]
-            
-            engine.dispose()
-            
-            # Extract tenant IDs from database names
-            tenant_ids = []
-            prefix = "google-analytics-"
-            for db_name in databases:
-                if db_name.startswith(prefix):
-                    tenant_id = db_name[len(prefix):]
-                    tenant_ids.append(tenant_id)
-            
-            return tenant_ids
-            
-        except Exception as e:
-            logger.error(f"Error getting tenant list: {e}")
-            return []
+        return failed, retriggered
 
-    async def _get_stuck_jobs(self, tenant_id: str, job_type: str) -> list[dict[str, Any]]:
+    async def _get_stuck_jobs(self, session: AsyncSession) -> list[dict[str, Any]]:
         """
-        Query database for jobs stuck in 'processing' or 'queued' status for
-        more than stuck_timeout_minutes (default 15 minutes).
+        Query both job tables for jobs stuck in 'processing' or 'queued' status
+        for more than stuck_timeout_minutes, in one round-trip.
 
         Args:
-            tenant_id: The tenant ID to query.
-            job_type: Either 'ingestion' or 'email'.
+            session: Session on the tenant database.
 
         Returns:
-            List of stuck job records with all fields needed for re-trigger or failure.
+            List of stuck job records with a ``job_type`` of 'ingestion' or
+            'email' and all fields needed for re-trigger or failure.
         """
-        table = "processing_jobs" if job_type == "ingestion" else "email_sending_jobs"
         cutoff = datetime.now(timezone.utc) - timedelta(minutes=self.stuck_timeout_minutes)
 
-        db_name = f"google-analytics-{tenant_id}"
-        url = _create_sqlalchemy_url(db_name, async_driver=True)
-
-        engine = create_async_engine(url, pool_size=1, max_overflow=0)
-        session_maker = async_sessionmaker(
-            bind=engine,
-            class_=AsyncSession,
-            expire_on_commit=False,
+        result = await session.execute(
+            text("""
+                SELECT 'ingestion' AS job_type, job_id, status, updated_at,
+                       progress, start_date, end_date, data_types, incremental
+                FROM processing_jobs
+                WHERE status IN ('processing', 'queued')
+                AND updated_at < :cutoff
+                UNION ALL
+                SELECT 'email', job_id, status, updated_at,
+                       NULL, NULL, NULL, NULL, NULL
+                FROM email_sending_jobs
+                WHERE status IN ('processing', 'queued')
+                AND updated_at < :cutoff
+            """),
+            {"cutoff": cutoff},
         )
-
-        try:
-            async with session_maker() as session:
-                if job_type == "ingestion":
-                    result = await session.execute(
-                        text(f"""
-                            SELECT job_id, tenant_id, status, updated_at,
-                                   progress, start_date, end_date, data_types
-                            FROM {table}
-                            WHERE status IN ('processing', 'queued')
-                            AND updated_at < :cutoff
-                        """),
-                        {"cutoff": cutoff},
-                    )
-                else:
-                    result = await session.execute(
-                        text(f"""
-                            SELECT job_id, tenant_id, status, updated_at
-                            FROM {table}
-                            WHERE status IN ('processing', 'queued')
-                            AND updated_at < :cutoff
-                        """),
-                        {"cutoff": cutoff},
-                    )
-                rows = result.mappings().all()
-                return [dict(row) for row in rows]
-        finally:
-            await engine.dispose()
+        return [dict(row) for row in result.mappings().all()]
 
     async def _retrigger_queued_job(
-        self, tenant_id: str, job: dict[str, Any], new_retrigger_count: int
+        self,
+        session: AsyncSession,
+        tenant_id: str,
+        job: dict[str, Any],
+        new_retrigger_count: int,
     ) -> bool:
         """
         Re-send a stuck queued ingestion job to the Azure Storage Queue using the same job_id.
@@ -320,8 +353,10 @@ class JobStatusMonitor:
         Resets updated_at so the job won't be picked up again by the monitor this cycle.
 
         Args:
+            session: Session on the tenant database.
             tenant_id: The tenant ID.
-            job: The stuck job record (must include job_id, start_date, end_date, data_types).
+            job: The stuck job record (must include job_id, start_date, end_date,
+                data_types, incremental).
             new_retrigger_count: The updated retry count to store (1, 2, or 3).
 
         Returns:
@@ -337,6 +372,7 @@ class JobStatusMonitor:
                 "start_date": job["start_date"].isoformat() if hasattr(job["start_date"], "isoformat") else str(job["start_date"]),
                 "end_date": job["end_date"].isoformat() if hasattr(job["end_date"], "isoformat") else str(job["end_date"]),
                 "data_types": job["data_types"] if isinstance(job["data_types"], list) else list(job["data_types"]),
+                "incremental": bool(job.get("incremental")),
             }
 
             queue_client = QueueClient.from_connection_string(
@@ -347,43 +383,35 @@ class JobStatusMonitor:
 
             # Stamp retrigger_count and reset updated_at to prevent immediate
             # re-trigger on the next monitor cycle
-            db_name = f"google-analytics-{tenant_id}"
-            url = _create_sqlalchemy_url(db_name, async_driver=True)
-            engine = create_async_engine(url, pool_size=1, max_overflow=0)
-            session_maker = async_sessionmaker(
-                bind=engine, class_=AsyncSession, expire_on_commit=False
+            await session.execute(
+                text("""
+                    UPDATE processing_jobs
+                    SET progress = jsonb_set(
+                            COALESCE(progress, '{}'::jsonb),
+                            '{retrigger_count}',
+                            CAST(:count AS jsonb)
+                        ),
+                        updated_at = NOW()
+                    WHERE job_id = :job_id
+                """),
+                {"job_id": job_id, "count": str(new_retrigger_count)},
             )
-            try:
-                async with session_maker() as session:
-                    await session.execute(
-                        text("""
-                            UPDATE processing_jobs
-                            SET progress = jsonb_set(
-                                    COALESCE(progress, '{}'::jsonb),
-                                    '{retrigger_count}',
-                                    :count::jsonb
-                                ),
-                                updated_at = NOW()
-                            WHERE job_id = :job_id
-                        """),
-                        {"job_id": job_id, "count": str(new_retrigger_count)},
-                    )
-                    await session.commit()
-            finally:
-                await engine.dispose()
+            await session.commit()
 
             logger.info(
                 f"Re-triggered stuck queued job {job_id} for tenant {tenant_id} "
-                f"(attempt {new_retrigger_count}/3)"
+                f"(attempt {new_retrigger_count}/{MAX_RETRIGGERS})"
             )
             return True
 
         except Exception as e:
+            await session.rollback()
             logger.error(f"Failed to re-trigger job {job_id}: {e}")
             return False
 
     async def _mark_job_failed(
         self,
+        session: AsyncSession,
         tenant_id: str,
         job_id: str,
         job_type: str,
@@ -391,55 +419,44 @@ class JobStatusMonitor:
     ) -> None:
         """
         Update a stuck job's status to 'failed'.
-        
+
         Args:
+            session: Session on the tenant database.
             tenant_id: The tenant ID.
             job_id: The job ID to update.
             job_type: Either 'ingestion' or 'email'.
             error_message: Error message to store.
         """
         table = "processing_jobs" if job_type == "ingestion" else "email_sending_jobs"
-        
-        db_name = f"google-analytics-{tenant_id}"
-        url = _create_sqlalchemy_url(db_name, async_driver=True)
-        
-        engine = create_async_engine(url, pool_size=1, max_overflow=0)
-        session_maker = async_sessionmaker(
-            bind=engine,
-            class_=AsyncSession,
-            expire_on_commit=False,
-        )
-        
+
         try:
-            async with session_maker() as session:
-                await session.execute(
-                    text(f"""
-                        UPDATE {table}
-                        SET status = 'failed',
-                            error_message = :error_message,
-                            completed_at = NOW(),
-                            updated_at = NOW()
-                        WHERE job_id = :job_id
-                    """),
-                    {"job_id": job_id, "error_message": error_message},
-                )
-                await session.commit()
-                logger.info(
-                    f"Marked {job_type} job {job_id} as failed for tenant {tenant_id}: {error_message}"
-                )
+            await session.execute(
+                text(f"""
+                    UPDATE {table}
+                    SET status = 'failed',
+                        error_message = :error_message,
+                        completed_at = NOW(),
+                        updated_at = NOW()
+                    WHERE job_id = :job_id
+                """),
+                {"job_id": job_id, "error_message": error_message},
+            )
+            await session.commit()
+            logger.info(
+                f"Marked {job_type} job {job_id} as failed for tenant {tenant_id}: {error_message}"
+            )
         except Exception as e:
+            await session.rollback()
             logger.error(f"Error marking job {job_id} as failed: {e}")
-        finally:
-            await engine.dispose()
 
     async def _log_queue_stats(self) -> None:
         """Log Azure Queue statistics for monitoring."""
         if not self.azure_connection_string:
             logger.debug("Azure connection string not configured, skipping queue stats")
             return
-            
+
         queues = ["ingestion-jobs", "email-jobs"]
-        
+
         for queue_name in queues:
             try:
                 queue_client = QueueClient.from_connection_string(
@@ -457,15 +474,19 @@ def create_job_monitor(
     azure_connection_string: str,
     interval_seconds: int = 300,
     stuck_timeout_minutes: int = 15,
+    concurrency: int = 8,
+    service_name: str = "job-monitor",
 ) -> JobStatusMonitor:
     """
     Factory function to create a JobStatusMonitor instance.
-    
+
     Args:
         azure_connection_string: Azure Storage connection string.
         interval_seconds: Polling interval in seconds (default: 300).
         stuck_timeout_minutes: Stuck job timeout in minutes (default: 10).
-        
+        concurrency: Maximum tenants checked concurrently (default: 8).
+        service_name: Service whose pooled tenant engines are reused.
+
     Returns:
         Configured JobStatusMonitor instance.
     """
@@ -473,4 +494,6 @@ def create_job_monitor(
         azure_connection_string=azure_connection_string,
         interval_seconds=interval_seconds,
         stuck_timeout_minutes=stuck_timeout_minutes,
+        concurrency=concurrency,
+        service_name=service_name,
     )
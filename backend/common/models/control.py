@@ -14,7 +14,7 @@ from __future__ import annotations
 
 from datetime import date, datetime
 
-from sqlalchemy import TIMESTAMP, Date, String, Text, text
+from sqlalchemy import TIMESTAMP, Boolean, Date, String, Text, text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -39,6 +39,8 @@ class ProcessingJobs(Base):
             Example: {"page_view": "completed", "purchase": "pending"}
         start_date (date): Start date for data extraction/processing.
         end_date (date): End date for data extraction/processing.
+        incremental (bool): Whether only event days whose BigQuery shard changed
+            are re-extracted. Default: False.
         progress (dict): JSON object tracking overall progress. May include:
             - "total_records": int
             - "processed_records": int
@@ -91,6 +93,9 @@ class ProcessingJobs(Base):
     data_types: Mapped[dict] = mapped_column(JSONB)
     start_date: Mapped[date] = mapped_column(Date)
     end_date: Mapped[date] = mapped_column(Date)
+    incremental: Mapped[bool] = mapped_column(
+        Boolean, default=False, server_default=text("false")
+    )
     progress: Mapped[dict] = mapped_column(JSONB, default=dict)
     records_processed: Mapped[dict] = mapped_column(JSONB, default=dict)
     error_message: Mapped[str | None] = mapped_column(Text)
@@ -0,0 +1,85 @@
+-- Definition for function public.backfill_derived_tables
+-- Derives converted_sessions, sessions and the dashboard rollups
+-- (daily_branch_stats, daily_branch_sessions, daily_branch_users) for event
+-- data that was ingested before those tables existed. Ingestion only
+-- refreshes the ranges it loads, and incremental runs never reload unchanged
+-- days, so without this historical carts would read as abandoned, searches
+-- as unconverted, history and repeat visits as missing and days as empty.
+-- Called when a tenant schema is (re)initialized; a no-op once everything
+-- is derived.
+CREATE OR REPLACE FUNCTION public.backfill_derived_tables(
+    p_tenant_id uuid
+)
+ RETURNS jsonb
+ LANGUAGE plpgsql
+AS $function$
+DECLARE
+    v_converted integer := 0;
+    v_sessions integer := 0;
+    v_rollup_days integer := 0;
+    v_range record;
+BEGIN
+    -- The refresh functions rebuild the whole history when the tenant has
+    -- no rows yet. converted_sessions goes first: the rollups read it.
+    IF NOT EXISTS (SELECT 1 FROM converted_sessions WHERE tenant_id = p_tenant_id) THEN
+        v_converted := refresh_converted_sessions(p_tenant_id);
+    END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM sessions WHERE tenant_id = p_tenant_id) THEN
+        v_sessions := refresh_sessions(p_tenant_id);
+    END IF;
+
+    -- Rollups are per day: rebuild every run of consecutive days that has
+    -- events but no rollup rows, or page views but no daily_branch_users rows
+    FOR v_range IN
+        WITH event_days AS (
+            SELECT event_date FROM page_view WHERE tenant_id = p_tenant_id
+            UNION
+            SELECT event_date FROM add_to_cart WHERE tenant_id = p_tenant_id
+            UNION
+            SELECT event_date FROM purchase WHERE tenant_id = p_tenant_id
+            UNION
+            SELECT event_date FROM view_search_results WHERE tenant_id = p_tenant_id
+            UNION
+            SELECT event_date FROM no_search_results WHERE tenant_id = p_tenant_id
+        ),
+        missing_days AS (
+            SELECT d.event_date
+            FROM event_days d
+            WHERE NOT EXISTS (
+                SELECT 1 FROM daily_branch_stats s
+                WHERE s.tenant_id = p_tenant_id AND s.event_date = d.event_date
+            )
+              AND NOT EXISTS (
+                SELECT 1 FROM daily_branch_sessions s
+                WHERE s.tenant_id = p_tenant_id AND s.event_date = d.event_date
+            )
+            UNION
+            SELECT DISTINCT p.event_date
+            FROM page_view p
+            WHERE p.tenant_id = p_tenant_id
+              AND NOT EXISTS (
+                SELECT 1 FROM daily_branch_users u
+                WHERE u.tenant_id = p_tenant_id AND u.event_date = p.event_date
+            )
+        )
+        SELECT MIN(event_date) AS start_date, MAX(event_date) AS end_date, COUNT(*) AS days
+        FROM (
+            SELECT event_date,
+                   event_date - (ROW_NUMBER() OVER (ORDER BY event_date))::integer AS island
+            FROM missing_days
+        ) numbered
+        GROUP BY island
+        ORDER BY 1
+    LOOP
+        PERFORM refresh_daily_branch_stats(p_tenant_id, v_range.start_date, v_range.end_date);
+        v_rollup_days := v_rollup_days + v_range.days;
+    END LOOP;
+
+    RETURN jsonb_build_object(
+        'converted_sessions', v_converted,
+        'sessions', v_sessions,
+        'daily_branch_stats_days', v_rollup_days
+    );
+END;
+$function$
@@ -0,0 +1,43 @@
+-- Definition for function public.ensure_event_partitions
+-- Creates any missing daily partitions ({table}_YYYYMMDD) of an event table
+-- for the inclusive date range. No-op for tables that are not partitioned.
+CREATE OR REPLACE FUNCTION public.ensure_event_partitions(
+    p_table text,
+    p_start_date date,
+    p_end_date date
+)
+ RETURNS integer
+ LANGUAGE plpgsql
+AS $function$
+DECLARE
+    v_day date := p_start_date;
+    v_partition text;
+    v_created integer := 0;
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+        FROM pg_partitioned_table pt
+        JOIN pg_class c ON c.oid = pt.partrelid
+        WHERE c.relname = p_table
+          AND c.relnamespace = 'public'::regnamespace
+    ) THEN
+        RETURN 0;
+    END IF;
+
+    WHILE v_day <= p_end_date LOOP
+        v_partition := p_table || '_' || to_char(v_day, 'YYYYMMDD');
+
+        IF to_regclass(format('public.%I', v_partition)) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE public.%I PARTITION OF public.%I FOR VALUES FROM (%L) TO (%L)',
+                v_partition, p_table, v_day, v_day + 1
+            );
+            v_created := v_created + 1;
+        END IF;
+
+        v_day := v_day + 1;
+    END LOOP;
+
+    RETURN v_created;
+END;
+$function$
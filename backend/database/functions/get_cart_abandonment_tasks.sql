@@ -1,38 +1,56 @@
 -- Definition for function public.get_cart_abandonment_tasks
-CREATE OR REPLACE FUNCTION public.get_cart_abandonment_tasks(p_tenant_id uuid, p_page integer, p_limit integer, p_query text DEFAULT NULL::text, p_location_id text DEFAULT NULL::text, p_start_date text DEFAULT NULL::text, p_end_date text DEFAULT NULL::text, p_sort_field text DEFAULT 'last_activity'::text, p_sort_order text DEFAULT 'desc'::text)
+-- Offset (p_page) or keyset (p_cursor) pagination, as in get_purchase_tasks.
+-- With p_include_total = false the exact total is replaced by an estimate
+-- from daily_branch_sessions (null when p_query is set).
+DROP FUNCTION IF EXISTS public.get_cart_abandonment_tasks(uuid, integer, integer, text, text, text, text, text, text);
+
+CREATE OR REPLACE FUNCTION public.get_cart_abandonment_tasks(p_tenant_id uuid, p_page integer, p_limit integer, p_query text DEFAULT NULL::text, p_location_id text DEFAULT NULL::text, p_start_date text DEFAULT NULL::text, p_end_date text DEFAULT NULL::text, p_sort_field text DEFAULT 'last_activity'::text, p_sort_order text DEFAULT 'desc'::text, p_cursor jsonb DEFAULT NULL::jsonb, p_include_total boolean DEFAULT true)
  RETURNS jsonb
  LANGUAGE plpgsql
 AS $function$
 DECLARE
     result JSONB;
 BEGIN
-    WITH abandoned_sessions AS (
+    WITH matched_identities AS (
+        -- Event identities of customers matching the search box (trigram
+        -- indexes on users)
+        SELECT ui.user_prop_webuserid, ui.user_prop_webcustomerid
+        FROM users u
+        JOIN user_identities ui ON ui.tenant_id = p_tenant_id AND ui.user_id = u.user_id
+        WHERE p_query IS NOT NULL
+          AND u.tenant_id = p_tenant_id
+          AND (u.buying_company_name ILIKE '%' || p_query || '%'
+               OR u.email ILIKE '%' || p_query || '%')
+    ),
+    abandoned_sessions AS (
         SELECT DISTINCT
             ac.param_ga_session_id
         FROM add_to_cart ac
-        LEFT JOIN users u ON u.tenant_id = p_tenant_id
-            AND (u.user_id = ac.user_prop_webuserid
-                 OR (ac.user_prop_webuserid IS NULL AND u.buying_company_erp_id = ac.user_prop_webcustomerid))
         WHERE ac.tenant_id = p_tenant_id
           AND (p_location_id IS NULL OR ac.user_prop_default_branch_id = p_location_id)
           AND (p_start_date IS NULL OR ac.event_date >= TO_DATE(p_start_date, 'YYYY-MM-DD'))
           AND (p_end_date IS NULL OR ac.event_date <= TO_DATE(p_end_date, 'YYYY-MM-DD'))
           AND NOT EXISTS (
-              SELECT 1 FROM purchase p
-              WHERE p.param_ga_session_id = ac.param_ga_session_id
-                AND p.tenant_id = p_tenant_id
+              SELECT 1
+              FROM get_converted_sessions(
+                  p_tenant_id,
+                  TO_DATE(p_start_date, 'YYYY-MM-DD'),
+                  TO_DATE(p_end_date, 'YYYY-MM-DD')
+              ) cs
+              WHERE cs.session_id = ac.param_ga_session_id
           )
-          AND (p_query IS NULL OR
-               u.buying_company_name ILIKE '%' || p_query || '%' OR
-               u.email ILIKE '%' || p_query || '%' OR
-               ac.first_item_item_name ILIKE '%' || p_query || '%')
+          AND (p_query IS NULL
+               OR ac.items_search_text ILIKE '%' || p_query || '%'
+               OR (COALESCE(ac.user_prop_webuserid, ''),
+                   CASE WHEN ac.user_prop_webuserid IS NULL THEN COALESCE(ac.user_prop_webcustomerid, '') ELSE '' END)
+                  IN (SELECT mi.user_prop_webuserid, mi.user_prop_webcustomerid FROM matched_identities mi))
     ),
     session_details AS (
         SELECT
             ac.param_ga_session_id,
             ac.user_prop_webuserid,
             MAX(ac.user_prop_webcustomerid) AS user_prop_webcustomerid,
-            MAX(ac.event_timestamp) AS last_activity,
+            MAX(ac.event_time) AS last_activity,
             COUNT(ac.id) AS items_count,
             SUM(ac.first_item_price * ac.first_item_quantity) AS total_value,
             jsonb_agg(
@@ -57,35 +75,69 @@ BEGIN
             u.email,
             u.cell_phone AS phone,
             u.office_phone,
-            COUNT(*) OVER() AS total_count
+            COALESCE(sd.param_ga_session_id, '') || ':' || COALESCE(sd.user_prop_webuserid, '')
+                || ':' || COALESCE(u.user_id, '') AS sort_key
         FROM session_details sd
-        LEFT JOIN users u ON u.tenant_id = p_tenant_id
-            AND (u.user_id = sd.user_prop_webuserid
-                 OR (sd.user_prop_webuserid IS NULL AND u.buying_company_erp_id = sd.user_prop_webcustomerid))
+        LEFT JOIN user_identities ui ON ui.tenant_id = p_tenant_id
+            AND ui.user_prop_webuserid = COALESCE(sd.user_prop_webuserid, '')
+            AND ui.user_prop_webcustomerid = CASE WHEN sd.user_prop_webuserid IS NULL THEN COALESCE(sd.user_prop_webcustomerid, '') ELSE '' END
+        LEFT JOIN users u ON u.tenant_id = p_tenant_id AND u.user_id = ui.user_id
+    ),
+    keyed_sessions AS (
+        SELECT
+            swu.*,
+            CASE
+                WHEN p_sort_field = 'total_value' THEN swu.total_value
+                WHEN p_sort_field = 'items_count' THEN swu.items_count
+                WHEN p_sort_field = 'customer_name' THEN NULL
+                ELSE (EXTRACT(EPOCH FROM swu.last_activity) * 1000000)::bigint
+            END AS sort_num,
+            CASE WHEN p_sort_field = 'customer_name' THEN swu.customer_name END AS sort_text
+        FROM sessions_with_user swu
     ),
     paginated_sessions AS (
-        SELECT *
-        FROM sessions_with_user
-        ORDER BY
-            CASE WHEN p_sort_field = 'total_value'   AND p_sort_order = 'desc' THEN total_value   END DESC NULLS LAST,
-            CASE WHEN p_sort_field = 'total_value'   AND p_sort_order = 'asc'  THEN total_value   END ASC  NULLS LAST,
-            CASE WHEN p_sort_field = 'last_activity' AND p_sort_order = 'desc' THEN last_activity END DESC NULLS LAST,
-            CASE WHEN p_sort_field = 'last_activity' AND p_sort_order = 'asc'  THEN last_activity END ASC  NULLS LAST,
-            CASE WHEN p_sort_field = 'customer_name' AND p_sort_order = 'desc' THEN customer_name END DESC NULLS LAST,
-            CASE WHEN p_sort_field = 'customer_name' AND p_sort_order = 'asc'  THEN customer_name END ASC  NULLS LAST,
-            CASE WHEN p_sort_field = 'items_count'   AND p_sort_order = 'desc' THEN items_count   END DESC NULLS LAST,
-            CASE WHEN p_sort_field = 'items_count'   AND p_sort_order = 'asc'  THEN items_count   END ASC  NULLS LAST,
-            last_activity DESC
-        LIMIT p_limit
-        OFFSET (p_page - 1) * p_limit
+        SELECT page.*, ROW_NUMBER() OVER (
+            ORDER BY
+                sort_is_null,
+                CASE WHEN p_sort_order = 'asc' THEN sort_num END ASC,
+                CASE WHEN p_sort_order <> 'asc' THEN sort_num END DESC,
+                CASE WHEN p_sort_order = 'asc' THEN sort_text END ASC,
+                CASE WHEN p_sort_order <> 'asc' THEN sort_text END DESC,
+                sort_key
+        ) AS page_rn
+        FROM (
+            SELECT *, (sort_num IS NULL AND sort_text IS NULL) AS sort_is_null
+            FROM keyed_sessions ks
+            WHERE p_cursor IS NULL
+               OR (ks.sort_num IS NULL AND ks.sort_text IS NULL) > (p_cursor->>'z')::boolean
+               OR ((ks.sort_num IS NULL AND ks.sort_text IS NULL) = (p_cursor->>'z')::boolean AND (
+                      COALESCE(
+                          CASE WHEN p_sort_order = 'asc' THEN ks.sort_num > (p_cursor->>'n')::numeric ELSE ks.sort_num < (p_cursor->>'n')::numeric END,
+                          CASE WHEN p_sort_order = 'asc' THEN ks.sort_text > p_cursor->>'t' ELSE ks.sort_text < p_cursor->>'t' END,
+                          false
+                      )
+                      OR (ks.sort_num IS NOT DISTINCT FROM (p_cursor->>'n')::numeric
+                          AND ks.sort_text IS NOT DISTINCT FROM p_cursor->>'t'
+                          AND ks.sort_key > p_cursor->>'k')
+                  ))
+            ORDER BY
+                (sort_num IS NULL AND sort_text IS NULL),
+                CASE WHEN p_sort_order = 'asc' THEN sort_num END ASC,
+                CASE WHEN p_sort_order <> 'asc' THEN sort_num END DESC,
+                CASE WHEN p_sort_order = 'asc' THEN sort_text END ASC,
+                CASE WHEN p_sort_order <> 'asc' THEN sort_text END DESC,
+                sort_key
+            LIMIT p_limit + 1
+            OFFSET CASE WHEN p_cursor IS NULL THEN (p_page - 1) * p_limit ELSE 0 END
+        ) page
     )
     SELECT jsonb_build_object(
         'data', (
             SELECT jsonb_agg(
                 jsonb_build_object(
                     'session_id', ps.param_ga_session_id,
-                    'event_date', TO_CHAR(TO_TIMESTAMP(CAST(ps.last_activity AS BIGINT) / 1000000), 'YYYY-MM-DD'),
-                    'last_activity', TO_CHAR(TO_TIMESTAMP(CAST(ps.last_activity AS BIGINT) / 1000000), 'YYYY-MM-DD'),
+                    'event_date', TO_CHAR(ps.last_activity, 'YYYY-MM-DD'),
+                    'last_activity', TO_CHAR(ps.last_activity, 'YYYY-MM-DD'),
                     'items_count', ps.items_count,
                     'total_value', ps.total_value,
                     'user_id', ps.user_id,
@@ -94,14 +146,42 @@ BEGIN
                     'phone', ps.phone,
                     'office_phone', ps.office_phone,
                     'products', ps.products
-                )
+                ) ORDER BY ps.page_rn
             )
             FROM paginated_sessions ps
+            WHERE ps.page_rn <= p_limit
         ),
-        'total', (SELECT MAX(total_count) FROM paginated_sessions),
+        'total', CASE
+            WHEN p_include_total THEN (SELECT COUNT(*) FROM keyed_sessions)
+            WHEN p_query IS NULL THEN (
+                SELECT COUNT(DISTINCT dbs.session_id)
+                FROM daily_branch_sessions dbs
+                WHERE dbs.tenant_id = p_tenant_id
+                  AND dbs.has_cart
+                  AND (p_location_id IS NULL OR dbs.branch_id = p_location_id)
+                  AND (p_start_date IS NULL OR dbs.event_date >= TO_DATE(p_start_date, 'YYYY-MM-DD'))
+                  AND (p_end_date IS NULL OR dbs.event_date <= TO_DATE(p_end_date, 'YYYY-MM-DD'))
+                  AND NOT EXISTS (
+                      SELECT 1
+                      FROM get_converted_sessions(
+                          p_tenant_id,
+                          TO_DATE(p_start_date, 'YYYY-MM-DD'),
+                          TO_DATE(p_end_date, 'YYYY-MM-DD')
+                      ) cs
+                      WHERE cs.session_id = dbs.session_id
+                  )
+            )
+        END,
+        'total_is_estimate', NOT p_include_total,
         'page', p_page,
         'limit', p_limit,
-        'has_more', (p_page * p_limit) < (SELECT MAX(total_count) FROM paginated_sessions)
+        'has_more', (SELECT COUNT(*) FROM paginated_sessions) > p_limit,
+        'next_cursor', (
+            SELECT jsonb_build_object('z', ps.sort_is_null, 'n', ps.sort_num, 't', ps.sort_text, 'k', ps.sort_key)
+            FROM paginated_sessions ps
+            WHERE ps.page_rn = p_limit
+              AND EXISTS (SELECT 1 FROM paginated_sessions WHERE page_rn > p_limit)
+        )
     ) INTO result;
 
     RETURN result;
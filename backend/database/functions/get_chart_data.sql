@@ -8,6 +8,9 @@ DECLARE
     date_format TEXT;
     series_interval TEXT;
     use_hourly_data BOOLEAN;
+    v_from TIMESTAMPTZ;
+    v_to TIMESTAMPTZ;
+    v_bucket_hours INTEGER;
 BEGIN
     -- Determine if we need hourly data based on granularity
     use_hourly_data := p_granularity IN ('hourly', '4hours', '12hours');
@@ -32,238 +35,214 @@ BEGIN
         series_interval := '1 day';
     END IF;
 
-    WITH date_series AS (
-        SELECT generate_series(
-            TO_TIMESTAMP(p_start_date || ' 00:00:00', 'YYYY-MM-DD HH24:MI:SS'),
+    -- Daily, weekly and monthly charts read the rollups maintained by
+    -- refresh_daily_branch_stats(); hourly granularities need event_time and
+    -- fall through to the raw event tables below
+    IF NOT use_hourly_data THEN
+        WITH date_series AS (
+            SELECT generate_series(
+                TO_TIMESTAMP(p_start_date || ' 00:00:00', 'YYYY-MM-DD HH24:MI:SS'),
+                TO_TIMESTAMP(p_end_date || ' 23:59:59', 'YYYY-MM-DD HH24:MI:SS'),
+                series_interval::interval
+            ) as time_point
+        ),
+        unique_grouped_dates AS (
+            SELECT DISTINCT
+                TO_CHAR(DATE_TRUNC(period, time_point), date_format) as date_group,
+                DATE_TRUNC(period, time_point) as start_of_period
+            FROM date_series,
+                 LATERAL (SELECT CASE p_granularity
+                     WHEN 'monthly' THEN 'month'
+                     WHEN 'weekly' THEN 'week'
+                     ELSE 'day'
+                 END as period) granularity
+        ),
+        branch_stats AS (
+            SELECT
+                TO_CHAR(DATE_TRUNC(CASE p_granularity
+                    WHEN 'monthly' THEN 'month'
+                    WHEN 'weekly' THEN 'week'
+                    ELSE 'day'
+                END, event_date::timestamp), date_format) as date_group,
+                revenue,
+                purchases,
+                searches + failed_searches as searches
+            FROM daily_branch_stats
+            WHERE tenant_id = p_tenant_id
+              AND event_date BETWEEN TO_DATE(p_start_date, 'YYYY-MM-DD') AND TO_DATE(p_end_date, 'YYYY-MM-DD')
+              AND (p_location_id IS NULL OR branch_id = p_location_id)
+        ),
+        branch_sessions AS (
+            SELECT
+                TO_CHAR(DATE_TRUNC(CASE p_granularity
+                    WHEN 'monthly' THEN 'month'
+                    WHEN 'weekly' THEN 'week'
+                    ELSE 'day'
+                END, event_date::timestamp), date_format) as date_group,
+                session_id,
+                has_page_view,
+                has_cart
+            FROM daily_branch_sessions
+            WHERE tenant_id = p_tenant_id
+              AND event_date BETWEEN TO_DATE(p_start_date, 'YYYY-MM-DD') AND TO_DATE(p_end_date, 'YYYY-MM-DD')
+              AND (p_location_id IS NULL OR branch_id = p_location_id)
+        ),
+        stats_by_period AS (
+            SELECT
+                date_group,
+                SUM(revenue) as revenue,
+                SUM(purchases) as purchases,
+                SUM(searches) as searches
+            FROM branch_stats
+            GROUP BY date_group
+        ),
+        visitors_by_period AS (
+            SELECT
+                date_group,
+                COUNT(DISTINCT session_id) as visitors
+            FROM branch_sessions
+            WHERE has_page_view
+            GROUP BY date_group
+        ),
+        -- Abandoned carts: sessions with cart additions but NO purchase (consistent with stats)
+        abandoned_carts_by_period AS (
+            SELECT
+                bs.date_group,
+                COUNT(DISTINCT bs.session_id) as abandoned_carts
+            FROM branch_sessions bs
+            WHERE bs.has_cart
+              AND NOT EXISTS (
+                  SELECT 1
+                  FROM get_converted_sessions(
+                      p_tenant_id,
+                      TO_DATE(p_start_date, 'YYYY-MM-DD'),
+                      TO_DATE(p_end_date, 'YYYY-MM-DD')
+                  ) cs
+                  WHERE cs.session_id = bs.session_id
+              )
+            GROUP BY bs.date_group
+        )
+        SELECT jsonb_agg(jsonb_build_object(
+            'date', gd.start_of_period,
+            'time', gd.start_of_period,
+            'revenue', COALESCE(s.revenue, 0),
+            'purchases', COALESCE(s.purchases, 0),
+            'visitors', COALESCE(v.visitors, 0),
+            'carts', COALESCE(ac.abandoned_carts, 0),
+            'searches', COALESCE(s.searches, 0)
+        ) ORDER BY gd.start_of_period)
+        INTO result
+        FROM unique_grouped_dates gd
+        LEFT JOIN stats_by_period s ON gd.date_group = s.date_group
+        LEFT JOIN visitors_by_period v ON gd.date_group = v.date_group
+        LEFT JOIN abandoned_carts_by_period ac ON gd.date_group = ac.date_group;
+
+        RETURN COALESCE(result, '[]'::jsonb);
+    END IF;
+
+    -- Hourly granularities bucket the typed event_time column. The range
+    -- predicate on it is served by the idx_*_event_time indexes, and the
+    -- event_date predicate keeps partition pruning.
+    v_from := TO_TIMESTAMP(p_start_date || ' 00:00:00', 'YYYY-MM-DD HH24:MI:SS');
+    v_to := TO_TIMESTAMP(p_end_date || ' 00:00:00', 'YYYY-MM-DD HH24:MI:SS') + INTERVAL '1 day';
+    v_bucket_hours := CASE p_granularity WHEN '4hours' THEN 4 WHEN '12hours' THEN 12 ELSE 1 END;
+
+    WITH time_buckets AS (
+        SELECT DISTINCT
+            DATE_TRUNC('hour', time_point)
+                - INTERVAL '1 hour' * (EXTRACT(HOUR FROM time_point)::int % v_bucket_hours) AS start_of_period
+        FROM generate_series(
+            v_from,
             TO_TIMESTAMP(p_end_date || ' 23:59:59', 'YYYY-MM-DD HH24:MI:SS'),
             series_interval::interval
-        ) as time_point
-    ),
-    grouped_dates AS (
-        SELECT
-            CASE 
-                WHEN p_granularity = 'monthly' THEN TO_CHAR(DATE_TRUNC('month', time_point), date_format)
-                WHEN p_granularity = 'weekly' THEN TO_CHAR(DATE_TRUNC('week', time_point), date_format)
-                WHEN p_granularity = '4hours' THEN 
-                    TO_CHAR(DATE_TRUNC('hour', time_point) - INTERVAL '1 hour' * (EXTRACT(HOUR FROM time_point)::int % 4), date_format)
-                WHEN p_granularity = '12hours' THEN 
-                    TO_CHAR(DATE_TRUNC('hour', time_point) - INTERVAL '1 hour' * (EXTRACT(HOUR FROM time_point)::int % 12), date_format)
-                WHEN p_granularity = 'hourly' THEN TO_CHAR(DATE_TRUNC('hour', time_point), date_format)
-                ELSE TO_CHAR(DATE_TRUNC('day', time_point), date_format)
-            END as date_group,
-            CASE 
-                WHEN p_granularity = 'monthly' THEN DATE_TRUNC('month', time_point)
-                WHEN p_granularity = 'weekly' THEN DATE_TRUNC('week', time_point)
-                WHEN p_granularity = '4hours' THEN 
-                    DATE_TRUNC('hour', time_point) - INTERVAL '1 hour' * (EXTRACT(HOUR FROM time_point)::int % 4)
-                WHEN p_granularity = '12hours' THEN 
-                    DATE_TRUNC('hour', time_point) - INTERVAL '1 hour' * (EXTRACT(HOUR FROM time_point)::int % 12)
-                WHEN p_granularity = 'hourly' THEN DATE_TRUNC('hour', time_point)
-                ELSE DATE_TRUNC('day', time_point)
-            END as start_of_period
-        FROM date_series
-    ),
-    unique_grouped_dates AS (
-        SELECT DISTINCT date_group, start_of_period
-        FROM grouped_dates
+        ) AS time_point
     ),
     purchases_by_period AS (
         SELECT
-            CASE 
-                -- For daily/weekly/monthly, use event_date (date field)
-                WHEN p_granularity = 'monthly' THEN TO_CHAR(DATE_TRUNC('month', event_date::timestamp), date_format)
-                WHEN p_granularity = 'weekly' THEN TO_CHAR(DATE_TRUNC('week', event_date::timestamp), date_format)
-                WHEN NOT use_hourly_data THEN TO_CHAR(DATE_TRUNC('day', event_date::timestamp), date_format)
-                -- For hourly granularities, convert string timestamp to timestamp (assuming microseconds since epoch)
-                WHEN p_granularity = '4hours' THEN 
-                    TO_CHAR(
-                        DATE_TRUNC('hour', TO_TIMESTAMP(event_timestamp::bigint / 1000000.0)) - 
-                        INTERVAL '1 hour' * (EXTRACT(HOUR FROM TO_TIMESTAMP(event_timestamp::bigint / 1000000.0))::int % 4), 
-                        date_format
-                    )
-                WHEN p_granularity = '12hours' THEN 
-                    TO_CHAR(
-                        DATE_TRUNC('hour', TO_TIMESTAMP(event_timestamp::bigint / 1000000.0)) - 
-                        INTERVAL '1 hour' * (EXTRACT(HOUR FROM TO_TIMESTAMP(event_timestamp::bigint / 1000000.0))::int % 12), 
-                        date_format
-                    )
-                WHEN p_granularity = 'hourly' THEN 
-                    TO_CHAR(DATE_TRUNC('hour', TO_TIMESTAMP(event_timestamp::bigint / 1000000.0)), date_format)
-                ELSE TO_CHAR(DATE_TRUNC('day', event_date::timestamp), date_format)
-            END as date_group,
+            DATE_TRUNC('hour', event_time)
+                - INTERVAL '1 hour' * (EXTRACT(HOUR FROM event_time)::int % v_bucket_hours) AS start_of_period,
             SUM(ecommerce_purchase_revenue) as revenue,
             COUNT(*) as purchases
         FROM purchase
         WHERE tenant_id = p_tenant_id
           AND event_date BETWEEN TO_DATE(p_start_date, 'YYYY-MM-DD') AND TO_DATE(p_end_date, 'YYYY-MM-DD')
+          AND event_time >= v_from AND event_time < v_to
           AND (p_location_id IS NULL OR user_prop_default_branch_id = p_location_id)
-          -- Only include records with valid timestamp for hourly data
-          AND (NOT use_hourly_data OR (event_timestamp IS NOT NULL AND event_timestamp ~ '^[0-9]+$'))
-        GROUP BY date_group
+        GROUP BY 1
     ),
     visitors_by_period AS (
         SELECT
-            CASE 
-                -- For daily/weekly/monthly, use event_date (date field)
-                WHEN p_granularity = 'monthly' THEN TO_CHAR(DATE_TRUNC('month', event_date::timestamp), date_format)
-                WHEN p_granularity = 'weekly' THEN TO_CHAR(DATE_TRUNC('week', event_date::timestamp), date_format)
-                WHEN NOT use_hourly_data THEN TO_CHAR(DATE_TRUNC('day', event_date::timestamp), date_format)
-                -- For hourly granularities, convert string timestamp to timestamp
-                WHEN p_granularity = '4hours' THEN 
-                    TO_CHAR(
-                        DATE_TRUNC('hour', TO_TIMESTAMP(event_timestamp::bigint / 1000000.0)) - 
-                        INTERVAL '1 hour' * (EXTRACT(HOUR FROM TO_TIMESTAMP(event_timestamp::bigint / 1000000.0))::int % 4), 
-                        date_format
-                    )
-                WHEN p_granularity = '12hours' THEN 
-                    TO_CHAR(
-                        DATE_TRUNC('hour', TO_TIMESTAMP(event_timestamp::bigint / 1000000.0)) - 
-                        INTERVAL '1 hour' * (EXTRACT(HOUR FROM TO_TIMESTAMP(event_timestamp::bigint / 1000000.0))::int % 12), 
-                        date_format
-                    )
-                WHEN p_granularity = 'hourly' THEN 
-                    TO_CHAR(DATE_TRUNC('hour', TO_TIMESTAMP(event_timestamp::bigint / 1000000.0)), date_format)
-                ELSE TO_CHAR(DATE_TRUNC('day', event_date::timestamp), date_format)
-            END as date_group,
+            DATE_TRUNC('hour', event_time)
+                - INTERVAL '1 hour' * (EXTRACT(HOUR FROM event_time)::int % v_bucket_hours) AS start_of_period,
             COUNT(DISTINCT param_ga_session_id) as visitors
         FROM page_view
         WHERE tenant_id = p_tenant_id
           AND event_date BETWEEN TO_DATE(p_start_date, 'YYYY-MM-DD') AND TO_DATE(p_end_date, 'YYYY-MM-DD')
+          AND event_time >= v_from AND event_time < v_to
           AND (p_location_id IS NULL OR user_prop_default_branch_id = p_location_id)
-          -- Only include records with valid timestamp for hourly data
-          AND (NOT use_hourly_data OR (event_timestamp IS NOT NULL AND event_timestamp ~ '^[0-9]+$'))
-        GROUP BY date_group
+        GROUP BY 1
     ),
     -- Abandoned carts: sessions with cart additions but NO purchase (consistent with stats)
-    abandoned_cart_sessions AS (
-        SELECT DISTINCT ac.param_ga_session_id, ac.event_date, ac.event_timestamp
+    abandoned_carts_by_period AS (
+        SELECT
+            DATE_TRUNC('hour', ac.event_time)
+                - INTERVAL '1 hour' * (EXTRACT(HOUR FROM ac.event_time)::int % v_bucket_hours) AS start_of_period,
+            COUNT(DISTINCT ac.param_ga_session_id) as abandoned_carts
         FROM add_to_cart ac
         WHERE ac.tenant_id = p_tenant_id
           AND ac.event_date BETWEEN TO_DATE(p_start_date, 'YYYY-MM-DD') AND TO_DATE(p_end_date, 'YYYY-MM-DD')
+          AND ac.event_time >= v_from AND ac.event_time < v_to
           AND (p_location_id IS NULL OR ac.user_prop_default_branch_id = p_location_id)
           AND NOT EXISTS (
-              SELECT 1 FROM purchase p
-              WHERE p.param_ga_session_id = ac.param_ga_session_id
-                AND p.tenant_id = p_tenant_id
+              SELECT 1
+              FROM get_converted_sessions(
+                  p_tenant_id,
+                  TO_DATE(p_start_date, 'YYYY-MM-DD'),
+                  TO_DATE(p_end_date, 'YYYY-MM-DD')
+              ) cs
+              WHERE cs.session_id = ac.param_ga_session_id
           )
-    ),
-    abandoned_carts_by_period AS (
-        SELECT
-            CASE 
-                -- For daily/weekly/monthly, use event_date (date field)
-                WHEN p_granularity = 'monthly' THEN TO_CHAR(DATE_TRUNC('month', event_date::timestamp), date_format)
-                WHEN p_granularity = 'weekly' THEN TO_CHAR(DATE_TRUNC('week', event_date::timestamp), date_format)
-                WHEN NOT use_hourly_data THEN TO_CHAR(DATE_TRUNC('day', event_date::timestamp), date_format)
-                -- For hourly granularities, convert string timestamp to timestamp
-                WHEN p_granularity = '4hours' THEN 
-                    TO_CHAR(
-                        DATE_TRUNC('hour', TO_TIMESTAMP(event_timestamp::bigint / 1000000.0)) - 
-                        INTERVAL '1 hour' * (EXTRACT(HOUR FROM TO_TIMESTAMP(event_timestamp::bigint / 1000000.0))::int % 4), 
-                        date_format
-                    )
-                WHEN p_granularity = '12hours' THEN 
-                    TO_CHAR(
-                        DATE_TRUNC('hour', TO_TIMESTAMP(event_timestamp::bigint / 1000000.0)) - 
-                        INTERVAL '1 hour' * (EXTRACT(HOUR FROM TO_TIMESTAMP(event_timestamp::bigint / 1000000.0))::int % 12), 
-                        date_format
-                    )
-                WHEN p_granularity = 'hourly' THEN 
-                    TO_CHAR(DATE_TRUNC('hour', TO_TIMESTAMP(event_timestamp::bigint / 1000000.0)), date_format)
-                ELSE TO_CHAR(DATE_TRUNC('day', event_date::timestamp), date_format)
-            END as date_group,
-            COUNT(DISTINCT param_ga_session_id) as abandoned_carts
-        FROM abandoned_cart_sessions
-        WHERE (NOT use_hourly_data OR (event_timestamp IS NOT NULL AND event_timestamp ~ '^[0-9]+$'))
-        GROUP BY date_group
+        GROUP BY 1
     ),
     searches_by_period AS (
-        SELECT 
-            date_group,
-            SUM(searches) as searches
+        SELECT
+            DATE_TRUNC('hour', searches.event_time)
+                - INTERVAL '1 hour' * (EXTRACT(HOUR FROM searches.event_time)::int % v_bucket_hours) AS start_of_period,
+            COUNT(*) as searches
         FROM (
-            SELECT
-                CASE 
-                    -- For daily/weekly/monthly, use event_date (date field)
-                    WHEN p_granularity = 'monthly' THEN TO_CHAR(DATE_TRUNC('month', event_date::timestamp), date_format)
-                    WHEN p_granularity = 'weekly' THEN TO_CHAR(DATE_TRUNC('week', event_date::timestamp), date_format)
-                    WHEN NOT use_hourly_data THEN TO_CHAR(DATE_TRUNC('day', event_date::timestamp), date_format)
-                    -- For hourly granularities, convert string timestamp to timestamp
-                    WHEN p_granularity = '4hours' THEN 
-                        TO_CHAR(
-                            DATE_TRUNC('hour', TO_TIMESTAMP(event_timestamp::bigint / 1000000.0)) - 
-                            INTERVAL '1 hour' * (EXTRACT(HOUR FROM TO_TIMESTAMP(event_timestamp::bigint / 1000000.0))::int % 4), 
-                            date_format
-                        )
-                    WHEN p_granularity = '12hours' THEN 
-                        TO_CHAR(
-                            DATE_TRUNC('hour', TO_TIMESTAMP(event_timestamp::bigint / 1000000.0)) - 
-                            INTERVAL '1 hour' * (EXTRACT(HOUR FROM TO_TIMESTAMP(event_timestamp::bigint / 1000000.0))::int % 12), 
-                            date_format
-                        )
-                    WHEN p_granularity = 'hourly' THEN 
-                        TO_CHAR(DATE_TRUNC('hour', TO_TIMESTAMP(event_timestamp::bigint / 1000000.0)), date_format)
-                    ELSE TO_CHAR(DATE_TRUNC('day', event_date::timestamp), date_format)
-                END as date_group,
-                COUNT(*) as searches
+            SELECT event_time
             FROM view_search_results
             WHERE tenant_id = p_tenant_id
               AND event_date BETWEEN TO_DATE(p_start_date, 'YYYY-MM-DD') AND TO_DATE(p_end_date, 'YYYY-MM-DD')
+              AND event_time >= v_from AND event_time < v_to
               AND (p_location_id IS NULL OR user_prop_default_branch_id = p_location_id)
-              -- Only include records with valid timestamp for hourly data
-              AND (NOT use_hourly_data OR (event_timestamp IS NOT NULL AND event_timestamp ~ '^[0-9]+$'))
-            GROUP BY date_group
-            
+
             UNION ALL
-            
-            SELECT
-                CASE 
-                    -- For daily/weekly/monthly, use event_date (date field)
-                    WHEN p_granularity = 'monthly' THEN TO_CHAR(DATE_TRUNC('month', event_date::timestamp), date_format)
-                    WHEN p_granularity = 'weekly' THEN TO_CHAR(DATE_TRUNC('week', event_date::timestamp), date_format)
-                    WHEN NOT use_hourly_data THEN TO_CHAR(DATE_TRUNC('day', event_date::timestamp), date_format)
-                    -- For hourly granularities, convert string timestamp to timestamp
-                    WHEN p_granularity = '4hours' THEN 
-                        TO_CHAR(
-                            DATE_TRUNC('hour', TO_TIMESTAMP(event_timestamp::bigint / 1000000.0)) - 
-                            INTERVAL '1 hour' * (EXTRACT(HOUR FROM TO_TIMESTAMP(event_timestamp::bigint / 1000000.0))::int % 4), 
-                            date_format
-                        )
-                    WHEN p_granularity = '12hours' THEN 
-                        TO_CHAR(
-                            DATE_TRUNC('hour', TO_TIMESTAMP(event_timestamp::bigint / 1000000.0)) - 
-                            INTERVAL '1 hour' * (EXTRACT(HOUR FROM TO_TIMESTAMP(event_timestamp::bigint / 1000000.0))::int % 12), 
-                            date_format
-                        )
-                    WHEN p_granularity = 'hourly' THEN 
-                        TO_CHAR(DATE_TRUNC('hour', TO_TIMESTAMP(event_timestamp::bigint / 1000000.0)), date_format)
-                    ELSE TO_CHAR(DATE_TRUNC('day', event_date::timestamp), date_format)
-                END as date_group,
-                COUNT(*) as searches
+
+            SELECT event_time
             FROM no_search_results
             WHERE tenant_id = p_tenant_id
               AND event_date BETWEEN TO_DATE(p_start_date, 'YYYY-MM-DD') AND TO_DATE(p_end_date, 'YYYY-MM-DD')
+              AND event_time >= v_from AND event_time < v_to
               AND (p_location_id IS NULL OR user_prop_default_branch_id = p_location_id)
-              -- Only include records with valid timestamp for hourly data
-              AND (NOT use_hourly_data OR (event_timestamp IS NOT NULL AND event_timestamp ~ '^[0-9]+$'))
-            GROUP BY date_group
-        ) combined_searches
-        GROUP BY date_group
+        ) searches
+        GROUP BY 1
     )
     SELECT jsonb_agg(jsonb_build_object(
-        'date', gd.start_of_period,
-        'time', gd.start_of_period,
+        'date', tb.start_of_period,
+        'time', tb.start_of_period,
         'revenue', COALESCE(p.revenue, 0),
         'purchases', COALESCE(p.purchases, 0),
         'visitors', COALESCE(v.visitors, 0),
         'carts', COALESCE(ac.abandoned_carts, 0),
         'searches', COALESCE(s.searches, 0)
-    ) ORDER BY gd.start_of_period)
+    ) ORDER BY tb.start_of_period)
     INTO result
-    FROM unique_grouped_dates gd
-    LEFT JOIN purchases_by_period p ON gd.date_group = p.date_group
-    LEFT JOIN visitors_by_period v ON gd.date_group = v.date_group
-    LEFT JOIN abandoned_carts_by_period ac ON gd.date_group = ac.date_group
-    LEFT JOIN searches_by_period s ON gd.date_group = s.date_group;
+    FROM time_buckets tb
+    LEFT JOIN purchases_by_period p ON tb.start_of_period = p.start_of_period
+    LEFT JOIN visitors_by_period v ON tb.start_of_period = v.start_of_period
+    LEFT JOIN abandoned_carts_by_period ac ON tb.start_of_period = ac.start_of_period
+    LEFT JOIN searches_by_period s ON tb.start_of_period = s.start_of_period;
 
     RETURN COALESCE(result, '[]'::jsonb);
 END;
@@ -0,0 +1,24 @@
+-- Definition for function public.get_converted_sessions
+-- Sessions with a purchase between p_start_date - 1 and p_end_date + 1 (one
+-- day of slack for sessions crossing midnight), NULL bounds being unbounded.
+-- The single helper behind every abandoned-cart / unconverted-search check:
+--   NOT EXISTS (SELECT 1 FROM get_converted_sessions(tenant, start, end) cs
+--               WHERE cs.session_id = x.param_ga_session_id)
+-- It is a STABLE, non-strict SQL function so the planner inlines it into the
+-- caller and probes converted_sessions_pkey with an index-only scan. Keep it
+-- that way (a plpgsql body or a subquery argument would prevent inlining).
+CREATE OR REPLACE FUNCTION public.get_converted_sessions(
+    p_tenant_id uuid,
+    p_start_date date DEFAULT NULL::date,
+    p_end_date date DEFAULT NULL::date
+)
+ RETURNS TABLE(session_id character varying)
+ LANGUAGE sql
+ STABLE
+AS $function$
+    SELECT cs.session_id
+    FROM converted_sessions cs
+    WHERE cs.tenant_id = p_tenant_id
+      AND (p_start_date IS NULL OR cs.last_purchase_date >= p_start_date - 1)
+      AND (p_end_date IS NULL OR cs.first_purchase_date <= p_end_date + 1)
+$function$
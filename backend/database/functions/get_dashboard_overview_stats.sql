@@ -9,62 +9,71 @@ BEGIN
     WITH date_range AS (
         SELECT TO_DATE(p_start_date, 'YYYY-MM-DD') as start_date, TO_DATE(p_end_date, 'YYYY-MM-DD') as end_date
     ),
-    purchase_stats AS (
-        SELECT
-            SUM(ecommerce_purchase_revenue) as total_revenue,
-            COUNT(*) as total_purchases,
-            COUNT(DISTINCT param_ga_session_id) as purchase_sessions
-        FROM purchase
+    -- Additive metrics and distinct counts come from the rollups maintained
+    -- by refresh_daily_branch_stats() instead of the raw event tables
+    branch_stats AS (
+        SELECT *
+        FROM daily_branch_stats
         WHERE tenant_id = p_tenant_id 
           AND event_date BETWEEN (SELECT start_date FROM date_range) AND (SELECT end_date FROM date_range)
-          AND (p_location_id IS NULL OR user_prop_default_branch_id = p_location_id)
+          AND (p_location_id IS NULL OR branch_id = p_location_id)
     ),
-    visitor_stats AS (
-        SELECT
-            COUNT(DISTINCT param_ga_session_id) as total_visitors,
-            COUNT(DISTINCT user_prop_webuserid) as unique_users
-        FROM page_view
+    branch_sessions AS (
+        SELECT *
+        FROM daily_branch_sessions
         WHERE tenant_id = p_tenant_id 
           AND event_date BETWEEN (SELECT start_date FROM date_range) AND (SELECT end_date FROM date_range)
-          AND (p_location_id IS NULL OR user_prop_default_branch_id = p_location_id)
+          AND (p_location_id IS NULL OR branch_id = p_location_id)
+    ),
+    branch_users AS (
+        SELECT *
+        FROM daily_branch_users
+        WHERE tenant_id = p_tenant_id 
+          AND event_date BETWEEN (SELECT start_date FROM date_range) AND (SELECT end_date FROM date_range)
+          AND (p_location_id IS NULL OR branch_id = p_location_id)
+    ),
+    purchase_stats AS (
+        SELECT
+            SUM(revenue) as total_revenue,
+            SUM(purchases) as total_purchases
+        FROM branch_stats
+    ),
+    visitor_stats AS (
+        SELECT
+            COUNT(DISTINCT session_id) as total_visitors,
+            (SELECT COUNT(DISTINCT NULLIF(user_id, '')) FROM branch_users) as unique_users
+        FROM branch_sessions
+        WHERE has_page_view
     ),
     cart_stats AS (
         SELECT
-            COUNT(DISTINCT ac.param_ga_session_id) as abandoned_cart_sessions
-        FROM add_to_cart ac
-        WHERE ac.tenant_id = p_tenant_id 
-          AND ac.event_date BETWEEN (SELECT start_date FROM date_range) AND (SELECT end_date FROM date_range)
-          AND (p_location_id IS NULL OR ac.user_prop_default_branch_id = p_location_id)
+            COUNT(DISTINCT bs.session_id) as abandoned_cart_sessions
+        FROM branch_sessions bs
+        WHERE bs.has_cart
           AND NOT EXISTS (
-              SELECT 1 FROM purchase p
-              WHERE p.param_ga_session_id = ac.param_ga_session_id
-                AND p.tenant_id = p_tenant_id
+              SELECT 1
+              FROM get_converted_sessions(
+                  p_tenant_id,
+                  TO_DATE(p_start_date, 'YYYY-MM-DD'),
+                  TO_DATE(p_end_date, 'YYYY-MM-DD')
+              ) cs
+              WHERE cs.session_id = bs.session_id
           )
     ),
     search_stats AS (
         SELECT
-            COUNT(*) as total_searches,
-            (SELECT COUNT(*) FROM no_search_results 
-             WHERE tenant_id = p_tenant_id 
-               AND event_date BETWEEN (SELECT start_date FROM date_range) AND (SELECT end_date FROM date_range)
-               AND (p_location_id IS NULL OR user_prop_default_branch_id = p_location_id)
-            ) as failed_searches
-        FROM view_search_results
-        WHERE tenant_id = p_tenant_id 
-          AND event_date BETWEEN (SELECT start_date FROM date_range) AND (SELECT end_date FROM date_range)
-          AND (p_location_id IS NULL OR user_prop_default_branch_id = p_location_id)
+            SUM(searches) as total_searches,
+            SUM(failed_searches) as failed_searches
+        FROM branch_stats
     ),
     repeat_visit_stats AS (
         SELECT COUNT(*) as repeat_visitors
         FROM (
-            SELECT user_prop_webuserid
-            FROM page_view
-            WHERE tenant_id = p_tenant_id 
-              AND event_date BETWEEN (SELECT start_date FROM date_range) AND (SELECT end_date FROM date_range)
-              AND (p_location_id IS NULL OR user_prop_default_branch_id = p_location_id)
-              AND user_prop_webuserid IS NOT NULL
-            GROUP BY user_prop_webuserid
-            HAVING COUNT(DISTINCT param_ga_session_id) > 1
+            SELECT user_id
+            FROM branch_users
+            WHERE user_id <> ''
+            GROUP BY user_id
+            HAVING COUNT(DISTINCT NULLIF(session_id, '')) > 1
         ) multi_session_users
     )
     SELECT jsonb_build_object(
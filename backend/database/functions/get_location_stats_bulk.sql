@@ -9,74 +9,65 @@ BEGIN
     WITH date_range AS (
         SELECT TO_DATE(p_start_date, 'YYYY-MM-DD') as start_date, TO_DATE(p_end_date, 'YYYY-MM-DD') as end_date
     ),
+    -- Additive metrics and distinct counts come from the rollups maintained
+    -- by refresh_daily_branch_stats() instead of the raw event tables
+    branch_sessions AS (
+        SELECT branch_id AS location_id, session_id, has_cart
+        FROM daily_branch_sessions
+        WHERE tenant_id = p_tenant_id 
+          AND event_date BETWEEN (SELECT start_date FROM date_range) AND (SELECT end_date FROM date_range)
+    ),
     page_view_aggregated AS (
         SELECT
-            user_prop_default_branch_id AS location_id,
-            COUNT(DISTINCT param_ga_session_id) AS totalVisitors,
-            user_prop_webuserid,
-            COUNT(DISTINCT param_ga_session_id) AS session_count
-        FROM page_view
+            branch_id AS location_id,
+            user_id,
+            COUNT(DISTINCT NULLIF(session_id, '')) AS session_count
+        FROM daily_branch_users
         WHERE tenant_id = p_tenant_id 
           AND event_date BETWEEN (SELECT start_date FROM date_range) AND (SELECT end_date FROM date_range)
-        GROUP BY user_prop_default_branch_id, user_prop_webuserid
+        GROUP BY branch_id, user_id
     ),
     location_page_views AS (
         SELECT
             location_id,
-            SUM(totalVisitors) AS totalVisitors
+            SUM(session_count) AS totalVisitors
         FROM page_view_aggregated
         GROUP BY location_id
     ),
-    location_purchases AS (
+    location_stats AS (
         SELECT
-            user_prop_default_branch_id AS location_id,
-            SUM(ecommerce_purchase_revenue) AS totalRevenue,
-            COUNT(*) AS purchases
-        FROM purchase
+            branch_id AS location_id,
+            SUM(revenue) AS totalRevenue,
+            SUM(purchases) AS purchases,
+            SUM(failed_searches) AS failedSearches
+        FROM daily_branch_stats
         WHERE tenant_id = p_tenant_id AND event_date BETWEEN (SELECT start_date FROM date_range) AND (SELECT end_date FROM date_range)
-        GROUP BY user_prop_default_branch_id
-    ),
-    abandoned_carts_by_session AS (
-      SELECT DISTINCT ac.param_ga_session_id, ac.user_prop_default_branch_id as location_id
-      FROM add_to_cart ac
-      WHERE ac.tenant_id = p_tenant_id
-        AND ac.event_date BETWEEN (SELECT start_date FROM date_range) AND (SELECT end_date FROM date_range)
-        AND NOT EXISTS (
-          SELECT 1 FROM purchase p
-          WHERE p.param_ga_session_id = ac.param_ga_session_id
-            AND p.tenant_id = p_tenant_id
-        )
+        GROUP BY branch_id
     ),
     location_abandoned_carts AS (
       SELECT
-        location_id,
-        COUNT(param_ga_session_id) as abandonedCarts
-      FROM abandoned_carts_by_session
-      GROUP BY location_id
-    ),
-    location_failed_searches AS (
-        SELECT
-            user_prop_default_branch_id AS location_id,
-            COUNT(*) AS failedSearches
-        FROM no_search_results
-        WHERE tenant_id = p_tenant_id AND event_date BETWEEN (SELECT start_date FROM date_range) AND (SELECT end_date FROM date_range)
-        GROUP BY user_prop_default_branch_id
-    ),
-    user_sessions_per_location AS (
-        SELECT
-            user_prop_webuserid,
-            location_id,
-            session_count
-        FROM page_view_aggregated
-        WHERE user_prop_webuserid IS NOT NULL
-          AND location_id IS NOT NULL
+        bs.location_id,
+        COUNT(DISTINCT bs.session_id) as abandonedCarts
+      FROM branch_sessions bs
+      WHERE bs.has_cart
+        AND NOT EXISTS (
+          SELECT 1
+          FROM get_converted_sessions(
+              p_tenant_id,
+              TO_DATE(p_start_date, 'YYYY-MM-DD'),
+              TO_DATE(p_end_date, 'YYYY-MM-DD')
+          ) cs
+          WHERE cs.session_id = bs.session_id
+        )
+      GROUP BY bs.location_id
     ),
     location_repeat_visits AS (
         SELECT
             location_id,
-            COUNT(user_prop_webuserid) as repeatVisits
-        FROM user_sessions_per_location
-        WHERE session_count > 1
+            COUNT(user_id) as repeatVisits
+        FROM page_view_aggregated
+        WHERE user_id <> ''
+          AND session_count > 1
         GROUP BY location_id
     )
     SELECT jsonb_agg(jsonb_build_object(
@@ -84,19 +75,18 @@ BEGIN
         'locationName', l.warehouse_name,
         'city', l.city,
         'state', l.state,
-        'totalRevenue', '$' || COALESCE(lp.totalRevenue, 0)::text,
-        'purchases', COALESCE(lp.purchases, 0),
+        'totalRevenue', '$' || COALESCE(ls.totalRevenue, 0)::text,
+        'purchases', COALESCE(ls.purchases, 0),
         'totalVisitors', COALESCE(lpw.totalVisitors, 0),
         'abandonedCarts', COALESCE(lac.abandonedCarts, 0),
         'repeatVisits', COALESCE(lrv.repeatVisits, 0),
-        'failedSearches', COALESCE(lfs.failedSearches, 0)
+        'failedSearches', COALESCE(ls.failedSearches, 0)
     ))
     INTO result
     FROM locations l
     LEFT JOIN location_page_views lpw ON l.warehouse_code = lpw.location_id
-    LEFT JOIN location_purchases lp ON l.warehouse_code = lp.location_id
+    LEFT JOIN location_stats ls ON l.warehouse_code = ls.location_id
     LEFT JOIN location_abandoned_carts lac ON l.warehouse_code = lac.location_id
-    LEFT JOIN location_failed_searches lfs ON l.warehouse_code = lfs.location_id
     LEFT JOIN location_repeat_visits lrv ON l.warehouse_code = lrv.location_id
     WHERE l.tenant_id = p_tenant_id AND l.is_active = TRUE;
 
@@ -1,32 +1,32 @@
 -- Definition for function public.get_performance_tasks (oid=217036)
-CREATE OR REPLACE FUNCTION public.get_performance_tasks(p_tenant_id uuid, p_page integer, p_limit integer, p_location_id text DEFAULT NULL::text, p_start_date text DEFAULT NULL::text, p_end_date text DEFAULT NULL::text, p_sort_field text DEFAULT 'last_activity'::text, p_sort_order text DEFAULT 'desc'::text, p_issue_type text DEFAULT NULL::text)
+-- Offset (p_page) or keyset (p_cursor) pagination, as in get_purchase_tasks.
+-- The total is the bounced session count the facets need anyway, so
+-- p_include_total is accepted only for a uniform task signature.
+-- Bounced sessions (one distinct page) come from the sessions fact table.
+DROP FUNCTION IF EXISTS public.get_performance_tasks(uuid, integer, integer, text, text, text, text, text, text);
+
+CREATE OR REPLACE FUNCTION public.get_performance_tasks(p_tenant_id uuid, p_page integer, p_limit integer, p_location_id text DEFAULT NULL::text, p_start_date text DEFAULT NULL::text, p_end_date text DEFAULT NULL::text, p_sort_field text DEFAULT 'last_activity'::text, p_sort_order text DEFAULT 'desc'::text, p_issue_type text DEFAULT NULL::text, p_cursor jsonb DEFAULT NULL::jsonb, p_include_total boolean DEFAULT true)
  RETURNS jsonb
  LANGUAGE plpgsql
 AS $function$
 DECLARE
     result JSONB;
 BEGIN
-    WITH session_page_counts AS (
+    WITH bounced_sessions AS (
         SELECT
-            param_ga_session_id,
-            user_prop_webuserid,
-            MAX(user_prop_webcustomerid) as user_prop_webcustomerid,
-            MAX(user_prop_default_branch_id) as user_prop_default_branch_id,
-            COUNT(DISTINCT param_page_location) as page_view_count,
-            MAX(event_timestamp) as last_activity,
-            (array_agg(param_page_location ORDER BY event_timestamp))[1] as entry_page
-        FROM page_view
-        WHERE tenant_id = p_tenant_id
-          AND (p_location_id IS NULL OR user_prop_default_branch_id = p_location_id)
-          AND (p_start_date IS NULL OR event_date >= TO_DATE(p_start_date, 'YYYY-MM-DD'))
-          AND (p_end_date IS NULL OR event_date <= TO_DATE(p_end_date, 'YYYY-MM-DD'))
-        GROUP BY param_ga_session_id, user_prop_webuserid
-    ),
-    bounced_sessions AS (
-        SELECT *,
-            COUNT(*) OVER() as total_count
-        FROM session_page_counts
-        WHERE page_view_count = 1
+            s.session_id AS param_ga_session_id,
+            s.user_prop_webuserid,
+            s.user_prop_webcustomerid,
+            s.branch_id AS user_prop_default_branch_id,
+            s.distinct_pages AS page_view_count,
+            s.last_event_timestamp AS last_activity,
+            s.entry_page
+        FROM sessions s
+        WHERE s.tenant_id = p_tenant_id
+          AND s.distinct_pages = 1
+          AND (p_location_id IS NULL OR s.branch_id = p_location_id)
+          AND (p_start_date IS NULL OR s.last_event_date >= TO_DATE(p_start_date, 'YYYY-MM-DD'))
+          AND (p_end_date IS NULL OR s.first_event_date <= TO_DATE(p_end_date, 'YYYY-MM-DD'))
     ),
     bounced_sessions_with_user AS (
         SELECT
@@ -36,25 +36,50 @@ BEGIN
             u.email,
             u.cell_phone  AS phone,
             u.office_phone,
-            bs.user_prop_default_branch_id AS location_id
+            bs.user_prop_default_branch_id AS location_id,
+            COALESCE(bs.param_ga_session_id, '') || ':' || COALESCE(bs.user_prop_webuserid, '')
+                || ':' || COALESCE(u.user_id, '') AS sort_key,
+            NULL::numeric AS sort_num,
+            CASE
+                WHEN p_sort_field = 'customer_name' THEN u.buying_company_name
+                WHEN p_sort_field = 'entry_page' THEN bs.entry_page
+                ELSE bs.last_activity
+            END AS sort_text
         FROM bounced_sessions bs
-        LEFT JOIN users u ON u.tenant_id = p_tenant_id
-            AND (u.user_id = bs.user_prop_webuserid
-                 OR (bs.user_prop_webuserid IS NULL AND u.buying_company_erp_id = bs.user_prop_webcustomerid))
+        LEFT JOIN user_identities ui ON ui.tenant_id = p_tenant_id
+            AND ui.user_prop_webuserid = COALESCE(bs.user_prop_webuserid, '')
+            AND ui.user_prop_webcustomerid = CASE WHEN bs.user_prop_webuserid IS NULL THEN COALESCE(bs.user_prop_webcustomerid, '') ELSE '' END
+        LEFT JOIN users u ON u.tenant_id = p_tenant_id AND u.user_id = ui.user_id
     ),
     paginated_sessions AS (
-        SELECT *
-        FROM bounced_sessions_with_user
-        ORDER BY
-            CASE WHEN p_sort_field = 'last_activity' AND p_sort_order = 'desc' THEN last_activity  END DESC NULLS LAST,
-            CASE WHEN p_sort_field = 'last_activity' AND p_sort_order = 'asc'  THEN last_activity  END ASC  NULLS LAST,
-            CASE WHEN p_sort_field = 'customer_name' AND p_sort_order = 'desc' THEN customer_name  END DESC NULLS LAST,
-            CASE WHEN p_sort_field = 'customer_name' AND p_sort_order = 'asc'  THEN customer_name  END ASC  NULLS LAST,
-            CASE WHEN p_sort_field = 'entry_page'    AND p_sort_order = 'desc' THEN entry_page     END DESC NULLS LAST,
-            CASE WHEN p_sort_field = 'entry_page'    AND p_sort_order = 'asc'  THEN entry_page     END ASC  NULLS LAST,
-            last_activity DESC
-        LIMIT p_limit
-        OFFSET (p_page - 1) * p_limit
+        SELECT page.*, ROW_NUMBER() OVER (
+            ORDER BY
+                sort_is_null,
+                CASE WHEN p_sort_order = 'asc' THEN sort_text END ASC,
+                CASE WHEN p_sort_order <> 'asc' THEN sort_text END DESC,
+                sort_key
+        ) AS page_rn
+        FROM (
+            SELECT *, sort_text IS NULL AS sort_is_null
+            FROM bounced_sessions_with_user bsu
+            WHERE p_cursor IS NULL
+               OR (bsu.sort_text IS NULL) > (p_cursor->>'z')::boolean
+               OR ((bsu.sort_text IS NULL) = (p_cursor->>'z')::boolean AND (
+                      COALESCE(
+                          CASE WHEN p_sort_order = 'asc' THEN bsu.sort_text > p_cursor->>'t' ELSE bsu.sort_text < p_cursor->>'t' END,
+                          false
+                      )
+                      OR (bsu.sort_text IS NOT DISTINCT FROM p_cursor->>'t'
+                          AND bsu.sort_key > p_cursor->>'k')
+                  ))
+            ORDER BY
+                sort_text IS NULL,
+                CASE WHEN p_sort_order = 'asc' THEN sort_text END ASC,
+                CASE WHEN p_sort_order <> 'asc' THEN sort_text END DESC,
+                sort_key
+            LIMIT p_limit + 1
+            OFFSET CASE WHEN p_cursor IS NULL THEN (p_page - 1) * p_limit ELSE 0 END
+        ) page
     ),
     frequently_bounced_pages AS (
         SELECT
@@ -67,7 +92,7 @@ BEGIN
     ),
     facet_counts AS (
         SELECT
-            (SELECT MAX(total_count) FROM bounced_sessions) AS high_bounce_count,
+            (SELECT COUNT(*) FROM bounced_sessions) AS high_bounce_count,
             (SELECT COUNT(*) FROM frequently_bounced_pages) AS page_bounce_count
     )
     SELECT jsonb_build_object(
@@ -83,9 +108,10 @@ BEGIN
                         'email', ps.email,
                         'phone', ps.phone,
                         'office_phone', ps.office_phone
-                    )
+                    ) ORDER BY ps.page_rn
                 ), '[]'::jsonb)
                 FROM paginated_sessions ps
+                WHERE ps.page_rn <= p_limit
             ) ELSE '[]'::jsonb END,
             'frequently_bounced_pages', CASE WHEN p_issue_type IS NULL OR p_issue_type = 'page_bounce_issue' THEN (
                 SELECT COALESCE(jsonb_agg(fbp), '[]'::jsonb)
@@ -103,10 +129,17 @@ BEGIN
                 ) sub
             )
         ),
-        'total', (SELECT MAX(total_count) FROM paginated_sessions),
+        'total', (SELECT fc.high_bounce_count FROM facet_counts fc),
+        'total_is_estimate', false,
         'page', p_page,
         'limit', p_limit,
-        'has_more', (p_page * p_limit) < (SELECT MAX(total_count) FROM paginated_sessions)
+        'has_more', (SELECT COUNT(*) FROM paginated_sessions) > p_limit,
+        'next_cursor', (
+            SELECT jsonb_build_object('z', ps.sort_is_null, 'n', ps.sort_num, 't', ps.sort_text, 'k', ps.sort_key)
+            FROM paginated_sessions ps
+            WHERE ps.page_rn = p_limit
+              AND EXISTS (SELECT 1 FROM paginated_sessions WHERE page_rn > p_limit)
+        )
     ) INTO result;
 
     RETURN result;
@@ -1,5 +1,12 @@
 -- Definition for function public.get_purchase_tasks
-CREATE OR REPLACE FUNCTION public.get_purchase_tasks(p_tenant_id uuid, p_page integer, p_limit integer, p_query text DEFAULT NULL::text, p_location_id text DEFAULT NULL::text, p_start_date text DEFAULT NULL::text, p_end_date text DEFAULT NULL::text, p_sort_field text DEFAULT 'event_timestamp'::text, p_sort_order text DEFAULT 'desc'::text)
+-- Pages either by offset (p_page) or by keyset (p_cursor, the next_cursor of
+-- the previous page). Every page returns next_cursor, the position of its last
+-- row: (sort_is_null, sort_num | sort_text, sort_key), where sort_key is a
+-- unique tiebreaker. With p_include_total = false the exact total is replaced
+-- by an estimate from daily_branch_stats (null when p_query is set).
+DROP FUNCTION IF EXISTS public.get_purchase_tasks(uuid, integer, integer, text, text, text, text, text, text);
+
+CREATE OR REPLACE FUNCTION public.get_purchase_tasks(p_tenant_id uuid, p_page integer, p_limit integer, p_query text DEFAULT NULL::text, p_location_id text DEFAULT NULL::text, p_start_date text DEFAULT NULL::text, p_end_date text DEFAULT NULL::text, p_sort_field text DEFAULT 'event_timestamp'::text, p_sort_order text DEFAULT 'desc'::text, p_cursor jsonb DEFAULT NULL::jsonb, p_include_total boolean DEFAULT true)
  RETURNS jsonb
  LANGUAGE plpgsql
 AS $function$
@@ -8,8 +15,10 @@ DECLARE
 BEGIN
     WITH filtered_purchases AS (
         SELECT
+            p.id,
             p.param_transaction_id,
             p.event_timestamp,
+            p.event_time,
             p.ecommerce_purchase_revenue,
             p.param_ga_session_id,
             p.user_prop_webuserid,
@@ -22,12 +31,13 @@ BEGIN
           AND (p_location_id IS NULL OR p.user_prop_default_branch_id = p_location_id)
           AND (p_start_date IS NULL OR p.event_date >= TO_DATE(p_start_date, 'YYYY-MM-DD'))
           AND (p_end_date IS NULL OR p.event_date <= TO_DATE(p_end_date, 'YYYY-MM-DD'))
-          AND (p_query IS NULL OR p.items_json::text ILIKE '%' || p_query || '%')
+          AND (p_query IS NULL OR p.items_search_text ILIKE '%' || p_query || '%')
     ),
     purchase_details AS (
         SELECT
             fp.param_transaction_id,
             fp.event_timestamp,
+            fp.event_time,
             fp.ecommerce_purchase_revenue,
             fp.param_ga_session_id,
             fp.user_prop_webuserid,
@@ -40,32 +50,66 @@ BEGIN
             u.cell_phone AS phone,
             u.office_phone,
             false AS completed,
-            COUNT(*) OVER() AS total_count
+            fp.id::text || ':' || COALESCE(u.user_id, '') AS sort_key
         FROM filtered_purchases fp
-        LEFT JOIN users u ON u.tenant_id = p_tenant_id
-            AND (u.user_id = fp.user_prop_webuserid
-                 OR (fp.user_prop_webuserid IS NULL AND u.buying_company_erp_id = fp.user_prop_webcustomerid))
+        LEFT JOIN user_identities ui ON ui.tenant_id = p_tenant_id
+            AND ui.user_prop_webuserid = COALESCE(fp.user_prop_webuserid, '')
+            AND ui.user_prop_webcustomerid = CASE WHEN fp.user_prop_webuserid IS NULL THEN COALESCE(fp.user_prop_webcustomerid, '') ELSE '' END
+        LEFT JOIN users u ON u.tenant_id = p_tenant_id AND u.user_id = ui.user_id
+    ),
+    keyed_purchases AS (
+        SELECT
+            pd.*,
+            CASE
+                WHEN p_sort_field = 'order_value' THEN pd.ecommerce_purchase_revenue
+                WHEN p_sort_field = 'customer_name' THEN NULL
+                ELSE (EXTRACT(EPOCH FROM pd.event_time) * 1000000)::bigint
+            END AS sort_num,
+            CASE WHEN p_sort_field = 'customer_name' THEN pd.customer_name END AS sort_text
+        FROM purchase_details pd
     ),
     paginated_purchases AS (
-        SELECT *
-        FROM purchase_details
-        ORDER BY
-            CASE WHEN p_sort_field = 'event_timestamp' AND p_sort_order = 'desc' THEN event_timestamp           END DESC NULLS LAST,
-            CASE WHEN p_sort_field = 'event_timestamp' AND p_sort_order = 'asc'  THEN event_timestamp           END ASC  NULLS LAST,
-            CASE WHEN p_sort_field = 'order_value'     AND p_sort_order = 'desc' THEN ecommerce_purchase_revenue END DESC NULLS LAST,
-            CASE WHEN p_sort_field = 'order_value'     AND p_sort_order = 'asc'  THEN ecommerce_purchase_revenue END ASC  NULLS LAST,
-            CASE WHEN p_sort_field = 'customer_name'   AND p_sort_order = 'desc' THEN customer_name              END DESC NULLS LAST,
-            CASE WHEN p_sort_field = 'customer_name'   AND p_sort_order = 'asc'  THEN customer_name              END ASC  NULLS LAST,
-            event_timestamp DESC
-        LIMIT p_limit
-        OFFSET (p_page - 1) * p_limit
+        SELECT page.*, ROW_NUMBER() OVER (
+            ORDER BY
+                sort_is_null,
+                CASE WHEN p_sort_order = 'asc' THEN sort_num END ASC,
+                CASE WHEN p_sort_order <> 'asc' THEN sort_num END DESC,
+                CASE WHEN p_sort_order = 'asc' THEN sort_text END ASC,
+                CASE WHEN p_sort_order <> 'asc' THEN sort_text END DESC,
+                sort_key
+        ) AS page_rn
+        FROM (
+            SELECT *, (sort_num IS NULL AND sort_text IS NULL) AS sort_is_null
+            FROM keyed_purchases kp
+            WHERE p_cursor IS NULL
+               OR (kp.sort_num IS NULL AND kp.sort_text IS NULL) > (p_cursor->>'z')::boolean
+               OR ((kp.sort_num IS NULL AND kp.sort_text IS NULL) = (p_cursor->>'z')::boolean AND (
+                      COALESCE(
+                          CASE WHEN p_sort_order = 'asc' THEN kp.sort_num > (p_cursor->>'n')::numeric ELSE kp.sort_num < (p_cursor->>'n')::numeric END,
+                          CASE WHEN p_sort_order = 'asc' THEN kp.sort_text > p_cursor->>'t' ELSE kp.sort_text < p_cursor->>'t' END,
+                          false
+                      )
+                      OR (kp.sort_num IS NOT DISTINCT FROM (p_cursor->>'n')::numeric
+                          AND kp.sort_text IS NOT DISTINCT FROM p_cursor->>'t'
+                          AND kp.sort_key > p_cursor->>'k')
+                  ))
+            ORDER BY
+                (sort_num IS NULL AND sort_text IS NULL),
+                CASE WHEN p_sort_order = 'asc' THEN sort_num END ASC,
+                CASE WHEN p_sort_order <> 'asc' THEN sort_num END DESC,
+                CASE WHEN p_sort_order = 'asc' THEN sort_text END ASC,
+                CASE WHEN p_sort_order <> 'asc' THEN sort_text END DESC,
+                sort_key
+            LIMIT p_limit + 1
+            OFFSET CASE WHEN p_cursor IS NULL THEN (p_page - 1) * p_limit ELSE 0 END
+        ) page
     )
     SELECT jsonb_build_object(
         'data', (
             SELECT jsonb_agg(
                 jsonb_build_object(
                     'transaction_id', pp.param_transaction_id,
-                    'event_date', TO_CHAR(TO_TIMESTAMP(CAST(pp.event_timestamp AS BIGINT) / 1000000), 'YYYY-MM-DD'),
+                    'event_date', TO_CHAR(pp.event_time, 'YYYY-MM-DD'),
                     'order_value', COALESCE(pp.ecommerce_purchase_revenue, 0),
                     'page_location', COALESCE(pp.param_page_location, ''),
                     'ga_session_id', pp.param_ga_session_id,
@@ -76,14 +120,32 @@ BEGIN
                     'office_phone', pp.office_phone,
                     'products', COALESCE(pp.items_json, '[]'::jsonb),
                     'completed', pp.completed
-                )
+                ) ORDER BY pp.page_rn
             )
             FROM paginated_purchases pp
+            WHERE pp.page_rn <= p_limit
         ),
-        'total', (SELECT MAX(total_count) FROM paginated_purchases),
+        'total', CASE
+            WHEN p_include_total THEN (SELECT COUNT(*) FROM keyed_purchases)
+            WHEN p_query IS NULL THEN (
+                SELECT COALESCE(SUM(dbs.purchases), 0)
+                FROM daily_branch_stats dbs
+                WHERE dbs.tenant_id = p_tenant_id
+                  AND (p_location_id IS NULL OR dbs.branch_id = p_location_id)
+                  AND (p_start_date IS NULL OR dbs.event_date >= TO_DATE(p_start_date, 'YYYY-MM-DD'))
+                  AND (p_end_date IS NULL OR dbs.event_date <= TO_DATE(p_end_date, 'YYYY-MM-DD'))
+            )
+        END,
+        'total_is_estimate', NOT p_include_total,
         'page', p_page,
         'limit', p_limit,
-        'has_more', (p_page * p_limit) < (SELECT MAX(total_count) FROM paginated_purchases)
+        'has_more', (SELECT COUNT(*) FROM paginated_purchases) > p_limit,
+        'next_cursor', (
+            SELECT jsonb_build_object('z', pp.sort_is_null, 'n', pp.sort_num, 't', pp.sort_text, 'k', pp.sort_key)
+            FROM paginated_purchases pp
+            WHERE pp.page_rn = p_limit
+              AND EXISTS (SELECT 1 FROM paginated_purchases WHERE page_rn > p_limit)
+        )
     ) INTO result;
 
     RETURN result;
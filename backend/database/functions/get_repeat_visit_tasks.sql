@@ -1,25 +1,39 @@
 -- Definition for function public.get_repeat_visit_tasks (oid=217035)
-CREATE OR REPLACE FUNCTION public.get_repeat_visit_tasks(p_tenant_id uuid, p_page integer, p_limit integer, p_query text DEFAULT NULL::text, p_location_id text DEFAULT NULL::text, p_start_date text DEFAULT NULL::text, p_end_date text DEFAULT NULL::text, p_sort_field text DEFAULT 'page_views_count'::text, p_sort_order text DEFAULT 'desc'::text)
+-- Offset (p_page) or keyset (p_cursor) pagination, as in get_purchase_tasks.
+-- With p_include_total = false the total is skipped (null).
+-- Sessions come from the sessions fact table: a session overlapping the range
+-- counts with all of its distinct pages.
+DROP FUNCTION IF EXISTS public.get_repeat_visit_tasks(uuid, integer, integer, text, text, text, text, text, text);
+
+CREATE OR REPLACE FUNCTION public.get_repeat_visit_tasks(p_tenant_id uuid, p_page integer, p_limit integer, p_query text DEFAULT NULL::text, p_location_id text DEFAULT NULL::text, p_start_date text DEFAULT NULL::text, p_end_date text DEFAULT NULL::text, p_sort_field text DEFAULT 'page_views_count'::text, p_sort_order text DEFAULT 'desc'::text, p_cursor jsonb DEFAULT NULL::jsonb, p_include_total boolean DEFAULT true)
  RETURNS jsonb
  LANGUAGE plpgsql
 AS $function$
 DECLARE
     result JSONB;
 BEGIN
-    WITH active_sessions AS (
+    WITH matched_users AS (
+        -- Customers matching the search box (trigram indexes on users)
+        SELECT u.id
+        FROM users u
+        WHERE p_query IS NOT NULL
+          AND u.tenant_id = p_tenant_id
+          AND (u.buying_company_name ILIKE ('%' || p_query || '%')
+               OR u.email ILIKE ('%' || p_query || '%'))
+    ),
+    active_sessions AS (
         SELECT
-            pv.param_ga_session_id,
-            pv.user_prop_webuserid,
-            MAX(pv.user_prop_webcustomerid) AS user_prop_webcustomerid,
-            COUNT(DISTINCT pv.param_page_location) AS page_views_count,
-            MAX(pv.event_timestamp) AS last_activity
-        FROM page_view pv
-        WHERE pv.tenant_id = p_tenant_id
-          AND (p_location_id IS NULL OR pv.user_prop_default_branch_id = p_location_id)
-          AND (p_start_date IS NULL OR pv.event_date >= TO_DATE(p_start_date, 'YYYY-MM-DD'))
-          AND (p_end_date IS NULL OR pv.event_date <= TO_DATE(p_end_date, 'YYYY-MM-DD'))
-        GROUP BY pv.param_ga_session_id, pv.user_prop_webuserid
-        HAVING COUNT(DISTINCT pv.param_page_location) > 2
+            s.session_id AS param_ga_session_id,
+            s.user_prop_webuserid,
+            s.user_prop_webcustomerid,
+            s.distinct_pages AS page_views_count,
+            s.last_event_timestamp AS last_activity
+        FROM sessions s
+        WHERE s.tenant_id = p_tenant_id
+          AND (p_location_id IS NULL OR s.branch_id = p_location_id)
+          AND (p_start_date IS NULL OR s.last_event_date >= TO_DATE(p_start_date, 'YYYY-MM-DD'))
+          AND (p_end_date IS NULL OR s.first_event_date <= TO_DATE(p_end_date, 'YYYY-MM-DD'))
+          AND s.distinct_pages > 2
     ),
     user_session_counts AS (
         SELECT
@@ -51,26 +65,56 @@ BEGIN
             u.email,
             u.cell_phone  AS phone,
             u.office_phone,
-            COUNT(*) OVER() AS total_count
+            COALESCE(rvs.param_ga_session_id, '') || ':' || COALESCE(rvs.user_prop_webuserid, '')
+                || ':' || COALESCE(u.user_id, '') AS sort_key,
+            CASE WHEN p_sort_field IN ('last_activity', 'customer_name') THEN NULL ELSE rvs.page_views_count END AS sort_num,
+            CASE
+                WHEN p_sort_field = 'last_activity' THEN rvs.last_activity
+                WHEN p_sort_field = 'customer_name' THEN u.buying_company_name
+            END AS sort_text
         FROM repeat_visitor_sessions rvs
-        LEFT JOIN users u ON u.tenant_id = p_tenant_id
-            AND (u.user_id = rvs.user_prop_webuserid
-                 OR (rvs.user_prop_webuserid IS NULL AND u.buying_company_erp_id = rvs.user_prop_webcustomerid))
+        LEFT JOIN user_identities ui ON ui.tenant_id = p_tenant_id
+            AND ui.user_prop_webuserid = COALESCE(rvs.user_prop_webuserid, '')
+            AND ui.user_prop_webcustomerid = CASE WHEN rvs.user_prop_webuserid IS NULL THEN COALESCE(rvs.user_prop_webcustomerid, '') ELSE '' END
+        LEFT JOIN users u ON u.tenant_id = p_tenant_id AND u.user_id = ui.user_id
         WHERE p_query IS NULL
-           OR u.buying_company_name ILIKE ('%' || p_query || '%')
-           OR u.email ILIKE ('%' || p_query || '%')
+           OR u.id IN (SELECT mu.id FROM matched_users mu)
     ),
     paginated_sessions AS (
-        SELECT *
-        FROM repeat_visitor_sessions_with_user
-        ORDER BY
-            CASE WHEN p_sort_field = 'page_views_count' AND p_sort_order = 'desc' THEN page_views_count END DESC NULLS LAST,
-            CASE WHEN p_sort_field = 'page_views_count' AND p_sort_order = 'asc'  THEN page_views_count END ASC  NULLS LAST,
-            CASE WHEN p_sort_field = 'last_activity'    AND p_sort_order = 'desc' THEN last_activity    END DESC NULLS LAST,
-            CASE WHEN p_sort_field = 'last_activity'    AND p_sort_order = 'asc'  THEN last_activity    END ASC  NULLS LAST,
-            last_activity DESC
-        LIMIT p_limit
-        OFFSET (p_page - 1) * p_limit
+        SELECT page.*, ROW_NUMBER() OVER (
+            ORDER BY
+                sort_is_null,
+                CASE WHEN p_sort_order = 'asc' THEN sort_num END ASC,
+                CASE WHEN p_sort_order <> 'asc' THEN sort_num END DESC,
+                CASE WHEN p_sort_order = 'asc' THEN sort_text END ASC,
+                CASE WHEN p_sort_order <> 'asc' THEN sort_text END DESC,
+                sort_key
+        ) AS page_rn
+        FROM (
+            SELECT *, (sort_num IS NULL AND sort_text IS NULL) AS sort_is_null
+            FROM repeat_visitor_sessions_with_user rs
+            WHERE p_cursor IS NULL
+               OR (rs.sort_num IS NULL AND rs.sort_text IS NULL) > (p_cursor->>'z')::boolean
+               OR ((rs.sort_num IS NULL AND rs.sort_text IS NULL) = (p_cursor->>'z')::boolean AND (
+                      COALESCE(
+                          CASE WHEN p_sort_order = 'asc' THEN rs.sort_num > (p_cursor->>'n')::numeric ELSE rs.sort_num < (p_cursor->>'n')::numeric END,
+                          CASE WHEN p_sort_order = 'asc' THEN rs.sort_text > p_cursor->>'t' ELSE rs.sort_text < p_cursor->>'t' END,
+                          false
+                      )
+                      OR (rs.sort_num IS NOT DISTINCT FROM (p_cursor->>'n')::numeric
+                          AND rs.sort_text IS NOT DISTINCT FROM p_cursor->>'t'
+                          AND rs.sort_key > p_cursor->>'k')
+                  ))
+            ORDER BY
+                (sort_num IS NULL AND sort_text IS NULL),
+                CASE WHEN p_sort_order = 'asc' THEN sort_num END ASC,
+                CASE WHEN p_sort_order <> 'asc' THEN sort_num END DESC,
+                CASE WHEN p_sort_order = 'asc' THEN sort_text END ASC,
+                CASE WHEN p_sort_order <> 'asc' THEN sort_text END DESC,
+                sort_key
+            LIMIT p_limit + 1
+            OFFSET CASE WHEN p_cursor IS NULL THEN (p_page - 1) * p_limit ELSE 0 END
+        ) page
     ),
     session_product_views AS (
         SELECT
@@ -89,6 +133,7 @@ BEGIN
         FROM paginated_sessions ps
         LEFT JOIN view_item vi ON vi.param_ga_session_id = ps.param_ga_session_id
           AND vi.tenant_id = p_tenant_id
+        WHERE ps.page_rn <= p_limit
         GROUP BY ps.param_ga_session_id
     )
     SELECT jsonb_build_object(
@@ -105,15 +150,23 @@ BEGIN
                     'email', ps.email,
                     'phone', ps.phone,
                     'office_phone', ps.office_phone
-                )
+                ) ORDER BY ps.page_rn
             ), '[]'::jsonb)
             FROM paginated_sessions ps
             LEFT JOIN session_product_views spv ON spv.param_ga_session_id = ps.param_ga_session_id
+            WHERE ps.page_rn <= p_limit
         ),
-        'total', (SELECT MAX(total_count) FROM paginated_sessions),
+        'total', CASE WHEN p_include_total THEN (SELECT COUNT(*) FROM repeat_visitor_sessions_with_user) END,
+        'total_is_estimate', NOT p_include_total,
         'page', p_page,
         'limit', p_limit,
-        'has_more', (p_page * p_limit) < (SELECT MAX(total_count) FROM paginated_sessions)
+        'has_more', (SELECT COUNT(*) FROM paginated_sessions) > p_limit,
+        'next_cursor', (
+            SELECT jsonb_build_object('z', ps.sort_is_null, 'n', ps.sort_num, 't', ps.sort_text, 'k', ps.sort_key)
+            FROM paginated_sessions ps
+            WHERE ps.page_rn = p_limit
+              AND EXISTS (SELECT 1 FROM paginated_sessions WHERE page_rn > p_limit)
+        )
     ) INTO result;
 
     RETURN result;
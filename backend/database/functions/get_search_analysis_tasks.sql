@@ -1,5 +1,10 @@
 -- Definition for function public.get_search_analysis_tasks (oid=217034)
-CREATE OR REPLACE FUNCTION public.get_search_analysis_tasks(p_tenant_id uuid, p_page integer, p_limit integer, p_query text DEFAULT NULL::text, p_location_id text DEFAULT NULL::text, p_start_date text DEFAULT NULL::text, p_end_date text DEFAULT NULL::text, p_include_converted boolean DEFAULT false, p_sort_field text DEFAULT 'search_count'::text, p_sort_order text DEFAULT 'desc'::text, p_search_type text DEFAULT NULL::text)
+-- Offset (p_page) or keyset (p_cursor) pagination, as in get_purchase_tasks.
+-- The total always comes from facet_counts, which the facets need anyway, so
+-- p_include_total is accepted only for a uniform task signature.
+DROP FUNCTION IF EXISTS public.get_search_analysis_tasks(uuid, integer, integer, text, text, text, text, boolean, text, text, text);
+
+CREATE OR REPLACE FUNCTION public.get_search_analysis_tasks(p_tenant_id uuid, p_page integer, p_limit integer, p_query text DEFAULT NULL::text, p_location_id text DEFAULT NULL::text, p_start_date text DEFAULT NULL::text, p_end_date text DEFAULT NULL::text, p_include_converted boolean DEFAULT false, p_sort_field text DEFAULT 'search_count'::text, p_sort_order text DEFAULT 'desc'::text, p_search_type text DEFAULT NULL::text, p_cursor jsonb DEFAULT NULL::jsonb, p_include_total boolean DEFAULT true)
  RETURNS jsonb
  LANGUAGE plpgsql
 AS $function$
@@ -39,9 +44,13 @@ BEGIN
           AND (p_end_date IS NULL OR vsr.event_date <= TO_DATE(p_end_date, 'YYYY-MM-DD'))
           AND (p_query IS NULL OR vsr.param_search_term ILIKE ('%' || p_query || '%'))
           AND (p_include_converted OR NOT EXISTS (
-              SELECT 1 FROM purchase p
-              WHERE p.param_ga_session_id = vsr.param_ga_session_id
-                AND p.tenant_id = p_tenant_id
+              SELECT 1
+              FROM get_converted_sessions(
+                  p_tenant_id,
+                  TO_DATE(p_start_date, 'YYYY-MM-DD'),
+                  TO_DATE(p_end_date, 'YYYY-MM-DD')
+              ) cs
+              WHERE cs.session_id = vsr.param_ga_session_id
           ))
         GROUP BY vsr.param_ga_session_id, vsr.user_prop_webuserid
         HAVING COUNT(*) > 2
@@ -70,23 +79,55 @@ BEGIN
             u.email,
             u.cell_phone AS phone,
             u.office_phone,
-            COUNT(*) OVER() AS total_count
+            s.search_type || ':' || COALESCE(s.param_ga_session_id, '') || ':'
+                || COALESCE(s.user_prop_webuserid, '') || ':' || COALESCE(s.search_term, '')
+                || ':' || COALESCE(u.user_id, '') AS sort_key,
+            CASE WHEN p_sort_field IN ('search_term', 'customer_name') THEN NULL ELSE s.search_count END AS sort_num,
+            CASE
+                WHEN p_sort_field = 'search_term' THEN s.search_term
+                WHEN p_sort_field = 'customer_name' THEN u.buying_company_name
+            END AS sort_text
         FROM filtered_searches s
-        LEFT JOIN users u ON u.tenant_id = p_tenant_id
-            AND (u.user_id = s.user_prop_webuserid
-                 OR (s.user_prop_webuserid IS NULL AND u.buying_company_erp_id = s.user_prop_webcustomerid))
+        LEFT JOIN user_identities ui ON ui.tenant_id = p_tenant_id
+            AND ui.user_prop_webuserid = COALESCE(s.user_prop_webuserid, '')
+            AND ui.user_prop_webcustomerid = CASE WHEN s.user_prop_webuserid IS NULL THEN COALESCE(s.user_prop_webcustomerid, '') ELSE '' END
+        LEFT JOIN users u ON u.tenant_id = p_tenant_id AND u.user_id = ui.user_id
     ),
     paginated_searches AS (
-        SELECT *
-        FROM all_searches_with_user
-        ORDER BY
-            CASE WHEN p_sort_field = 'search_count' AND p_sort_order = 'desc' THEN search_count END DESC NULLS LAST,
-            CASE WHEN p_sort_field = 'search_count' AND p_sort_order = 'asc'  THEN search_count END ASC  NULLS LAST,
-            CASE WHEN p_sort_field = 'search_term'  AND p_sort_order = 'desc' THEN search_term  END DESC NULLS LAST,
-            CASE WHEN p_sort_field = 'search_term'  AND p_sort_order = 'asc'  THEN search_term  END ASC  NULLS LAST,
-            last_activity DESC
-        LIMIT p_limit
-        OFFSET (p_page - 1) * p_limit
+        SELECT page.*, ROW_NUMBER() OVER (
+            ORDER BY
+                sort_is_null,
+                CASE WHEN p_sort_order = 'asc' THEN sort_num END ASC,
+                CASE WHEN p_sort_order <> 'asc' THEN sort_num END DESC,
+                CASE WHEN p_sort_order = 'asc' THEN sort_text END ASC,
+                CASE WHEN p_sort_order <> 'asc' THEN sort_text END DESC,
+                sort_key
+        ) AS page_rn
+        FROM (
+            SELECT *, (sort_num IS NULL AND sort_text IS NULL) AS sort_is_null
+            FROM all_searches_with_user sw
+            WHERE p_cursor IS NULL
+               OR (sw.sort_num IS NULL AND sw.sort_text IS NULL) > (p_cursor->>'z')::boolean
+               OR ((sw.sort_num IS NULL AND sw.sort_text IS NULL) = (p_cursor->>'z')::boolean AND (
+                      COALESCE(
+                          CASE WHEN p_sort_order = 'asc' THEN sw.sort_num > (p_cursor->>'n')::numeric ELSE sw.sort_num < (p_cursor->>'n')::numeric END,
+                          CASE WHEN p_sort_order = 'asc' THEN sw.sort_text > p_cursor->>'t' ELSE sw.sort_text < p_cursor->>'t' END,
+                          false
+                      )
+                      OR (sw.sort_num IS NOT DISTINCT FROM (p_cursor->>'n')::numeric
+                          AND sw.sort_text IS NOT DISTINCT FROM p_cursor->>'t'
+                          AND sw.sort_key > p_cursor->>'k')
+                  ))
+            ORDER BY
+                (sort_num IS NULL AND sort_text IS NULL),
+                CASE WHEN p_sort_order = 'asc' THEN sort_num END ASC,
+                CASE WHEN p_sort_order <> 'asc' THEN sort_num END DESC,
+                CASE WHEN p_sort_order = 'asc' THEN sort_text END ASC,
+                CASE WHEN p_sort_order <> 'asc' THEN sort_text END DESC,
+                sort_key
+            LIMIT p_limit + 1
+            OFFSET CASE WHEN p_cursor IS NULL THEN (p_page - 1) * p_limit ELSE 0 END
+        ) page
     )
     SELECT jsonb_build_object(
         'data', (
@@ -102,9 +143,10 @@ BEGIN
                     'email', ps.email,
                     'phone', ps.phone,
                     'office_phone', ps.office_phone
-                )
+                ) ORDER BY ps.page_rn
             )
             FROM paginated_searches ps
+            WHERE ps.page_rn <= p_limit
         ),
         'facets', jsonb_build_object(
             'search_types', (
@@ -119,10 +161,21 @@ BEGIN
                 WHERE fc.cnt > 0
             )
         ),
-        'total', (SELECT MAX(total_count) FROM paginated_searches),
+        'total', (
+            SELECT COALESCE(SUM(fc.cnt), 0)
+            FROM facet_counts fc
+            WHERE p_search_type IS NULL OR fc.search_type = p_search_type
+        ),
+        'total_is_estimate', false,
         'page', p_page,
         'limit', p_limit,
-        'has_more', (p_page * p_limit) < (SELECT MAX(total_count) FROM paginated_searches)
+        'has_more', (SELECT COUNT(*) FROM paginated_searches) > p_limit,
+        'next_cursor', (
+            SELECT jsonb_build_object('z', ps.sort_is_null, 'n', ps.sort_num, 't', ps.sort_text, 'k', ps.sort_key)
+            FROM paginated_searches ps
+            WHERE ps.page_rn = p_limit
+              AND EXISTS (SELECT 1 FROM paginated_searches WHERE page_rn > p_limit)
+        )
     ) INTO result;
 
     RETURN result;
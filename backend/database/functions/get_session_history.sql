@@ -1,11 +1,21 @@
 -- Definition for function public.get_session_history (oid=217037)
+-- The session's first and last day come from the sessions fact table, so each
+-- event table is read from those partitions only. Sessions not recorded there
+-- yet are looked up across all partitions.
 CREATE OR REPLACE FUNCTION public.get_session_history(p_tenant_id uuid, p_session_id text)
  RETURNS jsonb
  LANGUAGE plpgsql
 AS $function$
 DECLARE
     result JSONB;
+    v_from date;
+    v_to date;
 BEGIN
+    SELECT s.first_event_date, s.last_event_date
+    INTO v_from, v_to
+    FROM sessions s
+    WHERE s.tenant_id = p_tenant_id AND s.session_id = p_session_id;
+
     WITH all_events AS (
         -- Page Views
         SELECT
@@ -17,6 +27,7 @@ BEGIN
             ) AS details
         FROM page_view
         WHERE tenant_id = p_tenant_id AND param_ga_session_id = p_session_id
+          AND event_date BETWEEN COALESCE(v_from, '-infinity'::date) AND COALESCE(v_to, 'infinity'::date)
 
         UNION ALL
 
@@ -32,6 +43,7 @@ BEGIN
             ) AS details
         FROM add_to_cart
         WHERE tenant_id = p_tenant_id AND param_ga_session_id = p_session_id
+          AND event_date BETWEEN COALESCE(v_from, '-infinity'::date) AND COALESCE(v_to, 'infinity'::date)
 
         UNION ALL
 
@@ -46,6 +58,7 @@ BEGIN
             ) AS details
         FROM purchase
         WHERE tenant_id = p_tenant_id AND param_ga_session_id = p_session_id
+          AND event_date BETWEEN COALESCE(v_from, '-infinity'::date) AND COALESCE(v_to, 'infinity'::date)
 
         UNION ALL
 
@@ -58,6 +71,7 @@ BEGIN
             ) AS details
         FROM view_search_results
         WHERE tenant_id = p_tenant_id AND param_ga_session_id = p_session_id
+          AND event_date BETWEEN COALESCE(v_from, '-infinity'::date) AND COALESCE(v_to, 'infinity'::date)
         
         UNION ALL
 
@@ -70,6 +84,7 @@ BEGIN
             ) AS details
         FROM no_search_results
         WHERE tenant_id = p_tenant_id AND param_ga_session_id = p_session_id
+          AND event_date BETWEEN COALESCE(v_from, '-infinity'::date) AND COALESCE(v_to, 'infinity'::date)
         
         UNION ALL
         
@@ -85,6 +100,7 @@ BEGIN
             ) AS details
         FROM view_item
         WHERE tenant_id = p_tenant_id AND param_ga_session_id = p_session_id
+          AND event_date BETWEEN COALESCE(v_from, '-infinity'::date) AND COALESCE(v_to, 'infinity'::date)
     )
     SELECT jsonb_agg(
         ae ORDER BY ae.event_timestamp ASC
@@ -1,17 +1,26 @@
 -- Definition for function public.get_user_history (oid=217038)
+-- The user's sessions and the days they span come from the sessions fact
+-- table, so each event table is probed only in those partitions.
 CREATE OR REPLACE FUNCTION public.get_user_history(p_tenant_id uuid, p_user_id text)
  RETURNS jsonb
  LANGUAGE plpgsql
 AS $function$
 DECLARE
     result JSONB;
+    v_sessions character varying[];
+    v_from date;
+    v_to date;
 BEGIN
-    WITH user_sessions AS (
-        SELECT DISTINCT param_ga_session_id
-        FROM page_view
-        WHERE tenant_id = p_tenant_id AND user_prop_webuserid = p_user_id
-    ),
-    all_events AS (
+    SELECT array_agg(s.session_id), MIN(s.first_event_date), MAX(s.last_event_date)
+    INTO v_sessions, v_from, v_to
+    FROM sessions s
+    WHERE s.tenant_id = p_tenant_id AND s.user_prop_webuserid = p_user_id;
+
+    IF v_sessions IS NULL THEN
+        RETURN '[]'::jsonb;
+    END IF;
+
+    WITH all_events AS (
         -- Page Views
         SELECT
             event_timestamp,
@@ -22,7 +31,8 @@ BEGIN
                 'page_title', param_page_title
             ) AS details
         FROM page_view
-        WHERE tenant_id = p_tenant_id AND param_ga_session_id IN (SELECT param_ga_session_id FROM user_sessions)
+        WHERE tenant_id = p_tenant_id AND event_date BETWEEN v_from AND v_to
+          AND param_ga_session_id = ANY (v_sessions)
 
         UNION ALL
 
@@ -38,7 +48,8 @@ BEGIN
                 'quantity', first_item_quantity
             ) AS details
         FROM add_to_cart
-        WHERE tenant_id = p_tenant_id AND param_ga_session_id IN (SELECT param_ga_session_id FROM user_sessions)
+        WHERE tenant_id = p_tenant_id AND event_date BETWEEN v_from AND v_to
+          AND param_ga_session_id = ANY (v_sessions)
 
         UNION ALL
 
@@ -53,7 +64,8 @@ BEGIN
                 'items', COALESCE(items_json::text, '[]')
             ) AS details
         FROM purchase
-        WHERE tenant_id = p_tenant_id AND param_ga_session_id IN (SELECT param_ga_session_id FROM user_sessions)
+        WHERE tenant_id = p_tenant_id AND event_date BETWEEN v_from AND v_to
+          AND param_ga_session_id = ANY (v_sessions)
 
         UNION ALL
 
@@ -66,7 +78,8 @@ BEGIN
                 'search_term', param_search_term
             ) AS details
         FROM view_search_results
-        WHERE tenant_id = p_tenant_id AND param_ga_session_id IN (SELECT param_ga_session_id FROM user_sessions)
+        WHERE tenant_id = p_tenant_id AND event_date BETWEEN v_from AND v_to
+          AND param_ga_session_id = ANY (v_sessions)
         
         UNION ALL
 
@@ -79,7 +92,8 @@ BEGIN
                 'search_term', param_no_search_results_term
             ) AS details
         FROM no_search_results
-        WHERE tenant_id = p_tenant_id AND param_ga_session_id IN (SELECT param_ga_session_id FROM user_sessions)
+        WHERE tenant_id = p_tenant_id AND event_date BETWEEN v_from AND v_to
+          AND param_ga_session_id = ANY (v_sessions)
         
         UNION ALL
         
@@ -95,7 +109,8 @@ BEGIN
                 'category', first_item_item_category
             ) AS details
         FROM view_item
-        WHERE tenant_id = p_tenant_id AND param_ga_session_id IN (SELECT param_ga_session_id FROM user_sessions)
+        WHERE tenant_id = p_tenant_id AND event_date BETWEEN v_from AND v_to
+          AND param_ga_session_id = ANY (v_sessions)
     )
     SELECT jsonb_agg(
         ae ORDER BY ae.event_timestamp ASC
@@ -0,0 +1,78 @@
+-- Definition for function public.refresh_converted_sessions
+-- Re-derives converted_sessions for every session that had a purchase in the
+-- inclusive date range before or after ingestion replaced it. With a NULL
+-- range, or when the tenant has no rows yet, the table is rebuilt from the
+-- whole purchase history.
+CREATE OR REPLACE FUNCTION public.refresh_converted_sessions(
+    p_tenant_id uuid,
+    p_start_date date DEFAULT NULL::date,
+    p_end_date date DEFAULT NULL::date
+)
+ RETURNS integer
+ LANGUAGE plpgsql
+AS $function$
+DECLARE
+    v_sessions character varying[];
+    v_from date;
+    v_to date;
+    v_rows integer;
+BEGIN
+    IF p_start_date IS NULL
+       OR NOT EXISTS (SELECT 1 FROM converted_sessions WHERE tenant_id = p_tenant_id) THEN
+        DELETE FROM converted_sessions WHERE tenant_id = p_tenant_id;
+
+        INSERT INTO converted_sessions (tenant_id, session_id, first_purchase_date, last_purchase_date)
+        SELECT p_tenant_id, param_ga_session_id, MIN(event_date), MAX(event_date)
+        FROM purchase
+        WHERE tenant_id = p_tenant_id
+          AND param_ga_session_id IS NOT NULL
+        GROUP BY param_ga_session_id;
+
+        GET DIAGNOSTICS v_rows = ROW_COUNT;
+        RETURN v_rows;
+    END IF;
+
+    -- Sessions recorded with a purchase in the range (which may have lost it)
+    -- plus sessions with a purchase in the reloaded range
+    SELECT COALESCE(array_agg(DISTINCT touched.session_id), '{}')
+    INTO v_sessions
+    FROM (
+        SELECT cs.session_id
+        FROM converted_sessions cs
+        WHERE cs.tenant_id = p_tenant_id
+          AND cs.last_purchase_date >= p_start_date
+          AND cs.first_purchase_date <= p_end_date
+        UNION ALL
+        SELECT p.param_ga_session_id
+        FROM purchase p
+        WHERE p.tenant_id = p_tenant_id
+          AND p.event_date BETWEEN p_start_date AND p_end_date
+          AND p.param_ga_session_id IS NOT NULL
+    ) touched;
+
+    -- Purchases of those sessions outside the range were recorded earlier,
+    -- so the days to read back are the range widened to their known spans
+    SELECT
+        LEAST(p_start_date, MIN(cs.first_purchase_date)),
+        GREATEST(p_end_date, MAX(cs.last_purchase_date))
+    INTO v_from, v_to
+    FROM converted_sessions cs
+    WHERE cs.tenant_id = p_tenant_id
+      AND cs.session_id = ANY (v_sessions);
+
+    DELETE FROM converted_sessions
+    WHERE tenant_id = p_tenant_id
+      AND session_id = ANY (v_sessions);
+
+    INSERT INTO converted_sessions (tenant_id, session_id, first_purchase_date, last_purchase_date)
+    SELECT p_tenant_id, param_ga_session_id, MIN(event_date), MAX(event_date)
+    FROM purchase
+    WHERE tenant_id = p_tenant_id
+      AND event_date BETWEEN v_from AND v_to
+      AND param_ga_session_id = ANY (v_sessions)
+    GROUP BY param_ga_session_id;
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$function$
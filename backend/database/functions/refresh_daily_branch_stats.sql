@@ -0,0 +1,151 @@
+-- Definition for function public.refresh_daily_branch_stats
+-- Rebuilds daily_branch_stats, daily_branch_sessions and daily_branch_users
+-- from the raw event tables for the inclusive date range. Called by ingestion
+-- after it replaces those days, so dashboard stats never rescan the event
+-- tables.
+CREATE OR REPLACE FUNCTION public.refresh_daily_branch_stats(
+    p_tenant_id uuid,
+    p_start_date date,
+    p_end_date date
+)
+ RETURNS integer
+ LANGUAGE plpgsql
+AS $function$
+DECLARE
+    v_rows integer;
+BEGIN
+    DELETE FROM daily_branch_stats
+    WHERE tenant_id = p_tenant_id
+      AND event_date BETWEEN p_start_date AND p_end_date;
+
+    DELETE FROM daily_branch_sessions
+    WHERE tenant_id = p_tenant_id
+      AND event_date BETWEEN p_start_date AND p_end_date;
+
+    DELETE FROM daily_branch_users
+    WHERE tenant_id = p_tenant_id
+      AND event_date BETWEEN p_start_date AND p_end_date;
+
+    INSERT INTO daily_branch_stats (
+        tenant_id, event_date, branch_id, revenue, purchases, searches, failed_searches
+    )
+    SELECT
+        p_tenant_id,
+        event_date,
+        branch_id,
+        SUM(revenue),
+        SUM(purchases),
+        SUM(searches),
+        SUM(failed_searches)
+    FROM (
+        SELECT
+            event_date,
+            COALESCE(user_prop_default_branch_id, '') AS branch_id,
+            SUM(ecommerce_purchase_revenue) AS revenue,
+            COUNT(*) AS purchases,
+            0 AS searches,
+            0 AS failed_searches
+        FROM purchase
+        WHERE tenant_id = p_tenant_id
+          AND event_date BETWEEN p_start_date AND p_end_date
+        GROUP BY 1, 2
+
+        UNION ALL
+
+        SELECT
+            event_date,
+            COALESCE(user_prop_default_branch_id, ''),
+            NULL,
+            0,
+            COUNT(*),
+            0
+        FROM view_search_results
+        WHERE tenant_id = p_tenant_id
+          AND event_date BETWEEN p_start_date AND p_end_date
+        GROUP BY 1, 2
+
+        UNION ALL
+
+        SELECT
+            event_date,
+            COALESCE(user_prop_default_branch_id, ''),
+            NULL,
+            0,
+            0,
+            COUNT(*)
+        FROM no_search_results
+        WHERE tenant_id = p_tenant_id
+          AND event_date BETWEEN p_start_date AND p_end_date
+        GROUP BY 1, 2
+    ) daily
+    GROUP BY event_date, branch_id;
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+
+    INSERT INTO daily_branch_sessions (
+        tenant_id, event_date, branch_id, session_id,
+        has_page_view, has_cart, has_purchase
+    )
+    SELECT
+        p_tenant_id,
+        event_date,
+        branch_id,
+        session_id,
+        BOOL_OR(source = 'page_view'),
+        BOOL_OR(source = 'add_to_cart'),
+        BOOL_OR(source = 'purchase')
+    FROM (
+        SELECT
+            event_date,
+            COALESCE(user_prop_default_branch_id, '') AS branch_id,
+            param_ga_session_id AS session_id,
+            'page_view' AS source
+        FROM page_view
+        WHERE tenant_id = p_tenant_id
+          AND event_date BETWEEN p_start_date AND p_end_date
+          AND param_ga_session_id IS NOT NULL
+
+        UNION ALL
+
+        SELECT
+            event_date,
+            COALESCE(user_prop_default_branch_id, ''),
+            param_ga_session_id,
+            'add_to_cart'
+        FROM add_to_cart
+        WHERE tenant_id = p_tenant_id
+          AND event_date BETWEEN p_start_date AND p_end_date
+          AND param_ga_session_id IS NOT NULL
+
+        UNION ALL
+
+        SELECT
+            event_date,
+            COALESCE(user_prop_default_branch_id, ''),
+            param_ga_session_id,
+            'purchase'
+        FROM purchase
+        WHERE tenant_id = p_tenant_id
+          AND event_date BETWEEN p_start_date AND p_end_date
+          AND param_ga_session_id IS NOT NULL
+    ) events
+    GROUP BY event_date, branch_id, session_id;
+
+    -- Every (user, session) pair, so a session whose web user changes (e.g.
+    -- a login mid-session) counts for each of its users
+    INSERT INTO daily_branch_users (
+        tenant_id, event_date, branch_id, user_id, session_id
+    )
+    SELECT DISTINCT
+        p_tenant_id,
+        event_date,
+        COALESCE(user_prop_default_branch_id, ''),
+        COALESCE(user_prop_webuserid, ''),
+        COALESCE(param_ga_session_id, '')
+    FROM page_view
+    WHERE tenant_id = p_tenant_id
+      AND event_date BETWEEN p_start_date AND p_end_date;
+
+    RETURN v_rows;
+END;
+$function$
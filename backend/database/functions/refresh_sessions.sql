@@ -0,0 +1,140 @@
+-- Definition for function public.refresh_sessions
+-- Re-derives the sessions fact rows of every session with events in the
+-- inclusive date range, before or after ingestion replaced it. Sessions that
+-- cross the range boundary are rebuilt from all of their days. With a NULL
+-- range, or when the tenant has no rows yet, the table is rebuilt from the
+-- whole event history.
+CREATE OR REPLACE FUNCTION public.refresh_sessions(
+    p_tenant_id uuid,
+    p_start_date date DEFAULT NULL::date,
+    p_end_date date DEFAULT NULL::date
+)
+ RETURNS integer
+ LANGUAGE plpgsql
+AS $function$
+DECLARE
+    v_full boolean;
+    v_sessions character varying[] := '{}';
+    v_from date := '-infinity';
+    v_to date := 'infinity';
+    v_rows integer;
+BEGIN
+    v_full := p_start_date IS NULL
+        OR NOT EXISTS (SELECT 1 FROM sessions WHERE tenant_id = p_tenant_id);
+
+    IF v_full THEN
+        DELETE FROM sessions WHERE tenant_id = p_tenant_id;
+    ELSE
+        -- Sessions recorded in the range (which may have lost events) plus
+        -- sessions with events in the reloaded range
+        SELECT COALESCE(array_agg(DISTINCT touched.session_id), '{}')
+        INTO v_sessions
+        FROM (
+            SELECT s.session_id FROM sessions s
+            WHERE s.tenant_id = p_tenant_id
+              AND s.last_event_date >= p_start_date
+              AND s.first_event_date <= p_end_date
+            UNION ALL
+            SELECT param_ga_session_id FROM page_view
+            WHERE tenant_id = p_tenant_id AND event_date BETWEEN p_start_date AND p_end_date
+            UNION ALL
+            SELECT param_ga_session_id FROM add_to_cart
+            WHERE tenant_id = p_tenant_id AND event_date BETWEEN p_start_date AND p_end_date
+            UNION ALL
+            SELECT param_ga_session_id FROM purchase
+            WHERE tenant_id = p_tenant_id AND event_date BETWEEN p_start_date AND p_end_date
+            UNION ALL
+            SELECT param_ga_session_id FROM view_search_results
+            WHERE tenant_id = p_tenant_id AND event_date BETWEEN p_start_date AND p_end_date
+            UNION ALL
+            SELECT param_ga_session_id FROM no_search_results
+            WHERE tenant_id = p_tenant_id AND event_date BETWEEN p_start_date AND p_end_date
+            UNION ALL
+            SELECT param_ga_session_id FROM view_item
+            WHERE tenant_id = p_tenant_id AND event_date BETWEEN p_start_date AND p_end_date
+        ) touched
+        WHERE touched.session_id IS NOT NULL;
+
+        -- Events of those sessions outside the range were recorded earlier,
+        -- so the days to read back are the range widened to their known spans
+        SELECT
+            LEAST(p_start_date, MIN(s.first_event_date)),
+            GREATEST(p_end_date, MAX(s.last_event_date))
+        INTO v_from, v_to
+        FROM sessions s
+        WHERE s.tenant_id = p_tenant_id
+          AND s.session_id IN (SELECT unnest(v_sessions));
+
+        DELETE FROM sessions s
+        WHERE s.tenant_id = p_tenant_id
+          AND s.session_id IN (SELECT unnest(v_sessions));
+    END IF;
+
+    INSERT INTO sessions (
+        tenant_id, session_id, user_prop_webuserid, user_prop_webcustomerid, branch_id,
+        first_event_date, last_event_date, first_event_timestamp, last_event_timestamp,
+        page_view_count, distinct_pages, entry_page,
+        has_cart, has_purchase, has_search, revenue
+    )
+    SELECT
+        p_tenant_id,
+        e.session_id,
+        MAX(e.user_prop_webuserid),
+        MAX(e.user_prop_webcustomerid),
+        MAX(e.branch_id),
+        MIN(e.event_date),
+        MAX(e.event_date),
+        MIN(e.event_timestamp),
+        MAX(e.event_timestamp),
+        COUNT(*) FILTER (WHERE e.event_type = 'page_view'),
+        COUNT(DISTINCT e.page_location) FILTER (WHERE e.event_type = 'page_view'),
+        (array_agg(e.page_location ORDER BY e.event_timestamp) FILTER (WHERE e.event_type = 'page_view'))[1],
+        bool_or(e.event_type = 'add_to_cart'),
+        bool_or(e.event_type = 'purchase'),
+        bool_or(e.event_type IN ('view_search_results', 'no_search_results')),
+        COALESCE(SUM(e.revenue), 0)
+    FROM (
+        SELECT 'page_view' AS event_type, param_ga_session_id AS session_id, event_date, event_timestamp,
+               user_prop_webuserid, user_prop_webcustomerid, user_prop_default_branch_id AS branch_id,
+               param_page_location AS page_location, NULL::numeric AS revenue
+        FROM page_view
+        WHERE tenant_id = p_tenant_id AND event_date BETWEEN v_from AND v_to
+        UNION ALL
+        SELECT 'add_to_cart', param_ga_session_id, event_date, event_timestamp,
+               user_prop_webuserid, user_prop_webcustomerid, user_prop_default_branch_id,
+               NULL, NULL
+        FROM add_to_cart
+        WHERE tenant_id = p_tenant_id AND event_date BETWEEN v_from AND v_to
+        UNION ALL
+        SELECT 'purchase', param_ga_session_id, event_date, event_timestamp,
+               user_prop_webuserid, user_prop_webcustomerid, user_prop_default_branch_id,
+               NULL, ecommerce_purchase_revenue
+        FROM purchase
+        WHERE tenant_id = p_tenant_id AND event_date BETWEEN v_from AND v_to
+        UNION ALL
+        SELECT 'view_search_results', param_ga_session_id, event_date, event_timestamp,
+               user_prop_webuserid, user_prop_webcustomerid, user_prop_default_branch_id,
+               NULL, NULL
+        FROM view_search_results
+        WHERE tenant_id = p_tenant_id AND event_date BETWEEN v_from AND v_to
+        UNION ALL
+        SELECT 'no_search_results', param_ga_session_id, event_date, event_timestamp,
+               user_prop_webuserid, user_prop_webcustomerid, user_prop_default_branch_id,
+               NULL, NULL
+        FROM no_search_results
+        WHERE tenant_id = p_tenant_id AND event_date BETWEEN v_from AND v_to
+        UNION ALL
+        SELECT 'view_item', param_ga_session_id, event_date, event_timestamp,
+               user_prop_webuserid, user_prop_webcustomerid, user_prop_default_branch_id,
+               NULL, NULL
+        FROM view_item
+        WHERE tenant_id = p_tenant_id AND event_date BETWEEN v_from AND v_to
+    ) e
+    WHERE e.session_id IS NOT NULL
+      AND (v_full OR e.session_id IN (SELECT unnest(v_sessions)))
+    GROUP BY e.session_id;
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$function$
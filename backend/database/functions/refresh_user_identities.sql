@@ -0,0 +1,89 @@
+-- Definition for function public.refresh_user_identities
+-- Records the identities seen on event rows in the inclusive date range and
+-- (re)resolves every identity of the tenant against the users table. Called
+-- by ingestion after it loads a range and by the user sync after upserting
+-- users, with a NULL range. When the tenant has no identities yet the whole
+-- event history is scanned once (NULL bounds are unbounded).
+CREATE OR REPLACE FUNCTION public.refresh_user_identities(
+    p_tenant_id uuid,
+    p_start_date date DEFAULT NULL::date,
+    p_end_date date DEFAULT NULL::date
+)
+ RETURNS integer
+ LANGUAGE plpgsql
+AS $function$
+DECLARE
+    v_rows integer;
+BEGIN
+    IF p_start_date IS NOT NULL
+       OR NOT EXISTS (SELECT 1 FROM user_identities WHERE tenant_id = p_tenant_id) THEN
+        INSERT INTO user_identities (tenant_id, user_prop_webuserid, user_prop_webcustomerid)
+        SELECT DISTINCT
+            p_tenant_id,
+            COALESCE(e.user_prop_webuserid, ''),
+            CASE WHEN e.user_prop_webuserid IS NULL THEN COALESCE(e.user_prop_webcustomerid, '') ELSE '' END
+        FROM (
+            SELECT user_prop_webuserid, user_prop_webcustomerid FROM purchase
+            WHERE tenant_id = p_tenant_id
+              AND (p_start_date IS NULL OR event_date >= p_start_date)
+              AND (p_end_date IS NULL OR event_date <= p_end_date)
+            UNION
+            SELECT user_prop_webuserid, user_prop_webcustomerid FROM add_to_cart
+            WHERE tenant_id = p_tenant_id
+              AND (p_start_date IS NULL OR event_date >= p_start_date)
+              AND (p_end_date IS NULL OR event_date <= p_end_date)
+            UNION
+            SELECT user_prop_webuserid, user_prop_webcustomerid FROM page_view
+            WHERE tenant_id = p_tenant_id
+              AND (p_start_date IS NULL OR event_date >= p_start_date)
+              AND (p_end_date IS NULL OR event_date <= p_end_date)
+            UNION
+            SELECT user_prop_webuserid, user_prop_webcustomerid FROM view_search_results
+            WHERE tenant_id = p_tenant_id
+              AND (p_start_date IS NULL OR event_date >= p_start_date)
+              AND (p_end_date IS NULL OR event_date <= p_end_date)
+            UNION
+            SELECT user_prop_webuserid, user_prop_webcustomerid FROM no_search_results
+            WHERE tenant_id = p_tenant_id
+              AND (p_start_date IS NULL OR event_date >= p_start_date)
+              AND (p_end_date IS NULL OR event_date <= p_end_date)
+            UNION
+            SELECT user_prop_webuserid, user_prop_webcustomerid FROM view_item
+            WHERE tenant_id = p_tenant_id
+              AND (p_start_date IS NULL OR event_date >= p_start_date)
+              AND (p_end_date IS NULL OR event_date <= p_end_date)
+        ) e
+        WHERE e.user_prop_webuserid IS NOT NULL OR e.user_prop_webcustomerid IS NOT NULL
+        ON CONFLICT (tenant_id, user_prop_webuserid, user_prop_webcustomerid) DO NOTHING;
+    END IF;
+
+    -- A company ERP id can belong to several users; the lowest user_id wins
+    UPDATE user_identities ui
+    SET user_id = r.user_id,
+        resolved_at = NOW()
+    FROM (
+        SELECT
+            i.user_prop_webuserid,
+            i.user_prop_webcustomerid,
+            CASE
+                WHEN i.user_prop_webuserid <> '' THEN (
+                    SELECT u.user_id FROM users u
+                    WHERE u.tenant_id = p_tenant_id AND u.user_id = i.user_prop_webuserid
+                )
+                ELSE (
+                    SELECT MIN(u.user_id) FROM users u
+                    WHERE u.tenant_id = p_tenant_id AND u.buying_company_erp_id = i.user_prop_webcustomerid
+                )
+            END AS user_id
+        FROM user_identities i
+        WHERE i.tenant_id = p_tenant_id
+    ) r
+    WHERE ui.tenant_id = p_tenant_id
+      AND ui.user_prop_webuserid = r.user_prop_webuserid
+      AND ui.user_prop_webcustomerid = r.user_prop_webcustomerid
+      AND ui.user_id IS DISTINCT FROM r.user_id;
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$function$
@@ -1,4 +1,7 @@
 -- Generated schema for public.add_to_cart
+-- Partitioned by day on event_date. Daily partitions (add_to_cart_YYYYMMDD) are
+-- created by ensure_event_partitions() and swapped in whole by ingestion, so
+-- re-ingesting a day never leaves dead tuples behind.
 CREATE TABLE IF NOT EXISTS public.add_to_cart (
   id uuid NOT NULL DEFAULT gen_random_uuid(),
   tenant_id uuid NOT NULL,
@@ -24,8 +27,36 @@ CREATE TABLE IF NOT EXISTS public.add_to_cart (
   raw_data jsonb,
   created_at timestamp with time zone NOT NULL DEFAULT now(),
   updated_at timestamp with time zone NOT NULL DEFAULT now(),
-  PRIMARY KEY (id)
-);
+  PRIMARY KEY (id, event_date)
+) PARTITION BY RANGE (event_date);
+
+-- ======================================
+-- EVENT TIME
+-- ======================================
+-- event_timestamp (microseconds since the epoch, kept as text for the API)
+-- as a timestamptz, computed when rows are loaded. Hourly charts filter and
+-- bucket on it with an index range scan instead of casting every row.
+
+ALTER TABLE add_to_cart ADD COLUMN IF NOT EXISTS event_time timestamp with time zone
+GENERATED ALWAYS AS (
+  CASE WHEN event_timestamp ~ '^[0-9]+$'
+       THEN to_timestamp(event_timestamp::bigint / 1000000.0)
+  END
+) STORED;
+
+-- ======================================
+-- PRODUCT SEARCH TEXT
+-- ======================================
+-- Item ids and names extracted from items_json when rows are loaded, so the
+-- task search box can use a trigram index instead of casting every
+-- items_json document to text. Added with ALTER so existing tenant
+-- databases pick it up when the schema files are re-run.
+
+ALTER TABLE add_to_cart ADD COLUMN IF NOT EXISTS items_search_text text
+GENERATED ALWAYS AS (
+  jsonb_path_query_array(items_json, 'lax $[*].item_id')::text || ' ' ||
+  jsonb_path_query_array(items_json, 'lax $[*].item_name')::text
+) STORED;
 
 -- ======================================
 -- STATISTICS TARGETS FOR QUERY OPTIMIZER
@@ -53,14 +84,19 @@ ON add_to_cart (tenant_id, user_prop_webuserid);
 CREATE INDEX IF NOT EXISTS idx_add_to_cart_tenant_date_branch 
 ON add_to_cart (tenant_id, event_date, user_prop_default_branch_id);
 
--- Time-series index for dashboard
-CREATE INDEX IF NOT EXISTS idx_add_to_cart_time_series 
-ON add_to_cart (tenant_id, event_date DESC, event_timestamp DESC);
+-- Time-series index for hourly charts
+DROP INDEX IF EXISTS idx_add_to_cart_time_series;
+
+CREATE INDEX IF NOT EXISTS idx_add_to_cart_event_time 
+ON add_to_cart (tenant_id, event_time)
+INCLUDE (user_prop_default_branch_id, param_ga_session_id);
+
+-- Trigram index for product search (task filtering). Replaces the jsonb_ops
+-- GIN index on items_json, which cannot serve ILIKE.
+DROP INDEX IF EXISTS idx_add_to_cart_items_gin;
 
--- JSONB index for product search
-CREATE INDEX IF NOT EXISTS idx_add_to_cart_items_gin 
-ON add_to_cart USING GIN (items_json) 
-WHERE items_json IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_add_to_cart_items_search_trgm 
+ON add_to_cart USING GIN (items_search_text gin_trgm_ops);
 
 CREATE INDEX IF NOT EXISTS idx_add_to_cart_tenant_customer 
 ON add_to_cart (tenant_id, user_prop_webcustomerid)
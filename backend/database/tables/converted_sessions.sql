@@ -0,0 +1,20 @@
+-- Generated schema for public.converted_sessions
+-- One row per session with at least one purchase, with the first and last
+-- purchase day. Maintained by refresh_converted_sessions() whenever ingestion
+-- replaces purchase partitions, and read through get_converted_sessions() by
+-- every function that needs to know whether a session converted.
+CREATE TABLE IF NOT EXISTS public.converted_sessions (
+  tenant_id uuid NOT NULL,
+  session_id character varying(100) NOT NULL,
+  first_purchase_date date NOT NULL,
+  last_purchase_date date NOT NULL,
+  PRIMARY KEY (tenant_id, session_id) INCLUDE (first_purchase_date, last_purchase_date)
+);
+
+-- The primary key covers the date columns so "converted?" probes are
+-- index-only scans. Those need an up-to-date visibility map, so vacuum after
+-- inserts instead of waiting for the default 20% threshold.
+ALTER TABLE converted_sessions SET (
+  autovacuum_vacuum_insert_scale_factor = 0.02,
+  autovacuum_vacuum_scale_factor = 0.02
+);
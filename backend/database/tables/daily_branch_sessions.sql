@@ -0,0 +1,30 @@
+-- Generated schema for public.daily_branch_sessions
+-- Exact session sets behind the distinct session counts of the dashboard
+-- (visitors, abandoned carts): one row per session, day and branch, with
+-- flags for the event types seen. User counts read daily_branch_users.
+-- Rebuilt together with daily_branch_stats by refresh_daily_branch_stats().
+CREATE TABLE IF NOT EXISTS public.daily_branch_sessions (
+  tenant_id uuid NOT NULL,
+  event_date date NOT NULL,
+  branch_id character varying(100) NOT NULL DEFAULT '',
+  session_id character varying(100) NOT NULL,
+  has_page_view boolean NOT NULL DEFAULT false,
+  has_cart boolean NOT NULL DEFAULT false,
+  has_purchase boolean NOT NULL DEFAULT false,
+  PRIMARY KEY (tenant_id, event_date, branch_id, session_id)
+);
+
+-- ======================================
+-- DAILY_BRANCH_SESSIONS TABLE INDEXES
+-- ======================================
+
+-- Single-branch dashboard lookups across a date range
+CREATE INDEX IF NOT EXISTS idx_daily_branch_sessions_tenant_branch_date 
+ON daily_branch_sessions (tenant_id, branch_id, event_date);
+
+-- Cart abandonment detection reads converted_sessions instead
+DROP INDEX IF EXISTS idx_daily_branch_sessions_purchased;
+
+-- A session's users moved to daily_branch_users, which keeps every user
+-- seen in a session rather than one of them (drops its index as well)
+ALTER TABLE daily_branch_sessions DROP COLUMN IF EXISTS user_id;
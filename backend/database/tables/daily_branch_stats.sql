@@ -0,0 +1,23 @@
+-- Generated schema for public.daily_branch_stats
+-- Per-day, per-branch rollup of the additive dashboard metrics, rebuilt by
+-- refresh_daily_branch_stats() for the days an ingestion job loads. Events
+-- without a default branch are rolled up under branch_id ''.
+CREATE TABLE IF NOT EXISTS public.daily_branch_stats (
+  tenant_id uuid NOT NULL,
+  event_date date NOT NULL,
+  branch_id character varying(100) NOT NULL DEFAULT '',
+  revenue numeric(15,2),
+  purchases integer NOT NULL DEFAULT 0,
+  searches integer NOT NULL DEFAULT 0,
+  failed_searches integer NOT NULL DEFAULT 0,
+  refreshed_at timestamp with time zone NOT NULL DEFAULT now(),
+  PRIMARY KEY (tenant_id, event_date, branch_id)
+);
+
+-- ======================================
+-- DAILY_BRANCH_STATS TABLE INDEXES
+-- ======================================
+
+-- Single-branch dashboard lookups across a date range
+CREATE INDEX IF NOT EXISTS idx_daily_branch_stats_tenant_branch_date 
+ON daily_branch_stats (tenant_id, branch_id, event_date);
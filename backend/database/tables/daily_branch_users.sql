@@ -0,0 +1,21 @@
+-- Generated schema for public.daily_branch_users
+-- Distinct (user, session) pairs of page views per day and branch, behind the
+-- user counts of the dashboard (unique users, repeat visits, per-location
+-- visitors). Page views without a web user or session are kept under ''.
+-- Rebuilt together with daily_branch_stats by refresh_daily_branch_stats().
+CREATE TABLE IF NOT EXISTS public.daily_branch_users (
+  tenant_id uuid NOT NULL,
+  event_date date NOT NULL,
+  branch_id character varying(100) NOT NULL DEFAULT '',
+  user_id character varying(100) NOT NULL DEFAULT '',
+  session_id character varying(100) NOT NULL DEFAULT '',
+  PRIMARY KEY (tenant_id, event_date, branch_id, user_id, session_id)
+);
+
+-- ======================================
+-- DAILY_BRANCH_USERS TABLE INDEXES
+-- ======================================
+
+-- Single-branch dashboard lookups across a date range
+CREATE INDEX IF NOT EXISTS idx_daily_branch_users_tenant_branch_date 
+ON daily_branch_users (tenant_id, branch_id, event_date);
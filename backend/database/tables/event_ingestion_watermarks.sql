@@ -0,0 +1,23 @@
+-- Generated schema for public.event_ingestion_watermarks
+-- One row per event type and day describing what was last ingested, used by
+-- incremental ingestion to skip days whose BigQuery shard has not changed.
+CREATE TABLE IF NOT EXISTS public.event_ingestion_watermarks (
+  tenant_id uuid NOT NULL,
+  event_type character varying(50) NOT NULL,
+  event_date date NOT NULL,
+  row_count integer NOT NULL DEFAULT 0,
+  max_event_timestamp character varying(50),
+  source_last_modified timestamp with time zone,
+  source_intraday boolean NOT NULL DEFAULT false,
+  job_id character varying(255),
+  ingested_at timestamp with time zone NOT NULL DEFAULT now(),
+  PRIMARY KEY (tenant_id, event_type, event_date)
+);
+
+-- ======================================
+-- EVENT_INGESTION_WATERMARKS TABLE INDEXES
+-- ======================================
+
+-- Range lookups for a tenant across all event types
+CREATE INDEX IF NOT EXISTS idx_event_ingestion_watermarks_tenant_date 
+ON event_ingestion_watermarks (tenant_id, event_date);
@@ -0,0 +1,4 @@
+-- Extensions required by the tenant schema. Created first so later table
+-- files can reference their operator classes.
+-- pg_trgm: trigram GIN indexes behind the task search filters (ILIKE '%...%')
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
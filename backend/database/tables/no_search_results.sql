@@ -1,4 +1,7 @@
 -- Generated schema for public.no_search_results
+-- Partitioned by day on event_date. Daily partitions (no_search_results_YYYYMMDD) are
+-- created by ensure_event_partitions() and swapped in whole by ingestion, so
+-- re-ingesting a day never leaves dead tuples behind.
 CREATE TABLE IF NOT EXISTS public.no_search_results (
   id uuid NOT NULL DEFAULT gen_random_uuid(),
   tenant_id uuid NOT NULL,
@@ -19,8 +22,22 @@ CREATE TABLE IF NOT EXISTS public.no_search_results (
   raw_data jsonb,
   created_at timestamp with time zone NOT NULL DEFAULT now(),
   updated_at timestamp with time zone NOT NULL DEFAULT now(),
-  PRIMARY KEY (id)
-);
+  PRIMARY KEY (id, event_date)
+) PARTITION BY RANGE (event_date);
+
+-- ======================================
+-- EVENT TIME
+-- ======================================
+-- event_timestamp (microseconds since the epoch, kept as text for the API)
+-- as a timestamptz, computed when rows are loaded. Hourly charts filter and
+-- bucket on it with an index range scan instead of casting every row.
+
+ALTER TABLE no_search_results ADD COLUMN IF NOT EXISTS event_time timestamp with time zone
+GENERATED ALWAYS AS (
+  CASE WHEN event_timestamp ~ '^[0-9]+$'
+       THEN to_timestamp(event_timestamp::bigint / 1000000.0)
+  END
+) STORED;
 
 -- ======================================
 -- STATISTICS TARGETS FOR QUERY OPTIMIZER
@@ -52,9 +69,16 @@ ON no_search_results (tenant_id, event_date, user_prop_default_branch_id);
 CREATE INDEX IF NOT EXISTS idx_no_search_results_term 
 ON no_search_results (tenant_id, param_no_search_results_term);
 
--- Time-series index for dashboard
-CREATE INDEX IF NOT EXISTS idx_no_search_results_time_series 
-ON no_search_results (tenant_id, event_date DESC, event_timestamp DESC);
+-- Trigram index for the search-term filter in get_search_analysis_tasks
+CREATE INDEX IF NOT EXISTS idx_no_search_results_term_trgm 
+ON no_search_results USING GIN (param_no_search_results_term gin_trgm_ops);
+
+-- Time-series index for hourly charts
+DROP INDEX IF EXISTS idx_no_search_results_time_series;
+
+CREATE INDEX IF NOT EXISTS idx_no_search_results_event_time 
+ON no_search_results (tenant_id, event_time)
+INCLUDE (user_prop_default_branch_id);
 
 CREATE INDEX IF NOT EXISTS idx_no_search_results_tenant_customer 
 ON no_search_results (tenant_id, user_prop_webcustomerid)
@@ -1,4 +1,7 @@
 -- Generated schema for public.page_view
+-- Partitioned by day on event_date. Daily partitions (page_view_YYYYMMDD) are
+-- created by ensure_event_partitions() and swapped in whole by ingestion, so
+-- re-ingesting a day never leaves dead tuples behind.
 CREATE TABLE IF NOT EXISTS public.page_view (
   id uuid NOT NULL DEFAULT gen_random_uuid(),
   tenant_id uuid NOT NULL,
@@ -19,8 +22,22 @@ CREATE TABLE IF NOT EXISTS public.page_view (
   raw_data jsonb,
   created_at timestamp with time zone NOT NULL DEFAULT now(),
   updated_at timestamp with time zone NOT NULL DEFAULT now(),
-  PRIMARY KEY (id)
-);
+  PRIMARY KEY (id, event_date)
+) PARTITION BY RANGE (event_date);
+
+-- ======================================
+-- EVENT TIME
+-- ======================================
+-- event_timestamp (microseconds since the epoch, kept as text for the API)
+-- as a timestamptz, computed when rows are loaded. Hourly charts filter and
+-- bucket on it with an index range scan instead of casting every row.
+
+ALTER TABLE page_view ADD COLUMN IF NOT EXISTS event_time timestamp with time zone
+GENERATED ALWAYS AS (
+  CASE WHEN event_timestamp ~ '^[0-9]+$'
+       THEN to_timestamp(event_timestamp::bigint / 1000000.0)
+  END
+) STORED;
 
 -- ======================================
 -- STATISTICS TARGETS FOR QUERY OPTIMIZER
@@ -48,9 +65,12 @@ ON page_view (tenant_id, user_prop_webuserid);
 CREATE INDEX IF NOT EXISTS idx_page_view_tenant_date_branch 
 ON page_view (tenant_id, event_date, user_prop_default_branch_id);
 
--- Time-series index for dashboard
-CREATE INDEX IF NOT EXISTS idx_page_view_time_series 
-ON page_view (tenant_id, event_date DESC, event_timestamp DESC);
+-- Time-series index for hourly charts
+DROP INDEX IF EXISTS idx_page_view_time_series;
+
+CREATE INDEX IF NOT EXISTS idx_page_view_event_time 
+ON page_view (tenant_id, event_time)
+INCLUDE (user_prop_default_branch_id, param_ga_session_id);
 
 -- Specialized index for repeat visitor analysis
 CREATE INDEX IF NOT EXISTS idx_page_view_user_session 
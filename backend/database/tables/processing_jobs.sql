@@ -17,6 +17,14 @@ CREATE TABLE IF NOT EXISTS public.processing_jobs (
   PRIMARY KEY (id)
 );
 
+-- ======================================
+-- INCREMENTAL FLAG
+-- ======================================
+-- Whether the job only re-extracts event days whose BigQuery shard changed.
+-- Stored so the job monitor re-queues a stuck job with the same mode.
+
+ALTER TABLE processing_jobs ADD COLUMN IF NOT EXISTS incremental boolean NOT NULL DEFAULT false;
+
 -- ======================================
 -- STATISTICS TARGETS FOR QUERY OPTIMIZER
 -- ======================================
@@ -1,4 +1,7 @@
 -- Generated schema for public.purchase
+-- Partitioned by day on event_date. Daily partitions (purchase_YYYYMMDD) are
+-- created by ensure_event_partitions() and swapped in whole by ingestion, so
+-- re-ingesting a day never leaves dead tuples behind.
 CREATE TABLE IF NOT EXISTS public.purchase (
   id uuid NOT NULL DEFAULT gen_random_uuid(),
   tenant_id uuid NOT NULL,
@@ -21,8 +24,36 @@ CREATE TABLE IF NOT EXISTS public.purchase (
   raw_data jsonb,
   created_at timestamp with time zone NOT NULL DEFAULT now(),
   updated_at timestamp with time zone NOT NULL DEFAULT now(),
-  PRIMARY KEY (id)
-);
+  PRIMARY KEY (id, event_date)
+) PARTITION BY RANGE (event_date);
+
+-- ======================================
+-- EVENT TIME
+-- ======================================
+-- event_timestamp (microseconds since the epoch, kept as text for the API)
+-- as a timestamptz, computed when rows are loaded. Hourly charts filter and
+-- bucket on it with an index range scan instead of casting every row.
+
+ALTER TABLE purchase ADD COLUMN IF NOT EXISTS event_time timestamp with time zone
+GENERATED ALWAYS AS (
+  CASE WHEN event_timestamp ~ '^[0-9]+$'
+       THEN to_timestamp(event_timestamp::bigint / 1000000.0)
+  END
+) STORED;
+
+-- ======================================
+-- PRODUCT SEARCH TEXT
+-- ======================================
+-- Item ids and names extracted from items_json when rows are loaded, so the
+-- task search box can use a trigram index instead of casting every
+-- items_json document to text. Added with ALTER so existing tenant
+-- databases pick it up when the schema files are re-run.
+
+ALTER TABLE purchase ADD COLUMN IF NOT EXISTS items_search_text text
+GENERATED ALWAYS AS (
+  jsonb_path_query_array(items_json, 'lax $[*].item_id')::text || ' ' ||
+  jsonb_path_query_array(items_json, 'lax $[*].item_name')::text
+) STORED;
 
 -- ======================================
 -- STATISTICS TARGETS FOR QUERY OPTIMIZER
@@ -58,19 +89,24 @@ CREATE INDEX IF NOT EXISTS idx_purchase_revenue
 ON purchase (tenant_id, event_date, ecommerce_purchase_revenue) 
 WHERE ecommerce_purchase_revenue IS NOT NULL;
 
--- Time-series index for dashboard
-CREATE INDEX IF NOT EXISTS idx_purchase_time_series 
-ON purchase (tenant_id, event_date DESC, event_timestamp DESC);
+-- Time-series index for hourly charts
+DROP INDEX IF EXISTS idx_purchase_time_series;
+
+CREATE INDEX IF NOT EXISTS idx_purchase_event_time 
+ON purchase (tenant_id, event_time)
+INCLUDE (user_prop_default_branch_id, ecommerce_purchase_revenue);
 
 -- Specialized index for cart abandonment detection (NOT EXISTS queries)
 CREATE INDEX IF NOT EXISTS idx_purchase_session_lookup 
 ON purchase (param_ga_session_id, tenant_id) 
 WHERE param_ga_session_id IS NOT NULL;
 
--- JSONB index for product search (task filtering)
-CREATE INDEX IF NOT EXISTS idx_purchase_items_gin 
-ON purchase USING GIN (items_json) 
-WHERE items_json IS NOT NULL;
+-- Trigram index for product search (task filtering). Replaces the jsonb_ops
+-- GIN index on items_json, which cannot serve ILIKE.
+DROP INDEX IF EXISTS idx_purchase_items_gin;
+
+CREATE INDEX IF NOT EXISTS idx_purchase_items_search_trgm 
+ON purchase USING GIN (items_search_text gin_trgm_ops);
 
 CREATE INDEX IF NOT EXISTS idx_purchase_tenant_customer 
 ON purchase (tenant_id, user_prop_webcustomerid)
@@ -0,0 +1,47 @@
+-- Generated schema for public.sessions
+-- Session fact table: one row per GA session, built from the six event tables
+-- by refresh_sessions() whenever ingestion replaces a date range. Backs the
+-- session and user history lookups and the repeat visit and bounce tasks,
+-- which would otherwise aggregate page_view by session on every request.
+-- Timestamps keep the event tables' representation (microseconds as text).
+CREATE TABLE IF NOT EXISTS public.sessions (
+  tenant_id uuid NOT NULL,
+  session_id character varying(100) NOT NULL,
+  user_prop_webuserid character varying(100),
+  user_prop_webcustomerid character varying(100),
+  branch_id character varying(100),
+  first_event_date date NOT NULL,
+  last_event_date date NOT NULL,
+  first_event_timestamp character varying(50),
+  last_event_timestamp character varying(50),
+  page_view_count integer NOT NULL DEFAULT 0,
+  distinct_pages integer NOT NULL DEFAULT 0,
+  entry_page text,
+  has_cart boolean NOT NULL DEFAULT false,
+  has_purchase boolean NOT NULL DEFAULT false,
+  has_search boolean NOT NULL DEFAULT false,
+  revenue numeric(15,2) NOT NULL DEFAULT 0,
+  refreshed_at timestamp with time zone NOT NULL DEFAULT now(),
+  PRIMARY KEY (tenant_id, session_id)
+);
+
+-- ======================================
+-- SESSIONS TABLE INDEXES
+-- ======================================
+
+-- Date range lookups (sessions ending on or after the range start)
+CREATE INDEX IF NOT EXISTS idx_sessions_tenant_date
+ON sessions (tenant_id, last_event_date);
+
+CREATE INDEX IF NOT EXISTS idx_sessions_tenant_branch_date
+ON sessions (tenant_id, branch_id, last_event_date);
+
+-- User history
+CREATE INDEX IF NOT EXISTS idx_sessions_tenant_user
+ON sessions (tenant_id, user_prop_webuserid)
+WHERE user_prop_webuserid IS NOT NULL;
+
+-- Bounce detection (single-page sessions)
+CREATE INDEX IF NOT EXISTS idx_sessions_bounced
+ON sessions (tenant_id, last_event_date)
+WHERE distinct_pages = 1;
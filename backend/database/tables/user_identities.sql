@@ -0,0 +1,25 @@
+-- Generated schema for public.user_identities
+-- Resolved users table row for every identity seen on event rows, maintained
+-- by refresh_user_identities() at ingestion and after user upserts. Task
+-- functions join events -> user_identities -> users with plain equality
+-- instead of an OR predicate on users.
+-- Identity key, mirroring the users join rule:
+--   user_prop_webuserid set      -> (webuserid, '')      resolved by users.user_id
+--   only user_prop_webcustomerid -> ('', webcustomerid)  resolved by buying_company_erp_id
+CREATE TABLE IF NOT EXISTS public.user_identities (
+  tenant_id uuid NOT NULL,
+  user_prop_webuserid character varying(100) NOT NULL DEFAULT '',
+  user_prop_webcustomerid character varying(100) NOT NULL DEFAULT '',
+  user_id character varying(100),
+  resolved_at timestamp with time zone NOT NULL DEFAULT now(),
+  PRIMARY KEY (tenant_id, user_prop_webuserid, user_prop_webcustomerid)
+);
+
+-- ======================================
+-- USER_IDENTITIES TABLE INDEXES
+-- ======================================
+
+-- Re-resolution after a user upsert touches a single user
+CREATE INDEX IF NOT EXISTS idx_user_identities_tenant_user 
+ON user_identities (tenant_id, user_id)
+WHERE user_id IS NOT NULL;
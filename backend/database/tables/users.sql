@@ -1,4 +1,7 @@
--- Users table: stores user master data synced from BigQuery
+-- Users table: stores user master data synced from BigQuery.
+-- content_hash is the MD5 of the source columns, so the nightly sync only
+-- rewrites users whose data changed. Users missing from the source are kept
+-- with is_active = false.
 CREATE TABLE IF NOT EXISTS public.users (
   id uuid NOT NULL DEFAULT gen_random_uuid(),
   tenant_id uuid NOT NULL,
@@ -9,6 +12,7 @@ CREATE TABLE IF NOT EXISTS public.users (
   email character varying(255),
   office_phone character varying(50),
   cell_phone character varying(50),
+  content_hash character varying(32),
   is_active boolean NOT NULL DEFAULT true,
   created_at timestamp with time zone NOT NULL DEFAULT now(),
   updated_at timestamp with time zone NOT NULL DEFAULT now(),
@@ -16,6 +20,14 @@ CREATE TABLE IF NOT EXISTS public.users (
   CONSTRAINT uq_users_tenant_user UNIQUE (tenant_id, user_id)
 );
 
+-- ======================================
+-- CONTENT HASH
+-- ======================================
+-- Added after the table was first provisioned. Existing rows start out NULL
+-- and are rewritten (and hashed) once by the next sync.
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS content_hash character varying(32);
+
 -- ======================================
 -- STATISTICS TARGETS FOR QUERY OPTIMIZER
 -- ======================================
@@ -36,3 +48,11 @@ ON users (tenant_id, user_id);
 CREATE INDEX IF NOT EXISTS idx_users_tenant_email 
 ON users (tenant_id, email) 
 WHERE email IS NOT NULL;
+
+-- Trigram indexes for the customer search in the task functions
+-- (buying_company_name / email ILIKE '%...%')
+CREATE INDEX IF NOT EXISTS idx_users_company_name_trgm 
+ON users USING GIN (buying_company_name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_users_email_trgm 
+ON users USING GIN (email gin_trgm_ops);
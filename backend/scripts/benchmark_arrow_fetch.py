@@ -0,0 +1,271 @@
+"""
+Arrow vs Row Event Conversion Benchmark Script.
+
+This module measures the client-side cost of turning BigQuery event results
+into PostgreSQL COPY records, comparing the Arrow-native fetch mode
+(INGESTION_EVENT_FETCH_MODE=arrow) against the pandas -> list-of-dicts path.
+Benchmarks run offline against recorded Arrow fixtures, so they are
+repeatable and need neither BigQuery nor a database.
+
+**Architecture Context:**
+    - The Azure Functions worker streams events from BigQuery and loads them
+      with EventBatchWriter (see services/functions/shared/database.py)
+    - In "arrow" mode record batches go through EventBatchWriter's columnar
+      helpers (_normalize_arrow, _record_arrow_day_stats, arrow_to_records)
+    - In "rows" mode each batch is converted with to_pandas().to_dict("records")
+      and then through _normalize, _record_day_stats and rows_to_records
+
+**What Is Measured:**
+    - CPU seconds (user + system) per million rows
+    - Peak RSS growth (MB) per million rows, relative to the RSS after the
+      fixture has been memory-mapped
+    - Each mode runs in a freshly spawned process so peak RSS is not shared
+    - Network transfer and COPY itself are excluded; REST JSON decoding is
+      also excluded, so the "rows" figures understate the REST path
+
+**Dependencies:**
+    - Azure Functions worker requirements (services/functions/requirements.txt)
+    - For `record` only: a tenant with a BigQuery configuration and the
+      POSTGRES_* environment variables used to look it up
+
+**Example Usage:**
+    ```bash
+    # Record a fixture once from a tenant's GA4 export (single-scan query)
+    python scripts/benchmark_arrow_fetch.py record <tenant_id> \\
+        --start 2024-01-01 --end 2024-01-07 --output events.arrow
+
+    # Record a single event type
+    python scripts/benchmark_arrow_fetch.py record <tenant_id> \\
+        --start 2024-01-01 --end 2024-01-07 --event-type page_view \\
+        --output page_view.arrow
+
+    # Benchmark both modes offline
+    python scripts/benchmark_arrow_fetch.py run page_view.arrow
+    ```
+
+**Output:**
+    One line per mode with rows, CPU seconds and peak RSS, both in total and
+    per million rows.
+
+**Note:**
+    Single-scan fixtures include an event_name column and are split by event
+    type before conversion, as iter_all_event_record_batches() does.
+"""
+
+import argparse
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from pathlib import Path
+import resource
+import sys
+from typing import Any
+
+from dotenv import load_dotenv
+from loguru import logger
+
+load_dotenv()
+
+# The functions worker uses top-level imports (e.g. `from shared.database import ...`)
+sys.path.append(
+    str(Path(__file__).parent.parent.resolve() / "services" / "functions")
+)
+
+from clients import EVENT_TYPES
+from clients.bigquery_client import EVENT_COLUMNS, EVENT_NAME_TO_TYPE
+import pyarrow as pa
+import pyarrow.compute as pc
+from shared.database import EventBatchWriter
+
+MODES = ["rows", "arrow"]
+BENCHMARK_TENANT_ID = "00000000-0000-0000-0000-000000000000"
+
+
+async def record(args: argparse.Namespace) -> None:
+    """
+    Record the Arrow results of an extraction query into an IPC file.
+
+    Args:
+        args: Parsed `record` arguments (tenant_id, start, end, event_type, output).
+    """
+    from clients import get_tenant_bigquery_client
+
+    client = await get_tenant_bigquery_client(args.tenant_id)
+    if client is None:
+        logger.error(f"BigQuery configuration not found for tenant {args.tenant_id}")
+        sys.exit(1)
+
+    if args.event_type:
+        query = client._build_event_queries(args.start, args.end)[args.event_type]
+    else:
+        query = client._build_all_events_query(args.start, args.end)
+
+    rows = 0
+    writer = None
+    for batch in client._execute_query_arrow(query):
+        if writer is None:
+            writer = pa.ipc.new_file(args.output, batch.schema)
+        writer.write_batch(batch)
+        rows += batch.num_rows
+    if writer is None:
+        logger.error("Query returned no rows; nothing recorded")
+        sys.exit(1)
+    writer.close()
+    logger.info(f"Recorded {rows} rows to {args.output}")
+
+
+def split_by_event_type(batch: pa.RecordBatch) -> list[tuple[str, pa.RecordBatch]]:
+    """
+    Split a recorded batch into per-event-type batches.
+
+    Args:
+        batch: Batch from a single-scan or per-type fixture.
+
+    Returns:
+        list[tuple[str, pa.RecordBatch]]: (event_type, batch) pairs.
+    """
+    if "event_name" not in batch.schema.names:
+        return [("", batch)]
+
+    split = []
+    for event_type in EVENT_TYPES:
+        names = [name for name, et in EVENT_NAME_TO_TYPE.items() if et == event_type]
+        selected = batch.filter(
+            pc.is_in(batch.column("event_name"), value_set=pa.array(names))
+        )
+        if selected.num_rows:
+            columns = EVENT_COLUMNS[event_type]
+            split.append(
+                (
+                    event_type,
+                    pa.RecordBatch.from_arrays(
+                        [selected.column(col) for col in columns], names=list(columns)
+                    ),
+                )
+            )
+    return split
+
+
+def convert(batch: pa.RecordBatch, mode: str) -> int:
+    """
+    Convert one batch into COPY records the way the loader does.
+
+    Args:
+        batch: Events of a single event type.
+        mode: "rows" or "arrow".
+
+    Returns:
+        int: Number of records built.
+    """
+    writer = EventBatchWriter(None, "benchmark", BENCHMARK_TENANT_ID)
+    built = 0
+    for offset in range(0, batch.num_rows, writer.COPY_BATCH_SIZE):
+        chunk = batch.slice(offset, writer.COPY_BATCH_SIZE)
+        if mode == "arrow":
+            chunk = writer._normalize_arrow(chunk)
+            writer._record_arrow_day_stats(chunk)
+            _, records = writer.arrow_to_records(chunk, BENCHMARK_TENANT_ID)
+        else:
+            events = chunk.to_pandas().to_dict("records")
+            normalized = [writer._normalize(ev) for ev in events]
+            writer._record_day_stats(normalized)
+            _, records = writer.rows_to_records(normalized)
+        built += len(records)
+    return built
+
+
+def measure(fixture: str, mode: str) -> dict[str, Any]:
+    """
+    Convert every batch of a fixture in this process and report resource use.
+
+    Args:
+        fixture: Path to an Arrow IPC file.
+        mode: "rows" or "arrow".
+
+    Returns:
+        dict[str, Any]: rows, cpu_seconds and peak_rss_mb (growth over baseline).
+    """
+    reader = pa.ipc.open_file(pa.memory_map(fixture))
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = resource.getrusage(resource.RUSAGE_SELF)
+
+    rows = 0
+    for i in range(reader.num_record_batches):
+        for _, batch in split_by_event_type(reader.get_batch(i)):
+            rows += convert(batch, mode)
+
+    end = resource.getrusage(resource.RUSAGE_SELF)
+    cpu_seconds = (end.ru_utime - start.ru_utime) + (end.ru_stime - start.ru_stime)
+    return {
+        "rows": rows,
+        "cpu_seconds": cpu_seconds,
+        "peak_rss_mb": (end.ru_maxrss - baseline_kb) / 1024,
+    }
+
+
+def run(args: argparse.Namespace) -> None:
+    """
+    Benchmark each mode in its own spawned process and print a summary table.
+
+    Args:
+        args: Parsed `run` arguments (fixture, modes).
+    """
+    results = []
+    for mode in args.modes:
+        logger.info(f"Converting {args.fixture} in {mode} mode")
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            results.append((mode, executor.submit(measure, args.fixture, mode).result()))
+
+    print(
+        f"\n{'mode':<6} {'rows':>10} {'cpu s':>8} {'peak MB':>9} "
+        f"{'cpu s/1M':>9} {'MB/1M':>8}"
+    )
+    for mode, result in results:
+        per_million = 1_000_000 / max(result["rows"], 1)
+        print(
+            f"{mode:<6} {result['rows']:>10} {result['cpu_seconds']:>8.2f} "
+            f"{result['peak_rss_mb']:>9.1f} "
+            f"{result['cpu_seconds'] * per_million:>9.2f} "
+            f"{result['peak_rss_mb'] * per_million:>8.1f}"
+        )
+
+
+def main() -> None:
+    """
+    Main entry point for the Arrow conversion benchmark.
+
+    **Workflow:**
+        1. `record`: run an extraction query once and save its Arrow batches
+        2. `run`: measure each mode in its own spawned process
+        3. Print CPU seconds and peak RSS per million rows
+    """
+    parser = argparse.ArgumentParser(description="Benchmark Arrow event conversion")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", help="Record an Arrow fixture")
+    record_parser.add_argument("tenant_id", help="Tenant UUID with a BigQuery config")
+    record_parser.add_argument("--start", required=True, help="YYYY-MM-DD")
+    record_parser.add_argument("--end", required=True, help="YYYY-MM-DD")
+    record_parser.add_argument(
+        "--event-type",
+        choices=EVENT_TYPES,
+        help="Record one event type instead of the single-scan query",
+    )
+    record_parser.add_argument("--output", required=True, help="Arrow IPC file")
+
+    run_parser = subparsers.add_parser("run", help="Benchmark a recorded fixture")
+    run_parser.add_argument("fixture", help="Arrow IPC file written by `record`")
+    run_parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+
+    args = parser.parse_args()
+
+    if args.command == "record":
+        asyncio.run(record(args))
+    else:
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
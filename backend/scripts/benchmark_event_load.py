@@ -0,0 +1,205 @@
+"""
+Event Table Bulk-Load Benchmark Script.
+
+This module measures how fast the Azure Functions ingestion worker can load GA4
+events into a tenant database, comparing the binary COPY loader against the
+multi-row INSERT ... VALUES loader used previously.
+
+**Architecture Context:**
+    - Events are written through FunctionsRepository.open_event_writer(), the same
+      code path used by ingestion jobs (delete range + load in one transaction)
+    - Each tenant has its own dedicated PostgreSQL database
+    - Database names follow the pattern: `google-analytics-{tenant_id}`
+
+**What Is Measured:**
+    - Rows per second for each load method ("copy", "insert") and row count
+    - Only the write phase is timed; synthetic rows are generated beforehand
+    - Rows are shaped like BigQuery page_view output, including a raw_data JSON
+      payload of realistic size
+
+**Safety:**
+    - Rows are written to a far-future date range (2099-01-01) that never holds
+      real data
+    - Every run is rolled back via EventBatchWriter.abort(), so the tenant
+      database is left unchanged (apart from table bloat until autovacuum runs)
+
+**Dependencies:**
+    - A provisioned tenant database (see scripts/init_db.py)
+    - Environment variables: POSTGRES_HOST, POSTGRES_PORT, POSTGRES_USER,
+      POSTGRES_PASSWORD
+    - Azure Functions worker requirements (services/functions/requirements.txt)
+
+**Example Usage:**
+    ```bash
+    # Default: page_view, 10k / 100k / 1M rows, both load methods
+    python scripts/benchmark_event_load.py 550e8400-e29b-41d4-a716-446655440000
+
+    # Smaller run against view_item with COPY only
+    python scripts/benchmark_event_load.py <tenant_id> \\
+        --event-type view_item --rows 10000 100000 --methods copy
+    ```
+
+**Output:**
+    One line per (method, row count) with elapsed seconds and rows/sec.
+"""
+
+import argparse
+import asyncio
+from datetime import date
+import json
+from pathlib import Path
+import sys
+import time
+from typing import Any
+
+from dotenv import load_dotenv
+from loguru import logger
+import numpy as np
+
+load_dotenv()
+
+# The functions worker uses top-level imports (e.g. `from shared.database import ...`)
+sys.path.append(
+    str(Path(__file__).parent.parent.resolve() / "services" / "functions")
+)
+
+from shared.database import EVENT_LOAD_METHODS, create_repository, dispose_engines
+
+BENCHMARK_DATE = date(2099, 1, 1)
+DEFAULT_ROW_COUNTS = [10_000, 100_000, 1_000_000]
+EVENT_TYPES = ["page_view", "view_item"]
+
+
+def build_events(event_type: str, count: int) -> list[dict[str, Any]]:
+    """
+    Generate synthetic events shaped like BigQuery extraction output.
+
+    Args:
+        event_type: Target event table ("page_view" or "view_item").
+        count: Number of events to generate.
+
+    Returns:
+        list[dict[str, Any]]: Event dictionaries ready for EventBatchWriter.write().
+    """
+    rng = np.random.default_rng(42)
+    event_date = BENCHMARK_DATE.strftime("%Y%m%d")
+    base_ts = 4_070_908_800_000_000  # 2099-01-01 in microseconds
+
+    events = []
+    for i in range(count):
+        session_id = str(1_700_000_000 + i // 20)
+        event: dict[str, Any] = {
+            "event_date": event_date,
+            "event_timestamp": str(base_ts + i * 1000),
+            "user_pseudo_id": f"{int(rng.integers(10**9))}.{int(rng.integers(10**9))}",
+            "user_prop_webuserid": str(int(rng.integers(100_000))),
+            "user_prop_default_branch_id": f"D{int(rng.integers(50)):02d}",
+            "user_prop_webcustomerid": str(int(rng.integers(20_000))),
+            "param_ga_session_id": session_id,
+            "param_page_title": f"Product Catalog Page {i % 500}",
+            "param_page_location": f"https://shop.example.com/catalog/{i % 5000}",
+            "device_category": str(rng.choice(["desktop", "mobile", "tablet"])),
+            "device_operating_system": str(rng.choice(["Windows", "iOS", "Android"])),
+            "geo_country": "United States",
+            "geo_city": str(rng.choice(["Chicago", "Dallas", "Denver", "Phoenix"])),
+        }
+        if event_type == "page_view":
+            event["param_page_referrer"] = "https://shop.example.com/"
+        else:
+            item = {
+                "item_id": f"SKU-{i % 10_000}",
+                "item_name": f"Item {i % 10_000}",
+                "item_category": "Fasteners",
+                "price": 12.5,
+            }
+            event["first_item_item_id"] = item["item_id"]
+            event["first_item_item_name"] = item["item_name"]
+            event["first_item_item_category"] = item["item_category"]
+            event["first_item_price"] = item["price"]
+            event["items_json"] = json.dumps([item])
+        event["raw_data"] = json.dumps(
+            {
+                "event_date": event_date,
+                "event_timestamp": event["event_timestamp"],
+                "event_name": event_type,
+                "user_pseudo_id": event["user_pseudo_id"],
+                "event_params": [
+                    {"key": "ga_session_id", "value": {"int_value": session_id}},
+                    {"key": "page_title", "value": {"string_value": event["param_page_title"]}},
+                    {"key": "page_location", "value": {"string_value": event["param_page_location"]}},
+                ],
+                "device": {"category": event["device_category"]},
+                "geo": {"country": event["geo_country"], "city": event["geo_city"]},
+            }
+        )
+        events.append(event)
+    return events
+
+
+async def run_once(
+    tenant_id: str, event_type: str, method: str, events: list[dict[str, Any]]
+) -> float:
+    """
+    Load events with one method inside a rolled-back replace transaction.
+
+    Args:
+        tenant_id: Tenant whose database is used.
+        event_type: Target event table.
+        method: Load method ("copy" or "insert").
+        events: Pre-generated events.
+
+    Returns:
+        float: Seconds spent writing the events.
+    """
+    repo = create_repository(tenant_id)
+    async with repo.open_event_writer(
+        tenant_id, event_type, BENCHMARK_DATE, BENCHMARK_DATE, load_method=method
+    ) as writer:
+        started = time.perf_counter()
+        await writer.write(events)
+        elapsed = time.perf_counter() - started
+        writer.abort()
+    return elapsed
+
+
+async def main() -> None:
+    """
+    Main entry point for the bulk-load benchmark.
+
+    **Workflow:**
+        1. Parse tenant_id, event type, row counts and load methods
+        2. For each row count, generate synthetic events once
+        3. Load them with each method and roll back
+        4. Print a rows/sec table
+    """
+    parser = argparse.ArgumentParser(description="Benchmark event table bulk loads")
+    parser.add_argument("tenant_id", help="Tenant UUID with a provisioned database")
+    parser.add_argument("--event-type", choices=EVENT_TYPES, default="page_view")
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=DEFAULT_ROW_COUNTS, metavar="N"
+    )
+    parser.add_argument(
+        "--methods",
+        nargs="+",
+        choices=sorted(EVENT_LOAD_METHODS),
+        default=["insert", "copy"],
+    )
+    args = parser.parse_args()
+
+    results: list[tuple[str, int, float]] = []
+    for count in args.rows:
+        logger.info(f"Generating {count} synthetic {args.event_type} events")
+        events = build_events(args.event_type, count)
+        for method in args.methods:
+            logger.info(f"Loading {count} rows with {method}")
+            elapsed = await run_once(args.tenant_id, args.event_type, method, events)
+            results.append((method, count, elapsed))
+    await dispose_engines()
+
+    print(f"\n{'method':<8} {'rows':>9} {'seconds':>11} {'rows/sec':>12}")
+    for method, count, elapsed in results:
+        print(f"{method:<8} {count:>9} {elapsed:>11.2f} {count / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,186 @@
+"""
+Location Sheet Parse Benchmark Script.
+
+This module measures the client-side cost of turning the SFTP locations
+workbook into database rows: reading the Excel file with each available
+pandas engine, and converting the DataFrame into row dictionaries with the
+per-cell loop used previously versus the column-wise conversion in
+shared/dataframes.py. It runs offline against a generated workbook, so it
+needs neither SFTP nor a database.
+
+**Architecture Context:**
+    - SFTPClient._get_locations_data_sync() downloads the workbook and reads
+      it with read_locations_sheet() (INGESTION_EXCEL_ENGINE)
+    - IngestionService._process_locations() converts the DataFrame with
+      dataframe_records() before FunctionsRepository.upsert_locations()
+
+**What Is Measured:**
+    - Best-of-N wall time of read_locations_sheet() per engine ("openpyxl",
+      and "calamine" when python-calamine and pandas 2.2+ are installed)
+    - Best-of-N wall time of the DataFrame -> records conversion, "loop"
+      (replace + to_dict + per-cell isna/Timestamp checks) and "columnar"
+      (dataframe_records)
+
+**Dependencies:**
+    - Azure Functions worker requirements (services/functions/requirements.txt)
+
+**Example Usage:**
+    ```bash
+    # Default: 50k-row workbook, generated on first run
+    python scripts/benchmark_location_parse.py
+
+    # Bigger sheet, more repeats
+    python scripts/benchmark_location_parse.py --rows 200000 --repeat 5 \\
+        --fixture /tmp/locations_200k.xlsx
+    ```
+
+**Output:**
+    One line per engine and per conversion mode with rows and best seconds.
+"""
+
+import argparse
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from pathlib import Path
+import sys
+import time
+from typing import Any
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+
+# The functions worker uses top-level imports (e.g. `from shared.database import ...`)
+sys.path.append(
+    str(Path(__file__).parent.parent.resolve() / "services" / "functions")
+)
+
+from clients import sftp_client
+from shared.dataframes import dataframe_records
+
+DEFAULT_ROWS = 50_000
+
+
+def build_workbook(path: Path, rows: int) -> None:
+    """
+    Write a synthetic locations workbook shaped like the SFTP export.
+
+    Args:
+        path: Output .xlsx path.
+        rows: Number of location rows.
+    """
+    rng = np.random.default_rng(42)
+    ids = np.arange(1, rows + 1)
+    df = pd.DataFrame(
+        {
+            "WAREHOUSE_ID": ids,
+            "WAREHOUSE_CODE": [f"WH{i:06d}" for i in ids],
+            "LOCATION_NAME": [f"Branch {i}" for i in ids],
+            "CITY": rng.choice(["Austin", "Denver", "Toronto", "Leeds"], rows),
+            "STATE": rng.choice(["TX", "CO", "ON", None], rows),
+            "COUNTRY": rng.choice(["US", "CA", "UK"], rows),
+            "ADDRESS1": [f"{i} Main Street" for i in ids],
+            # Mostly blank, as in real exports
+            "ADDRESS2": np.where(rng.random(rows) < 0.8, None, "Suite 100"),
+            "ZIP_CODE": rng.integers(10000, 99999, rows),
+            "UPDATED_AT": [
+                datetime(2024, 1, 1) + timedelta(minutes=int(m))
+                for m in rng.integers(0, 525_600, rows)
+            ],
+        }
+    )
+    logger.info(f"Writing {rows} rows to {path}")
+    df.to_excel(path, sheet_name="Locations", index=False, engine="openpyxl")
+
+
+def loop_records(df: pd.DataFrame) -> list[dict[str, Any]]:
+    """The per-cell conversion previously done in _process_locations()."""
+    records = df.replace({np.nan: None}).to_dict("records")
+    cleaned = []
+    for record in records:
+        cleaned_record = {}
+        for key, value in record.items():
+            if pd.isna(value):
+                cleaned_record[key] = None
+            elif isinstance(value, pd.Timestamp):
+                cleaned_record[key] = value.to_pydatetime()
+            else:
+                cleaned_record[key] = value
+        cleaned.append(cleaned_record)
+    return cleaned
+
+
+def best_of(repeat: int, fn: Callable[[], Any]) -> tuple[float, Any]:
+    """
+    Run a callable several times.
+
+    Args:
+        repeat: Number of runs.
+        fn: Callable to time.
+
+    Returns:
+        tuple[float, Any]: Fastest wall time in seconds and the last result.
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def engines() -> list[str]:
+    """Excel engines available in this environment."""
+    available = ["openpyxl"]
+    sftp_client.EXCEL_ENGINE = "auto"
+    if sftp_client._excel_engine() == "calamine":
+        available.append("calamine")
+    return available
+
+
+def main() -> None:
+    """
+    Main entry point for the location parse benchmark.
+
+    **Workflow:**
+        1. Generate the fixture workbook unless it already exists
+        2. Time read_locations_sheet() with each available engine
+        3. Time both DataFrame -> records conversions on the parsed sheet
+           and check that they produce the same records
+    """
+    parser = argparse.ArgumentParser(description="Benchmark location sheet parsing")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--fixture", type=Path, default=None, help="Workbook path (generated if missing)"
+    )
+    args = parser.parse_args()
+
+    fixture = args.fixture or Path(f"locations_{args.rows}.xlsx")
+    if not fixture.exists():
+        build_workbook(fixture, args.rows)
+
+    print(f"\n{'step':<20} {'rows':>8} {'best s':>8}")
+
+    df = None
+    for engine in engines():
+        sftp_client.EXCEL_ENGINE = engine
+        seconds, df = best_of(
+            args.repeat, lambda: sftp_client.read_locations_sheet(str(fixture))
+        )
+        print(f"{'read ' + engine:<20} {len(df):>8} {seconds:>8.3f}")
+
+    outputs = {}
+    for mode, convert in (("loop", loop_records), ("columnar", dataframe_records)):
+        seconds, outputs[mode] = best_of(
+            args.repeat, lambda convert=convert: convert(df)
+        )
+        print(f"{'convert ' + mode:<20} {len(outputs[mode]):>8} {seconds:>8.3f}")
+
+    if outputs["loop"] != outputs["columnar"]:
+        logger.warning("Conversions produced different records")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+SMTP Delivery Throughput Benchmark Script.
+
+This module measures email delivery throughput (emails per minute) of the
+Azure Functions email job against a local aiosmtpd stand-in server,
+comparing the original delivery path (a fresh SMTP connection per email,
+branches sent one after another) with SMTPDeliveryPool (reused sessions and
+concurrent branch fan-out).
+
+**Architecture Context:**
+    - EmailService.process_email_job() fans out across branches, bounded by
+      EMAIL_BRANCH_CONCURRENCY (see services/functions/services/email_service.py)
+    - Messages go through SMTPDeliveryPool, which reuses up to
+      EMAIL_SMTP_POOL_SIZE authenticated sessions, rate limits per server and
+      retries transient 4xx replies (see services/functions/clients/smtp_client.py)
+
+**What Is Measured:**
+    - Wall-clock emails per minute for the same set of messages
+    - SMTP connections opened by each mode
+    - Report rendering and database logging are excluded; only SMTP delivery
+      is timed
+
+**Stand-in Server:**
+    - aiosmtpd Controller bound to localhost, accepting every message
+    - --latency adds a per-message delay to the DATA reply, approximating a
+      remote relay
+    - --fail-every N answers every Nth message with "451 4.3.0 Try again
+      later" to exercise the retry path
+
+**Dependencies:**
+    - aiosmtpd (`pip install aiosmtpd`)
+    - Azure Functions worker requirements (services/functions/requirements.txt)
+
+**Example Usage:**
+    ```bash
+    # 40 branches with 2 recipients each, 50ms server latency
+    python scripts/benchmark_smtp_delivery.py --branches 40 --recipients 2 \\
+        --latency 0.05
+
+    # Include transient failures in the pooled run
+    python scripts/benchmark_smtp_delivery.py --fail-every 10
+    ```
+
+**Output:**
+    One line per mode with messages, connections, elapsed seconds and emails
+    per minute.
+
+**Note:**
+    Transient failures are only injected into the pooled run; the original
+    path has no retry and would count them as failed emails.
+"""
+
+import argparse
+import asyncio
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from pathlib import Path
+import smtplib
+import sys
+import time
+from typing import Any
+
+from aiosmtpd.controller import Controller
+from loguru import logger
+
+# The functions worker uses top-level imports (e.g. `from clients import ...`)
+sys.path.append(
+    str(Path(__file__).parent.parent.resolve() / "services" / "functions")
+)
+
+from clients.smtp_client import SMTPDeliveryPool
+
+REPORT_HTML = "<html><body>" + "<p>Branch report row</p>" * 500 + "</body></html>"
+
+
+class CountingHandler:
+    """aiosmtpd handler that counts messages and can inject 451 replies."""
+
+    def __init__(self, latency: float, fail_every: int) -> None:
+        self.latency = latency
+        self.fail_every = fail_every
+        self.received = 0
+        self.rejected = 0
+        self.connections = 0
+        self._attempts = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.connections += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope) -> str:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self._attempts += 1
+        if self.fail_every and self._attempts % self.fail_every == 0:
+            self.rejected += 1
+            return "451 4.3.0 Try again later"
+        self.received += 1
+        return "250 Message accepted for delivery"
+
+    def reset(self, fail_every: int) -> None:
+        self.fail_every = fail_every
+        self.received = self.rejected = self.connections = self._attempts = 0
+
+
+def build_messages(branches: int, recipients: int) -> list[list[MIMEMultipart]]:
+    """
+    Build one report email per recipient, grouped by branch.
+
+    Args:
+        branches: Number of branches.
+        recipients: Sales reps per branch.
+
+    Returns:
+        list[list[MIMEMultipart]]: Messages for each branch.
+    """
+    grouped = []
+    for b in range(branches):
+        messages = []
+        for r in range(recipients):
+            msg = MIMEMultipart("related")
+            msg["From"] = "reports@example.com"
+            msg["To"] = f"rep{r}.branch{b}@example.com"
+            msg["Subject"] = f"Daily Branch Sales Report - benchmark - BR{b:03d}"
+            msg.attach(MIMEText(REPORT_HTML, "html"))
+            messages.append(msg)
+        grouped.append(messages)
+    return grouped
+
+
+def send_fresh(config: dict[str, Any], msg: MIMEMultipart) -> None:
+    """Send one message on a new connection, as the original job did."""
+    smtp_server = smtplib.SMTP(config["server"], config["port"])
+    try:
+        smtp_server.send_message(msg)
+    finally:
+        smtp_server.quit()
+
+
+async def run_before(config: dict[str, Any], grouped: list[list[MIMEMultipart]]) -> int:
+    """Send every message sequentially, connecting per email."""
+    failed = 0
+    for messages in grouped:
+        for msg in messages:
+            try:
+                send_fresh(config, msg)
+            except smtplib.SMTPException:
+                failed += 1
+    return failed
+
+
+async def run_after(
+    config: dict[str, Any],
+    grouped: list[list[MIMEMultipart]],
+    pool_size: int,
+    concurrency: int,
+) -> int:
+    """Send branches concurrently through an SMTPDeliveryPool."""
+    delivery = SMTPDeliveryPool(config, size=pool_size, retry_backoff=0.1)
+    slots = asyncio.Semaphore(concurrency)
+
+    async def send_branch(messages: list[MIMEMultipart]) -> int:
+        failed = 0
+        async with slots:
+            for msg in messages:
+                try:
+                    await delivery.send(msg)
+                except smtplib.SMTPException:
+                    failed += 1
+        return failed
+
+    try:
+        return sum(await asyncio.gather(*(send_branch(m) for m in grouped)))
+    finally:
+        await delivery.close()
+
+
+async def benchmark(args: argparse.Namespace) -> None:
+    """
+    Run both delivery modes against the stand-in server and print a summary.
+
+    Args:
+        args: Parsed command-line arguments.
+    """
+    handler = CountingHandler(args.latency, 0)
+    controller = Controller(handler, hostname="127.0.0.1", port=args.port)
+    controller.start()
+    config = {"server": "127.0.0.1", "port": args.port, "use_tls": False}
+    grouped = build_messages(args.branches, args.recipients)
+    total = args.branches * args.recipients
+
+    results = []
+    try:
+        for mode in ("before", "after"):
+            handler.reset(args.fail_every if mode == "after" else 0)
+            logger.info(f"Sending {total} emails ({mode})")
+            started = time.perf_counter()
+            if mode == "before":
+                failed = await run_before(config, grouped)
+            else:
+                failed = await run_after(
+                    config, grouped, args.pool_size, args.concurrency
+                )
+            elapsed = time.perf_counter() - started
+            results.append(
+                (mode, handler.received, failed, handler.rejected,
+                 handler.connections, elapsed)
+            )
+    finally:
+        controller.stop()
+
+    print(
+        f"\n{'mode':<7} {'sent':>6} {'failed':>7} {'451s':>6} {'conns':>6} "
+        f"{'seconds':>8} {'emails/min':>11}"
+    )
+    for mode, sent, failed, rejected, connections, elapsed in results:
+        print(
+            f"{mode:<7} {sent:>6} {failed:>7} {rejected:>6} {connections:>6} "
+            f"{elapsed:>8.2f} {sent / elapsed * 60:>11.0f}"
+        )
+
+
+def main() -> None:
+    """
+    Main entry point for the SMTP delivery benchmark.
+
+    **Workflow:**
+        1. Start an aiosmtpd stand-in server on localhost
+        2. Send the same messages with the original and pooled delivery paths
+        3. Print emails per minute for each mode
+    """
+    parser = argparse.ArgumentParser(description="Benchmark SMTP report delivery")
+    parser.add_argument("--branches", type=int, default=20)
+    parser.add_argument("--recipients", type=int, default=2, help="Reps per branch")
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="Server DATA delay in seconds"
+    )
+    parser.add_argument(
+        "--fail-every", type=int, default=0, help="Reply 451 to every Nth message"
+    )
+    parser.add_argument("--pool-size", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+
+    asyncio.run(benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Converted Sessions Plan Check Script.
+
+This module is a regression check for the conversion lookups of the dashboard
+and task functions. Every "did this session purchase?" test goes through
+get_converted_sessions(), which must be inlined by the planner so the anti-join
+probes the converted_sessions primary key with an index-only scan instead of
+scanning purchase history. The script EXPLAINs representative probes against a
+tenant database and exits non-zero when that is no longer the case.
+
+**Architecture Context:**
+    - converted_sessions holds one row per purchasing session and is
+      maintained by refresh_converted_sessions() at purchase ingestion
+    - get_converted_sessions() is a STABLE LANGUAGE sql function, inlined
+      into get_dashboard_overview_stats, get_location_stats_bulk,
+      get_chart_data, get_cart_abandonment_tasks and get_search_analysis_tasks
+    - Turning the helper into plpgsql, marking it STRICT or VOLATILE, or
+      passing it a subquery argument silently turns each probe into a
+      Function Scan over a materialized result
+
+**What Is Checked:**
+    - No "Function Scan" on get_converted_sessions (the helper was inlined)
+    - At least one "Index Only Scan" on converted_sessions
+    - With --analyze, the heap fetches of those scans are reported (a high
+      count means the visibility map is stale and the table needs a VACUUM)
+
+**Dependencies:**
+    - A provisioned tenant database with converted_sessions and the
+      get_converted_sessions() function
+    - POSTGRES_* environment variables used by common.database
+
+**Example Usage:**
+    ```bash
+    # Run from backend directory
+    python scripts/check_converted_sessions_plan.py <tenant_id>
+
+    # Check a specific range and report heap fetches
+    python scripts/check_converted_sessions_plan.py <tenant_id> \\
+        --start 2024-01-01 --end 2024-01-31 --analyze
+    ```
+
+**Note:**
+    Sequential and bitmap scans are disabled for the EXPLAIN (SET LOCAL) so
+    the result does not depend on table sizes: on a small tenant a sequential
+    scan is a legitimate choice, but an un-inlined helper shows up either way.
+"""
+
+import argparse
+import asyncio
+from datetime import date, timedelta
+import json
+from pathlib import Path
+import sys
+from typing import Any
+
+from dotenv import load_dotenv
+from loguru import logger
+
+load_dotenv()
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from common.database import get_async_db_session
+
+# Representative anti-joins, as written in the dashboard and task functions
+PROBES = {
+    "abandoned_carts (daily_branch_sessions)": """
+        SELECT COUNT(DISTINCT dbs.session_id)
+        FROM daily_branch_sessions dbs
+        WHERE dbs.tenant_id = CAST(:tenant_id AS uuid)
+          AND dbs.has_cart
+          AND dbs.event_date BETWEEN CAST(:start_date AS date) AND CAST(:end_date AS date)
+          AND NOT EXISTS (
+              SELECT 1
+              FROM get_converted_sessions(
+                  CAST(:tenant_id AS uuid), CAST(:start_date AS date), CAST(:end_date AS date)
+              ) cs
+              WHERE cs.session_id = dbs.session_id
+          )
+    """,
+    "abandoned_carts (add_to_cart)": """
+        SELECT COUNT(DISTINCT ac.param_ga_session_id)
+        FROM add_to_cart ac
+        WHERE ac.tenant_id = CAST(:tenant_id AS uuid)
+          AND ac.event_date BETWEEN CAST(:start_date AS date) AND CAST(:end_date AS date)
+          AND NOT EXISTS (
+              SELECT 1
+              FROM get_converted_sessions(
+                  CAST(:tenant_id AS uuid), CAST(:start_date AS date), CAST(:end_date AS date)
+              ) cs
+              WHERE cs.session_id = ac.param_ga_session_id
+          )
+    """,
+}
+
+
+def walk_plan(node: dict[str, Any]) -> list[dict[str, Any]]:
+    """
+    Flatten an EXPLAIN (FORMAT JSON) plan tree.
+
+    Args:
+        node: A plan node (the "Plan" of the EXPLAIN output).
+
+    Returns:
+        list[dict[str, Any]]: The node and all of its descendants.
+    """
+    nodes = [node]
+    for child in node.get("Plans", []):
+        nodes.extend(walk_plan(child))
+    return nodes
+
+
+def check_plan(plan: dict[str, Any]) -> tuple[list[str], int | None]:
+    """
+    Check one plan for an inlined helper and an index-only probe.
+
+    Args:
+        plan: The root "Plan" node.
+
+    Returns:
+        tuple[list[str], int | None]: Problems found (empty when the plan is
+        as expected) and total heap fetches of the converted_sessions scans
+        (None without ANALYZE).
+    """
+    nodes = walk_plan(plan)
+    problems = []
+
+    if any(
+        n["Node Type"] == "Function Scan"
+        and n.get("Function Name") == "get_converted_sessions"
+        for n in nodes
+    ):
+        problems.append("get_converted_sessions() was not inlined (Function Scan)")
+
+    probes = [
+        n
+        for n in nodes
+        if n["Node Type"] == "Index Only Scan"
+        and n.get("Relation Name") == "converted_sessions"
+    ]
+    if not probes:
+        problems.append("no Index Only Scan on converted_sessions")
+
+    heap_fetches = None
+    if any("Heap Fetches" in n for n in probes):
+        heap_fetches = sum(n.get("Heap Fetches", 0) for n in probes)
+    return problems, heap_fetches
+
+
+async def explain(
+    tenant_id: str, sql: str, params: dict[str, Any], analyze: bool
+) -> dict[str, Any]:
+    """
+    EXPLAIN a probe with sequential and bitmap scans disabled.
+
+    Args:
+        tenant_id: Tenant whose database is used.
+        sql: Probe query.
+        params: Bind parameters.
+        analyze: Run the query (EXPLAIN ANALYZE) to collect heap fetches.
+
+    Returns:
+        dict[str, Any]: The root "Plan" node.
+    """
+    options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+    async with get_async_db_session(
+        "analytics-service", tenant_id=tenant_id
+    ) as session:
+        await session.execute(text("SET LOCAL enable_seqscan = off"))
+        await session.execute(text("SET LOCAL enable_bitmapscan = off"))
+        result = await session.execute(text(f"EXPLAIN ({options}) {sql}"), params)
+        output = result.scalar()
+        await session.rollback()
+
+    if isinstance(output, str):
+        output = json.loads(output)
+    return output[0]["Plan"]
+
+
+async def main() -> int:
+    """
+    Main entry point for the plan check.
+
+    **Workflow:**
+        1. Parse tenant_id and the date range (default: the last 30 days)
+        2. EXPLAIN each probe
+        3. Print one line per probe and exit non-zero on any problem
+
+    Returns:
+        int: Process exit code (0 when every probe is as expected).
+    """
+    parser = argparse.ArgumentParser(
+        description="Check that conversion lookups probe converted_sessions"
+    )
+    parser.add_argument("tenant_id", help="Tenant UUID with a provisioned database")
+    parser.add_argument("--start", type=date.fromisoformat, default=None)
+    parser.add_argument("--end", type=date.fromisoformat, default=None)
+    parser.add_argument(
+        "--analyze", action="store_true", help="Run the probes and report heap fetches"
+    )
+    args = parser.parse_args()
+
+    end_date = args.end or date.today()
+    start_date = args.start or end_date - timedelta(days=30)
+    params = {
+        "tenant_id": args.tenant_id,
+        "start_date": start_date,
+        "end_date": end_date,
+    }
+
+    failed = False
+    for name, sql in PROBES.items():
+        plan = await explain(args.tenant_id, sql, params, args.analyze)
+        problems, heap_fetches = check_plan(plan)
+        if problems:
+            failed = True
+            logger.error(f"{name}: {'; '.join(problems)}")
+            logger.debug(json.dumps(plan, indent=2))
+        else:
+            fetches = f" (heap fetches: {heap_fetches})" if heap_fetches is not None else ""
+            logger.info(f"{name}: index-only probe of converted_sessions{fetches}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,195 @@
+"""
+SFTP Download Cache Check Script.
+
+This module is a regression check for the conditional download of the SFTP
+locations workbook. It runs SFTPClient against a local stand-in server (a
+directory served through the stat/get/close subset of paramiko's SFTP API),
+so it needs neither network access nor a database, and exits non-zero when
+a scenario misbehaves.
+
+**Architecture Context:**
+    - IngestionService._process_locations_if_changed() loads the cache entry
+      of a tenant's locations file, calls
+      SFTPClient._get_locations_update_sync(), and stores the entry after a
+      clean upsert
+    - SFTPClient stats the remote file and downloads it only when size or
+      mtime differ from the entry; a download whose SHA-256 matches the
+      entry is not parsed again (INGESTION_SFTP_CACHE_HASH)
+    - SFTPFileCache (clients/sftp_cache.py) persists entries with their
+      parsed rows and expires them after INGESTION_SFTP_CACHE_TTL
+
+**What Is Checked:**
+    - First fetch downloads and parses the workbook
+    - Unchanged size and mtime: no download, cached rows returned
+    - Touched file (new mtime, same bytes): downloaded, but reported
+      unchanged with the new mtime
+    - Edited file: downloaded, parsed, new rows returned
+    - Cache entries round-trip through disk and expire after the TTL
+
+**Dependencies:**
+    - Azure Functions worker requirements (services/functions/requirements.txt)
+
+**Example Usage:**
+    ```bash
+    # Run from backend directory
+    python scripts/check_sftp_download_cache.py
+    ```
+"""
+
+import os
+from pathlib import Path
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any
+
+from loguru import logger
+import pandas as pd
+import paramiko
+
+# The functions worker uses top-level imports (e.g. `from shared.database import ...`)
+sys.path.append(
+    str(Path(__file__).parent.parent.resolve() / "services" / "functions")
+)
+
+from clients.sftp_cache import SFTPFileCache, cache_key
+from clients.sftp_client import SFTPClient
+
+
+class LocalSFTPServer:
+    """Stand-in for paramiko.SFTPClient serving files from a local directory."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.downloads = 0
+
+    def _local(self, remote_path: str) -> Path:
+        return self.root / remote_path.lstrip("/")
+
+    def stat(self, remote_path: str) -> paramiko.SFTPAttributes:
+        return paramiko.SFTPAttributes.from_stat(self._local(remote_path).stat())
+
+    def get(self, remote_path: str, local_path: str) -> None:
+        self.downloads += 1
+        shutil.copyfile(self._local(remote_path), local_path)
+
+    def close(self) -> None:
+        pass
+
+
+class _Connection:
+    """Stand-in for the SSH client, which only needs close()."""
+
+    def close(self) -> None:
+        pass
+
+
+class LocalSFTPClient(SFTPClient):
+    """SFTPClient whose connections go to a LocalSFTPServer."""
+
+    def __init__(self, server: LocalSFTPServer) -> None:
+        super().__init__(
+            {"host": "localhost", "username": "check", "password": "check"}
+        )
+        self.server = server
+
+    def _create_connection(self) -> tuple[Any, Any]:
+        return _Connection(), self.server
+
+
+def write_workbook(path: Path, cities: list[str]) -> None:
+    """Write a small locations workbook, one row per city."""
+    df = pd.DataFrame(
+        {
+            "WAREHOUSE_ID": range(1, len(cities) + 1),
+            "WAREHOUSE_CODE": [f"WH{i}" for i in range(1, len(cities) + 1)],
+            "CITY": cities,
+        }
+    )
+    df.to_excel(path, sheet_name="Locations", index=False, engine="openpyxl")
+
+
+def check(condition: bool, message: str, failures: list[str]) -> None:
+    """Log a scenario result and collect failures."""
+    if condition:
+        logger.info(f"ok   {message}")
+    else:
+        logger.error(f"FAIL {message}")
+        failures.append(message)
+
+
+def main() -> None:
+    """
+    Main entry point for the SFTP download cache check.
+
+    **Workflow:**
+        1. Serve a generated workbook from a temporary directory
+        2. Fetch it through the client for each scenario, feeding back the
+           previous entry as the cache
+        3. Round-trip entries through SFTPFileCache and check expiry
+        4. Exit with status 1 if any scenario failed
+    """
+    failures: list[str] = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "sftp"
+        root.mkdir()
+        workbook = root / "Locations_List.xlsx"
+        write_workbook(workbook, ["Austin", "Denver"])
+
+        server = LocalSFTPServer(root)
+        client = LocalSFTPClient(server)
+
+        entry, changed = client._get_locations_update_sync(None)
+        check(
+            changed and server.downloads == 1 and len(entry["rows"]) == 2,
+            "first fetch downloads and parses",
+            failures,
+        )
+
+        cached = entry
+        entry, changed = client._get_locations_update_sync(cached)
+        check(
+            not changed and server.downloads == 1 and entry["rows"] == cached["rows"],
+            "unchanged size and mtime skip the download",
+            failures,
+        )
+
+        stat = workbook.stat()
+        os.utime(workbook, (stat.st_atime, stat.st_mtime + 60))
+        entry, changed = client._get_locations_update_sync(cached)
+        check(
+            not changed
+            and server.downloads == 2
+            and entry["mtime"] == cached["mtime"] + 60,
+            "touched file with identical content is not parsed again",
+            failures,
+        )
+
+        cached = entry
+        write_workbook(workbook, ["Austin", "Denver", "Toronto"])
+        os.utime(workbook, (stat.st_atime, stat.st_mtime + 120))
+        entry, changed = client._get_locations_update_sync(cached)
+        check(
+            changed and server.downloads == 3 and len(entry["rows"]) == 3,
+            "edited file is downloaded and parsed",
+            failures,
+        )
+
+        cache = SFTPFileCache(Path(tmp) / "cache", ttl=60)
+        key = cache_key("tenant", *client.cache_identity(client.locations_file))
+        cache.store(key, entry)
+        check(cache.load(key) is not None, "cache entry round-trips", failures)
+
+        cache.store(key, {**entry, "stored_at": time.time() - 120})
+        check(cache.load(key) is None, "expired cache entry is ignored", failures)
+
+    if failures:
+        logger.error(f"{len(failures)} scenario(s) failed")
+        sys.exit(1)
+    logger.info("All SFTP download cache scenarios passed")
+
+
+if __name__ == "__main__":
+    main()
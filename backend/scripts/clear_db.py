@@ -108,6 +108,7 @@ TABLE_CREATION_ORDER = [
     "users.sql",
     "locations.sql",
     "processing_jobs.sql",
+    "event_ingestion_watermarks.sql",
     "page_view.sql",
     "add_to_cart.sql",
     "purchase.sql",
@@ -81,7 +81,9 @@ async def main() -> None:
     **Workflow:**
         1. Display deprecation notice (automatic provisioning is preferred)
         2. Validate tenant_id argument from command line
-        3. Call provision_tenant_database() to create database and schema
+        3. Call provision_tenant_database() to create database and schema, or
+           initialize_tenant_schema() to upgrade, partition and backfill an
+           existing one
         4. Display success/failure status with database name
         5. Exit with appropriate status code
 
@@ -142,7 +144,19 @@ async def main() -> None:
     logger.info(f"Manually provisioning database for tenant: {tenant_id}")
 
     try:
-        success: bool = await provision_tenant_database(tenant_id, force_recreate=False)
+        from common.database.tenant_provisioning import (
+            initialize_tenant_schema,
+            is_schema_initialized,
+        )
+
+        if await is_schema_initialized(tenant_id):
+            # Existing tenant: re-run the idempotent schema files to add new
+            # tables and functions, convert unpartitioned event tables and
+            # backfill derived tables
+            logger.info(f"Upgrading existing schema for tenant: {tenant_id}")
+            success: bool = await initialize_tenant_schema(tenant_id)
+        else:
+            success = await provision_tenant_database(tenant_id, force_recreate=False)
 
         if success:
             logger.info(f"✓ Successfully provisioned database for tenant {tenant_id}")
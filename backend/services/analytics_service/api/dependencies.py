@@ -56,7 +56,7 @@ from functools import lru_cache
 from fastapi import Header, HTTPException
 from loguru import logger
 
-from common.database.tenant_provisioning import tenant_database_exists
+from common.database.tenant_registry import tenant_registry
 from services.analytics_service.database import (
     HistoryRepository,
     LocationsRepository,
@@ -169,7 +169,7 @@ def get_stats_repository() -> StatsRepository:
     return StatsRepository()
 
 
-def get_tenant_id(
+async def get_tenant_id(
     tenant_id_header: str | None = Header(default=None, alias="X-Tenant-Id"),
 ) -> str:
     """
@@ -190,6 +190,8 @@ def get_tenant_id(
         HTTPException: 400 Bad Request if:
             - The X-Tenant-Id header is missing (None)
             - The header value is empty or contains only whitespace
+            - The header value is not a UUID
+        HTTPException: 404 Not Found if the tenant database does not exist.
 
     Example:
         ```python
@@ -200,9 +202,9 @@ def get_tenant_id(
         ```
 
     Security Note:
-        This function does not validate the format or existence of the tenant ID
-        in the database. It only ensures that a tenant ID is provided. Database-level
-        validation and access control should be handled by the database client.
+        Tenant existence is checked against the in-memory tenant registry
+        (common.database.tenant_registry), so no database connection is made
+        per request. Access control should be handled by the database client.
 
     See Also:
         - services.analytics_service.database: Repository classes
@@ -223,7 +225,7 @@ def get_tenant_id(
         logger.warning(f"Invalid tenant ID format: {tenant_id_value}")
         raise HTTPException(status_code=400, detail="Invalid tenant ID format")
 
-    if not tenant_database_exists(tenant_id_value):
+    if not await tenant_registry.exists(tenant_id_value):
         logger.warning(f"Tenant database not found for: {tenant_id_value}")
         raise HTTPException(
             status_code=404,
@@ -16,10 +16,13 @@ Endpoint Design:
     - Fetch chart data in parallel
     - Load location stats independently
 
+    /stats/cache reports hit/miss counters of the stats result cache.
+
 Performance Considerations:
     - All endpoints use optimized PostgreSQL functions for fast aggregation
     - Date range filtering is applied at the database level
-    - Results are cached where appropriate by the database layer
+    - Results are cached per tenant by StatsRepository and invalidated when
+      an ingestion job covering the date range completes
 
 Multi-Tenancy:
     All endpoints require X-Tenant-Id header for proper data isolation.
@@ -277,3 +280,22 @@ async def get_location_stats(
     except Exception as e:
         msg = "fetching location stats"
         raise handle_database_error(msg, e)
+
+
+@router.get("/stats/cache", response_model=dict[str, Any])
+async def get_stats_cache_metrics(
+    tenant_id: str = Depends(get_tenant_id),
+    repo: StatsRepository = Depends(get_stats_repository),
+) -> dict[str, Any]:
+    """
+    Report hit/miss counters of the stats result cache.
+
+    Args:
+        tenant_id: Tenant identifier extracted from X-Tenant-Id header.
+        repo: StatsRepository dependency injection.
+
+    Returns:
+        dict[str, Any]: Process-wide cache counters (backend, entries, hits,
+            misses, hit_rate, invalidations, errors), used to size the cache.
+    """
+    return repo.cache.stats()
@@ -16,6 +16,10 @@ Task Types:
 Pagination:
     All task endpoints support pagination with configurable page size limits.
     Default page size is defined in settings, with a maximum enforced limit.
+    Pages are addressed either by page number or by the opaque next_cursor of
+    the previous response (keyset pagination). A cursor is rejected with 400
+    when the sort or filters differ from the request that issued it.
+    include_total=false skips the exact total count.
 
 Filtering:
     Tasks can be filtered by:
@@ -80,6 +84,14 @@ async def get_purchase_tasks(
         pattern="^(asc|desc)$",
         description="Sort direction",
     ),
+    cursor: str | None = Query(
+        default=None,
+        description="next_cursor from the previous page; replaces page when set",
+    ),
+    include_total: bool = Query(
+        default=True,
+        description="Count all matching tasks (false returns an estimate or null)",
+    ),
     repo: TasksRepository = Depends(get_tasks_repository),
 ) -> dict[str, Any]:
     """
@@ -98,6 +110,9 @@ async def get_purchase_tasks(
         start_date: Optional start date filter (YYYY-MM-DD format).
         end_date: Optional end date filter (YYYY-MM-DD format).
         db_client: Database client dependency injection.
+        cursor: Optional next_cursor from the previous response. When set,
+            page is ignored and the rows after the cursor are returned.
+        include_total: If False, skip the exact total count.
 
     Returns:
         dict[str, Any]: Paginated response containing:
@@ -107,9 +122,10 @@ async def get_purchase_tasks(
             - page (int): Current page number
             - limit (int): Items per page
             - has_more (bool): Whether more pages are available
+            - next_cursor (str | None): Cursor for the next page
 
     Raises:
-        HTTPException: 400 if tenant_id is invalid or pagination parameters invalid.
+        HTTPException: 400 if tenant_id, pagination parameters or cursor are invalid.
         HTTPException: 500 if database query fails.
 
     Example:
@@ -133,6 +149,8 @@ async def get_purchase_tasks(
             end_date=end_date,
             sort_field=sort_field,
             sort_order=sort_order,
+            cursor=cursor,
+            include_total=include_total,
         )
 
         logger.info(
@@ -141,6 +159,8 @@ async def get_purchase_tasks(
 
         return result
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except HTTPException:
         raise
     except Exception as e:
@@ -172,6 +192,14 @@ async def get_cart_abandonment_tasks(
         pattern="^(asc|desc)$",
         description="Sort direction",
     ),
+    cursor: str | None = Query(
+        default=None,
+        description="next_cursor from the previous page; replaces page when set",
+    ),
+    include_total: bool = Query(
+        default=True,
+        description="Count all matching tasks (false returns an estimate or null)",
+    ),
     repo: TasksRepository = Depends(get_tasks_repository),
 ) -> dict[str, Any]:
     """
@@ -190,6 +218,9 @@ async def get_cart_abandonment_tasks(
         start_date: Optional start date filter (YYYY-MM-DD format).
         end_date: Optional end date filter (YYYY-MM-DD format).
         repo: TasksRepository dependency injection.
+        cursor: Optional next_cursor from the previous response. When set,
+            page is ignored and the rows after the cursor are returned.
+        include_total: If False, skip the exact total count.
 
     Returns:
         dict[str, Any]: Paginated response containing:
@@ -199,9 +230,10 @@ async def get_cart_abandonment_tasks(
             - page (int): Current page number
             - limit (int): Items per page
             - has_more (bool): Whether more pages are available
+            - next_cursor (str | None): Cursor for the next page
 
     Raises:
-        HTTPException: 400 if tenant_id is invalid or pagination parameters invalid.
+        HTTPException: 400 if tenant_id, pagination parameters or cursor are invalid.
         HTTPException: 500 if database query fails.
 
     Example:
@@ -225,6 +257,8 @@ async def get_cart_abandonment_tasks(
             end_date=end_date,
             sort_field=sort_field,
             sort_order=sort_order,
+            cursor=cursor,
+            include_total=include_total,
         )
 
         logger.info(
@@ -233,6 +267,8 @@ async def get_cart_abandonment_tasks(
 
         return result
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except HTTPException:
         raise
     except Exception as e:
@@ -272,6 +308,14 @@ async def get_search_analysis_tasks(
         pattern="^(no_results|no_conversion)$",
         description="Filter by search type: no_results or no_conversion",
     ),
+    cursor: str | None = Query(
+        default=None,
+        description="next_cursor from the previous page; replaces page when set",
+    ),
+    include_total: bool = Query(
+        default=True,
+        description="Count all matching tasks (false returns an estimate or null)",
+    ),
     repo: TasksRepository = Depends(get_tasks_repository),
 ) -> dict[str, Any]:
     """
@@ -293,6 +337,9 @@ async def get_search_analysis_tasks(
         include_converted: If True, includes searches that resulted in purchases.
             If False (default), only includes searches without conversions.
         repo: TasksRepository dependency injection.
+        cursor: Optional next_cursor from the previous response. When set,
+            page is ignored and the rows after the cursor are returned.
+        include_total: If False, skip the exact total count.
 
     Returns:
         dict[str, Any]: Paginated response containing:
@@ -302,9 +349,10 @@ async def get_search_analysis_tasks(
             - page (int): Current page number
             - limit (int): Items per page
             - has_more (bool): Whether more pages are available
+            - next_cursor (str | None): Cursor for the next page
 
     Raises:
-        HTTPException: 400 if tenant_id is invalid or pagination parameters invalid.
+        HTTPException: 400 if tenant_id, pagination parameters or cursor are invalid.
         HTTPException: 500 if database query fails.
 
     Example:
@@ -334,6 +382,8 @@ async def get_search_analysis_tasks(
             sort_field=sort_field,
             sort_order=sort_order,
             search_type=search_type,
+            cursor=cursor,
+            include_total=include_total,
         )
 
         logger.info(
@@ -342,6 +392,8 @@ async def get_search_analysis_tasks(
 
         return result
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except HTTPException:
         raise
     except Exception as e:
@@ -377,6 +429,14 @@ async def get_performance_tasks(
         pattern="^(high_bounce|page_bounce_issue)$",
         description="Filter by issue type: high_bounce or page_bounce_issue",
     ),
+    cursor: str | None = Query(
+        default=None,
+        description="next_cursor from the previous page; replaces page when set",
+    ),
+    include_total: bool = Query(
+        default=True,
+        description="Count all matching tasks (false returns an estimate or null)",
+    ),
     repo: TasksRepository = Depends(get_tasks_repository),
 ) -> dict[str, Any]:
     """
@@ -395,6 +455,9 @@ async def get_performance_tasks(
         start_date: Optional start date filter (YYYY-MM-DD format).
         end_date: Optional end date filter (YYYY-MM-DD format).
         repo: TasksRepository dependency injection.
+        cursor: Optional next_cursor from the previous response. When set,
+            page is ignored and the rows after the cursor are returned.
+        include_total: If False, skip the exact total count.
 
     Returns:
         dict[str, Any]: Paginated response containing:
@@ -405,9 +468,10 @@ async def get_performance_tasks(
             - page (int): Current page number
             - limit (int): Items per page
             - has_more (bool): Whether more pages are available
+            - next_cursor (str | None): Cursor for the next page
 
     Raises:
-        HTTPException: 400 if tenant_id is invalid or pagination parameters invalid.
+        HTTPException: 400 if tenant_id, pagination parameters or cursor are invalid.
         HTTPException: 500 if database query fails.
 
     Example:
@@ -435,12 +499,16 @@ async def get_performance_tasks(
             sort_field=sort_field,
             sort_order=sort_order,
             issue_type=issue_type,
+            cursor=cursor,
+            include_total=include_total,
         )
 
         logger.info(f"Retrieved performance tasks for tenant {tenant_id}")
 
         return result
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except HTTPException:
         raise
     except Exception as e:
@@ -474,6 +542,14 @@ async def get_repeat_visit_tasks(
         pattern="^(asc|desc)$",
         description="Sort direction",
     ),
+    cursor: str | None = Query(
+        default=None,
+        description="next_cursor from the previous page; replaces page when set",
+    ),
+    include_total: bool = Query(
+        default=True,
+        description="Count all matching tasks (false returns an estimate or null)",
+    ),
     repo: TasksRepository = Depends(get_tasks_repository),
 ) -> dict[str, Any]:
     """
@@ -493,6 +569,9 @@ async def get_repeat_visit_tasks(
         start_date: Optional start date filter (YYYY-MM-DD format).
         end_date: Optional end date filter (YYYY-MM-DD format).
         repo: TasksRepository dependency injection.
+        cursor: Optional next_cursor from the previous response. When set,
+            page is ignored and the rows after the cursor are returned.
+        include_total: If False, skip the exact total count.
 
     Returns:
         dict[str, Any]: Paginated response containing:
@@ -503,9 +582,10 @@ async def get_repeat_visit_tasks(
             - page (int): Current page number
             - limit (int): Items per page
             - has_more (bool): Whether more pages are available
+            - next_cursor (str | None): Cursor for the next page
 
     Raises:
-        HTTPException: 400 if tenant_id is invalid or pagination parameters invalid.
+        HTTPException: 400 if tenant_id, pagination parameters or cursor are invalid.
         HTTPException: 500 if database query fails.
 
     Example:
@@ -529,6 +609,8 @@ async def get_repeat_visit_tasks(
             end_date=end_date,
             sort_field=sort_field,
             sort_order=sort_order,
+            cursor=cursor,
+            include_total=include_total,
         )
 
         logger.info(
@@ -537,6 +619,8 @@ async def get_repeat_visit_tasks(
 
         return result
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except HTTPException:
         raise
     except Exception as e:
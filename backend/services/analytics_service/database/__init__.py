@@ -12,6 +12,7 @@ Repository Classes:
 
 Shared Utilities:
     - SERVICE_NAME: Service name constant for database session routing
+    - StatsCache / stats_cache: Result cache in front of StatsRepository
 
 Example:
     ```python
@@ -34,6 +35,7 @@ See Also:
 from .base import SERVICE_NAME
 from .history_repository import HistoryRepository
 from .locations_repository import LocationsRepository
+from .stats_cache import StatsCache, stats_cache
 from .stats_repository import StatsRepository
 from .tasks_repository import TasksRepository
 
@@ -43,4 +45,6 @@ __all__ = [
     "TasksRepository",
     "HistoryRepository",
     "StatsRepository",
+    "StatsCache",
+    "stats_cache",
 ]
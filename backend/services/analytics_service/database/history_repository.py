@@ -97,6 +97,8 @@ class HistoryRepository:
         Note:
             Uses the `get_session_history()` PostgreSQL function which
             efficiently queries multiple event tables and orders by timestamp.
+            The session's days are taken from the `sessions` fact table so
+            only those partitions are read.
         """
         try:
             async with get_async_db_session(
@@ -156,6 +158,7 @@ class HistoryRepository:
         Note:
             Uses the `get_user_history()` PostgreSQL function which queries
             multiple event tables and orders by timestamp across all sessions.
+            The user's sessions are taken from the `sessions` fact table.
             This can return large result sets for highly active users.
         """
         try:
@@ -0,0 +1,345 @@
+"""
+Result Cache for StatsRepository
+
+The dashboard home page requests /stats/overview, /stats/chart and
+/stats/locations with the same date range on every page view and tab switch,
+and each call runs a full PL/pgSQL aggregation. This module caches those
+results per tenant, keyed on the repository method and its arguments.
+
+Invalidation:
+    Cached stats only change when an ingestion job replaces event data. Each
+    tenant's ``processing_jobs`` table is polled (at most every
+    STATS_CACHE_POLL_SECONDS) for jobs that reached ``completed`` or
+    ``completed_with_warnings``. An entry is stale when such a job's date range
+    overlaps the entry's range and the job was seen after the entry was
+    cached. Because staleness is decided at read time, entries shared through
+    Redis by several API instances are invalidated without coordination.
+
+Backends:
+    - In-process LRU (default), bounded by STATS_CACHE_MAX_ENTRIES
+    - Redis-compatible server when STATS_CACHE_REDIS_URL is set and the
+      optional ``redis`` package is installed
+
+Environment Variables:
+    - STATS_CACHE_TTL_SECONDS: Maximum entry age; 0 disables the cache (default: 300)
+    - STATS_CACHE_MAX_ENTRIES: In-process LRU capacity (default: 1024)
+    - STATS_CACHE_POLL_SECONDS: Minimum seconds between processing_jobs
+      polls per tenant (default: 10)
+    - STATS_CACHE_REDIS_URL: Redis URL for a shared cache (default: unset)
+
+Example:
+    ```python
+    from services.analytics_service.database.stats_cache import stats_cache
+
+    overview = await stats_cache.get_or_load(
+        tenant_id, "overview", ("2024-01-01", "2024-01-31", None),
+        "2024-01-01", "2024-01-31", load=load_overview,
+    )
+    stats_cache.stats()  # {"hits": ..., "misses": ..., ...}
+    ```
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import date
+import json
+import os
+import time
+from typing import Any
+
+from loguru import logger
+from sqlalchemy import text
+
+from common.database import get_async_db_session
+
+from .base import SERVICE_NAME
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # optional dependency
+    redis = None
+
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_POLL_SECONDS = 10
+
+
+@dataclass
+class _CompletedJob:
+    """An ingestion job seen in a completed state."""
+
+    start_date: date
+    end_date: date
+    seen_at: float
+
+
+class _MemoryBackend:
+    """In-process LRU of JSON-compatible values with per-entry expiry."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+
+    async def get(self, key: str) -> dict[str, Any] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if expires_at < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return payload
+
+    async def set(self, key: str, payload: dict[str, Any], ttl: float) -> None:
+        self._entries[key] = (time.time() + ttl, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def size(self) -> int | None:
+        return len(self._entries)
+
+
+class _RedisBackend:
+    """Redis-compatible backend; values are stored as JSON with a server-side TTL."""
+
+    name = "redis"
+
+    def __init__(self, url: str) -> None:
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> dict[str, Any] | None:
+        raw = await self._client.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, payload: dict[str, Any], ttl: float) -> None:
+        await self._client.set(key, json.dumps(payload), ex=max(1, int(ttl)))
+
+    def size(self) -> int | None:
+        return None
+
+
+class StatsCache:
+    """
+    Tenant-scoped cache of StatsRepository results.
+
+    Attributes:
+        ttl: Maximum entry age in seconds (0 disables caching).
+        poll_interval: Minimum seconds between processing_jobs polls per tenant.
+        hits: Lookups served from the cache.
+        misses: Lookups that ran the query (including stale entries).
+        invalidations: Entries discarded because an ingestion job covered them.
+        errors: Backend failures (the query is run instead).
+    """
+
+    def __init__(
+        self,
+        ttl: float | None = None,
+        max_entries: int | None = None,
+        poll_interval: float | None = None,
+        redis_url: str | None = None,
+    ) -> None:
+        """
+        Initialize the cache and select its backend.
+
+        Args:
+            ttl: Entry TTL in seconds (STATS_CACHE_TTL_SECONDS).
+            max_entries: In-process LRU capacity (STATS_CACHE_MAX_ENTRIES).
+            poll_interval: processing_jobs poll interval (STATS_CACHE_POLL_SECONDS).
+            redis_url: Redis URL (STATS_CACHE_REDIS_URL); in-process LRU if unset.
+        """
+        self.ttl = (
+            ttl
+            if ttl is not None
+            else float(os.getenv("STATS_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+        )
+        self.poll_interval = (
+            poll_interval
+            if poll_interval is not None
+            else float(os.getenv("STATS_CACHE_POLL_SECONDS", DEFAULT_POLL_SECONDS))
+        )
+        max_entries = max_entries or int(
+            os.getenv("STATS_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+        )
+        redis_url = redis_url or os.getenv("STATS_CACHE_REDIS_URL")
+
+        if redis_url and redis is None:
+            logger.warning(
+                "STATS_CACHE_REDIS_URL is set but the redis package is not "
+                "installed; using the in-process stats cache"
+            )
+        self._backend: _MemoryBackend | _RedisBackend = (
+            _RedisBackend(redis_url)
+            if redis_url and redis is not None
+            else _MemoryBackend(max_entries)
+        )
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+        # tenant_id -> {job_id: completed job}, pruned after one TTL
+        self._completed_jobs: dict[str, dict[str, _CompletedJob]] = {}
+        self._polled_at: dict[str, float] = {}
+        self._polled_until: dict[str, Any] = {}
+        self._poll_tasks: dict[str, asyncio.Task[None]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        """Whether results are cached at all."""
+        return self.ttl > 0
+
+    async def get_or_load(
+        self,
+        tenant_id: str,
+        method: str,
+        args: tuple[Any, ...],
+        start_date: str,
+        end_date: str,
+        *,
+        load: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Return a cached result, or run ``load`` and cache what it returns.
+
+        Args:
+            tenant_id: Tenant the result belongs to.
+            method: Repository method name, part of the cache key.
+            args: Remaining method arguments, part of the cache key.
+            start_date: First day covered by the result (YYYY-MM-DD).
+            end_date: Last day covered by the result (YYYY-MM-DD).
+            load: Coroutine factory that runs the query.
+
+        Returns:
+            Any: The cached or freshly loaded result.
+
+        Note:
+            Requests with unparseable dates bypass the cache; the query
+            reports the error as before.
+        """
+        if not self.enabled:
+            return await load()
+        try:
+            start = date.fromisoformat(start_date)
+            end = date.fromisoformat(end_date)
+        except ValueError:
+            return await load()
+
+        key = self._key(tenant_id, method, args)
+        try:
+            await self._poll_completed_jobs(tenant_id)
+            payload = await self._backend.get(key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Stats cache lookup failed for tenant {tenant_id}: {e}")
+            payload = None
+
+        if payload is not None:
+            if self._is_stale(tenant_id, start, end, payload["cached_at"]):
+                self.invalidations += 1
+            else:
+                self.hits += 1
+                return payload["value"]
+
+        self.misses += 1
+        cached_at = time.time()
+        value = await load()
+        try:
+            await self._backend.set(
+                key, {"cached_at": cached_at, "value": value}, self.ttl
+            )
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Stats cache write failed for tenant {tenant_id}: {e}")
+        return value
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters and size, for sizing the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "backend": self._backend.name,
+            "enabled": self.enabled,
+            "ttl_seconds": self.ttl,
+            "entries": self._backend.size(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+        }
+
+    @staticmethod
+    def _key(tenant_id: str, method: str, args: tuple[Any, ...]) -> str:
+        return f"stats:{tenant_id}:{method}:{json.dumps(args, default=str)}"
+
+    def _is_stale(
+        self, tenant_id: str, start: date, end: date, cached_at: float
+    ) -> bool:
+        """Whether a completed ingestion job overlapping the range postdates the entry."""
+        return any(
+            job.seen_at >= cached_at
+            and job.start_date <= end
+            and job.end_date >= start
+            for job in self._completed_jobs.get(tenant_id, {}).values()
+        )
+
+    async def _poll_completed_jobs(self, tenant_id: str) -> None:
+        """Poll processing_jobs for newly completed jobs, sharing an in-flight poll."""
+        polled_at = self._polled_at.get(tenant_id)
+        if polled_at is not None and time.monotonic() - polled_at < self.poll_interval:
+            return
+        task = self._poll_tasks.get(tenant_id)
+        if task is None or task.done():
+            task = self._poll_tasks[tenant_id] = asyncio.create_task(
+                self._load_completed_jobs(tenant_id)
+            )
+        await asyncio.shield(task)
+
+    async def _load_completed_jobs(self, tenant_id: str) -> None:
+        """Record jobs completed since the last poll (or within one TTL on the first)."""
+        async with get_async_db_session(SERVICE_NAME, tenant_id=tenant_id) as session:
+            result = await session.execute(
+                text("""
+                    SELECT job_id, start_date, end_date, completed_at
+                    FROM processing_jobs
+                    WHERE tenant_id = :tenant_id
+                      AND status IN ('completed', 'completed_with_warnings')
+                      AND completed_at >= COALESCE(
+                          CAST(:since AS timestamptz),
+                          NOW() - make_interval(secs => :ttl)
+                      )
+                """),
+                {
+                    "tenant_id": tenant_id,
+                    "since": self._polled_until.get(tenant_id),
+                    "ttl": self.ttl,
+                },
+            )
+            rows = result.mappings().all()
+
+        now = time.time()
+        jobs = self._completed_jobs.setdefault(tenant_id, {})
+        for row in rows:
+            if row["job_id"] not in jobs:
+                jobs[row["job_id"]] = _CompletedJob(
+                    row["start_date"], row["end_date"], now
+                )
+            since = self._polled_until.get(tenant_id)
+            if since is None or row["completed_at"] > since:
+                self._polled_until[tenant_id] = row["completed_at"]
+
+        # Jobs seen more than one TTL ago are older than every live entry
+        for job_id in [j for j, job in jobs.items() if job.seen_at < now - self.ttl]:
+            del jobs[job_id]
+        self._polled_at[tenant_id] = time.monotonic()
+
+
+stats_cache = StatsCache()
@@ -3,7 +3,9 @@ Stats Repository for Analytics Service
 
 This module provides database operations for analytics statistics and metrics
 in the Analytics Service. It handles retrieval of dashboard overview stats,
-time-series chart data, and location-based statistics.
+time-series chart data, and location-based statistics. Results are served
+through a tenant-scoped StatsCache that is invalidated when ingestion jobs
+covering the requested date range complete.
 
 Example:
     ```python
@@ -14,6 +16,7 @@ Example:
 
 See Also:
     - services.analytics_service.database.base: Shared constants
+    - services.analytics_service.database.stats_cache: Result cache
     - common.database.get_async_db_session: Database session management
 """
 
@@ -24,6 +27,7 @@ from sqlalchemy import text
 from common.database import get_async_db_session
 
 from .base import SERVICE_NAME
+from .stats_cache import StatsCache, stats_cache
 
 
 class StatsRepository:
@@ -38,6 +42,9 @@ class StatsRepository:
         This repository is thread-safe and can be used concurrently across
         multiple async tasks. Each method creates its own database session.
 
+    Attributes:
+        cache: Result cache shared by all queries (see StatsCache).
+
     Example:
         ```python
         repo = StatsRepository()
@@ -47,6 +54,8 @@ class StatsRepository:
         ```
     """
 
+    cache: StatsCache = stats_cache
+
     async def get_overview_stats(
         self,
         tenant_id: str,
@@ -105,23 +114,35 @@ class StatsRepository:
 
         Note:
             Uses the `get_dashboard_overview_stats()` PostgreSQL function which
-            efficiently aggregates data from multiple event tables.
+            efficiently aggregates data from multiple event tables. Results
+            are cached per tenant and argument set (see StatsCache).
         """
-        async with get_async_db_session(
-            SERVICE_NAME, tenant_id=tenant_id
-        ) as session:
-            result = await session.execute(
-                text(
-                    "SELECT get_dashboard_overview_stats(:p_tenant_id, :p_start_date, :p_end_date, :p_location_id)"
-                ),
-                {
-                    "p_tenant_id": tenant_id,
-                    "p_start_date": start_date,
-                    "p_end_date": end_date,
-                    "p_location_id": location_id,
-                },
-            )
-            return result.scalar() or {}
+
+        async def load() -> Any:
+            async with get_async_db_session(
+                SERVICE_NAME, tenant_id=tenant_id
+            ) as session:
+                result = await session.execute(
+                    text(
+                        "SELECT get_dashboard_overview_stats(:p_tenant_id, :p_start_date, :p_end_date, :p_location_id)"
+                    ),
+                    {
+                        "p_tenant_id": tenant_id,
+                        "p_start_date": start_date,
+                        "p_end_date": end_date,
+                        "p_location_id": location_id,
+                    },
+                )
+                return result.scalar() or {}
+
+        return await self.cache.get_or_load(
+            tenant_id,
+            "overview",
+            (start_date, end_date, location_id),
+            start_date,
+            end_date,
+            load=load,
+        )
 
     async def get_chart_data(
         self,
@@ -183,24 +204,36 @@ class StatsRepository:
 
         Note:
             Uses the `get_chart_data()` PostgreSQL function which efficiently
-            groups and aggregates time-series data.
+            groups and aggregates time-series data. Results are cached per
+            tenant and argument set (see StatsCache).
         """
-        async with get_async_db_session(
-            SERVICE_NAME, tenant_id=tenant_id
-        ) as session:
-            result = await session.execute(
-                text(
-                    "SELECT get_chart_data(:p_tenant_id, :p_start_date, :p_end_date, :p_granularity, :p_location_id)"
-                ),
-                {
-                    "p_tenant_id": tenant_id,
-                    "p_start_date": start_date,
-                    "p_end_date": end_date,
-                    "p_granularity": granularity,
-                    "p_location_id": location_id,
-                },
-            )
-            return result.scalar() or []
+
+        async def load() -> Any:
+            async with get_async_db_session(
+                SERVICE_NAME, tenant_id=tenant_id
+            ) as session:
+                result = await session.execute(
+                    text(
+                        "SELECT get_chart_data(:p_tenant_id, :p_start_date, :p_end_date, :p_granularity, :p_location_id)"
+                    ),
+                    {
+                        "p_tenant_id": tenant_id,
+                        "p_start_date": start_date,
+                        "p_end_date": end_date,
+                        "p_granularity": granularity,
+                        "p_location_id": location_id,
+                    },
+                )
+                return result.scalar() or []
+
+        return await self.cache.get_or_load(
+            tenant_id,
+            "chart",
+            (start_date, end_date, granularity, location_id),
+            start_date,
+            end_date,
+            load=load,
+        )
 
     async def get_location_stats(
         self,
@@ -255,19 +288,31 @@ class StatsRepository:
 
         Note:
             Uses the `get_location_stats_bulk()` PostgreSQL function which
-            efficiently aggregates metrics per location.
+            efficiently aggregates metrics per location. Results are cached
+            per tenant and date range (see StatsCache).
         """
-        async with get_async_db_session(
-            SERVICE_NAME, tenant_id=tenant_id
-        ) as session:
-            result = await session.execute(
-                text(
-                    "SELECT get_location_stats_bulk(:p_tenant_id, :p_start_date, :p_end_date)"
-                ),
-                {
-                    "p_tenant_id": tenant_id,
-                    "p_start_date": start_date,
-                    "p_end_date": end_date,
-                },
-            )
-            return result.scalar() or []
+
+        async def load() -> Any:
+            async with get_async_db_session(
+                SERVICE_NAME, tenant_id=tenant_id
+            ) as session:
+                result = await session.execute(
+                    text(
+                        "SELECT get_location_stats_bulk(:p_tenant_id, :p_start_date, :p_end_date)"
+                    ),
+                    {
+                        "p_tenant_id": tenant_id,
+                        "p_start_date": start_date,
+                        "p_end_date": end_date,
+                    },
+                )
+                return result.scalar() or []
+
+        return await self.cache.get_or_load(
+            tenant_id,
+            "locations",
+            (start_date, end_date),
+            start_date,
+            end_date,
+            load=load,
+        )
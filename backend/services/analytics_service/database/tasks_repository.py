@@ -10,15 +10,32 @@ Example:
     ```python
     repo = TasksRepository()
     tasks = await repo.get_purchase_tasks("tenant-123", page=1, limit=50)
+
+    # Next page by keyset instead of OFFSET
+    more = await repo.get_purchase_tasks(
+        "tenant-123", page=1, limit=50, cursor=tasks["next_cursor"]
+    )
     ```
 
+Pagination:
+    Every task method accepts either ``page`` (OFFSET paging) or ``cursor``,
+    the opaque ``next_cursor`` of the previous response. A cursor encodes the
+    last row's sort key plus a unique tiebreaker, and is only valid for the
+    sort and filters it was issued with. ``include_total=False`` skips the
+    exact total; functions that can estimate it cheaply return the estimate
+    with ``total_is_estimate``.
+
 See Also:
     - services.analytics_service.database.base: Shared constants
     - common.database.get_async_db_session: Database session management
 """
 
+import base64
+import binascii
 from collections.abc import AsyncIterator, Callable
 from contextlib import asynccontextmanager
+import hashlib
+import json
 from typing import Any
 
 from loguru import logger
@@ -28,6 +45,86 @@ from common.database import get_async_db_session
 
 from .base import SERVICE_NAME
 
+_CURSOR_POSITION_KEYS = ("z", "n", "t", "k")
+
+
+def _filters_digest(filters: dict[str, Any]) -> str:
+    """Return a short, stable hash of the filters a page was produced with."""
+    raw = json.dumps(filters, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+def encode_cursor(
+    position: dict[str, Any] | None,
+    sort_field: str,
+    sort_order: str,
+    filters: dict[str, Any],
+) -> str | None:
+    """
+    Encode a task function's next_cursor position as an opaque token.
+
+    Args:
+        position: Last-row position returned by the SQL function, or None.
+        sort_field: Sort field the page was produced with.
+        sort_order: Sort order the page was produced with.
+        filters: Filters the page was produced with (query, location_id,
+            start_date, end_date and any task-specific filters).
+
+    Returns:
+        str | None: URL-safe token, or None when there is no next page.
+    """
+    if not position:
+        return None
+    payload = {
+        "f": sort_field,
+        "o": sort_order,
+        "h": _filters_digest(filters),
+        **position,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: str | None, sort_field: str, sort_order: str, filters: dict[str, Any]
+) -> str | None:
+    """
+    Decode an opaque cursor into the JSON position the SQL functions expect.
+
+    Args:
+        cursor: Token from a previous response's next_cursor, or None.
+        sort_field: Sort field of the current request.
+        sort_order: Sort order of the current request.
+        filters: Filters of the current request, as passed to encode_cursor.
+
+    Returns:
+        str | None: JSON position for the ``p_cursor`` parameter, or None.
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for a different
+            sort field, sort order or set of filters.
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        msg = "Invalid pagination cursor"
+        raise ValueError(msg) from e
+    if not isinstance(payload, dict) or any(
+        key not in payload for key in _CURSOR_POSITION_KEYS
+    ):
+        msg = "Invalid pagination cursor"
+        raise ValueError(msg)
+    if payload.get("f") != sort_field or payload.get("o") != sort_order:
+        msg = "Pagination cursor does not match the requested sort"
+        raise ValueError(msg)
+    if payload.get("h") != _filters_digest(filters):
+        msg = "Pagination cursor does not match the requested filters"
+        raise ValueError(msg)
+    return json.dumps({key: payload[key] for key in _CURSOR_POSITION_KEYS})
+
 
 class TasksRepository:
     """
@@ -77,6 +174,8 @@ class TasksRepository:
         end_date: str | None = None,
         sort_field: str | None = None,
         sort_order: str | None = None,
+        cursor: str | None = None,
+        include_total: bool = True,
     ) -> dict[str, Any]:
         """
         Retrieve paginated purchase analysis tasks with optional filtering.
@@ -97,25 +196,41 @@ class TasksRepository:
                 only includes purchases on or after this date.
             end_date: Optional end date filter (YYYY-MM-DD format). If provided,
                 only includes purchases on or before this date.
+            cursor: Optional next_cursor from the previous page; when set,
+                ``page`` is ignored and rows after the cursor are returned.
+            include_total: If False, skip the exact total count.
 
         Returns:
             dict[str, Any]: Paginated response containing:
                 - data (list[dict]): List of purchase task objects
-                - total (int): Total number of matching tasks across all pages
+                - total (int | None): Total number of matching tasks across all
+                  pages (an estimate or None when include_total is False)
+                - total_is_estimate (bool): Whether total is an estimate
                 - page (int): Current page number
                 - limit (int): Items per page
                 - has_more (bool): Whether more pages are available
+                - next_cursor (str | None): Cursor for the next page
 
         Note:
             Uses the `get_purchase_tasks()` PostgreSQL function for optimized
             query execution with proper indexing.
         """
+        sort_field = sort_field or "event_timestamp"
+        sort_order = sort_order or "desc"
+        filters = {
+            "query": query,
+            "location_id": location_id,
+            "start_date": start_date,
+            "end_date": end_date,
+        }
+        position = decode_cursor(cursor, sort_field, sort_order, filters)
+
         try:
             async with self._session_factory(tenant_id=tenant_id) as session:
                 result = await session.execute(
                     text(
                         """
-                    SELECT get_purchase_tasks(:p_tenant_id, :p_page, :p_limit, :p_query, :p_location_id, :p_start_date, :p_end_date, :p_sort_field, :p_sort_order)
+                    SELECT get_purchase_tasks(:p_tenant_id, :p_page, :p_limit, :p_query, :p_location_id, :p_start_date, :p_end_date, :p_sort_field, :p_sort_order, CAST(:p_cursor AS jsonb), :p_include_total)
                 """
                     ),
                     {
@@ -126,11 +241,17 @@ class TasksRepository:
                         "p_location_id": location_id,
                         "p_start_date": start_date,
                         "p_end_date": end_date,
-                        "p_sort_field": sort_field or "event_timestamp",
-                        "p_sort_order": sort_order or "desc",
+                        "p_sort_field": sort_field,
+                        "p_sort_order": sort_order,
+                        "p_cursor": position,
+                        "p_include_total": include_total,
                     },
                 )
                 tasks = result.scalar()
+                if tasks:
+                    tasks["next_cursor"] = encode_cursor(
+                        tasks.get("next_cursor"), sort_field, sort_order, filters
+                    )
 
                 return tasks or {
                     "data": [],
@@ -138,6 +259,7 @@ class TasksRepository:
                     "page": page,
                     "limit": limit,
                     "has_more": False,
+                    "next_cursor": None,
                 }
 
         except Exception as e:
@@ -155,6 +277,8 @@ class TasksRepository:
         end_date: str | None = None,
         sort_field: str | None = None,
         sort_order: str | None = None,
+        cursor: str | None = None,
+        include_total: bool = True,
     ) -> dict[str, Any]:
         """
         Retrieve paginated cart abandonment tasks with optional filtering.
@@ -175,27 +299,43 @@ class TasksRepository:
                 only includes abandonments on or after this date.
             end_date: Optional end date filter (YYYY-MM-DD format). If provided,
                 only includes abandonments on or before this date.
+            cursor: Optional next_cursor from the previous page; when set,
+                ``page`` is ignored and rows after the cursor are returned.
+            include_total: If False, skip the exact total count.
 
         Returns:
             dict[str, Any]: Paginated response containing:
                 - data (list[dict]): List of cart abandonment task objects with
                   session details, cart contents, and customer information
-                - total (int): Total number of matching tasks across all pages
+                - total (int | None): Total number of matching tasks across all
+                  pages (an estimate or None when include_total is False)
+                - total_is_estimate (bool): Whether total is an estimate
                 - page (int): Current page number
                 - limit (int): Items per page
                 - has_more (bool): Whether more pages are available
+                - next_cursor (str | None): Cursor for the next page
 
         Note:
             Uses the `get_cart_abandonment_tasks()` PostgreSQL function which
             identifies sessions with add_to_cart events but no corresponding
             purchase events.
         """
+        sort_field = sort_field or "last_activity"
+        sort_order = sort_order or "desc"
+        filters = {
+            "query": query,
+            "location_id": location_id,
+            "start_date": start_date,
+            "end_date": end_date,
+        }
+        position = decode_cursor(cursor, sort_field, sort_order, filters)
+
         try:
             async with self._session_factory(tenant_id=tenant_id) as session:
                 result = await session.execute(
                     text(
                         """
-                    SELECT get_cart_abandonment_tasks(:p_tenant_id, :p_page, :p_limit, :p_query, :p_location_id, :p_start_date, :p_end_date, :p_sort_field, :p_sort_order)
+                    SELECT get_cart_abandonment_tasks(:p_tenant_id, :p_page, :p_limit, :p_query, :p_location_id, :p_start_date, :p_end_date, :p_sort_field, :p_sort_order, CAST(:p_cursor AS jsonb), :p_include_total)
                 """
                     ),
                     {
@@ -206,11 +346,17 @@ class TasksRepository:
                         "p_location_id": location_id,
                         "p_start_date": start_date,
                         "p_end_date": end_date,
-                        "p_sort_field": sort_field or "last_activity",
-                        "p_sort_order": sort_order or "desc",
+                        "p_sort_field": sort_field,
+                        "p_sort_order": sort_order,
+                        "p_cursor": position,
+                        "p_include_total": include_total,
                     },
                 )
                 tasks = result.scalar()
+                if tasks:
+                    tasks["next_cursor"] = encode_cursor(
+                        tasks.get("next_cursor"), sort_field, sort_order, filters
+                    )
 
                 return tasks or {
                     "data": [],
@@ -218,6 +364,7 @@ class TasksRepository:
                     "page": page,
                     "limit": limit,
                     "has_more": False,
+                    "next_cursor": None,
                 }
 
         except Exception as e:
@@ -237,6 +384,8 @@ class TasksRepository:
         sort_field: str | None = None,
         sort_order: str | None = None,
         search_type: str | None = None,
+        cursor: str | None = None,
+        include_total: bool = True,
     ) -> dict[str, Any]:
         """
         Retrieve paginated search analysis tasks with optional filtering.
@@ -260,26 +409,44 @@ class TasksRepository:
                 only includes searches on or before this date.
             include_converted: If True, includes searches that resulted in purchases.
                 If False (default), only includes searches without conversions.
+            cursor: Optional next_cursor from the previous page; when set,
+                ``page`` is ignored and rows after the cursor are returned.
+            include_total: If False, skip the exact total count.
 
         Returns:
             dict[str, Any]: Paginated response containing:
                 - data (list[dict]): List of search analysis task objects with
                   search terms, result counts, conversion status, and session details
-                - total (int): Total number of matching tasks across all pages
+                - total (int | None): Total number of matching tasks across all
+                  pages (an estimate or None when include_total is False)
+                - total_is_estimate (bool): Whether total is an estimate
                 - page (int): Current page number
                 - limit (int): Items per page
                 - has_more (bool): Whether more pages are available
+                - next_cursor (str | None): Cursor for the next page
 
         Note:
             Uses the `get_search_analysis_tasks()` PostgreSQL function which
             analyzes view_search_results and no_search_results events.
         """
+        sort_field = sort_field or "search_count"
+        sort_order = sort_order or "desc"
+        filters = {
+            "query": query,
+            "location_id": location_id,
+            "start_date": start_date,
+            "end_date": end_date,
+            "include_converted": include_converted,
+            "search_type": search_type,
+        }
+        position = decode_cursor(cursor, sort_field, sort_order, filters)
+
         try:
             async with self._session_factory(tenant_id=tenant_id) as session:
                 result = await session.execute(
                     text(
                         """
-                    SELECT get_search_analysis_tasks(:p_tenant_id, :p_page, :p_limit, :p_query, :p_location_id, :p_start_date, :p_end_date, :p_include_converted, :p_sort_field, :p_sort_order, :p_search_type)
+                    SELECT get_search_analysis_tasks(:p_tenant_id, :p_page, :p_limit, :p_query, :p_location_id, :p_start_date, :p_end_date, :p_include_converted, :p_sort_field, :p_sort_order, :p_search_type, CAST(:p_cursor AS jsonb), :p_include_total)
                 """
                     ),
                     {
@@ -291,12 +458,18 @@ class TasksRepository:
                         "p_start_date": start_date,
                         "p_end_date": end_date,
                         "p_include_converted": include_converted,
-                        "p_sort_field": sort_field or "search_count",
-                        "p_sort_order": sort_order or "desc",
+                        "p_sort_field": sort_field,
+                        "p_sort_order": sort_order,
                         "p_search_type": search_type,
+                        "p_cursor": position,
+                        "p_include_total": include_total,
                     },
                 )
                 tasks = result.scalar()
+                if tasks:
+                    tasks["next_cursor"] = encode_cursor(
+                        tasks.get("next_cursor"), sort_field, sort_order, filters
+                    )
 
                 return tasks or {
                     "data": [],
@@ -304,6 +477,7 @@ class TasksRepository:
                     "page": page,
                     "limit": limit,
                     "has_more": False,
+                    "next_cursor": None,
                 }
 
         except Exception as e:
@@ -321,6 +495,8 @@ class TasksRepository:
         end_date: str | None = None,
         sort_field: str | None = None,
         sort_order: str | None = None,
+        cursor: str | None = None,
+        include_total: bool = True,
     ) -> dict[str, Any]:
         """
         Retrieve paginated repeat visit tasks with optional filtering.
@@ -341,27 +517,43 @@ class TasksRepository:
                 only includes repeat visits on or after this date.
             end_date: Optional end date filter (YYYY-MM-DD format). If provided,
                 only includes repeat visits on or before this date.
+            cursor: Optional next_cursor from the previous page; when set,
+                ``page`` is ignored and rows after the cursor are returned.
+            include_total: If False, skip the exact total count.
 
         Returns:
             dict[str, Any]: Paginated response containing:
                 - data (list[dict]): List of repeat visit task objects with
                   user information, visit counts, purchase history, and engagement
                   metrics
-                - total (int): Total number of matching tasks across all pages
+                - total (int | None): Total number of matching tasks across all
+                  pages (an estimate or None when include_total is False)
+                - total_is_estimate (bool): Whether total is an estimate
                 - page (int): Current page number
                 - limit (int): Items per page
                 - has_more (bool): Whether more pages are available
+                - next_cursor (str | None): Cursor for the next page
 
         Note:
             Uses the `get_repeat_visit_tasks()` PostgreSQL function which
             identifies users with multiple sessions within the date range.
         """
+        sort_field = sort_field or "page_views_count"
+        sort_order = sort_order or "desc"
+        filters = {
+            "query": query,
+            "location_id": location_id,
+            "start_date": start_date,
+            "end_date": end_date,
+        }
+        position = decode_cursor(cursor, sort_field, sort_order, filters)
+
         try:
             async with self._session_factory(tenant_id=tenant_id) as session:
                 result = await session.execute(
                     text(
                         """
-                    SELECT get_repeat_visit_tasks(:p_tenant_id, :p_page, :p_limit, :p_query, :p_location_id, :p_start_date, :p_end_date, :p_sort_field, :p_sort_order)
+                    SELECT get_repeat_visit_tasks(:p_tenant_id, :p_page, :p_limit, :p_query, :p_location_id, :p_start_date, :p_end_date, :p_sort_field, :p_sort_order, CAST(:p_cursor AS jsonb), :p_include_total)
                 """
                     ),
                     {
@@ -372,11 +564,17 @@ class TasksRepository:
                         "p_location_id": location_id,
                         "p_start_date": start_date,
                         "p_end_date": end_date,
-                        "p_sort_field": sort_field or "page_views_count",
-                        "p_sort_order": sort_order or "desc",
+                        "p_sort_field": sort_field,
+                        "p_sort_order": sort_order,
+                        "p_cursor": position,
+                        "p_include_total": include_total,
                     },
                 )
                 tasks = result.scalar()
+                if tasks:
+                    tasks["next_cursor"] = encode_cursor(
+                        tasks.get("next_cursor"), sort_field, sort_order, filters
+                    )
 
                 return tasks or {
                     "data": [],
@@ -384,6 +582,7 @@ class TasksRepository:
                     "page": page,
                     "limit": limit,
                     "has_more": False,
+                    "next_cursor": None,
                 }
 
         except Exception as e:
@@ -401,6 +600,8 @@ class TasksRepository:
         sort_field: str | None = None,
         sort_order: str | None = None,
         issue_type: str | None = None,
+        cursor: str | None = None,
+        include_total: bool = True,
     ) -> dict[str, Any]:
         """
         Retrieve paginated branch performance tasks with optional filtering.
@@ -419,27 +620,43 @@ class TasksRepository:
                 only includes performance data on or after this date.
             end_date: Optional end date filter (YYYY-MM-DD format). If provided,
                 only includes performance data on or before this date.
+            cursor: Optional next_cursor from the previous page; when set,
+                ``page`` is ignored and rows after the cursor are returned.
+            include_total: If False, skip the exact total count.
 
         Returns:
             dict[str, Any]: Paginated response containing:
                 - data (list[dict]): List of performance task objects with
                   location details, revenue, visitor counts, conversion rates,
                   and other performance metrics
-                - total (int): Total number of matching tasks across all pages
+                - total (int | None): Total number of matching tasks across all
+                  pages (an estimate or None when include_total is False)
+                - total_is_estimate (bool): Whether total is an estimate
                 - page (int): Current page number
                 - limit (int): Items per page
                 - has_more (bool): Whether more pages are available
+                - next_cursor (str | None): Cursor for the next page
 
         Note:
             Uses the `get_performance_tasks()` PostgreSQL function which
             aggregates metrics from multiple event tables.
         """
+        sort_field = sort_field or "last_activity"
+        sort_order = sort_order or "desc"
+        filters = {
+            "location_id": location_id,
+            "start_date": start_date,
+            "end_date": end_date,
+            "issue_type": issue_type,
+        }
+        position = decode_cursor(cursor, sort_field, sort_order, filters)
+
         try:
             async with self._session_factory(tenant_id=tenant_id) as session:
                 result = await session.execute(
                     text(
                         """
-                    SELECT get_performance_tasks(:p_tenant_id, :p_page, :p_limit, :p_location_id, :p_start_date, :p_end_date, :p_sort_field, :p_sort_order, :p_issue_type)
+                    SELECT get_performance_tasks(:p_tenant_id, :p_page, :p_limit, :p_location_id, :p_start_date, :p_end_date, :p_sort_field, :p_sort_order, :p_issue_type, CAST(:p_cursor AS jsonb), :p_include_total)
                 """
                     ),
                     {
@@ -449,12 +666,18 @@ class TasksRepository:
                         "p_location_id": location_id,
                         "p_start_date": start_date,
                         "p_end_date": end_date,
-                        "p_sort_field": sort_field or "last_activity",
-                        "p_sort_order": sort_order or "desc",
+                        "p_sort_field": sort_field,
+                        "p_sort_order": sort_order,
                         "p_issue_type": issue_type,
+                        "p_cursor": position,
+                        "p_include_total": include_total,
                     },
                 )
                 tasks = result.scalar()
+                if tasks:
+                    tasks["next_cursor"] = encode_cursor(
+                        tasks.get("next_cursor"), sort_field, sort_order, filters
+                    )
 
                 return tasks or {
                     "data": [],
@@ -462,6 +685,7 @@ class TasksRepository:
                     "page": page,
                     "limit": limit,
                     "has_more": False,
+                    "next_cursor": None,
                 }
 
         except Exception as e:
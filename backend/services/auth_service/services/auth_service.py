@@ -545,7 +545,9 @@ class AuthenticationService:
             - New tenants get automatic database provisioning
             - All configurations stored as JSON strings for flexibility
             - BigQuery credentials stored separately for easier access
-            - Sets is_active=True and updates timestamps (created_at, updated_at)
+            - Sets is_active=True and updates timestamps (created_at, updated_at);
+              updated_at only moves when a configuration changed, since the
+              ingestion workers use it as the version of their cached clients
             - Uses tenant-specific database session for proper isolation
         """
         try:
@@ -609,7 +611,9 @@ class AuthenticationService:
                     )
                     logger.info(f"Created new tenant config: {username} ({tenant_id})")
                 else:
-                    # Always update existing tenant config with latest configurations from authentication API
+                    # Always update existing tenant config with latest configurations from authentication API.
+                    # updated_at is the config version the ingestion workers key their
+                    # cached BigQuery/SFTP clients on, so it only moves when a config changed.
                     await session.execute(
                         text(
                             """
@@ -622,7 +626,23 @@ class AuthenticationService:
                                 sftp_config = :sftp_config,
                                 email_config = :email_config,
                                 is_active = true,
-                                updated_at = NOW()
+                                updated_at = CASE
+                                    WHEN (
+                                        bigquery_project_id, bigquery_dataset_id,
+                                        bigquery_credentials, user_table,
+                                        sftp_config, email_config, is_active
+                                    ) IS DISTINCT FROM (
+                                        CAST(:bigquery_project_id AS varchar),
+                                        CAST(:bigquery_dataset_id AS varchar),
+                                        CAST(:bigquery_credentials AS jsonb),
+                                        CAST(:user_table AS varchar),
+                                        CAST(:sftp_config AS jsonb),
+                                        CAST(:email_config AS jsonb),
+                                        true
+                                    )
+                                    THEN NOW()
+                                    ELSE updated_at
+                                END
                             WHERE id = :tenant_id
                         """
                         ),
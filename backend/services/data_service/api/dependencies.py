@@ -48,7 +48,7 @@ from functools import lru_cache
 from fastapi import Header, HTTPException
 from loguru import logger
 
-from common.database.tenant_provisioning import tenant_database_exists
+from common.database.tenant_registry import tenant_registry
 from services.data_service.database.email_repository import EmailRepository
 from services.data_service.database.ingestion_repository import IngestionRepository
 
@@ -57,7 +57,7 @@ UUID_RE = re.compile(
 )
 
 
-def get_tenant_id(
+async def get_tenant_id(
     tenant_id_header: str | None = Header(default=None, alias="X-Tenant-Id"),
 ) -> str:
     """
@@ -76,7 +76,10 @@ def get_tenant_id(
         str: Validated tenant ID string (stripped of whitespace)
 
     Raises:
-        HTTPException: 400 Bad Request if header is missing or empty
+        HTTPException: 400 Bad Request if header is missing, empty or not a UUID
+        HTTPException: 404 Not Found if the tenant database does not exist
+            (checked against the cached tenant registry, without a database
+            round-trip per request)
 
     Security:
         This function ensures that every request is associated with a tenant,
@@ -106,7 +109,7 @@ def get_tenant_id(
         logger.warning(f"Invalid tenant ID format: {tenant_id_value}")
         raise HTTPException(status_code=400, detail="Invalid tenant ID format")
 
-    if not tenant_database_exists(tenant_id_value):
+    if not await tenant_registry.exists(tenant_id_value):
         logger.warning(f"Tenant database not found for: {tenant_id_value}")
         raise HTTPException(
             status_code=404,
@@ -135,6 +135,7 @@ async def create_ingestion_job(
             "data_types": request.data_types,
             "start_date": request.start_date,
             "end_date": request.end_date,
+            "incremental": request.incremental,
         }
         await repo.create_processing_job(job_data)
         logger.info(
@@ -155,6 +156,7 @@ async def create_ingestion_job(
             "start_date": request.start_date.isoformat(),
             "end_date": request.end_date.isoformat(),
             "data_types": request.data_types,
+            "incremental": request.incremental,
         }
 
         async with QueueClient.from_connection_string(
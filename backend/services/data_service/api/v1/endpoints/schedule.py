@@ -29,7 +29,8 @@ Job Naming Convention:
     This ensures unique schedule identification per tenant.
 
 Default Schedules:
-    - Data Ingestion: DATA_INGESTION_CRON (typically "0 2 * * *" for 2 AM daily)
+    - Data Ingestion: DATA_INGESTION_CRON (typically "0 2 * * *" for 2 AM daily),
+      queued as incremental jobs so unchanged BigQuery days are skipped
     - Email Reports: EMAIL_NOTIFICATION_CRON (typically "0 8 * * *" for 8 AM daily)
 
 Authentication:
@@ -142,7 +143,10 @@ async def upsert_ingestion_schedule(
             "cron_exp": cron_exp,
             "status": schedule_status,
             "header": {"X-Tenant-Id": tenant_id, "Content-Type": "application/json"},
-            "body": {"data_types": ["events", "users", "locations"]},
+            "body": {
+                "data_types": ["events", "users", "locations"],
+                "incremental": True,
+            },
         }
 
         # Create or update schedule
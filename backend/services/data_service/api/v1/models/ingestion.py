@@ -41,6 +41,9 @@ class CreateIngestionJobRequest(BaseModel):
         end_date: End of date range for data ingestion (inclusive)
         data_types: List of data types to process in this job
                    Default: ["events", "users", "locations"] (all types)
+        incremental: Only re-extract event days whose BigQuery shard changed
+                    since they were last ingested, or that are still intraday.
+                    Default: False (the whole date range is replaced)
 
     Validation Rules:
         - end_date must be after start_date (prevents invalid date ranges)
@@ -63,6 +66,7 @@ class CreateIngestionJobRequest(BaseModel):
     start_date: date | None = None
     end_date: date | None = None
     data_types: list[str] | None = ["events", "users", "locations"]
+    incremental: bool = False
 
     def __init__(self, **data: Any) -> None:
         # Set default dates if not provided
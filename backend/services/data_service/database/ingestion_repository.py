@@ -130,6 +130,7 @@ class IngestionRepository:
                 - data_types: List of data types to process (list[str])
                 - start_date: Start date for data ingestion (date)
                 - end_date: End date for data ingestion (date)
+                - incremental: Only re-extract changed event days (bool, optional)
                 - progress: Optional progress information (dict, optional)
                 - records_processed: Optional record counts (dict, optional)
                 - error_message: Optional error message (str, optional)
@@ -61,7 +61,8 @@ def setup_job_monitor(app: FastAPI, settings: BaseServiceSettings) -> None:
     Setup job status monitor with startup/shutdown event handlers.
     
     This function configures a background task that monitors job statuses
-    across all tenants and marks stuck jobs as failed.
+    across all tenants and marks stuck jobs as failed, and exposes its sweep
+    metrics at /health/job-monitor.
     
     Args:
         app: FastAPI application instance.
@@ -73,6 +74,7 @@ def setup_job_monitor(app: FastAPI, settings: BaseServiceSettings) -> None:
     monitor_enabled = getattr(settings, "JOB_MONITOR_ENABLED", True)
     interval_seconds = getattr(settings, "JOB_MONITOR_INTERVAL_SECONDS", 300)
     stuck_timeout_minutes = getattr(settings, "JOB_STUCK_TIMEOUT_MINUTES", 10)
+    concurrency = getattr(settings, "JOB_MONITOR_CONCURRENCY", 8)
     azure_connection_string = getattr(settings, "AZURE_STORAGE_CONNECTION_STRING", "")
     
     if not monitor_enabled:
@@ -89,6 +91,8 @@ def setup_job_monitor(app: FastAPI, settings: BaseServiceSettings) -> None:
             azure_connection_string=azure_connection_string,
             interval_seconds=interval_seconds,
             stuck_timeout_minutes=stuck_timeout_minutes,
+            concurrency=concurrency,
+            service_name=settings.SERVICE_NAME,
         )
         await _job_monitor.start()
     
@@ -102,6 +106,13 @@ def setup_job_monitor(app: FastAPI, settings: BaseServiceSettings) -> None:
             await _job_monitor.stop()
             _job_monitor = None
 
+    @app.get("/health/job-monitor")
+    async def job_monitor_stats() -> dict[str, Any]:
+        """Sweep duration, lag and job counters of the job status monitor."""
+        if _job_monitor is None:
+            return {"running": False}
+        return _job_monitor.stats()
+
 
 # Create FastAPI app with reverse proxy configuration and job monitor
 app = create_fastapi_app(
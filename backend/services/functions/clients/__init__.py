@@ -2,18 +2,29 @@
 External service clients for Azure Functions.
 """
 
-from .bigquery_client import BigQueryClient
+from .async_clients import AsyncBigQueryClient, AsyncSFTPClient
+from .bigquery_client import EVENT_TYPES, BigQueryClient
+from .sftp_cache import SFTPFileCache, cache_key
 from .sftp_client import SFTPClient
+from .smtp_client import SMTPDeliveryPool
 from .tenant_client_factory import (
     get_tenant_bigquery_client,
     get_tenant_bigquery_config,
     get_tenant_sftp_client,
+    invalidate_tenant_clients,
 )
 
 __all__ = [
+    "EVENT_TYPES",
+    "AsyncBigQueryClient",
+    "AsyncSFTPClient",
     "BigQueryClient",
     "SFTPClient",
+    "SFTPFileCache",
+    "SMTPDeliveryPool",
+    "cache_key",
     "get_tenant_bigquery_client",
     "get_tenant_bigquery_config",
     "get_tenant_sftp_client",
+    "invalidate_tenant_clients",
 ]
@@ -0,0 +1,234 @@
+"""
+Async facades over the blocking BigQuery and SFTP clients.
+
+BigQueryClient (google-cloud-bigquery, pandas) and SFTPClient (paramiko,
+pd.read_excel) block for as long as a query, download or parse runs. The
+facades run those calls on dedicated, bounded thread pools so the worker's
+event loop keeps serving other queue messages and job status updates.
+
+Cancelling the awaiting task (e.g. the job timeout in
+IngestionService.run_job_safe) drops calls that have not started yet and
+cancels the job's client (a fork of the tenant's shared client), which stops
+its BigQuery jobs or closes its SFTP connections that a worker thread is
+blocked on, so pool threads are freed promptly.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator, Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import logging
+import os
+from typing import Any, TypeVar
+
+import pandas as pd
+import pyarrow as pa
+
+from .bigquery_client import BigQueryClient
+from .sftp_client import SFTPClient
+
+logger = logging.getLogger(__name__)
+
+# Worker threads shared by all jobs on an instance, per client type
+BIGQUERY_WORKERS = int(os.getenv("INGESTION_BIGQUERY_WORKERS", "8"))
+SFTP_WORKERS = int(os.getenv("INGESTION_SFTP_WORKERS", "2"))
+
+T = TypeVar("T")
+
+_executors: dict[str, ThreadPoolExecutor] = {}
+
+
+def _get_executor(name: str, max_workers: int) -> ThreadPoolExecutor:
+    """Return the named thread pool, created on first use."""
+    executor = _executors.get(name)
+    if executor is None:
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix=name
+        )
+        _executors[name] = executor
+    return executor
+
+
+async def _run(
+    executor: ThreadPoolExecutor,
+    cancel: Callable[[], None],
+    fn: Callable[..., T],
+    *args: Any,
+) -> T:
+    """
+    Run a blocking call on a thread pool.
+
+    Args:
+        executor: Pool to run the call on.
+        cancel: Called when the awaiting task is cancelled, to unblock the
+            worker thread.
+        fn: Blocking callable.
+        *args: Positional arguments for ``fn``.
+
+    Returns:
+        The return value of ``fn``.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(executor, functools.partial(fn, *args))
+    try:
+        return await future
+    except asyncio.CancelledError:
+        cancel()
+        raise
+
+
+async def _iterate(
+    executor: ThreadPoolExecutor,
+    cancel: Callable[[], None],
+    items: Iterator[T],
+) -> AsyncIterator[T]:
+    """
+    Drive a blocking iterator from a thread pool, one item at a time.
+
+    When the consumer stops early or fails, the iterator is closed on the
+    pool so a generator's cleanup (e.g. untracking its BigQuery job) runs
+    instead of leaving it suspended. Consumers should iterate inside
+    ``contextlib.aclosing`` so that happens right away.
+    """
+    sentinel = object()
+    try:
+        while True:
+            item = await _run(executor, cancel, next, items, sentinel)
+            if item is sentinel:
+                return
+            yield item
+    finally:
+        close = getattr(items, "close", None)
+        if close is not None:
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(executor, close)
+            except Exception as e:
+                # e.g. a cancelled next() still running on its worker thread
+                logger.warning(f"Failed to close blocking iterator: {e}")
+
+
+class AsyncBigQueryClient:
+    """
+    Async facade over BigQueryClient.
+
+    Every method has the signature of its BigQueryClient counterpart and runs
+    it on the BigQuery thread pool (INGESTION_BIGQUERY_WORKERS threads).
+
+    Attributes:
+        client: The wrapped BigQueryClient.
+
+    Example:
+        >>> client = AsyncBigQueryClient(await get_tenant_bigquery_client(tenant_id))
+        >>> async for batch in client.iter_event_batches(
+        ...     "purchase", "2024-01-01", "2024-01-07", 10000
+        ... ):
+        ...     ...
+    """
+
+    def __init__(self, client: BigQueryClient) -> None:
+        """
+        Wrap a BigQuery client.
+
+        Args:
+            client: Tenant BigQuery client.
+        """
+        self.client = client
+        self._executor = _get_executor("bigquery", BIGQUERY_WORKERS)
+
+    async def _call(self, fn: Callable[..., T], *args: Any) -> T:
+        return await _run(self._executor, self.client.cancel, fn, *args)
+
+    def _iterate(self, items: Iterator[T]) -> AsyncIterator[T]:
+        return _iterate(self._executor, self.client.cancel, items)
+
+    async def get_date_range_events(
+        self, start_date: str, end_date: str, single_scan: bool = False
+    ) -> dict[str, list[dict[str, Any]]]:
+        """See BigQueryClient.get_date_range_events()."""
+        return await self._call(
+            self.client.get_date_range_events, start_date, end_date, single_scan
+        )
+
+    async def get_event_shards(
+        self, start_date: str, end_date: str
+    ) -> dict[Any, dict[str, Any]]:
+        """See BigQueryClient.get_event_shards()."""
+        return await self._call(self.client.get_event_shards, start_date, end_date)
+
+    async def extract_users(self, user_table: str) -> list[dict[str, Any]]:
+        """See BigQueryClient.extract_users()."""
+        return await self._call(self.client.extract_users, user_table)
+
+    def iter_event_batches(
+        self, event_type: str, start_date: str, end_date: str, batch_size: int
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """See BigQueryClient.iter_event_batches()."""
+        return self._iterate(
+            self.client.iter_event_batches(event_type, start_date, end_date, batch_size)
+        )
+
+    def iter_all_event_batches(
+        self, start_date: str, end_date: str, batch_size: int
+    ) -> AsyncIterator[dict[str, list[dict[str, Any]]]]:
+        """See BigQueryClient.iter_all_event_batches()."""
+        return self._iterate(
+            self.client.iter_all_event_batches(start_date, end_date, batch_size)
+        )
+
+    def iter_event_record_batches(
+        self, event_type: str, start_date: str, end_date: str, batch_size: int
+    ) -> AsyncIterator[pa.RecordBatch]:
+        """See BigQueryClient.iter_event_record_batches()."""
+        return self._iterate(
+            self.client.iter_event_record_batches(
+                event_type, start_date, end_date, batch_size
+            )
+        )
+
+    def iter_all_event_record_batches(
+        self, start_date: str, end_date: str, batch_size: int
+    ) -> AsyncIterator[dict[str, pa.RecordBatch]]:
+        """See BigQueryClient.iter_all_event_record_batches()."""
+        return self._iterate(
+            self.client.iter_all_event_record_batches(start_date, end_date, batch_size)
+        )
+
+
+class AsyncSFTPClient:
+    """
+    Async facade over SFTPClient.
+
+    Downloads and Excel parsing run on the SFTP thread pool
+    (INGESTION_SFTP_WORKERS threads).
+
+    Attributes:
+        client: The wrapped SFTPClient.
+    """
+
+    def __init__(self, client: SFTPClient) -> None:
+        """
+        Wrap an SFTP client.
+
+        Args:
+            client: Tenant SFTP client.
+        """
+        self.client = client
+        self._executor = _get_executor("sftp", SFTP_WORKERS)
+
+    async def get_locations_data(self) -> pd.DataFrame:
+        """See SFTPClient._get_locations_data_sync()."""
+        return await _run(
+            self._executor, self.client.cancel, self.client._get_locations_data_sync
+        )
+
+    async def get_locations_update(
+        self, cached: dict[str, Any] | None
+    ) -> tuple[dict[str, Any], bool]:
+        """See SFTPClient._get_locations_update_sync()."""
+        return await _run(
+            self._executor,
+            self.client.cancel,
+            self.client._get_locations_update_sync,
+            cached,
+        )
@@ -2,19 +2,134 @@
 BigQuery client for Azure Functions.
 
 Extracts GA4 event data from BigQuery using concurrent queries
-for each event type via ThreadPoolExecutor.
+for each event type via ThreadPoolExecutor, or with a single scan
+split by event type client-side. Results can also be streamed page
+by page for memory-bounded ingestion, either as row dictionaries or as
+Arrow record batches read through the BigQuery Storage Read API.
 """
 
+from collections.abc import Iterable, Iterator
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import copy
+from datetime import date, datetime, timezone
+import threading
 from typing import Any
 
 import logging
+from google.api_core import exceptions as google_exceptions
 from google.cloud import bigquery
 from google.oauth2 import service_account
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from shared.dataframes import dataframe_records
+
+try:
+    from google.cloud import bigquery_storage
+except ImportError:  # Storage Read API client not installed: REST only
+    bigquery_storage = None
 
 logger = logging.getLogger(__name__)
 
+# Event types extracted from GA4, in the order they are processed. Each maps
+# to a table of the same name in the tenant database.
+EVENT_TYPES = (
+    "purchase",
+    "add_to_cart",
+    "page_view",
+    "view_search_results",
+    "no_search_results",
+    "view_item",
+)
+
+# Columns returned for each event type, in table insertion order. The
+# single-scan query selects the union of these and rows are projected back
+# onto the per-type column set, so both extraction modes yield identical
+# records.
+_COMMON_COLUMNS = (
+    "event_date",
+    "event_timestamp",
+    "user_pseudo_id",
+    "user_prop_webuserid",
+    "user_prop_default_branch_id",
+    "user_prop_webcustomerid",
+    "param_ga_session_id",
+)
+_DEVICE_GEO_COLUMNS = (
+    "device_category",
+    "device_operating_system",
+    "geo_country",
+    "geo_city",
+    "raw_data",
+)
+_FIRST_ITEM_COLUMNS = (
+    "first_item_item_id",
+    "first_item_item_name",
+    "first_item_item_category",
+    "first_item_price",
+)
+EVENT_COLUMNS: dict[str, tuple[str, ...]] = {
+    "purchase": (
+        *_COMMON_COLUMNS,
+        "param_transaction_id",
+        "param_page_title",
+        "param_page_location",
+        "ecommerce_purchase_revenue",
+        "items_json",
+        *_DEVICE_GEO_COLUMNS,
+    ),
+    "add_to_cart": (
+        *_COMMON_COLUMNS,
+        "param_page_title",
+        "param_page_location",
+        *_FIRST_ITEM_COLUMNS,
+        "first_item_quantity",
+        "items_json",
+        *_DEVICE_GEO_COLUMNS,
+    ),
+    "page_view": (
+        *_COMMON_COLUMNS,
+        "param_page_title",
+        "param_page_location",
+        "param_page_referrer",
+        *_DEVICE_GEO_COLUMNS,
+    ),
+    "view_search_results": (
+        *_COMMON_COLUMNS,
+        "param_search_term",
+        "param_page_title",
+        "param_page_location",
+        *_DEVICE_GEO_COLUMNS,
+    ),
+    "no_search_results": (
+        *_COMMON_COLUMNS,
+        "param_no_search_results_term",
+        "param_page_title",
+        "param_page_location",
+        *_DEVICE_GEO_COLUMNS,
+    ),
+    "view_item": (
+        *_COMMON_COLUMNS,
+        *_FIRST_ITEM_COLUMNS,
+        "param_page_title",
+        "param_page_location",
+        "items_json",
+        *_DEVICE_GEO_COLUMNS,
+    ),
+}
+
+# GA4 event_name -> event type (table) it is stored as
+EVENT_NAME_TO_TYPE = {
+    "purchase": "purchase",
+    "add_to_cart": "add_to_cart",
+    "page_view": "page_view",
+    "view_search_results": "view_search_results",
+    "no_search_results": "no_search_results",
+    "view_search_results_no_results": "no_search_results",
+    "view_item": "view_item",
+}
+
 
 class BigQueryClient:
     """
@@ -78,12 +193,25 @@ class BigQueryClient:
         # Initialize BigQuery client
         self.client = bigquery.Client(credentials=credentials, project=self.project_id)
 
+        # Storage Read API client, created on first Arrow fetch and shared
+        # with every fork() of this client
+        self._credentials = credentials
+        self._bqstorage: dict[str, Any] = {
+            "client": None,
+            "unavailable": bigquery_storage is None,
+        }
+
+        # Query jobs in flight, cancelled together by cancel()
+        self._jobs_lock = threading.Lock()
+        self._active_jobs: set[bigquery.QueryJob] = set()
+        self._cancelled = threading.Event()
+
         logger.info(
             f"Initialized BigQuery client for {self.project_id}.{self.dataset_id}"
         )
 
     def get_date_range_events(
-        self, start_date: str, end_date: str
+        self, start_date: str, end_date: str, single_scan: bool = False
     ) -> dict[str, list[dict[str, Any]]]:
         """
         Extract all GA4 event types for a specified date range.
@@ -96,10 +224,13 @@ class BigQueryClient:
         Args:
             start_date: Start date in YYYY-MM-DD format (inclusive).
             end_date: End date in YYYY-MM-DD format (inclusive).
+            single_scan: Extract all event types with one query instead of
+                one query per type (see iter_all_event_batches()).
 
         Returns:
             dict[str, list[dict[str, Any]]]: Dictionary mapping event type names
-            to lists of event records. Event types include:
+            to lists of event records. Event types whose extraction failed are
+            left out. Event types include:
                 - purchase: Completed purchase transactions
                 - add_to_cart: Items added to shopping cart
                 - page_view: Page view events
@@ -112,7 +243,8 @@ class BigQueryClient:
 
         Note:
             - Queries use wildcard table matching (events_*) for date partitioning
-            - Each event type is extracted independently (failures don't cascade)
+            - Each event type is extracted independently (failures don't cascade);
+              in single-scan mode a failed query yields no event types
             - Raw event data is preserved in JSON format for future analysis
             - Events are ordered by timestamp for consistent processing
             - Empty results are returned as empty lists, not None
@@ -124,26 +256,38 @@ class BigQueryClient:
             >>> events["purchase"][0]["param_transaction_id"]
             'TXN-12345'
         """
+        if single_scan:
+            results: dict[str, list[dict[str, Any]]] = {et: [] for et in EVENT_TYPES}
+            logger.info(
+                f"Extracting {len(EVENT_TYPES)} event types in a single scan "
+                f"for {start_date} to {end_date}"
+            )
+            try:
+                rows = self._extract_events(
+                    self._build_all_events_query(start_date, end_date)
+                )
+            except Exception as e:
+                logger.exception(f"Error extracting events in a single scan: {e}")
+                return {}
+            for et, batch in self._split_event_rows(rows).items():
+                results[et].extend(batch)
+            for et, rows in results.items():
+                logger.info(f"Extracted {len(rows)} {et} events")
+            return results
+
         results = {}
 
-        event_extractors = {
-            "purchase": self._extract_purchase_events,
-            "add_to_cart": self._extract_add_to_cart_events,
-            "page_view": self._extract_page_view_events,
-            "view_search_results": self._extract_view_search_results_events,
-            "no_search_results": self._extract_no_search_results_events,
-            "view_item": self._extract_view_item_events,
-        }
+        event_queries = self._build_event_queries(start_date, end_date)
 
         logger.info(
-            f"Extracting {len(event_extractors)} event types concurrently "
+            f"Extracting {len(event_queries)} event types concurrently "
             f"for {start_date} to {end_date}"
         )
 
-        with ThreadPoolExecutor(max_workers=len(event_extractors)) as executor:
+        with ThreadPoolExecutor(max_workers=len(event_queries)) as executor:
             futures = {
-                executor.submit(extractor, start_date, end_date): event_type
-                for event_type, extractor in event_extractors.items()
+                executor.submit(self._extract_events, query): event_type
+                for event_type, query in event_queries.items()
             }
             for future in as_completed(futures):
                 event_type = futures[future]
@@ -153,10 +297,382 @@ class BigQueryClient:
                     logger.info(f"Extracted {len(events)} {event_type} events")
                 except Exception as e:
                     logger.error(f"Error extracting {event_type} events: {e}")
-                    results[event_type] = []
 
         return results
 
+    def get_event_shards(
+        self, start_date: str, end_date: str
+    ) -> dict[date, dict[str, Any]]:
+        """
+        Describe the GA4 export shards available for a date range.
+
+        Reads table metadata only (the dataset's ``__TABLES__`` meta-table),
+        so it does not scan event data and is not billed by bytes.
+
+        Args:
+            start_date: Start date in YYYY-MM-DD format (inclusive).
+            end_date: End date in YYYY-MM-DD format (inclusive).
+
+        Returns:
+            dict[date, dict[str, Any]]: One entry per day that has a daily
+            ``events_YYYYMMDD`` shard and/or an ``events_intraday_YYYYMMDD``
+            shard, with:
+                - last_modified: Last modification time of the daily shard
+                  (None if only the intraday shard exists)
+                - intraday: True while an intraday shard exists for the day,
+                  i.e. the export for that day is not final yet
+
+        Raises:
+            Exception: If the metadata query fails.
+        """
+        start_suffix = start_date.replace("-", "")
+        end_suffix = end_date.replace("-", "")
+
+        query = f"""
+        SELECT table_id, last_modified_time
+        FROM `{self.project_id}.{self.dataset_id}.__TABLES__`
+        WHERE table_id BETWEEN 'events_{start_suffix}' AND 'events_{end_suffix}'
+        OR table_id BETWEEN 'events_intraday_{start_suffix}' AND 'events_intraday_{end_suffix}'
+        """
+
+        shards: dict[date, dict[str, Any]] = {}
+        for row in self._execute_query(query).to_dict("records"):
+            table_id = row["table_id"]
+            suffix = table_id.rsplit("_", 1)[-1]
+            if len(suffix) != 8 or not suffix.isdigit():
+                continue
+            day = datetime.strptime(suffix, "%Y%m%d").date()
+            shard = shards.setdefault(day, {"last_modified": None, "intraday": False})
+            if table_id.startswith("events_intraday_"):
+                shard["intraday"] = True
+            else:
+                shard["last_modified"] = datetime.fromtimestamp(
+                    int(row["last_modified_time"]) / 1000, tz=timezone.utc
+                )
+
+        return shards
+
+    def iter_event_batches(
+        self, event_type: str, start_date: str, end_date: str, batch_size: int
+    ) -> Iterator[list[dict[str, Any]]]:
+        """
+        Stream one GA4 event type for a date range in fixed-size batches.
+
+        Unlike get_date_range_events(), which materializes every event type
+        in memory at once, this generator pages through the query result via
+        the BigQuery read API and yields one page at a time. Peak memory is
+        bounded by ``batch_size`` rows regardless of the date range, so it is
+        the preferred path for large backfills.
+
+        Args:
+            event_type: One of the keys of EVENT_TYPES (e.g. "purchase").
+            start_date: Start date in YYYY-MM-DD format (inclusive).
+            end_date: End date in YYYY-MM-DD format (inclusive).
+            batch_size: Maximum number of rows per yielded batch.
+
+        Yields:
+            list[dict[str, Any]]: Event records with the same shape as the
+            lists returned by get_date_range_events(). Empty pages are skipped.
+
+        Raises:
+            ValueError: If event_type is not a supported event type.
+            Exception: If BigQuery query execution fails.
+
+        Note:
+            - Pages are fetched lazily; nothing is downloaded until iterated
+            - Iteration is blocking; async callers should pull batches in a
+              worker thread (see AsyncBigQueryClient)
+        """
+        event_queries = self._build_event_queries(start_date, end_date)
+        if event_type not in event_queries:
+            msg = f"Unsupported event type: {event_type}"
+            raise ValueError(msg)
+
+        query = event_queries[event_type]
+        try:
+            query_job = self._start_query(query)
+            rows = query_job.result(page_size=batch_size)
+        except Exception as e:
+            logger.exception(f"BigQuery execution error: {e}\nQuery: {query}")
+            raise
+
+        try:
+            for page in rows.pages:
+                self._check_cancelled()
+                batch = [dict(row.items()) for row in page]
+                if batch:
+                    yield batch
+        finally:
+            self._finish_query(query_job)
+
+    def iter_all_event_batches(
+        self, start_date: str, end_date: str, batch_size: int
+    ) -> Iterator[dict[str, list[dict[str, Any]]]]:
+        """
+        Stream every GA4 event type for a date range from a single scan.
+
+        The per-type queries each scan ``events_*`` over the same
+        ``_TABLE_SUFFIX`` range and re-evaluate the same UNNEST subqueries, so
+        a job pays for the shard scan six times. This issues one query
+        filtered on ``event_name IN (...)`` and splits the rows by event type
+        client-side. BigQuery materializes the result in the job's temporary
+        destination table, which is then paged through like
+        iter_event_batches().
+
+        Args:
+            start_date: Start date in YYYY-MM-DD format (inclusive).
+            end_date: End date in YYYY-MM-DD format (inclusive).
+            batch_size: Maximum number of rows per page.
+
+        Yields:
+            dict[str, list[dict[str, Any]]]: Rows of one page grouped by event
+            type, with exactly the columns of the per-type queries
+            (EVENT_COLUMNS). Event types absent from a page are omitted.
+
+        Raises:
+            Exception: If BigQuery query execution fails.
+
+        Note:
+            - Rows are not ordered by event_timestamp (the per-type queries
+              are); loading does not depend on row order
+        """
+        query = self._build_all_events_query(start_date, end_date)
+        try:
+            query_job = self._start_query(query)
+            rows = query_job.result(page_size=batch_size)
+        except Exception as e:
+            logger.exception(f"BigQuery execution error: {e}\nQuery: {query}")
+            raise
+
+        try:
+            for page in rows.pages:
+                self._check_cancelled()
+                batches = self._split_event_rows(dict(row.items()) for row in page)
+                if batches:
+                    yield batches
+        finally:
+            self._finish_query(query_job)
+
+    def iter_event_record_batches(
+        self, event_type: str, start_date: str, end_date: str, batch_size: int
+    ) -> Iterator[pa.RecordBatch]:
+        """
+        Stream one GA4 event type for a date range as Arrow record batches.
+
+        Arrow-native counterpart of iter_event_batches(): results are read
+        as columnar batches (see _execute_query_arrow()) and handed to the
+        loader without building a DataFrame or per-row dictionaries.
+
+        Args:
+            event_type: One of EVENT_TYPES (e.g. "purchase").
+            start_date: Start date in YYYY-MM-DD format (inclusive).
+            end_date: End date in YYYY-MM-DD format (inclusive).
+            batch_size: Page size used when falling back to the REST API.
+
+        Yields:
+            pa.RecordBatch: Batches with the columns of the per-type query.
+            Empty batches are skipped.
+
+        Raises:
+            ValueError: If event_type is not a supported event type.
+            Exception: If BigQuery query execution fails.
+        """
+        event_queries = self._build_event_queries(start_date, end_date)
+        if event_type not in event_queries:
+            msg = f"Unsupported event type: {event_type}"
+            raise ValueError(msg)
+
+        for batch in self._execute_query_arrow(event_queries[event_type], batch_size):
+            if batch.num_rows:
+                yield batch
+
+    def iter_all_event_record_batches(
+        self, start_date: str, end_date: str, batch_size: int
+    ) -> Iterator[dict[str, pa.RecordBatch]]:
+        """
+        Stream every GA4 event type from a single scan as Arrow record batches.
+
+        Arrow-native counterpart of iter_all_event_batches(). Each batch is
+        split by event_name with vectorized filters and projected onto the
+        per-type column set (EVENT_COLUMNS).
+
+        Args:
+            start_date: Start date in YYYY-MM-DD format (inclusive).
+            end_date: End date in YYYY-MM-DD format (inclusive).
+            batch_size: Page size used when falling back to the REST API.
+
+        Yields:
+            dict[str, pa.RecordBatch]: Non-empty batches keyed by event type.
+
+        Raises:
+            Exception: If BigQuery query execution fails.
+        """
+        event_names: dict[str, list[str]] = {}
+        for event_name, event_type in EVENT_NAME_TO_TYPE.items():
+            event_names.setdefault(event_type, []).append(event_name)
+        value_sets = {et: pa.array(names) for et, names in event_names.items()}
+
+        query = self._build_all_events_query(start_date, end_date)
+        for batch in self._execute_query_arrow(query, batch_size):
+            split: dict[str, pa.RecordBatch] = {}
+            for event_type, value_set in value_sets.items():
+                mask = pc.is_in(batch.column("event_name"), value_set=value_set)
+                selected = batch.filter(mask)
+                if selected.num_rows:
+                    columns = EVENT_COLUMNS[event_type]
+                    split[event_type] = pa.RecordBatch.from_arrays(
+                        [selected.column(col) for col in columns], names=list(columns)
+                    )
+            if split:
+                yield split
+
+    @staticmethod
+    def _split_event_rows(
+        rows: Iterable[dict[str, Any]],
+    ) -> dict[str, list[dict[str, Any]]]:
+        """
+        Group single-scan rows by event type, keeping only that type's columns.
+
+        Args:
+            rows: Rows of the single-scan query (including ``event_name``).
+
+        Returns:
+            dict[str, list[dict[str, Any]]]: Projected rows per event type.
+        """
+        batches: dict[str, list[dict[str, Any]]] = {}
+        for row in rows:
+            event_type = EVENT_NAME_TO_TYPE.get(row.get("event_name"))
+            if event_type is None:
+                continue
+            batches.setdefault(event_type, []).append(
+                {col: row.get(col) for col in EVENT_COLUMNS[event_type]}
+            )
+        return batches
+
+    def _build_all_events_query(self, start_date: str, end_date: str) -> str:
+        """
+        Build the single-scan extraction query covering every event type.
+
+        Selects the union of the per-type columns. ``raw_data`` keeps the
+        per-type struct shape (ecommerce only for purchases, items only for
+        item-level events) so stored payloads match the per-type queries.
+
+        Args:
+            start_date: Start date in YYYY-MM-DD format.
+            end_date: End date in YYYY-MM-DD format.
+
+        Returns:
+            str: SQL selecting all supported events with an event_name column.
+        """
+        start_suffix = start_date.replace("-", "")
+        end_suffix = end_date.replace("-", "")
+        event_names = ", ".join(f"'{name}'" for name in EVENT_NAME_TO_TYPE)
+
+        return f"""
+        SELECT
+            event_name,
+            event_date,
+            CAST(event_timestamp AS STRING) as event_timestamp,
+            user_pseudo_id,
+            (SELECT COALESCE(CAST(value.int_value AS STRING), value.string_value) FROM UNNEST(user_properties) WHERE key = 'WebUserId') as user_prop_webuserid,
+            (SELECT COALESCE(value.string_value, CAST(value.int_value AS STRING)) FROM UNNEST(user_properties) WHERE key = 'default_branch_id') as user_prop_default_branch_id,
+            (SELECT COALESCE(CAST(value.int_value AS STRING), value.string_value) FROM UNNEST(user_properties) WHERE key = 'WebCustomerId') as user_prop_webcustomerid,
+            (SELECT COALESCE(CAST(value.int_value AS STRING), value.string_value) FROM UNNEST(event_params) WHERE key = 'ga_session_id') as param_ga_session_id,
+            (SELECT COALESCE(value.string_value, CAST(value.int_value AS STRING)) FROM UNNEST(event_params) WHERE key = 'transaction_id') as param_transaction_id,
+            (SELECT COALESCE(value.string_value, CAST(value.int_value AS STRING)) FROM UNNEST(event_params) WHERE key = 'search_term') as param_search_term,
+            (SELECT COALESCE(value.string_value, CAST(value.int_value AS STRING)) FROM UNNEST(event_params) WHERE key = 'no_search_results_term') as param_no_search_results_term,
+            (SELECT COALESCE(value.string_value, CAST(value.int_value AS STRING)) FROM UNNEST(event_params) WHERE key = 'page_title') as param_page_title,
+            (SELECT COALESCE(value.string_value, CAST(value.int_value AS STRING)) FROM UNNEST(event_params) WHERE key = 'page_location') as param_page_location,
+            (SELECT COALESCE(value.string_value, CAST(value.int_value AS STRING)) FROM UNNEST(event_params) WHERE key = 'page_referrer') as param_page_referrer,
+            ecommerce.purchase_revenue as ecommerce_purchase_revenue,
+            items[SAFE_OFFSET(0)].item_id as first_item_item_id,
+            items[SAFE_OFFSET(0)].item_name as first_item_item_name,
+            items[SAFE_OFFSET(0)].item_category as first_item_item_category,
+            items[SAFE_OFFSET(0)].price as first_item_price,
+            items[SAFE_OFFSET(0)].quantity as first_item_quantity,
+            TO_JSON_STRING(items) as items_json,
+            device.category as device_category,
+            device.operating_system as device_operating_system,
+            geo.country as geo_country,
+            geo.city as geo_city,
+            CASE
+                WHEN event_name = 'purchase' THEN TO_JSON_STRING(STRUCT(
+                    event_date,
+                    event_timestamp,
+                    event_name,
+                    user_pseudo_id,
+                    user_properties,
+                    event_params,
+                    ecommerce,
+                    items,
+                    device,
+                    geo
+                ))
+                WHEN event_name IN ('add_to_cart', 'view_item') THEN TO_JSON_STRING(STRUCT(
+                    event_date,
+                    event_timestamp,
+                    event_name,
+                    user_pseudo_id,
+                    user_properties,
+                    event_params,
+                    items,
+                    device,
+                    geo
+                ))
+                ELSE TO_JSON_STRING(STRUCT(
+                    event_date,
+                    event_timestamp,
+                    event_name,
+                    user_pseudo_id,
+                    user_properties,
+                    event_params,
+                    device,
+                    geo
+                ))
+            END as raw_data
+        FROM `{self.project_id}.{self.dataset_id}.events_*`
+        WHERE _TABLE_SUFFIX BETWEEN '{start_suffix}' AND '{end_suffix}'
+        AND event_name IN ({event_names})
+        """
+
+    def _build_event_queries(self, start_date: str, end_date: str) -> dict[str, str]:
+        """
+        Build the extraction query for every supported event type.
+
+        Args:
+            start_date: Start date in YYYY-MM-DD format.
+            end_date: End date in YYYY-MM-DD format.
+
+        Returns:
+            dict[str, str]: Mapping of event type name to its SQL query, in
+            EVENT_TYPES order.
+        """
+        builders = {
+            "purchase": self._build_purchase_query,
+            "add_to_cart": self._build_add_to_cart_query,
+            "page_view": self._build_page_view_query,
+            "view_search_results": self._build_view_search_results_query,
+            "no_search_results": self._build_no_search_results_query,
+            "view_item": self._build_view_item_query,
+        }
+        return {
+            event_type: builders[event_type](start_date, end_date)
+            for event_type in EVENT_TYPES
+        }
+
+    def _extract_events(self, query: str) -> list[dict[str, Any]]:
+        """
+        Run an event extraction query and return all rows as dictionaries.
+
+        Args:
+            query: SQL built by one of the ``_build_*_query`` methods.
+
+        Returns:
+            list[dict[str, Any]]: Event records keyed by column name.
+        """
+        df = self._execute_query(query)
+        return df.to_dict("records")
+
     def _execute_query(self, query: str) -> pd.DataFrame:
         """
         Execute a BigQuery SQL query and return results as a pandas DataFrame.
@@ -180,13 +696,150 @@ class BigQueryClient:
             - Errors are logged with full query text for troubleshooting
             - Large result sets are handled efficiently by BigQuery
         """
+        query_job = None
         try:
-            query_job = self.client.query(query)
+            query_job = self._start_query(query)
             return query_job.to_dataframe()
         except Exception as e:
             logger.error(f"BigQuery execution error: {e}")
             logger.error(f"Query: {query}")
             raise
+        finally:
+            if query_job is not None:
+                self._finish_query(query_job)
+
+    def _execute_query_arrow(
+        self, query: str, page_size: int | None = None
+    ) -> Iterator[pa.RecordBatch]:
+        """
+        Execute a BigQuery SQL query and stream results as Arrow record batches.
+
+        Arrow-native fetch mode of _execute_query(): results are read through
+        the BigQuery Storage Read API, which returns columnar Arrow batches
+        over gRPC, instead of being paged as JSON through the REST API and
+        converted into a DataFrame.
+
+        Args:
+            query: SQL query string to execute against BigQuery.
+            page_size: Rows per page when results are read through REST.
+
+        Yields:
+            pa.RecordBatch: Query results in arrival order.
+
+        Raises:
+            Exception: If query execution fails, with detailed error logging
+                      including the query text for debugging.
+
+        Note:
+            - Falls back to the REST API when google-cloud-bigquery-storage is
+              not installed, or when opening the read session fails (e.g. the
+              Storage API is disabled or the service account lacks
+              bigquery.readsessions.create); the fallback sticks for the
+              lifetime of the client
+            - Small results that fit in the first REST page are always read
+              through REST by the BigQuery library
+        """
+        try:
+            query_job = self._start_query(query)
+            rows = query_job.result(page_size=page_size)
+        except Exception as e:
+            logger.exception(f"BigQuery execution error: {e}\nQuery: {query}")
+            raise
+
+        try:
+            bqstorage_client = self._get_bqstorage_client()
+            if bqstorage_client is not None:
+                batches = rows.to_arrow_iterable(bqstorage_client=bqstorage_client)
+                try:
+                    first = next(batches, None)
+                except google_exceptions.GoogleAPICallError as e:
+                    logger.warning(
+                        f"BigQuery Storage Read API unavailable, falling back to REST: {e}"
+                    )
+                    self._bqstorage["unavailable"] = True
+                    rows = query_job.result(page_size=page_size)
+                else:
+                    if first is not None:
+                        yield first
+                    for batch in batches:
+                        self._check_cancelled()
+                        yield batch
+                    return
+
+            for batch in rows.to_arrow_iterable():
+                self._check_cancelled()
+                yield batch
+        finally:
+            self._finish_query(query_job)
+
+    def _start_query(self, query: str) -> bigquery.QueryJob:
+        """Start a query job, tracked so that cancel() can stop it."""
+        self._check_cancelled()
+        query_job = self.client.query(query)
+        with self._jobs_lock:
+            self._active_jobs.add(query_job)
+        return query_job
+
+    def _finish_query(self, query_job: bigquery.QueryJob) -> None:
+        """Stop tracking a query job whose results have been read."""
+        with self._jobs_lock:
+            self._active_jobs.discard(query_job)
+
+    def _check_cancelled(self) -> None:
+        """Raise if cancel() was called, before starting or reading more results."""
+        if self._cancelled.is_set():
+            msg = "BigQuery extraction was cancelled"
+            raise RuntimeError(msg)
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancel() was called; a cancelled client cannot be reused."""
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        """
+        Cancel every query job of this client and refuse new ones.
+
+        Safe to call from any thread. Worker threads blocked on a cancelled
+        job's results get an error from BigQuery, and paging iterators stop
+        before their next page, so the threads are freed promptly instead of
+        finishing work nobody waits for.
+        """
+        self._cancelled.set()
+        with self._jobs_lock:
+            jobs = list(self._active_jobs)
+        for query_job in jobs:
+            try:
+                query_job.cancel()
+            except Exception as e:
+                logger.warning(f"Failed to cancel BigQuery job {query_job.job_id}: {e}")
+        if jobs:
+            logger.info(f"Cancelled {len(jobs)} BigQuery jobs")
+
+    def fork(self) -> "BigQueryClient":
+        """
+        Return a client for a single job that shares this client's connections.
+
+        The fork reuses the authenticated BigQuery and Storage Read clients
+        but tracks its own query jobs, so cancelling it (e.g. on a job
+        timeout) stops only that job's queries and leaves this client and
+        its other forks usable.
+        """
+        forked = copy.copy(self)
+        forked._jobs_lock = threading.Lock()
+        forked._active_jobs = set()
+        forked._cancelled = threading.Event()
+        return forked
+
+    def _get_bqstorage_client(self) -> Any:
+        """Return the Storage Read API client, or None when it can't be used."""
+        if self._bqstorage["unavailable"]:
+            return None
+        if self._bqstorage["client"] is None:
+            self._bqstorage["client"] = bigquery_storage.BigQueryReadClient(
+                credentials=self._credentials
+            )
+        return self._bqstorage["client"]
 
     def extract_users(self, user_table: str) -> list[dict[str, Any]]:
         """
@@ -221,19 +874,15 @@ class BigQueryClient:
         logger.info(f"Extracting users from BigQuery table: {user_table}")
         df = self._execute_query(query)
 
-        df = df.where(pd.notna(df), None)
-
-        users = df.to_dict("records")
+        users = dataframe_records(df)
         logger.info(f"Extracted {len(users)} users from BigQuery")
         return users
 
-    def _extract_purchase_events(
-        self, start_date: str, end_date: str
-    ) -> list[dict[str, Any]]:
+    def _build_purchase_query(self, start_date: str, end_date: str) -> str:
         """
-        Extract purchase events from GA4 BigQuery tables.
+        Build the purchase extraction query for GA4 BigQuery tables.
 
-        Queries BigQuery for purchase events within the date range, extracting
+        Selects purchase events within the date range, extracting
         transaction details, revenue, customer information, and product data.
         Includes e-commerce data and preserves raw event structure.
 
@@ -242,8 +891,8 @@ class BigQueryClient:
             end_date: End date in YYYY-MM-DD format.
 
         Returns:
-            list[dict[str, Any]]: List of purchase event dictionaries containing
-                                transaction IDs, revenue, items, customer data, etc.
+            str: SQL selecting purchase events with transaction IDs, revenue,
+                items, customer data, etc.
 
         Note:
             - Extracts ecommerce.purchase_revenue for revenue calculations
@@ -254,7 +903,7 @@ class BigQueryClient:
         start_suffix = start_date.replace("-", "")
         end_suffix = end_date.replace("-", "")
 
-        query = f"""
+        return f"""
         SELECT
             event_date,
             CAST(event_timestamp AS STRING) as event_timestamp,
@@ -290,16 +939,11 @@ class BigQueryClient:
         ORDER BY event_timestamp
         """
 
-        df = self._execute_query(query)
-        return df.to_dict("records")
-
-    def _extract_add_to_cart_events(
-        self, start_date: str, end_date: str
-    ) -> list[dict[str, Any]]:
+    def _build_add_to_cart_query(self, start_date: str, end_date: str) -> str:
         """
-        Extract add_to_cart events from GA4 BigQuery tables.
+        Build the add_to_cart extraction query for GA4 BigQuery tables.
 
-        Queries BigQuery for cart addition events, extracting item details,
+        Selects cart addition events, extracting item details,
         customer information, and session data for cart abandonment analysis.
 
         Args:
@@ -307,7 +951,7 @@ class BigQueryClient:
             end_date: End date in YYYY-MM-DD format.
 
         Returns:
-            list[dict[str, Any]]: List of add_to_cart event dictionaries.
+            str: SQL selecting add_to_cart events.
 
         Note:
             - Extracts first item details for quick access
@@ -317,7 +961,7 @@ class BigQueryClient:
         start_suffix = start_date.replace("-", "")
         end_suffix = end_date.replace("-", "")
 
-        query = f"""
+        return f"""
         SELECT
             event_date,
             CAST(event_timestamp AS STRING) as event_timestamp,
@@ -355,16 +999,11 @@ class BigQueryClient:
         ORDER BY event_timestamp
         """
 
-        df = self._execute_query(query)
-        return df.to_dict("records")
-
-    def _extract_page_view_events(
-        self, start_date: str, end_date: str
-    ) -> list[dict[str, Any]]:
+    def _build_page_view_query(self, start_date: str, end_date: str) -> str:
         """
-        Extract page_view events from GA4 BigQuery tables.
+        Build the page_view extraction query for GA4 BigQuery tables.
 
-        Queries BigQuery for page view events, extracting page information,
+        Selects page view events, extracting page information,
         referrer data, and user session details for traffic analysis.
 
         Args:
@@ -372,7 +1011,7 @@ class BigQueryClient:
             end_date: End date in YYYY-MM-DD format.
 
         Returns:
-            list[dict[str, Any]]: List of page_view event dictionaries.
+            str: SQL selecting page_view events.
 
         Note:
             - Includes page title, location (URL), and referrer
@@ -382,7 +1021,7 @@ class BigQueryClient:
         start_suffix = start_date.replace("-", "")
         end_suffix = end_date.replace("-", "")
 
-        query = f"""
+        return f"""
         SELECT
             event_date,
             CAST(event_timestamp AS STRING) as event_timestamp,
@@ -414,16 +1053,11 @@ class BigQueryClient:
         ORDER BY event_timestamp
         """
 
-        df = self._execute_query(query)
-        return df.to_dict("records")
-
-    def _extract_view_search_results_events(
-        self, start_date: str, end_date: str
-    ) -> list[dict[str, Any]]:
+    def _build_view_search_results_query(self, start_date: str, end_date: str) -> str:
         """
-        Extract view_search_results events from GA4 BigQuery tables.
+        Build the view_search_results extraction query for GA4 BigQuery tables.
 
-        Queries BigQuery for successful search events where results were returned,
+        Selects successful search events where results were returned,
         extracting search terms and user interaction data.
 
         Args:
@@ -431,7 +1065,7 @@ class BigQueryClient:
             end_date: End date in YYYY-MM-DD format.
 
         Returns:
-            list[dict[str, Any]]: List of view_search_results event dictionaries.
+            str: SQL selecting view_search_results events.
 
         Note:
             - Extracts search_term parameter
@@ -440,7 +1074,7 @@ class BigQueryClient:
         start_suffix = start_date.replace("-", "")
         end_suffix = end_date.replace("-", "")
 
-        query = f"""
+        return f"""
         SELECT
             event_date,
             CAST(event_timestamp AS STRING) as event_timestamp,
@@ -472,16 +1106,11 @@ class BigQueryClient:
         ORDER BY event_timestamp
         """
 
-        df = self._execute_query(query)
-        return df.to_dict("records")
-
-    def _extract_no_search_results_events(
-        self, start_date: str, end_date: str
-    ) -> list[dict[str, Any]]:
+    def _build_no_search_results_query(self, start_date: str, end_date: str) -> str:
         """
-        Extract no_search_results events from GA4 BigQuery tables.
+        Build the no_search_results extraction query for GA4 BigQuery tables.
 
-        Queries BigQuery for failed search events where no results were returned,
+        Selects failed search events where no results were returned,
         extracting search terms for search optimization analysis.
 
         Args:
@@ -489,7 +1118,7 @@ class BigQueryClient:
             end_date: End date in YYYY-MM-DD format.
 
         Returns:
-            list[dict[str, Any]]: List of no_search_results event dictionaries.
+            str: SQL selecting no_search_results events.
 
         Note:
             - Handles both 'no_search_results' and 'view_search_results_no_results' events
@@ -499,7 +1128,7 @@ class BigQueryClient:
         start_suffix = start_date.replace("-", "")
         end_suffix = end_date.replace("-", "")
 
-        query = f"""
+        return f"""
         SELECT
             event_date,
             CAST(event_timestamp AS STRING) as event_timestamp,
@@ -531,16 +1160,11 @@ class BigQueryClient:
         ORDER BY event_timestamp
         """
 
-        df = self._execute_query(query)
-        return df.to_dict("records")
-
-    def _extract_view_item_events(
-        self, start_date: str, end_date: str
-    ) -> list[dict[str, Any]]:
+    def _build_view_item_query(self, start_date: str, end_date: str) -> str:
         """
-        Extract view_item events from GA4 BigQuery tables.
+        Build the view_item extraction query for GA4 BigQuery tables.
 
-        Queries BigQuery for product detail page view events, extracting
+        Selects product detail page view events, extracting
         product information and user interaction data.
 
         Args:
@@ -548,7 +1172,7 @@ class BigQueryClient:
             end_date: End date in YYYY-MM-DD format.
 
         Returns:
-            list[dict[str, Any]]: List of view_item event dictionaries.
+            str: SQL selecting view_item events.
 
         Note:
             - Extracts product details from items array
@@ -558,7 +1182,7 @@ class BigQueryClient:
         start_suffix = start_date.replace("-", "")
         end_suffix = end_date.replace("-", "")
 
-        query = f"""
+        return f"""
         SELECT
             event_date,
             CAST(event_timestamp AS STRING) as event_timestamp,
@@ -594,6 +1218,3 @@ class BigQueryClient:
         AND event_name = 'view_item'
         ORDER BY event_timestamp
         """
-
-        df = self._execute_query(query)
-        return df.to_dict("records")
@@ -0,0 +1,193 @@
+"""
+Local cache of SFTP files for the Functions worker.
+
+The locations workbook on a tenant's SFTP server changes rarely, but every
+ingestion job used to download, parse and upsert it again. An entry here
+records the remote file's size and modification time (and a SHA-256 of its
+content) together with the parsed, normalized rows that were last written to
+the tenant database. SFTPClient compares a fresh `stat` against the entry and
+skips the download - and the ingestion service skips the upsert - when the
+file is unchanged.
+
+Entries live on the instance's local disk, so a new instance starts cold and
+does one full download and upsert. They expire after INGESTION_SFTP_CACHE_TTL
+seconds, which bounds how long out-of-band changes to the locations table
+(e.g. a cleared tenant database) go unrepaired.
+
+Entries are plain JSON (dates and datetimes are tagged so they round-trip),
+never a format that can execute code when read, and the cache directory is
+created private to the worker's user. A directory owned by another user or
+writable by others is not used.
+"""
+
+import contextlib
+from datetime import date, datetime
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import stat
+import tempfile
+import time
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Directory for cache entries (default: a folder in the system temp directory)
+CACHE_DIR = os.getenv("INGESTION_SFTP_CACHE_DIR") or str(
+    Path(tempfile.gettempdir()) / "ga-sftp-cache"
+)
+
+# Seconds an entry is trusted before the file is downloaded and upserted again
+CACHE_TTL = int(os.getenv("INGESTION_SFTP_CACHE_TTL", "86400"))
+
+
+def cache_key(*parts: Any) -> str:
+    """
+    Build a cache key from identifying parts.
+
+    Args:
+        *parts: Values identifying the cached file, e.g. tenant ID, host,
+            username and remote path.
+
+    Returns:
+        str: Hex digest usable as a file name.
+    """
+    return hashlib.sha256("\0".join(str(p) for p in parts).encode()).hexdigest()
+
+
+def _encode(value: Any) -> Any:
+    """JSON encoder hook for the date and datetime values of parsed rows."""
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    msg = f"Cannot cache value of type {type(value).__name__}"
+    raise TypeError(msg)
+
+
+def _decode(obj: dict[str, Any]) -> Any:
+    """JSON object hook reversing _encode()."""
+    if len(obj) == 1:
+        if "__datetime__" in obj:
+            return datetime.fromisoformat(obj["__datetime__"])
+        if "__date__" in obj:
+            return date.fromisoformat(obj["__date__"])
+    return obj
+
+
+class SFTPFileCache:
+    """
+    JSON-file store of SFTP cache entries.
+
+    An entry is a dictionary with the remote ``size`` and ``mtime``, the
+    ``sha256`` of the downloaded content (None when hashing is disabled) and
+    the parsed ``rows``. store() adds ``stored_at`` unless the entry already
+    has one, which load() compares against the TTL. Reads and writes
+    block and should run off the event loop.
+
+    Attributes:
+        directory: Directory holding one file per entry.
+        ttl: Seconds after which load() ignores an entry (0: never expire).
+
+    Example:
+        >>> cache = SFTPFileCache()
+        >>> key = cache_key(tenant_id, "sftp.example.com", "/data/Locations_List.xlsx")
+        >>> entry = cache.load(key)  # None on the first run
+    """
+
+    def __init__(self, directory: str | Path = CACHE_DIR, ttl: int = CACHE_TTL) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            directory: Directory for entries, created private (0700) on
+                first store().
+            ttl: Seconds an entry stays valid (0: never expire).
+        """
+        self.directory = Path(directory)
+        self.ttl = ttl
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _is_private(self) -> bool:
+        """Whether the directory is owned by this user and not writable by others."""
+        info = self.directory.stat()
+        if hasattr(os, "getuid") and info.st_uid != os.getuid():
+            logger.warning(
+                f"SFTP cache directory {self.directory} is owned by another user; "
+                "not using it"
+            )
+            return False
+        if info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            logger.warning(
+                f"SFTP cache directory {self.directory} is writable by other users; "
+                "not using it"
+            )
+            return False
+        return True
+
+    def load(self, key: str) -> dict[str, Any] | None:
+        """
+        Read an entry.
+
+        Args:
+            key: Entry key (see cache_key()).
+
+        Returns:
+            dict[str, Any] | None: The entry, or None if it is missing,
+            expired or unreadable.
+        """
+        path = self._path(key)
+        try:
+            if not self._is_private():
+                return None
+            with path.open(encoding="utf-8") as f:
+                entry = json.load(f, object_hook=_decode)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable SFTP cache entry {path}: {e}")
+            self.discard(key)
+            return None
+
+        if self.ttl and time.time() - entry.get("stored_at", 0) > self.ttl:
+            logger.info(f"SFTP cache entry {key[:12]} expired")
+            return None
+        return entry
+
+    def store(self, key: str, entry: dict[str, Any]) -> None:
+        """
+        Write an entry, replacing any previous one atomically.
+
+        Args:
+            key: Entry key (see cache_key()).
+            entry: Entry with size, mtime, sha256, rows and optionally
+                stored_at.
+        """
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if not self._is_private():
+            return
+        # An entry refreshed without re-upserting keeps its original age
+        entry = {"stored_at": time.time(), **entry}
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, default=_encode)
+            Path(temp_path).replace(self._path(key))
+        except Exception:
+            with contextlib.suppress(OSError):
+                Path(temp_path).unlink()
+            raise
+
+    def discard(self, key: str) -> None:
+        """
+        Remove an entry if it exists.
+
+        Args:
+            key: Entry key (see cache_key()).
+        """
+        with contextlib.suppress(FileNotFoundError):
+            self._path(key).unlink()
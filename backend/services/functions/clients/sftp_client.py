@@ -7,16 +7,179 @@ synchronous methods suitable for Azure Functions activity execution.
 
 import builtins
 import contextlib
+import copy
+import hashlib
+import os
 from pathlib import Path
 import tempfile
+import threading
 from typing import Any
 
 import logging
 import pandas as pd
 import paramiko
+from shared.dataframes import dataframe_records
+
+try:
+    import python_calamine
+except ImportError:  # Rust Excel reader not installed: openpyxl only
+    python_calamine = None
 
 logger = logging.getLogger(__name__)
 
+# Excel reader for location sheets: "auto" uses calamine (a Rust reader, much
+# faster than openpyxl on large sheets) when python-calamine is installed and
+# pandas supports it (2.2+), otherwise pandas' default engine.
+EXCEL_ENGINE = os.getenv("INGESTION_EXCEL_ENGINE", "auto").lower()
+
+# When a file's size or mtime changed, also compare a SHA-256 of the download
+# against the cached one, so a re-exported but identical file is not parsed
+# and upserted again.
+CACHE_VERIFY_HASH = os.getenv("INGESTION_SFTP_CACHE_HASH", "true").lower() == "true"
+
+
+def _excel_engine() -> str | None:
+    """Resolve INGESTION_EXCEL_ENGINE to a pandas engine name (None: default)."""
+    if EXCEL_ENGINE != "auto":
+        return EXCEL_ENGINE
+    pandas_version = tuple(int(part) for part in pd.__version__.split(".")[:2])
+    if python_calamine is not None and pandas_version >= (2, 2):
+        return "calamine"
+    return None
+
+
+def read_locations_sheet(path: str) -> pd.DataFrame:
+    """
+    Read the locations sheet of an Excel workbook.
+
+    The workbook is opened once; the "Locations" sheet is read if present
+    and not empty, otherwise the first sheet. If the preferred engine cannot open the file,
+    pandas' default engine is tried.
+
+    Args:
+        path: Local path of the workbook.
+
+    Returns:
+        pd.DataFrame: The sheet's rows (may be empty).
+    """
+    engine = _excel_engine()
+    try:
+        workbook = pd.ExcelFile(path, engine=engine)
+    except Exception as e:
+        if engine is None:
+            raise
+        logger.warning(f"Excel engine {engine!r} failed, using pandas default: {e}")
+        engine = None
+        workbook = pd.ExcelFile(path)
+
+    with workbook:
+        sheet = "Locations" if "Locations" in workbook.sheet_names else 0
+        df = workbook.parse(sheet_name=sheet)
+        if df.empty and sheet != 0 and workbook.sheet_names[0] != sheet:
+            sheet = 0
+            df = workbook.parse(sheet_name=sheet)
+    logger.info(
+        f"Read locations data from sheet {sheet!r} ({engine or 'default'} engine)"
+    )
+    return df
+
+
+def parse_locations_file(path: str) -> pd.DataFrame:
+    """
+    Read a downloaded locations workbook and normalize it to the database schema.
+
+    Args:
+        path: Local path of the workbook.
+
+    Returns:
+        pd.DataFrame: Location rows with columns among warehouse_id,
+        warehouse_code, warehouse_name, city, state, country, address1,
+        address2 and zip. ID, code and zip are strings; rows without a
+        warehouse_id are dropped.
+
+    Raises:
+        ValueError: If the workbook cannot be read or has no rows.
+    """
+    df = None
+    try:
+        df = read_locations_sheet(path)
+    except Exception as e:
+        logger.debug(f"Reading locations workbook failed: {e}")
+
+    if df is None or df.empty:
+        msg = "Could not read locations data from Excel file"
+        raise ValueError(msg)
+
+    # Rename columns to match database schema
+    rename_map = {
+        "WAREHOUSE_ID": "warehouse_id",
+        "WAREHOUSE_CODE": "warehouse_code",
+        "WAREHOUSE_NAME": "warehouse_name",
+        "LOCATION_NAME": "warehouse_name",
+        "CITY": "city",
+        "STATE": "state",
+        "PROVINCE": "state",
+        "COUNTRY": "country",
+        "ADDRESS1": "address1",
+        "ADDRESS": "address1",
+        "ADDRESS2": "address2",
+        "ZIP_CODE": "zip",
+        "POSTAL_CODE": "zip",
+        "ZIP": "zip",
+    }
+
+    rename_dict = {}
+    for old_col, new_col in rename_map.items():
+        if old_col in df.columns:
+            rename_dict[old_col] = new_col
+
+    df = df.rename(columns=rename_dict)
+
+    # Keep only columns that match the database schema
+    db_columns = [
+        "warehouse_id",
+        "warehouse_code",
+        "warehouse_name",
+        "city",
+        "state",
+        "country",
+        "address1",
+        "address2",
+        "zip",
+    ]
+
+    available_cols = [col for col in db_columns if col in df.columns]
+
+    if available_cols:
+        df = df[available_cols]
+
+    # Convert ID and code fields to strings
+    string_fields = ["warehouse_id", "warehouse_code", "zip"]
+
+    for field in string_fields:
+        if field in df.columns:
+            df[field] = df[field].astype(str)
+            df.loc[df[field] == "nan", field] = None
+
+    # Ensure warehouse_id is present and valid
+    if "warehouse_id" in df.columns:
+        df = df.dropna(subset=["warehouse_id"])
+        df = df[df["warehouse_id"].str.strip() != ""]
+
+    logger.info(
+        f"Successfully processed {len(df)} locations with columns: {list(df.columns)}"
+    )
+    return df
+
+
+def _file_sha256(path: str) -> str:
+    """SHA-256 hex digest of a local file, read in 1 MiB chunks."""
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 
 class SFTPClient:
     """
@@ -79,6 +242,11 @@ class SFTPClient:
         self.remote_path = sftp_config.get("remote_path", "")
         self.locations_file = sftp_config.get("locations_file", "Locations_List.xlsx")
 
+        # Open SSH connections, closed from another thread by cancel()
+        self._connections_lock = threading.Lock()
+        self._connections: set[paramiko.SSHClient] = set()
+        self._cancelled = threading.Event()
+
         if not all([self.host, self.username, self.password]):
             logger.warning(
                 "SFTP configuration incomplete, SFTP operations will be disabled"
@@ -106,9 +274,16 @@ class SFTPClient:
             - Disables agent and key lookups for explicit credential use
             - Connection must be closed by caller using returned SSH client
         """
+        if self._cancelled.is_set():
+            msg = "SFTP download was cancelled"
+            raise RuntimeError(msg)
+
+        ssh_client = None
         try:
             ssh_client = paramiko.SSHClient()
             ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            with self._connections_lock:
+                self._connections.add(ssh_client)
 
             connect_params = {
                 "hostname": self.host,
@@ -133,6 +308,11 @@ class SFTPClient:
 
         except Exception as e:
             logger.error(f"Failed to create SFTP connection: {e}")
+            if ssh_client:
+                with self._connections_lock:
+                    self._connections.discard(ssh_client)
+                with contextlib.suppress(builtins.BaseException):
+                    ssh_client.close()
             raise
 
     def _build_remote_path(self, filename: str | None = None) -> str:
@@ -190,6 +370,32 @@ class SFTPClient:
             >>> # Use temp_path...
             >>> Path(temp_path).unlink()  # Cleanup
         """
+        _, temp_path = self._download_if_changed_sync(remote_filename)
+        return temp_path
+
+    def _download_if_changed_sync(
+        self, remote_filename: str, cached: dict[str, Any] | None = None
+    ) -> tuple[dict[str, Any], str | None]:
+        """
+        Stat a remote file and download it unless it matches a cache entry.
+
+        Stat and download share one connection. The file counts as unchanged
+        when its size and modification time both equal those of ``cached``.
+
+        Args:
+            remote_filename: Name of the file on the SFTP server.
+            cached: Cache entry with ``size`` and ``mtime`` (None: always
+                download).
+
+        Returns:
+            tuple[dict[str, Any], str | None]: The remote ``size`` and
+            ``mtime``, and the path of the downloaded temporary file, or None
+            if the file is unchanged. The caller removes the temporary file.
+
+        Raises:
+            Exception: If stat or download fails, the file is empty, or
+                connection errors occur.
+        """
         ssh_client = None
         sftp_client = None
         temp_path = None
@@ -197,12 +403,26 @@ class SFTPClient:
         try:
             ssh_client, sftp_client = self._create_connection()
 
+            remote_path = self._build_remote_path(remote_filename)
+            attrs = sftp_client.stat(remote_path)
+            remote_state = {"size": attrs.st_size, "mtime": attrs.st_mtime}
+
+            if (
+                cached is not None
+                and remote_state["mtime"] is not None
+                and cached.get("size") == remote_state["size"]
+                and cached.get("mtime") == remote_state["mtime"]
+            ):
+                logger.info(
+                    f"{remote_path} unchanged ({remote_state['size']} bytes, "
+                    f"mtime {remote_state['mtime']}), skipping download"
+                )
+                return remote_state, None
+
             temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx")
             temp_path = temp_file.name
             temp_file.close()
 
-            remote_path = self._build_remote_path(remote_filename)
-
             logger.info(f"Downloading {remote_path} to {temp_path}")
 
             sftp_client.get(remote_path, temp_path)
@@ -215,7 +435,7 @@ class SFTPClient:
             logger.info(
                 f"Successfully downloaded {remote_filename} ({temp_path_obj.stat().st_size} bytes)"
             )
-            return temp_path
+            return remote_state, temp_path
 
         except Exception as e:
             logger.error(f"Error downloading file {remote_filename}: {e}")
@@ -229,9 +449,62 @@ class SFTPClient:
                 with contextlib.suppress(builtins.BaseException):
                     sftp_client.close()
             if ssh_client:
+                with self._connections_lock:
+                    self._connections.discard(ssh_client)
                 with contextlib.suppress(builtins.BaseException):
                     ssh_client.close()
 
+    def cache_identity(self, remote_filename: str) -> tuple[Any, ...]:
+        """
+        Identify a remote file for cache keys.
+
+        Args:
+            remote_filename: Name of the file on the SFTP server.
+
+        Returns:
+            tuple[Any, ...]: Host, port, username and full remote path.
+        """
+        return (
+            self.host,
+            self.port,
+            self.username,
+            self._build_remote_path(remote_filename),
+        )
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancel() was called; a cancelled client cannot be reused."""
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        """
+        Close every open connection of this client and refuse new ones.
+
+        Safe to call from any thread: a worker thread blocked in a transfer
+        gets an error from paramiko and cleans up its temporary file.
+        """
+        self._cancelled.set()
+        with self._connections_lock:
+            connections = list(self._connections)
+        for ssh_client in connections:
+            with contextlib.suppress(builtins.BaseException):
+                ssh_client.close()
+        if connections:
+            logger.info(f"Closed {len(connections)} SFTP connections")
+
+    def fork(self) -> "SFTPClient":
+        """
+        Return a client for a single job with the same configuration.
+
+        The fork opens and tracks its own connections, so cancelling it
+        (e.g. on a job timeout) closes only that job's transfers.
+        """
+        forked = copy.copy(self)
+        forked._connections_lock = threading.Lock()
+        forked._connections = set()
+        forked._cancelled = threading.Event()
+        return forked
+
     def _get_locations_data_sync(self) -> pd.DataFrame:
         """
         Download and parse locations data Excel file from SFTP server.
@@ -249,9 +522,8 @@ class SFTPClient:
             ValueError: If file cannot be read or parsed, or if no valid data found.
 
         Note:
-            - Tries multiple parsing strategies:
-              1. Sheet named "Locations"
-              2. First sheet directly
+            - Reads the sheet named "Locations", or the first sheet, parsing
+              the workbook once (see read_locations_sheet() for the engine)
             - Normalizes column names from various source formats
             - Converts warehouse_id and codes to strings
             - Filters out records without warehouse_id
@@ -267,91 +539,69 @@ class SFTPClient:
 
         try:
             temp_path = self._download_file_sync(self.locations_file)
+            return parse_locations_file(temp_path)
 
-            df = None
-
-            # Strategy 1: Try with 'Locations' sheet
-            try:
-                df = pd.read_excel(temp_path, sheet_name="Locations")
-                logger.info("Successfully read locations data with 'Locations' sheet")
-            except Exception as e:
-                logger.debug(f"Strategy 1 failed: {e}")
-
-            # Strategy 2: Try first sheet directly
-            if df is None or df.empty:
-                try:
-                    df = pd.read_excel(temp_path)
-                    logger.info("Successfully read locations data from first sheet")
-                except Exception as e:
-                    logger.debug(f"Strategy 2 failed: {e}")
-
-            if df is None or df.empty:
-                msg = "Could not read locations data from Excel file"
-                raise ValueError(msg)
-
-            # Rename columns to match database schema
-            rename_map = {
-                "WAREHOUSE_ID": "warehouse_id",
-                "WAREHOUSE_CODE": "warehouse_code",
-                "WAREHOUSE_NAME": "warehouse_name",
-                "LOCATION_NAME": "warehouse_name",
-                "CITY": "city",
-                "STATE": "state",
-                "PROVINCE": "state",
-                "COUNTRY": "country",
-                "ADDRESS1": "address1",
-                "ADDRESS": "address1",
-                "ADDRESS2": "address2",
-                "ZIP_CODE": "zip",
-                "POSTAL_CODE": "zip",
-                "ZIP": "zip",
-            }
-
-            rename_dict = {}
-            for old_col, new_col in rename_map.items():
-                if old_col in df.columns:
-                    rename_dict[old_col] = new_col
-
-            df = df.rename(columns=rename_dict)
+        except Exception as e:
+            logger.error(f"Error getting locations data: {e}")
+            raise
 
-            # Keep only columns that match the database schema
-            db_columns = [
-                "warehouse_id",
-                "warehouse_code",
-                "warehouse_name",
-                "city",
-                "state",
-                "country",
-                "address1",
-                "address2",
-                "zip",
-            ]
+        finally:
+            if temp_path and Path(temp_path).exists():
+                with contextlib.suppress(builtins.BaseException):
+                    Path(temp_path).unlink()
 
-            available_cols = [col for col in db_columns if col in df.columns]
+    def _get_locations_update_sync(
+        self, cached: dict[str, Any] | None
+    ) -> tuple[dict[str, Any], bool]:
+        """
+        Fetch the locations file unless it is unchanged since a cache entry.
 
-            if available_cols:
-                df = df[available_cols]
+        Stats the remote file and downloads it only if its size or mtime
+        differ from ``cached``. A downloaded file whose SHA-256 equals the
+        cached one (INGESTION_SFTP_CACHE_HASH) is not parsed again either.
 
-            # Convert ID and code fields to strings
-            string_fields = ["warehouse_id", "warehouse_code", "zip"]
+        Args:
+            cached: Entry from SFTPFileCache with size, mtime, sha256 and
+                rows, or None.
 
-            for field in string_fields:
-                if field in df.columns:
-                    df[field] = df[field].astype(str)
-                    df.loc[df[field] == "nan", field] = None
+        Returns:
+            tuple[dict[str, Any], bool]: The entry describing the current
+            remote file (size, mtime, sha256 and the parsed, normalized rows)
+            and whether its rows differ from ``cached``. When unchanged, the
+            rows are those of ``cached``.
 
-            # Ensure warehouse_id is present and valid
-            if "warehouse_id" in df.columns:
-                df = df.dropna(subset=["warehouse_id"])
-                df = df[df["warehouse_id"].str.strip() != ""]
+        Raises:
+            ValueError: If a changed file cannot be read or parsed.
+            Exception: Network, authentication or missing-file errors.
+        """
+        temp_path = None
 
-            logger.info(
-                f"Successfully processed {len(df)} locations with columns: {list(df.columns)}"
+        try:
+            remote_state, temp_path = self._download_if_changed_sync(
+                self.locations_file, cached
             )
-            return df
+            if temp_path is None:
+                return {**cached, **remote_state}, False
+
+            digest = None
+            if CACHE_VERIFY_HASH:
+                digest = _file_sha256(temp_path)
+                if cached is not None and cached.get("sha256") == digest:
+                    logger.info(
+                        f"{self.locations_file} content unchanged (sha256 match), skipping parse"
+                    )
+                    return {**cached, **remote_state}, False
+
+            df = parse_locations_file(temp_path)
+            entry = {
+                **remote_state,
+                "sha256": digest,
+                "rows": dataframe_records(df),
+            }
+            return entry, True
 
         except Exception as e:
-            logger.error(f"Error getting locations data: {e}")
+            logger.exception(f"Error getting locations data: {e}")
             raise
 
         finally:
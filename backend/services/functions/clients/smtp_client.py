@@ -0,0 +1,229 @@
+"""
+SMTP delivery client for Azure Functions.
+
+Keeps a small pool of authenticated SMTP sessions per email job and sends
+messages on worker threads, so report delivery neither reconnects for every
+email nor blocks the event loop.
+"""
+
+import asyncio
+import builtins
+import contextlib
+from email.message import Message
+import logging
+import os
+import smtplib
+import time
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Authenticated SMTP sessions kept open per email job.
+SMTP_POOL_SIZE = int(os.getenv("EMAIL_SMTP_POOL_SIZE", "3"))
+
+# Messages per minute sent to one SMTP server (0 = unlimited). Tenants can
+# override it with "rate_limit_per_minute" in their email configuration.
+SMTP_RATE_LIMIT = float(os.getenv("EMAIL_SMTP_RATE_LIMIT_PER_MINUTE", "0"))
+
+# Retries after a transient (4xx) reply or a dropped connection.
+SMTP_MAX_RETRIES = int(os.getenv("EMAIL_SMTP_MAX_RETRIES", "3"))
+SMTP_RETRY_BACKOFF = float(os.getenv("EMAIL_SMTP_RETRY_BACKOFF_SECONDS", "2"))
+
+SMTP_TIMEOUT = 60
+
+
+class _RateLimiter:
+    """Spaces sends to one server evenly at ``rate_per_minute``."""
+
+    def __init__(self, rate_per_minute: float) -> None:
+        self.interval = 60.0 / rate_per_minute if rate_per_minute > 0 else 0.0
+        self._next_slot = 0.0
+
+    async def wait(self) -> None:
+        """Sleep until this caller's send slot."""
+        if not self.interval:
+            return
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+# (server, port) -> limiter shared by every pool on the warm instance
+_rate_limiters: dict[tuple[str, int], _RateLimiter] = {}
+
+
+def is_transient_smtp_error(error: BaseException) -> bool:
+    """
+    Whether an SMTP error is worth retrying.
+
+    Args:
+        error: Exception raised while sending.
+
+    Returns:
+        bool: True for 4xx replies, recipients refused only with 4xx codes,
+        and dropped connections.
+    """
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in error.recipients.values()]
+        return bool(codes) and all(400 <= code < 500 for code in codes)
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return isinstance(error, (ConnectionError, TimeoutError))
+
+
+class SMTPDeliveryPool:
+    """
+    Pool of reusable, authenticated SMTP sessions for one email job.
+
+    Sessions are opened lazily (connect, STARTTLS, login) up to ``size`` and
+    returned to the pool after each message. smtplib calls run in worker
+    threads via asyncio.to_thread; a session is only used by one send at a
+    time. Sends to the same server are rate limited across pools, and
+    transient failures are retried with exponential backoff on a fresh
+    session.
+
+    Attributes:
+        config: Tenant email configuration (server, port, username, password,
+            from_address, use_ssl, use_tls, optional rate_limit_per_minute).
+        size: Maximum number of open sessions.
+        max_retries: Retries after a transient failure.
+        sessions_opened: Number of SMTP connections opened so far.
+
+    Example:
+        >>> pool = SMTPDeliveryPool(email_config)
+        >>> try:
+        ...     response = await pool.send(message)
+        ... finally:
+        ...     await pool.close()
+    """
+
+    def __init__(
+        self,
+        config: dict[str, Any],
+        size: int = SMTP_POOL_SIZE,
+        max_retries: int = SMTP_MAX_RETRIES,
+        retry_backoff: float = SMTP_RETRY_BACKOFF,
+    ) -> None:
+        """
+        Initialize the pool without connecting.
+
+        Args:
+            config: Tenant email configuration dictionary.
+            size: Maximum number of open sessions.
+            max_retries: Retries after a transient failure.
+            retry_backoff: Delay before the first retry, doubled each retry.
+        """
+        self.config = config
+        self.size = max(1, size)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.sessions_opened = 0
+
+        port = config.get("port", 587)
+        self.port = int(port) if isinstance(port, str) else port
+        if config.get("use_ssl", False) and self.port not in (465, 995):
+            self.port = 465
+        self.server = config["server"]
+
+        rate = float(config.get("rate_limit_per_minute") or SMTP_RATE_LIMIT)
+        key = (self.server, self.port)
+        limiter = _rate_limiters.get(key)
+        if limiter is None or (rate > 0 and limiter.interval != 60.0 / rate):
+            limiter = _rate_limiters[key] = _RateLimiter(rate)
+        self._limiter = limiter
+
+        self._idle: list[smtplib.SMTP] = []
+        self._open = 0
+        self._available = asyncio.Semaphore(self.size)
+
+    async def send(self, message: Message) -> dict[str, Any]:
+        """
+        Send one message, retrying transient failures.
+
+        Args:
+            message: Complete email message with From/To headers.
+
+        Returns:
+            dict[str, Any]: smtplib.send_message() result (refused recipients,
+            empty when every recipient was accepted).
+
+        Raises:
+            smtplib.SMTPException: If the send fails permanently or retries
+                are exhausted.
+        """
+        attempt = 0
+        while True:
+            await self._limiter.wait()
+            async with self._available:
+                session: smtplib.SMTP | None = None
+                try:
+                    # Connect and login failures are retried like send failures
+                    session = await self._checkout()
+                    response = await asyncio.to_thread(session.send_message, message)
+                except Exception as e:
+                    if session is not None:
+                        await self._discard(session)
+                    if attempt >= self.max_retries or not is_transient_smtp_error(e):
+                        raise
+                    error = e
+                else:
+                    self._idle.append(session)
+                    return response
+
+            delay = self.retry_backoff * (2**attempt)
+            attempt += 1
+            logger.warning(
+                f"Transient SMTP error sending to {message['To']} "
+                f"(attempt {attempt}/{self.max_retries}, retrying in {delay:.1f}s): {error}"
+            )
+            await asyncio.sleep(delay)
+
+    async def close(self) -> None:
+        """Quit every idle session."""
+        sessions, self._idle = self._idle, []
+        for session in sessions:
+            await asyncio.to_thread(self._quit, session)
+        self._open -= len(sessions)
+
+    async def _checkout(self) -> smtplib.SMTP:
+        """Take an idle session or open a new one (caller holds a pool slot)."""
+        if self._idle:
+            return self._idle.pop()
+        session = await asyncio.to_thread(self._connect)
+        self._open += 1
+        self.sessions_opened += 1
+        return session
+
+    async def _discard(self, session: smtplib.SMTP) -> None:
+        """Drop a session that may be in an unknown state."""
+        self._open -= 1
+        await asyncio.to_thread(self._quit, session)
+
+    def _connect(self) -> smtplib.SMTP:
+        """Open, secure and authenticate one SMTP session (blocking)."""
+        if self.config.get("use_ssl", False):
+            session: smtplib.SMTP = smtplib.SMTP_SSL(
+                self.server, self.port, timeout=SMTP_TIMEOUT
+            )
+        else:
+            session = smtplib.SMTP(self.server, self.port, timeout=SMTP_TIMEOUT)
+
+        try:
+            if not self.config.get("use_ssl", False) and self.config.get("use_tls", True):
+                session.starttls()
+            if self.config.get("username") and self.config.get("password"):
+                session.login(self.config["username"], self.config["password"])
+        except Exception:
+            self._quit(session)
+            raise
+        return session
+
+    @staticmethod
+    def _quit(session: smtplib.SMTP) -> None:
+        """Close a session, ignoring errors from an already broken connection."""
+        with contextlib.suppress(builtins.BaseException):
+            session.quit()
@@ -1,14 +1,94 @@
 """
 Factory for creating tenant-aware clients using configurations from the database.
+
+Configurations and the clients built from them are cached on the warm
+instance. A configuration is served from memory for TENANT_CLIENT_CACHE_TTL
+seconds and then read again; a client is reused for as long as the
+configuration it was built from keeps the same config_version
+(tenant_config.updated_at, bumped by the auth service when it stores new
+configurations), so credential parsing and HTTP session setup happen once per
+tenant and configuration rather than once per call.
+
+Each call returns a fork() of the cached client: forks share its connections
+and credentials but track their own in-flight work, so one job's timeout or
+cancellation never stops the queries or transfers of another job running for
+the same tenant.
 """
 
+from collections.abc import Awaitable, Callable
 import logging
+import os
+import time
+from typing import Any
 
 from .bigquery_client import BigQueryClient
+from .sftp_client import SFTPClient
 
 logger = logging.getLogger(__name__)
-from .sftp_client import SFTPClient
-from typing import Any
+
+# Seconds a tenant configuration is served from memory; 0 disables caching
+CLIENT_CACHE_TTL = float(os.getenv("TENANT_CLIENT_CACHE_TTL", "300"))
+
+# (kind, tenant_id) -> (loaded at, configuration or None)
+_config_cache: dict[tuple[str, str], tuple[float, dict[str, Any] | None]] = {}
+
+# (kind, tenant_id) -> (config_version, client)
+_client_cache: dict[tuple[str, str], tuple[str, Any]] = {}
+
+
+async def _get_cached_config(
+    kind: str,
+    tenant_id: str,
+    load: Callable[[str], Awaitable[dict[str, Any] | None]],
+) -> dict[str, Any] | None:
+    """Return a tenant configuration from the cache, loading it when expired."""
+    key = (kind, tenant_id)
+    now = time.monotonic()
+    cached = _config_cache.get(key)
+    if cached is not None and now - cached[0] < CLIENT_CACHE_TTL:
+        return cached[1]
+
+    config = await load(tenant_id)
+    if CLIENT_CACHE_TTL > 0:
+        _config_cache[key] = (now, config)
+    return config
+
+
+def _get_cached_client(
+    kind: str,
+    tenant_id: str,
+    config: dict[str, Any],
+    build: Callable[[dict[str, Any]], Any],
+) -> Any:
+    """
+    Return a job-scoped fork of the cached client for a configuration.
+
+    The shared client is rebuilt when the configuration version changed. It
+    is never cancelled itself: cancellation applies to the fork handed out.
+    """
+    key = (kind, tenant_id)
+    version = config.get("config_version")
+    cached = _client_cache.get(key)
+    if cached is not None and version is not None and cached[0] == version:
+        return cached[1].fork()
+
+    client = build(config)
+    if CLIENT_CACHE_TTL > 0 and version is not None:
+        _client_cache[key] = (version, client)
+    return client.fork()
+
+
+def invalidate_tenant_clients(tenant_id: str | None = None) -> None:
+    """
+    Drop cached configurations and clients.
+
+    Args:
+        tenant_id: Tenant whose entries are dropped, or None for all tenants.
+    """
+    for cache in (_config_cache, _client_cache):
+        for key in list(cache):
+            if tenant_id is None or key[1] == tenant_id:
+                del cache[key]
 
 
 async def get_tenant_bigquery_config(tenant_id: str) -> dict[str, Any] | None:
@@ -30,11 +110,14 @@ async def get_tenant_bigquery_config(tenant_id: str) -> dict[str, Any] | None:
         - Uses tenant-specific database connection
         - Returns None if BigQuery is disabled for tenant
         - Configuration is stored encrypted in database
+        - Cached for TENANT_CLIENT_CACHE_TTL seconds; treat as read-only
     """
     from shared.database import create_repository
 
-    repo = create_repository(tenant_id)
-    return await repo.get_tenant_bigquery_config(tenant_id)
+    async def load(tenant_id: str) -> dict[str, Any] | None:
+        return await create_repository(tenant_id).get_tenant_bigquery_config(tenant_id)
+
+    return await _get_cached_config("bigquery", tenant_id, load)
 
 
 async def get_tenant_sftp_config(tenant_id: str) -> dict[str, Any] | None:
@@ -56,11 +139,14 @@ async def get_tenant_sftp_config(tenant_id: str) -> dict[str, Any] | None:
         - Uses tenant-specific database connection
         - Returns None if SFTP is disabled for tenant
         - Configuration is stored encrypted in database
+        - Cached for TENANT_CLIENT_CACHE_TTL seconds; treat as read-only
     """
     from shared.database import create_repository
 
-    repo = create_repository(tenant_id)
-    return await repo.get_tenant_sftp_config(tenant_id)
+    async def load(tenant_id: str) -> dict[str, Any] | None:
+        return await create_repository(tenant_id).get_tenant_sftp_config(tenant_id)
+
+    return await _get_cached_config("sftp", tenant_id, load)
 
 
 async def get_tenant_bigquery_client(tenant_id: str) -> BigQueryClient | None:
@@ -87,6 +173,9 @@ async def get_tenant_bigquery_client(tenant_id: str) -> BigQueryClient | None:
         - Returns None gracefully if BigQuery not configured for tenant
         - Errors are logged but don't raise exceptions
         - Client is ready for immediate use after creation
+        - The client's connections are shared with later calls on the warm
+          instance until the tenant's configuration version changes; its
+          cancellation is scoped to the caller
 
     Example:
         >>> client = await get_tenant_bigquery_client(tenant_id)
@@ -100,7 +189,7 @@ async def get_tenant_bigquery_client(tenant_id: str) -> BigQueryClient | None:
             logger.error(f"BigQuery configuration not found for tenant {tenant_id}")
             return None
 
-        return BigQueryClient(bigquery_config)
+        return _get_cached_client("bigquery", tenant_id, bigquery_config, BigQueryClient)
 
     except Exception as e:
         logger.error(f"Failed to create BigQuery client for tenant {tenant_id}: {e}")
@@ -129,6 +218,9 @@ async def get_tenant_sftp_client(tenant_id: str) -> SFTPClient | None:
         - Returns None gracefully if SFTP not configured for tenant
         - Errors are logged but don't raise exceptions
         - Client is ready for immediate use after creation
+        - The client's connections are shared with later calls on the warm
+          instance until the tenant's configuration version changes; its
+          cancellation is scoped to the caller
 
     Example:
         >>> client = await get_tenant_sftp_client(tenant_id)
@@ -142,7 +234,7 @@ async def get_tenant_sftp_client(tenant_id: str) -> SFTPClient | None:
             logger.error(f"SFTP configuration not found for tenant {tenant_id}")
             return None
 
-        return SFTPClient(sftp_config)
+        return _get_cached_client("sftp", tenant_id, sftp_config, SFTPClient)
 
     except Exception as e:
         logger.error(f"Failed to create SFTP client for tenant {tenant_id}: {e}")
@@ -150,7 +150,8 @@ async def process_ingestion_job(msg: func.QueueMessage) -> None:
             "tenant_id": "550e8400-e29b-41d4-a716-446655440000",
             "start_date": "2024-01-01",
             "end_date": "2024-01-07",
-            "data_types": ["events", "users"]
+            "data_types": ["events", "users"],
+            "incremental": false
         }
     """
     try:
@@ -161,6 +162,7 @@ async def process_ingestion_job(msg: func.QueueMessage) -> None:
         start_date = date.fromisoformat(message_body["start_date"])
         end_date = date.fromisoformat(message_body["end_date"])
         data_types = message_body["data_types"]
+        incremental = message_body.get("incremental", False)
 
         logging.info(
             f"Processing ingestion job {job_id} for tenant {tenant_id} from queue"
@@ -172,7 +174,10 @@ async def process_ingestion_job(msg: func.QueueMessage) -> None:
 
         # Create request object
         request = CreateIngestionJobRequest(
-            start_date=start_date, end_date=end_date, data_types=data_types
+            start_date=start_date,
+            end_date=end_date,
+            data_types=data_types,
+            incremental=incremental,
         )
 
         # Process the job
@@ -254,7 +259,8 @@ async def process_email_job(msg: func.QueueMessage) -> None:
         )
 
         logging.info(
-            f"Successfully processed email job {job_id}: {result.get('emails_sent', 0)} emails sent"
+            f"Successfully processed email job {job_id}: {result.get('emails_sent', 0)} emails sent, "
+            f"{result.get('report_builds_avoided', 0)} report builds avoided"
         )
 
     except Exception as e:
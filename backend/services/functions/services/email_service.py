@@ -5,22 +5,25 @@ Adapted from the FastAPI analytics_service for use in serverless Azure Functions
 Handles sending branch reports via SMTP.
 """
 
-import builtins
-import contextlib
+import asyncio
 from datetime import datetime
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from collections import defaultdict
-import smtplib
+import os
 from typing import Any
 
 import logging
+from clients.smtp_client import SMTPDeliveryPool
 from shared.database import create_repository
 
 logger = logging.getLogger(__name__)
 
 from services.report_service import ReportService
 
+# Branches processed concurrently within one email job
+BRANCH_CONCURRENCY = int(os.getenv("EMAIL_BRANCH_CONCURRENCY", "5"))
+
 
 class EmailService:
     """
@@ -100,6 +103,9 @@ class EmailService:
                 - total_emails: Total number of emails attempted
                 - emails_sent: Number of successfully sent emails
                 - emails_failed: Number of failed email attempts
+                - report_builds: Number of branch reports generated
+                - report_builds_avoided: Report requests served from the
+                  per-job (or EMAIL_REPORT_CACHE_TTL) report cache
 
         Raises:
             Exception: If email configuration is missing, no branch mappings found,
@@ -107,11 +113,13 @@ class EmailService:
 
         Note:
             - Job status is updated to "processing" at start
-            - Each branch report is generated independently
+            - Each branch report is generated once and reused for every
+              sales rep mapped to the branch
             - Individual email failures are logged but don't stop the job
             - Job status reflects overall success/failure state
             - Email send history is logged for compliance auditing
-            - SMTP connection is created fresh for each email (stateless)
+            - Up to EMAIL_BRANCH_CONCURRENCY branches are processed at once;
+              emails share a pool of EMAIL_SMTP_POOL_SIZE SMTP sessions
 
         Example:
             >>> result = await service.process_email_job(
@@ -159,14 +167,7 @@ class EmailService:
                 msg = "No branches found to send reports to"
                 raise Exception(msg)
 
-            # Send individual branch reports
-            total_emails = 0
-            emails_sent = 0
-            emails_failed = 0
-
             # Group mappings by branch
-
-
             mappings_by_branch = defaultdict(list)
             for mapping in filtered_mappings:
                 mappings_by_branch[mapping["branch_code"]].append(mapping)
@@ -175,21 +176,29 @@ class EmailService:
                 f"Generating individual branch reports for {len(mappings_by_branch)} branches"
             )
 
-            # Send individual reports for each branch
-            for branch_code, branch_mappings in mappings_by_branch.items():
-                for mapping in branch_mappings:
-                    if mapping.get("is_enabled", True):
-                        total_emails += 1
-
+            # Send branches concurrently over a shared pool of SMTP sessions
+            delivery = SMTPDeliveryPool(email_config)
+            branch_slots = asyncio.Semaphore(max(1, BRANCH_CONCURRENCY))
+
+            async def send_branch(
+                branch_code: str, branch_mappings: list[dict[str, Any]]
+            ) -> tuple[int, int]:
+                async with branch_slots:
+                    sent = failed = 0
+                    for mapping in branch_mappings:
+                        if not mapping.get("is_enabled", True):
+                            continue
                         try:
-                            # Generate full branch report with analytics
+                            # Full branch report with analytics, built once per
+                            # branch and shared by all of its sales reps
                             branch_report_html = (
-                                await self.report_service.generate_branch_report(
+                                await self.report_service.get_branch_report(
                                     tenant_id, branch_code, report_date
                                 )
                             )
 
                             await self._send_branch_email(
+                                delivery,
                                 email_config,
                                 mapping,
                                 branch_report_html,
@@ -198,13 +207,13 @@ class EmailService:
                                 job_id,
                                 tenant_id,
                             )
-                            emails_sent += 1
+                            sent += 1
                             logger.info(
                                 f"Sent branch report to {mapping['sales_rep_email']} for branch: {branch_code}"
                             )
 
                         except Exception as email_error:
-                            emails_failed += 1
+                            failed += 1
                             logger.error(
                                 f"Failed to send branch email to {mapping['sales_rep_email']} for branch {branch_code}: {email_error}"
                             )
@@ -225,6 +234,21 @@ class EmailService:
                                     "error_message": str(email_error),
                                 }
                             )
+                    return sent, failed
+
+            try:
+                results = await asyncio.gather(
+                    *(
+                        send_branch(branch_code, branch_mappings)
+                        for branch_code, branch_mappings in mappings_by_branch.items()
+                    )
+                )
+            finally:
+                await delivery.close()
+
+            emails_sent = sum(sent for sent, _ in results)
+            emails_failed = sum(failed for _, failed in results)
+            total_emails = emails_sent + emails_failed
 
             # Update job completion status
             if emails_failed > 0 and emails_sent > 0:
@@ -246,7 +270,9 @@ class EmailService:
             )
 
             logger.info(
-                f"Email job {job_id} finished with status '{final_status}': {emails_sent}/{total_emails} sent successfully"
+                f"Email job {job_id} finished with status '{final_status}': {emails_sent}/{total_emails} sent successfully "
+                f"({self.report_service.report_builds} reports built, "
+                f"{self.report_service.report_builds_avoided} builds avoided)"
             )
 
             return {
@@ -255,6 +281,8 @@ class EmailService:
                 "total_emails": total_emails,
                 "emails_sent": emails_sent,
                 "emails_failed": emails_failed,
+                "report_builds": self.report_service.report_builds,
+                "report_builds_avoided": self.report_service.report_builds_avoided,
             }
 
         except Exception as e:
@@ -270,6 +298,7 @@ class EmailService:
 
     async def _send_branch_email(
         self,
+        delivery: SMTPDeliveryPool,
         email_config: dict[str, Any],
         mapping: dict[str, Any],
         branch_report_html: str,
@@ -281,12 +310,13 @@ class EmailService:
         """
         Send individual branch report email via SMTP.
 
-        This method creates an HTML email message, connects to the SMTP server
-        using tenant-specific configuration, and sends the branch analytics
-        report to the configured sales representative. The email send attempt
-        is logged to the database for audit purposes.
+        This method creates an HTML email message and sends the branch
+        analytics report to the configured sales representative over a pooled
+        SMTP session. The email send attempt is logged to the database for
+        audit purposes.
 
         Args:
+            delivery: SMTP session pool for the job's email configuration.
             email_config: SMTP server configuration dictionary containing:
                 - server: SMTP server hostname
                 - port: SMTP server port (default: 587)
@@ -307,22 +337,23 @@ class EmailService:
             tenant_id: Tenant ID for database logging.
 
         Returns:
-            None: Email is sent synchronously. Results are logged to database.
+            None: Results are logged to database.
 
         Raises:
             smtplib.SMTPException: If SMTP server connection or send fails.
             Exception: Various SMTP-related errors (authentication, network, etc.)
 
         Note:
-            - SMTP connection is created fresh for each email (stateless)
+            - Sessions are reused across emails of the job (see SMTPDeliveryPool)
+            - Transient 4xx replies are retried with backoff before failing
             - Supports both SSL (port 465) and STARTTLS (port 587) connections
             - Email subject format: "Daily Branch Sales Report - {date} - {branch_code}"
             - Email send history is logged with status "sent" or "failed"
             - SMTP response is captured and stored for debugging
-            - Connection is properly closed even on errors
 
         Example:
             >>> await service._send_branch_email(
+            ...     delivery,
             ...     email_config,
             ...     {"sales_rep_email": "rep@example.com", ...},
             ...     "<html>...</html>",
@@ -345,49 +376,21 @@ class EmailService:
         # Attach HTML content
         msg.attach(MIMEText(branch_report_html, "html"))
 
-        # Send via SMTP
-        smtp_server = None
-        try:
-            # Get port as integer
-            port = email_config.get("port", 587)
-            if isinstance(port, str):
-                port = int(port)
-
-            # Create SMTP connection
-            if email_config.get("use_ssl", False):
-                smtp_server = smtplib.SMTP_SSL(
-                    email_config["server"], port if port in [465, 995] else 465
-                )
-            else:
-                smtp_server = smtplib.SMTP(email_config["server"], port)
-
-                if email_config.get("use_tls", True):
-                    smtp_server.starttls()
-
-            # Login if credentials provided
-            if email_config.get("username") and email_config.get("password"):
-                smtp_server.login(email_config["username"], email_config["password"])
-
-            # Send email
-            smtp_response = smtp_server.send_message(msg)
-
-            # Log successful send
-            await self.repo.log_email_send_history(
-                {
-                    "tenant_id": tenant_id,
-                    "job_id": job_id,
-                    "branch_code": branch_code,
-                    "sales_rep_email": mapping["sales_rep_email"],
-                    "sales_rep_name": mapping.get("sales_rep_name"),
-                    "subject": subject,
-                    "report_date": report_date,
-                    "status": "sent",
-                    "smtp_response": str(smtp_response) if smtp_response else "OK",
-                    "error_message": None,
-                }
-            )
+        # Send via a pooled SMTP session
+        smtp_response = await delivery.send(msg)
 
-        finally:
-            if smtp_server:
-                with contextlib.suppress(builtins.BaseException):
-                    smtp_server.quit()
+        # Log successful send
+        await self.repo.log_email_send_history(
+            {
+                "tenant_id": tenant_id,
+                "job_id": job_id,
+                "branch_code": branch_code,
+                "sales_rep_email": mapping["sales_rep_email"],
+                "sales_rep_name": mapping.get("sales_rep_name"),
+                "subject": subject,
+                "report_date": report_date,
+                "status": "sent",
+                "smtp_response": str(smtp_response) if smtp_response else "OK",
+                "error_message": None,
+            }
+        )
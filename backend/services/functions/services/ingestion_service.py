@@ -6,17 +6,65 @@ Handles BigQuery event and user extraction, and SFTP location downloads.
 """
 
 import asyncio
-from datetime import datetime
+from collections.abc import Callable
+from contextlib import AsyncExitStack, aclosing
+from datetime import date, datetime, timedelta
 import logging
+import os
 from typing import Any
-import numpy as np
-from clients import get_tenant_bigquery_client, get_tenant_bigquery_config, get_tenant_sftp_client
-import pandas as pd
-from shared.database import create_repository
+from clients import (
+    EVENT_TYPES,
+    AsyncBigQueryClient,
+    AsyncSFTPClient,
+    SFTPFileCache,
+    cache_key,
+    get_tenant_bigquery_client,
+    get_tenant_bigquery_config,
+    get_tenant_sftp_client,
+    invalidate_tenant_clients,
+)
+import pyarrow as pa
+import pyarrow.compute as pc
+from shared.database import USER_SYNC_COUNTS, create_repository
+from shared.dataframes import dataframe_records
 from shared.models import CreateIngestionJobRequest
 
 logger = logging.getLogger(__name__)
 
+# Stream events from BigQuery to PostgreSQL batch by batch instead of
+# materializing the whole date range in memory first.
+STREAM_EVENTS = os.getenv("INGESTION_STREAM_EVENTS", "true").lower() == "true"
+
+# Extract all event types with one BigQuery scan (event_name IN (...)) and
+# split rows by type client-side, instead of one query per event type.
+SINGLE_SCAN_EVENTS = (
+    os.getenv("INGESTION_SINGLE_SCAN_EVENTS", "true").lower() == "true"
+)
+
+# How streamed events are fetched: "arrow" reads Arrow record batches through
+# the BigQuery Storage Read API (REST fallback) and loads them columnar,
+# "rows" pages row dictionaries through the REST API.
+EVENT_FETCH_MODES = frozenset({"arrow", "rows"})
+EVENT_FETCH_MODE = os.getenv("INGESTION_EVENT_FETCH_MODE", "arrow").lower()
+
+# Rows per BigQuery page / database write when streaming events.
+EVENT_BATCH_SIZE = int(os.getenv("INGESTION_EVENT_BATCH_SIZE", "10000"))
+
+# Run the events, users and locations steps of a job concurrently instead
+# of one after another.
+CONCURRENT_DATA_TYPES = (
+    os.getenv("INGESTION_CONCURRENT_DATA_TYPES", "true").lower() == "true"
+)
+
+# Stat the SFTP locations file and skip the download and the upsert when its
+# size and mtime (or content hash) match the rows last written on this
+# instance (see clients/sftp_cache.py).
+CONDITIONAL_LOCATIONS_DOWNLOAD = (
+    os.getenv("INGESTION_SFTP_CONDITIONAL_DOWNLOAD", "true").lower() == "true"
+)
+
+NO_RESULTS_MARKER = "No Results Found"
+
 
 class IngestionService:
     """
@@ -107,6 +155,10 @@ class IngestionService:
             )
         except asyncio.TimeoutError:
             logger.error(f"Job {job_id} timed out after 30 minutes")
+
+            # Don't reuse clients whose connections may be stuck
+            invalidate_tenant_clients(tenant_id)
+
             try:
                 await self.repo.update_job_status(
                     job_id,
@@ -122,6 +174,9 @@ class IngestionService:
             error_msg = str(e)
             logger.exception(f"Job failed: {error_msg}")
 
+            # Don't reuse clients that may hold stale credentials or sessions
+            invalidate_tenant_clients(tenant_id)
+
             if not error_msg or error_msg == "":
                 error_msg = f"Job failed unexpectedly. Please contact administrator with job ID: {job_id}"
 
@@ -159,6 +214,7 @@ class IngestionService:
             dict[str, Any]: Results dictionary containing:
                 - Event type counts (purchase, add_to_cart, page_view, etc.)
                 - users_processed: Number of users successfully processed
+                - users_sync: Users inserted, updated, unchanged and deactivated
                 - locations_processed: Number of locations successfully processed
                 - warnings: List of warning messages for partial failures
 
@@ -169,7 +225,11 @@ class IngestionService:
 
         Note:
             - Job status is updated to "processing" at start
-            - Progress is tracked per data type (events, users, locations)
+            - With INGESTION_CONCURRENT_DATA_TYPES enabled (default) the
+              events, users and locations steps run concurrently and the job
+              fails with the first step error once all steps have finished;
+              otherwise they run in that order and progress is tracked per
+              data type
             - Partial failures result in warnings, not complete failure
             - Job status is updated to "completed" or "failed" at end
             - All database operations use tenant-specific connections
@@ -204,127 +264,41 @@ class IngestionService:
             }
             warnings = []  # Track partial failures
 
-            # Process events from BigQuery
-            if "events" in request.data_types:
-                try:
-                    logger.info(f"Processing events for job {job_id}")
-                    await self.repo.update_job_status(
-                        job_id, "processing", progress={"current": "events"}
-                    )
-                    event_results, event_warnings = await self._process_events_async(tenant_id, request)
-                    results.update(event_results)
-                    warnings.extend(event_warnings)
+            steps = [
+                (data_type, step)
+                for data_type, step in (
+                    ("events", self._ingest_events),
+                    ("users", self._ingest_users),
+                    ("locations", self._ingest_locations),
+                )
+                if data_type in request.data_types
+            ]
 
-                except Exception as e:
-                    logger.error(
-                        f"Failed to extract events from BigQuery: {e}", exc_info=True
-                    )
-                    root_cause = str(e)
-                    if (
-                        "nodename nor servname" in root_cause
-                        or "gaierror" in root_cause
-                    ):
-                        msg = "Failed to extract events from BigQuery - Network/DNS error. Please check BigQuery configuration and network connectivity."
-                        raise Exception(
-                            msg
-                        ) from e
-                    if (
-                        "credentials" in root_cause.lower()
-                        or "authentication" in root_cause.lower()
-                    ):
-                        msg = "Failed to extract events from BigQuery - Authentication error. Please check service account credentials."
-                        raise Exception(
-                            msg
-                        ) from e
-                    msg = f"Failed to extract events from BigQuery - {type(e).__name__}: {e!s}"
-                    raise Exception(
-                        msg
-                    ) from e
-
-            # Process users from BigQuery (or SFTP fallback)
-            if "users" in request.data_types:
-                try:
-                    logger.info(f"Processing users for job {job_id}")
+            if CONCURRENT_DATA_TYPES and len(steps) > 1:
+                await self.repo.update_job_status(
+                    job_id,
+                    "processing",
+                    progress={"current": ", ".join(dt for dt, _ in steps)},
+                )
+                # Let every step finish, then fail with the first error
+                outcomes = await asyncio.gather(
+                    *(step(job_id, tenant_id, request) for _, step in steps),
+                    return_exceptions=True,
+                )
+                for outcome in outcomes:
+                    if isinstance(outcome, BaseException):
+                        raise outcome
+            else:
+                outcomes = []
+                for data_type, step in steps:
                     await self.repo.update_job_status(
-                        job_id, "processing", progress={"current": "users"}
+                        job_id, "processing", progress={"current": data_type}
                     )
-                    users_count, users_errors = await self._process_users(tenant_id)
-                    results["users_processed"] = users_count
-                    if users_errors > 0:
-                        warnings.append(
-                            f"Users: {users_errors} batch errors during upsert"
-                        )
+                    outcomes.append(await step(job_id, tenant_id, request))
 
-                except Exception as e:
-                    logger.error(
-                        f"Failed to process users: {e}", exc_info=True
-                    )
-                    root_cause = str(e)
-                    if (
-                        "nodename nor servname" in root_cause
-                        or "gaierror" in root_cause
-                    ):
-                        msg = "Failed to process users - Network/DNS error. Please check BigQuery/SFTP configuration and network connectivity."
-                        raise Exception(msg) from e
-                    if (
-                        "credentials" in root_cause.lower()
-                        or "authentication" in root_cause.lower()
-                        or "permission denied" in root_cause.lower()
-                    ):
-                        msg = "Failed to process users - Authentication error. Please check service account or SFTP credentials."
-                        raise Exception(msg) from e
-                    msg = f"Failed to process users - {type(e).__name__}: {e!s}"
-                    raise Exception(msg) from e
-
-            # Process locations from SFTP
-            if "locations" in request.data_types:
-                try:
-                    logger.info(f"Processing locations for job {job_id}")
-                    await self.repo.update_job_status(
-                        job_id, "processing", progress={"current": "locations"}
-                    )
-                    locations_count, locations_errors = await self._process_locations(
-                        tenant_id
-                    )
-                    results["locations_processed"] = locations_count
-                    if locations_errors > 0:
-                        warnings.append(
-                            f"Locations: {locations_errors} batch errors during upsert"
-                        )
-
-                except Exception as e:
-                    logger.error(
-                        f"Failed to download/process locations: {e}", exc_info=True
-                    )
-                    root_cause = str(e)
-                    if (
-                        "nodename nor servname" in root_cause
-                        or "gaierror" in root_cause
-                    ):
-                        msg = "Failed to download locations data from SFTP - Network/DNS error. Please verify SFTP hostname in tenant configuration."
-                        raise Exception(
-                            msg
-                        ) from e
-                    if (
-                        "authentication" in root_cause.lower()
-                        or "permission denied" in root_cause.lower()
-                    ):
-                        msg = "Failed to download locations data from SFTP - Authentication error. Please check SFTP credentials."
-                        raise Exception(
-                            msg
-                        ) from e
-                    if (
-                        "no such file" in root_cause.lower()
-                        or "file not found" in root_cause.lower()
-                    ):
-                        msg = "Failed to download locations data from SFTP - File not found. Please verify the file exists on the server."
-                        raise Exception(
-                            msg
-                        ) from e
-                    msg = f"Failed to download locations data from SFTP - {type(e).__name__}: {e!s}"
-                    raise Exception(
-                        msg
-                    ) from e
+            for step_results, step_warnings in outcomes:
+                results.update(step_results)
+                warnings.extend(step_warnings)
 
             if warnings:
                 logger.warning(f"Job {job_id} completed with warnings: {warnings}")
@@ -349,8 +323,177 @@ class IngestionService:
             logger.error(f"Failed processing job {job_id}: {e}")
             raise
 
+    async def _ingest_events(
+        self, job_id: str, tenant_id: str, request: CreateIngestionJobRequest
+    ) -> tuple[dict[str, Any], list[str]]:
+        """
+        Run the events step of a job.
+
+        Args:
+            job_id: Job being run.
+            tenant_id: Tenant ID for multi-tenant isolation.
+            request: Ingestion request of the job.
+
+        Returns:
+            tuple[dict[str, Any], list[str]]: Per-event-type counts and warnings.
+
+        Raises:
+            Exception: Extraction failures, with a message naming the likely cause.
+        """
+        try:
+            logger.info(f"Processing events for job {job_id}")
+            event_results, event_warnings = await self._process_events_async(
+                tenant_id, request, job_id
+            )
+            return event_results, event_warnings
+
+        except Exception as e:
+            logger.error(
+                f"Failed to extract events from BigQuery: {e}", exc_info=True
+            )
+            root_cause = str(e)
+            if (
+                "nodename nor servname" in root_cause
+                or "gaierror" in root_cause
+            ):
+                msg = "Failed to extract events from BigQuery - Network/DNS error. Please check BigQuery configuration and network connectivity."
+                raise Exception(
+                    msg
+                ) from e
+            if (
+                "credentials" in root_cause.lower()
+                or "authentication" in root_cause.lower()
+            ):
+                msg = "Failed to extract events from BigQuery - Authentication error. Please check service account credentials."
+                raise Exception(
+                    msg
+                ) from e
+            msg = f"Failed to extract events from BigQuery - {type(e).__name__}: {e!s}"
+            raise Exception(
+                msg
+            ) from e
+
+    async def _ingest_users(
+        self, job_id: str, tenant_id: str, request: CreateIngestionJobRequest
+    ) -> tuple[dict[str, Any], list[str]]:
+        """
+        Run the users step of a job.
+
+        Args:
+            job_id: Job being run.
+            tenant_id: Tenant ID for multi-tenant isolation.
+            request: Ingestion request of the job.
+
+        Returns:
+            tuple[dict[str, Any], list[str]]: users_processed and users_sync
+            counts, and warnings.
+
+        Raises:
+            Exception: Sync failures, with a message naming the likely cause.
+        """
+        try:
+            logger.info(f"Processing users for job {job_id}")
+            users_counts, users_errors = await self._process_users(tenant_id)
+            results: dict[str, Any] = {}
+            warnings: list[str] = []
+            results["users_processed"] = (
+                users_counts["inserted"]
+                + users_counts["updated"]
+                + users_counts["unchanged"]
+            )
+            results["users_sync"] = users_counts
+            if users_errors > 0:
+                warnings.append(
+                    f"Users: {users_errors} batch errors during upsert"
+                )
+            return results, warnings
+
+        except Exception as e:
+            logger.error(
+                f"Failed to process users: {e}", exc_info=True
+            )
+            root_cause = str(e)
+            if (
+                "nodename nor servname" in root_cause
+                or "gaierror" in root_cause
+            ):
+                msg = "Failed to process users - Network/DNS error. Please check BigQuery/SFTP configuration and network connectivity."
+                raise Exception(msg) from e
+            if (
+                "credentials" in root_cause.lower()
+                or "authentication" in root_cause.lower()
+                or "permission denied" in root_cause.lower()
+            ):
+                msg = "Failed to process users - Authentication error. Please check service account or SFTP credentials."
+                raise Exception(msg) from e
+            msg = f"Failed to process users - {type(e).__name__}: {e!s}"
+            raise Exception(msg) from e
+
+    async def _ingest_locations(
+        self, job_id: str, tenant_id: str, request: CreateIngestionJobRequest
+    ) -> tuple[dict[str, Any], list[str]]:
+        """
+        Run the locations step of a job.
+
+        Args:
+            job_id: Job being run.
+            tenant_id: Tenant ID for multi-tenant isolation.
+            request: Ingestion request of the job.
+
+        Returns:
+            tuple[dict[str, Any], list[str]]: locations_processed and warnings.
+
+        Raises:
+            Exception: Download failures, with a message naming the likely cause.
+        """
+        try:
+            logger.info(f"Processing locations for job {job_id}")
+            locations_count, locations_errors = await self._process_locations(
+                tenant_id
+            )
+            warnings: list[str] = []
+            if locations_errors > 0:
+                warnings.append(
+                    f"Locations: {locations_errors} batch errors during upsert"
+                )
+            return {"locations_processed": locations_count}, warnings
+
+        except Exception as e:
+            logger.error(
+                f"Failed to download/process locations: {e}", exc_info=True
+            )
+            root_cause = str(e)
+            if (
+                "nodename nor servname" in root_cause
+                or "gaierror" in root_cause
+            ):
+                msg = "Failed to download locations data from SFTP - Network/DNS error. Please verify SFTP hostname in tenant configuration."
+                raise Exception(
+                    msg
+                ) from e
+            if (
+                "authentication" in root_cause.lower()
+                or "permission denied" in root_cause.lower()
+            ):
+                msg = "Failed to download locations data from SFTP - Authentication error. Please check SFTP credentials."
+                raise Exception(
+                    msg
+                ) from e
+            if (
+                "no such file" in root_cause.lower()
+                or "file not found" in root_cause.lower()
+            ):
+                msg = "Failed to download locations data from SFTP - File not found. Please verify the file exists on the server."
+                raise Exception(
+                    msg
+                ) from e
+            msg = f"Failed to download locations data from SFTP - {type(e).__name__}: {e!s}"
+            raise Exception(
+                msg
+            ) from e
+
     async def _process_events_async(
-        self, tenant_id: str, request: CreateIngestionJobRequest
+        self, tenant_id: str, request: CreateIngestionJobRequest, job_id: str
     ) -> tuple[dict[str, int], list[str]]:
         """
         Extract and process all event types from BigQuery for the specified date range.
@@ -369,10 +512,12 @@ class IngestionService:
         Args:
             tenant_id: Tenant ID for BigQuery configuration lookup and database routing.
             request: Ingestion request containing start_date, end_date, and data_types.
+            job_id: Job recorded against the ingestion watermarks.
 
         Returns:
             dict[str, int]: Dictionary mapping event type names to record counts.
                           Example: {"purchase": 150, "add_to_cart": 300, ...}
+                          Incremental jobs also report event_days_skipped.
 
         Raises:
             ValueError: If BigQuery configuration is not found for the tenant.
@@ -381,9 +526,18 @@ class IngestionService:
 
         Note:
             - Uses tenant-specific BigQuery credentials from database
-            - Events are extracted for the entire date range in one query per type
-            - Existing events for the date range are deleted before insertion
+            - Events are extracted for the entire date range in one query per
+              type, or in a single scan split client-side when
+              INGESTION_SINGLE_SCAN_EVENTS is enabled (default)
+            - With INGESTION_STREAM_EVENTS enabled (default) results are paged
+              and written in batches of INGESTION_EVENT_BATCH_SIZE rows
+            - Existing events for the date range are replaced atomically
             - Each event type is processed independently (failures don't cascade)
+            - A watermark (row count, max event_timestamp, shard last_modified)
+              is recorded per event type and day; incremental requests only
+              re-extract days whose shard changed or is still intraday
+            - The daily_branch_stats/daily_branch_sessions rollups read by the
+              dashboard are rebuilt for every re-extracted range
             - Raw event data is preserved in JSON format for future analysis
 
         Example:
@@ -392,7 +546,7 @@ class IngestionService:
             ...     end_date=date(2024, 1, 7),
             ...     data_types=["events"]
             ... )
-            >>> results = await service._process_events_async(tenant_id, request)
+            >>> results = await service._process_events_async(tenant_id, request, job_id)
             >>> results["purchase"]
             150
         """
@@ -405,54 +559,90 @@ class IngestionService:
                 raise ValueError(
                     msg
                 )
+            bigquery_client = AsyncBigQueryClient(bigquery_client)
 
-            # Get all events for date range
-            logger.info(
-                f"Starting BigQuery extraction for {request.start_date} to {request.end_date}"
-            )
-            events_by_type = bigquery_client.get_date_range_events(
-                request.start_date.isoformat(), request.end_date.isoformat()
-            )
+            shards = await self._get_event_shards(bigquery_client, request)
 
-            # Reclassify mistagged search events: the GA4 implementation fires
-            # no_search_results for ALL searches on /searchPage.action regardless
-            # of outcome. We use page title to distinguish genuinely failed searches
-            # from successful ones that were mistagged.
-            events_by_type = self._reclassify_search_events(events_by_type)
-
-            results: dict[str, int] = {}
+            results: dict[str, int] = dict.fromkeys(EVENT_TYPES, 0)
             event_warnings: list[str] = []
+            watermarks: list[dict[str, Any]] = []
 
-            async def _insert_event_type_safe(
-                et: str, data: list[dict[str, Any]]
-            ) -> tuple[str, int, str | None]:
+            if request.incremental:
+                ranges, skipped_days = await self._get_stale_event_ranges(
+                    request.start_date, request.end_date, shards
+                )
+                results["event_days_skipped"] = skipped_days
+                logger.info(
+                    f"Incremental ingestion: {skipped_days} unchanged days skipped, "
+                    f"re-extracting {ranges}"
+                )
+            else:
+                ranges = [(request.start_date, request.end_date)]
+
+            for range_start, range_end in ranges:
+                if STREAM_EVENTS:
+                    counts, range_warnings, day_stats = await self._stream_events(
+                        tenant_id, range_start, range_end, bigquery_client
+                    )
+                else:
+                    counts, range_warnings, day_stats = await self._load_events(
+                        tenant_id, range_start, range_end, bigquery_client
+                    )
+
+                for et, count in counts.items():
+                    results[et] += count
+                event_warnings.extend(range_warnings)
+                refresh_failed = False
+
+                # Record which sessions converted before anything reads them
                 try:
-                    if data:
-                        count = await self.repo.replace_event_data(
-                            tenant_id,
-                            et,
-                            request.start_date,
-                            request.end_date,
-                            data,
-                        )
-                        logger.info(f"Processed {count} {et} events")
-                        return et, count, None
-                    logger.info(f"No {et} events found")
-                    return et, 0, None
+                    await self.repo.refresh_converted_sessions(range_start, range_end)
                 except Exception as e:
-                    logger.error(f"Failed to insert {et} events: {e}")
-                    return et, 0, str(e)
+                    logger.exception(f"Failed to refresh converted sessions: {e}")
+                    event_warnings.append(f"converted_sessions: {e}")
+                    refresh_failed = True
 
-            tasks = [
-                _insert_event_type_safe(et, data)
-                for et, data in events_by_type.items()
-            ]
+                # Rebuild the session facts behind history and session tasks
+                try:
+                    await self.repo.refresh_sessions(range_start, range_end)
+                except Exception as e:
+                    logger.exception(f"Failed to refresh sessions: {e}")
+                    event_warnings.append(f"sessions: {e}")
+                    refresh_failed = True
+
+                # Rebuild the dashboard rollups for the days just replaced
+                try:
+                    await self.repo.refresh_daily_branch_stats(range_start, range_end)
+                except Exception as e:
+                    logger.exception(f"Failed to refresh daily branch stats: {e}")
+                    event_warnings.append(f"daily_branch_stats: {e}")
+                    refresh_failed = True
 
-            for coro in asyncio.as_completed(tasks):
-                event_type, count, error = await coro
-                results[event_type] = count
-                if error:
-                    event_warnings.append(f"{event_type}: {error}")
+                # Resolve the users behind identities first seen in this range
+                try:
+                    await self.repo.refresh_user_identities(range_start, range_end)
+                except Exception as e:
+                    logger.exception(f"Failed to refresh user identities: {e}")
+                    event_warnings.append(f"user_identities: {e}")
+                    refresh_failed = True
+
+                range_watermarks = self._build_event_watermarks(
+                    day_stats, range_start, range_end, shards
+                )
+                # Days whose derived tables are stale are recorded without a
+                # source version, so the next incremental run re-extracts and
+                # re-derives them instead of skipping them
+                if refresh_failed:
+                    logger.warning(
+                        f"Marking {range_start} to {range_end} stale: "
+                        "derived table refresh failed"
+                    )
+                    for watermark in range_watermarks:
+                        watermark["source_last_modified"] = None
+                        watermark["source_intraday"] = True
+                watermarks.extend(range_watermarks)
+
+            await self.repo.upsert_event_watermarks(job_id, watermarks)
 
             return results, event_warnings
 
@@ -460,6 +650,348 @@ class IngestionService:
             logger.error(f"Error processing BigQuery events: {e}")
             raise
 
+    async def _load_events(
+        self,
+        tenant_id: str,
+        start_date: date,
+        end_date: date,
+        bigquery_client: AsyncBigQueryClient,
+    ) -> tuple[dict[str, int], list[str], dict[str, dict[date, dict[str, Any]]]]:
+        """
+        Extract every event type into memory, then replace it in the database.
+
+        This is the non-streaming path (INGESTION_STREAM_EVENTS=false).
+
+        Args:
+            tenant_id: Tenant ID for database routing.
+            start_date: First day to replace (inclusive).
+            end_date: Last day to replace (inclusive).
+            bigquery_client: Tenant BigQuery client (async facade).
+
+        Returns:
+            tuple: Per-event-type insert counts, warnings for event types that
+            failed, and per-day stats for event types that were replaced.
+
+        Note:
+            - Event types whose extraction failed are left untouched; event
+              types with no rows are replaced with nothing and get zero-row
+              watermarks, as in the streaming path
+            - view_search_results and no_search_results are left untouched
+              together, since reclassification moves rows between them
+        """
+        logger.info(
+            f"Starting BigQuery extraction for {start_date} to {end_date}"
+        )
+        events_by_type = await bigquery_client.get_date_range_events(
+            start_date.isoformat(), end_date.isoformat(), single_scan=SINGLE_SCAN_EVENTS
+        )
+
+        event_warnings: list[str] = []
+        failed_types = [et for et in EVENT_TYPES if et not in events_by_type]
+        if {"view_search_results", "no_search_results"} & set(failed_types):
+            for et in ("view_search_results", "no_search_results"):
+                if et not in failed_types:
+                    failed_types.append(et)
+                events_by_type.pop(et, None)
+        for et in failed_types:
+            event_warnings.append(f"{et}: BigQuery extraction failed")
+
+        # Reclassify mistagged search events: the GA4 implementation fires
+        # no_search_results for ALL searches on /searchPage.action regardless
+        # of outcome. We use page title to distinguish genuinely failed searches
+        # from successful ones that were mistagged.
+        events_by_type = self._reclassify_search_events(events_by_type)
+
+        results: dict[str, int] = dict.fromkeys(failed_types, 0)
+        day_stats: dict[str, dict[date, dict[str, Any]]] = {}
+
+        async def _insert_event_type_safe(
+            et: str, data: list[dict[str, Any]]
+        ) -> tuple[str, int, str | None]:
+            try:
+                async with self.repo.open_event_writer(
+                    tenant_id, et, start_date, end_date
+                ) as writer:
+                    if data:
+                        await writer.write(data)
+                day_stats[et] = writer.day_stats
+                if data:
+                    logger.info(f"Processed {writer.count} {et} events")
+                else:
+                    logger.info(f"No {et} events found")
+                return et, writer.count, None
+            except Exception as e:
+                logger.exception(f"Failed to insert {et} events: {e}")
+                return et, 0, str(e)
+
+        tasks = [
+            _insert_event_type_safe(et, data)
+            for et, data in events_by_type.items()
+        ]
+
+        for coro in asyncio.as_completed(tasks):
+            event_type, count, error = await coro
+            results[event_type] = count
+            if error:
+                event_warnings.append(f"{event_type}: {error}")
+
+        return results, event_warnings, day_stats
+
+    async def _stream_events(
+        self,
+        tenant_id: str,
+        start_date: date,
+        end_date: date,
+        bigquery_client: AsyncBigQueryClient,
+    ) -> tuple[dict[str, int], list[str], dict[str, dict[date, dict[str, Any]]]]:
+        """
+        Stream every event type from BigQuery into the database in batches.
+
+        One transactional writer is opened per event table, then each event
+        type is paged out of BigQuery concurrently and written as it arrives.
+        With INGESTION_SINGLE_SCAN_EVENTS a single query pages out every
+        event type and each page is routed to the matching writers. Memory
+        stays bounded by EVENT_BATCH_SIZE rows per query instead of the full
+        date range. With INGESTION_EVENT_FETCH_MODE=arrow (default) batches
+        are Arrow record batches loaded via EventBatchWriter.write_arrow().
+
+        Args:
+            tenant_id: Tenant ID for database routing.
+            start_date: First day to replace (inclusive).
+            end_date: Last day to replace (inclusive).
+            bigquery_client: Tenant BigQuery client (async facade).
+
+        Returns:
+            tuple: Per-event-type insert counts, warnings for event types that
+            failed, and per-day stats for event types that were replaced.
+
+        Note:
+            - A failed event type is rolled back and its existing data kept;
+              other event types are still committed. A failed single scan
+              rolls back every event type
+            - Search events reclassified out of no_search_results are routed
+              to the view_search_results writer batch by batch, so a failed
+              no_search_results stream rolls back view_search_results too
+        """
+        start_str = start_date.isoformat()
+        end_str = end_date.isoformat()
+
+        if EVENT_FETCH_MODE not in EVENT_FETCH_MODES:
+            msg = (
+                f"Invalid INGESTION_EVENT_FETCH_MODE {EVENT_FETCH_MODE!r}; "
+                f"expected one of {sorted(EVENT_FETCH_MODES)}"
+            )
+            raise ValueError(msg)
+        arrow = EVENT_FETCH_MODE == "arrow"
+
+        logger.info(
+            f"Streaming BigQuery extraction for {start_str} to {end_str} "
+            f"in batches of {EVENT_BATCH_SIZE} ({EVENT_FETCH_MODE} fetch)"
+        )
+
+        event_warnings: list[str] = []
+
+        async with AsyncExitStack() as stack:
+            writers = {
+                et: await stack.enter_async_context(
+                    self.repo.open_event_writer(tenant_id, et, start_date, end_date)
+                )
+                for et in EVENT_TYPES
+            }
+
+            async def _write(et: str, batch: Any) -> None:
+                if arrow:
+                    await writers[et].write_arrow(batch)
+                else:
+                    await writers[et].write(batch)
+
+            async def _write_batch(et: str, batch: Any) -> None:
+                if et == "no_search_results":
+                    split = (
+                        self._split_no_search_record_batch
+                        if arrow
+                        else self._split_no_search_events
+                    )
+                    failed, reclassified = split(batch)
+                    await _write("no_search_results", failed)
+                    await _write("view_search_results", reclassified)
+                else:
+                    await _write(et, batch)
+                logger.debug(f"Wrote batch of {len(batch)} {et} events")
+
+            async def _stream_event_type(et: str) -> str | None:
+                try:
+                    iter_batches = (
+                        bigquery_client.iter_event_record_batches
+                        if arrow
+                        else bigquery_client.iter_event_batches
+                    )
+                    async with aclosing(
+                        iter_batches(et, start_str, end_str, EVENT_BATCH_SIZE)
+                    ) as batches:
+                        async for batch in batches:
+                            await _write_batch(et, batch)
+                    return None
+                except Exception as e:
+                    logger.exception(f"Failed to stream {et} events: {e}")
+                    writers[et].abort()
+                    if et == "no_search_results":
+                        # Part of this range's searches were already written
+                        # through the view_search_results writer
+                        writers["view_search_results"].abort()
+                    return str(e)
+
+            async def _stream_single_scan() -> str | None:
+                try:
+                    iter_pages = (
+                        bigquery_client.iter_all_event_record_batches
+                        if arrow
+                        else bigquery_client.iter_all_event_batches
+                    )
+                    async with aclosing(
+                        iter_pages(start_str, end_str, EVENT_BATCH_SIZE)
+                    ) as pages:
+                        async for page in pages:
+                            for et, batch in page.items():
+                                await _write_batch(et, batch)
+                    return None
+                except Exception as e:
+                    logger.exception(f"Failed to stream events in a single scan: {e}")
+                    for writer in writers.values():
+                        writer.abort()
+                    return str(e)
+
+            if SINGLE_SCAN_EVENTS:
+                error = await _stream_single_scan()
+                errors = [error] * len(EVENT_TYPES)
+            else:
+                errors = await asyncio.gather(
+                    *(_stream_event_type(et) for et in EVENT_TYPES)
+                )
+                no_search_error = errors[EVENT_TYPES.index("no_search_results")]
+                vsr_index = EVENT_TYPES.index("view_search_results")
+                if no_search_error and not errors[vsr_index]:
+                    errors[vsr_index] = (
+                        f"rolled back with no_search_results: {no_search_error}"
+                    )
+
+        results: dict[str, int] = {}
+        day_stats: dict[str, dict[date, dict[str, Any]]] = {}
+        for et, error in zip(EVENT_TYPES, errors, strict=True):
+            if error:
+                results[et] = 0
+                event_warnings.append(f"{et}: {error}")
+            else:
+                results[et] = writers[et].count
+                day_stats[et] = writers[et].day_stats
+                logger.info(f"Processed {results[et]} {et} events")
+
+        return results, event_warnings, day_stats
+
+    async def _get_event_shards(
+        self, bigquery_client: AsyncBigQueryClient, request: CreateIngestionJobRequest
+    ) -> dict[date, dict[str, Any]]:
+        """
+        Fetch GA4 shard metadata for the request's date range.
+
+        Failures are logged and treated as "no shard information", which makes
+        every day look changed: incremental jobs then behave like full jobs
+        and the watermarks they record are re-checked next time.
+        """
+        try:
+            return await bigquery_client.get_event_shards(
+                request.start_date.isoformat(),
+                request.end_date.isoformat(),
+            )
+        except Exception as e:
+            logger.warning(f"Could not read BigQuery shard metadata: {e}")
+            return {}
+
+    async def _get_stale_event_ranges(
+        self,
+        start_date: date,
+        end_date: date,
+        shards: dict[date, dict[str, Any]],
+    ) -> tuple[list[tuple[date, date]], int]:
+        """
+        Find the days that need re-extraction, grouped into contiguous ranges.
+
+        A day is current (and skipped) only if its daily ``events_YYYYMMDD``
+        shard exists, no intraday shard remains for it, and every event type
+        has a watermark recorded against the shard's current
+        ``last_modified`` time.
+
+        Args:
+            start_date: First day of the requested range (inclusive).
+            end_date: Last day of the requested range (inclusive).
+            shards: Shard metadata from BigQueryClient.get_event_shards().
+
+        Returns:
+            tuple[list[tuple[date, date]], int]: Inclusive date ranges to
+            re-extract, and the number of days skipped.
+        """
+        watermarks = await self.repo.get_event_watermarks(start_date, end_date)
+
+        ranges: list[tuple[date, date]] = []
+        skipped_days = 0
+        day = start_date
+        while day <= end_date:
+            shard = shards.get(day)
+            is_current = (
+                shard is not None
+                and not shard["intraday"]
+                and shard["last_modified"] is not None
+                and all(
+                    (et, day) in watermarks
+                    and watermarks[(et, day)]["source_last_modified"]
+                    == shard["last_modified"]
+                    for et in EVENT_TYPES
+                )
+            )
+
+            if is_current:
+                skipped_days += 1
+            elif ranges and ranges[-1][1] == day - timedelta(days=1):
+                ranges[-1] = (ranges[-1][0], day)
+            else:
+                ranges.append((day, day))
+
+            day += timedelta(days=1)
+
+        return ranges, skipped_days
+
+    @staticmethod
+    def _build_event_watermarks(
+        day_stats: dict[str, dict[date, dict[str, Any]]],
+        start_date: date,
+        end_date: date,
+        shards: dict[date, dict[str, Any]],
+    ) -> list[dict[str, Any]]:
+        """
+        Build watermark rows for every replaced event type and day.
+
+        Days without a final daily shard are recorded as intraday so that
+        incremental jobs keep re-pulling them.
+        """
+        watermarks: list[dict[str, Any]] = []
+        for et, stats_by_day in day_stats.items():
+            day = start_date
+            while day <= end_date:
+                stats = stats_by_day.get(day, {})
+                shard = shards.get(day)
+                watermarks.append(
+                    {
+                        "event_type": et,
+                        "event_date": day,
+                        "row_count": stats.get("row_count", 0),
+                        "max_event_timestamp": stats.get("max_event_timestamp"),
+                        "source_last_modified": shard["last_modified"] if shard else None,
+                        "source_intraday": shard is None or shard["intraday"],
+                    }
+                )
+                day += timedelta(days=1)
+        return watermarks
+
     @staticmethod
     def _reclassify_search_events(
         events_by_type: dict[str, list[dict[str, Any]]]
@@ -475,25 +1007,13 @@ class IngestionService:
         renamed to ``param_search_term`` so the record matches the
         ``view_search_results`` table schema.
         """
-        NO_RESULTS_MARKER = "No Results Found"
-
         no_search = events_by_type.get("no_search_results", [])
         if not no_search:
             return events_by_type
 
-        genuinely_failed: list[dict[str, Any]] = []
-        reclassified: list[dict[str, Any]] = []
-
-        for event in no_search:
-            title = event.get("param_page_title") or ""
-            if NO_RESULTS_MARKER in title:
-                genuinely_failed.append(event)
-            else:
-                converted = dict(event)
-                converted["param_search_term"] = converted.pop(
-                    "param_no_search_results_term", None
-                )
-                reclassified.append(converted)
+        genuinely_failed, reclassified = IngestionService._split_no_search_events(
+            no_search
+        )
 
         events_by_type["no_search_results"] = genuinely_failed
 
@@ -508,17 +1028,65 @@ class IngestionService:
 
         return events_by_type
 
-    async def _process_users(self, tenant_id: str) -> tuple[int, int]:
+    @staticmethod
+    def _split_no_search_events(
+        events: list[dict[str, Any]],
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        """Split no_search_results events into genuine failures and mistagged searches.
+
+        Returns:
+            tuple: ``(genuinely_failed, reclassified)`` where reclassified events
+            already carry ``param_search_term`` instead of
+            ``param_no_search_results_term``.
+        """
+        genuinely_failed: list[dict[str, Any]] = []
+        reclassified: list[dict[str, Any]] = []
+
+        for event in events:
+            title = event.get("param_page_title") or ""
+            if NO_RESULTS_MARKER in title:
+                genuinely_failed.append(event)
+            else:
+                converted = dict(event)
+                converted["param_search_term"] = converted.pop(
+                    "param_no_search_results_term", None
+                )
+                reclassified.append(converted)
+
+        return genuinely_failed, reclassified
+
+    @staticmethod
+    def _split_no_search_record_batch(
+        batch: pa.RecordBatch,
+    ) -> tuple[pa.RecordBatch, pa.RecordBatch]:
+        """Columnar version of _split_no_search_events() for Arrow batches."""
+        titles = pc.fill_null(batch.column("param_page_title"), "")
+        failed_mask = pc.match_substring(titles, NO_RESULTS_MARKER)
+
+        genuinely_failed = batch.filter(failed_mask)
+        reclassified = batch.filter(pc.invert(failed_mask))
+        names = [
+            "param_search_term" if name == "param_no_search_results_term" else name
+            for name in batch.schema.names
+        ]
+        return genuinely_failed, pa.RecordBatch.from_arrays(
+            list(reclassified.columns), names=names
+        )
+
+    async def _process_users(self, tenant_id: str) -> tuple[dict[str, int], int]:
         """
-        Extract user data from BigQuery and upsert into the users table.
+        Extract user data from BigQuery and delta-sync it into the users table.
 
         Requires `bigquery_user_table` to be configured in tenant_config.
+        Unchanged users are not rewritten and users missing from the source
+        table are deactivated (see FunctionsRepository.upsert_users).
 
         Args:
             tenant_id: Tenant ID for configuration lookup and database routing.
 
         Returns:
-            tuple[int, int]: (count of users processed, count of batch errors)
+            tuple[dict[str, int], int]: (counts of users inserted, updated,
+            unchanged and deactivated, count of batch errors)
         """
         try:
             bq_config = await get_tenant_bigquery_config(tenant_id)
@@ -528,7 +1096,7 @@ class IngestionService:
                 logger.warning(
                     f"No bigquery_user_table configured for tenant {tenant_id}, skipping user processing"
                 )
-                return 0, 0
+                return dict.fromkeys(USER_SYNC_COUNTS, 0), 0
 
             logger.info(f"Extracting users from BigQuery table: {user_table}")
             bigquery_client = await get_tenant_bigquery_client(tenant_id)
@@ -536,17 +1104,22 @@ class IngestionService:
                 msg = f"BigQuery client could not be created for tenant {tenant_id}"
                 raise ValueError(msg)
 
-            users_list = bigquery_client.extract_users(user_table)
+            users_list = await AsyncBigQueryClient(bigquery_client).extract_users(
+                user_table
+            )
 
             if users_list:
-                count, errors = await self.repo.upsert_users(tenant_id, users_list)
+                counts, errors = await self.repo.upsert_users(tenant_id, users_list)
                 logger.info(
-                    f"Processed {count} users from BigQuery ({errors} batch errors)"
+                    f"Processed {len(users_list)} users from BigQuery: {counts} "
+                    f"({errors} batch errors)"
                 )
-                return count, errors
+                return counts, errors
 
+            # An empty extract is more likely a source problem than a
+            # tenant without users, so nobody is deactivated
             logger.info("No users found in BigQuery table")
-            return 0, 0
+            return dict.fromkeys(USER_SYNC_COUNTS, 0), 0
 
         except Exception as e:
             logger.error(f"Error processing users: {e}")
@@ -584,7 +1157,11 @@ class IngestionService:
             - Data is processed in batches of 500 records for performance
             - Batch failures are logged but don't stop processing
             - Warehouse ID is required and records without it are filtered out
-            - String fields are normalized and NaN values converted to None
+            - String fields are normalized; NaN values become None and
+              Timestamps datetimes column by column (dataframe_records)
+            - With INGESTION_SFTP_CONDITIONAL_DOWNLOAD, an unchanged file is
+              neither downloaded nor upserted and 0 locations are reported
+              (see _process_locations_if_changed)
 
         Example:
             >>> count, errors = await service._process_locations(tenant_id)
@@ -604,30 +1181,15 @@ class IngestionService:
             logger.info(
                 f"Connecting to SFTP to download locations data for tenant {tenant_id}"
             )
-            locations_data = sftp_client._get_locations_data_sync()
+            if CONDITIONAL_LOCATIONS_DOWNLOAD:
+                return await self._process_locations_if_changed(
+                    tenant_id, AsyncSFTPClient(sftp_client)
+                )
 
-            if locations_data is not None and len(locations_data) > 0:
+            locations_data = await AsyncSFTPClient(sftp_client).get_locations_data()
 
-                locations_data = locations_data.replace({np.nan: None})
-
-                locations_list = locations_data.to_dict("records")
-
-                # Clean the records for JSON compatibility
-                cleaned_locations = []
-                for record in locations_list:
-                    cleaned_record = {}
-                    for key, value in record.items():
-                        if (
-                            pd.isna(value)
-                            if hasattr(pd, "isna")
-                            else (value is None or str(value) == "nan")
-                        ):
-                            cleaned_record[key] = None
-                        elif isinstance(value, pd.Timestamp):
-                            cleaned_record[key] = value.to_pydatetime()
-                        else:
-                            cleaned_record[key] = value
-                    cleaned_locations.append(cleaned_record)
+            if locations_data is not None and len(locations_data) > 0:
+                cleaned_locations = dataframe_records(locations_data)
 
                 count, errors = await self.repo.upsert_locations(
                     tenant_id, cleaned_locations
@@ -642,3 +1204,61 @@ class IngestionService:
         except Exception as e:
             logger.error(f"Error processing locations: {e}")
             raise
+
+    async def _process_locations_if_changed(
+        self, tenant_id: str, sftp_client: AsyncSFTPClient
+    ) -> tuple[int, int]:
+        """
+        Upsert SFTP locations only if the file changed since the last upsert.
+
+        The cache entry of this tenant's locations file (remote size, mtime,
+        content hash and the parsed rows) is compared against the remote
+        file by the SFTP client. Unchanged files are skipped; changed files
+        are upserted and become the new entry. An entry is only stored after
+        an upsert without batch errors, so a partial write is retried by the
+        next job.
+
+        Args:
+            tenant_id: Tenant ID for database routing and the cache key.
+            sftp_client: Tenant SFTP client.
+
+        Returns:
+            tuple[int, int]: Locations upserted (0 when unchanged) and batch
+            upsert errors.
+        """
+        cache = SFTPFileCache()
+        client = sftp_client.client
+        key = cache_key(tenant_id, *client.cache_identity(client.locations_file))
+        cached = await asyncio.to_thread(cache.load, key)
+
+        entry, changed = await sftp_client.get_locations_update(cached)
+
+        if not changed:
+            logger.info(
+                f"Locations file unchanged for tenant {tenant_id}, "
+                f"skipping upsert of {len(entry['rows'])} cached locations"
+            )
+            # Record the new mtime after a hash match, keeping the entry's age
+            await self._update_sftp_cache(cache.store, key, entry)
+            return 0, 0
+
+        if not entry["rows"]:
+            logger.info("No locations data received from SFTP")
+            return 0, 0
+
+        count, errors = await self.repo.upsert_locations(tenant_id, entry["rows"])
+        logger.info(f"Processed {count} locations from SFTP ({errors} batch errors)")
+
+        if errors:
+            await self._update_sftp_cache(cache.discard, key)
+        else:
+            await self._update_sftp_cache(cache.store, key, entry)
+        return count, errors
+
+    @staticmethod
+    async def _update_sftp_cache(operation: Callable[..., Any], *args: Any) -> None:
+        """Run an SFTPFileCache write off the event loop; failures only log."""
+        try:
+            await asyncio.to_thread(operation, *args)
+        except Exception as e:
+            logger.warning(f"Failed to update SFTP cache: {e}")
@@ -6,6 +6,8 @@ Adapted for Azure Functions from the analytics_service.
 
 import asyncio
 from datetime import date, datetime
+import os
+import time
 from typing import Any
 
 import logging
@@ -16,6 +18,14 @@ from shared.tasks_repository import TasksRepository
 
 logger = logging.getLogger(__name__)
 
+# Seconds a rendered branch report is kept on a warm instance for reuse by
+# later email jobs (e.g. re-sends later the same day). 0 keeps reports for
+# the current job only.
+REPORT_CACHE_TTL = int(os.getenv("EMAIL_REPORT_CACHE_TTL", "0"))
+
+# (tenant_id, branch_code, report_date) -> (expires_at, html)
+_persisted_reports: dict[tuple[str, str, date], tuple[float, str]] = {}
+
 
 class ReportService:
     """
@@ -60,6 +70,71 @@ class ReportService:
         self.repo = create_repository(tenant_id)
         self.tasks_repo = TasksRepository()
         self.template_service = TemplateService()
+        self.report_builds = 0
+        self.report_builds_avoided = 0
+        self._reports: dict[tuple[str, str, date], asyncio.Future[str]] = {}
+
+    async def get_branch_report(
+        self, tenant_id: str, branch_code: str, report_date: date
+    ) -> str:
+        """
+        Memoized generate_branch_report(): one build per (tenant, branch, date).
+
+        Reports are memoized for the lifetime of this service instance (one
+        email job), so every sales rep mapped to a branch receives the same
+        rendered report. Concurrent callers share an in-flight build. With
+        EMAIL_REPORT_CACHE_TTL set, reports are also kept on the warm
+        instance for later jobs.
+
+        Args:
+            tenant_id: Tenant ID for database routing and data isolation.
+            branch_code: Branch/warehouse code to generate report for.
+            report_date: Date for which to generate the analytics report.
+
+        Returns:
+            str: Complete HTML content of the branch report.
+
+        Raises:
+            Exception: Propagated from generate_branch_report(). Failed builds
+                     are not memoized, so a later call retries.
+
+        Note:
+            - report_builds counts reports actually generated
+            - report_builds_avoided counts calls served from the memo
+        """
+        key = (tenant_id, branch_code, report_date)
+
+        build = self._reports.get(key)
+        if build is None:
+            persisted = _persisted_reports.get(key)
+            if persisted and persisted[0] > time.monotonic():
+                build = asyncio.get_running_loop().create_future()
+                build.set_result(persisted[1])
+                self._reports[key] = build
+                self.report_builds_avoided += 1
+                return persisted[1]
+
+            build = asyncio.ensure_future(
+                self.generate_branch_report(tenant_id, branch_code, report_date)
+            )
+            self._reports[key] = build
+            self.report_builds += 1
+        else:
+            self.report_builds_avoided += 1
+
+        try:
+            html = await asyncio.shield(build)
+        except Exception:
+            if self._reports.get(key) is build:
+                del self._reports[key]
+            raise
+
+        if REPORT_CACHE_TTL > 0:
+            now = time.monotonic()
+            for expired in [k for k, (exp, _) in _persisted_reports.items() if exp <= now]:
+                del _persisted_reports[expired]
+            _persisted_reports[key] = (now + REPORT_CACHE_TTL, html)
+        return html
 
     async def generate_branch_report(
         self, tenant_id: str, branch_code: str, report_date: date
@@ -1,22 +1,32 @@
 """
 Database session management for Azure Functions.
 
-This module provides per-request database connections without connection pooling,
-suitable for the stateless nature of Azure Functions.
+Azure Functions reuses a worker process across invocations, so each tenant's
+engine (and its small connection pool) is cached on the warm instance and
+shared by every repository call of a job. Cached engines are disposed after
+an idle timeout and replaced after a maximum age.
 
 IMPORTANT: Uses tenant-specific databases for SOC2 compliance.
 Each tenant has their own database: google-analytics-{tenant_id}
 """
 
+import asyncio
+from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
-from datetime import date
+from datetime import date, timedelta
+import hashlib
+from itertools import repeat
 import json
 import os
+import re
+import time
 from typing import Any
 import uuid
 
 import logging
 from dotenv import load_dotenv
+import pyarrow as pa
+import pyarrow.compute as pc
 from sqlalchemy import text
 
 logger = logging.getLogger(__name__)
@@ -25,6 +35,67 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_asyn
 
 load_dotenv()
 
+# How EventBatchWriter loads rows: "copy" streams them with binary COPY
+# (asyncpg copy_records_to_table), "insert" uses multi-row INSERT ... VALUES.
+EVENT_LOAD_METHODS = frozenset({"copy", "insert"})
+EVENT_LOAD_METHOD = os.getenv("INGESTION_EVENT_LOAD_METHOD", "copy").lower()
+
+# Warm-instance engine cache: seconds an unused tenant engine is kept, and
+# seconds after which an engine is replaced even if it is still in use.
+ENGINE_IDLE_TIMEOUT = float(os.getenv("DATABASE_ENGINE_IDLE_TIMEOUT", "300"))
+ENGINE_MAX_AGE = float(os.getenv("DATABASE_ENGINE_MAX_AGE", "1800"))
+
+# Connections kept open per cached engine, plus burst connections for
+# concurrent sessions (e.g. one per event table while streaming events).
+ENGINE_POOL_SIZE = int(os.getenv("DATABASE_ENGINE_POOL_SIZE", "2"))
+ENGINE_MAX_OVERFLOW = int(os.getenv("DATABASE_ENGINE_MAX_OVERFLOW", "10"))
+
+# Source columns of a user row; their hash (users.content_hash) tells
+# upsert_users() whether an existing row needs rewriting.
+USER_CONTENT_COLUMNS = (
+    "user_name",
+    "buying_company_name",
+    "buying_company_erp_id",
+    "email",
+    "office_phone",
+    "cell_phone",
+)
+
+# Columns of a location row written by upsert_locations(), warehouse_id first
+LOCATION_COLUMNS = (
+    "warehouse_id",
+    "warehouse_code",
+    "warehouse_name",
+    "city",
+    "state",
+    "country",
+    "address1",
+    "address2",
+    "zip",
+)
+
+# Index definitions returned by pg_get_indexdef() for a parent event table,
+# rewritten onto a staging table by EventBatchWriter.prepare_swap()
+_INDEXDEF_TARGET = re.compile(r"^CREATE (UNIQUE )?INDEX \S+ ON (?:ONLY )?\S+ ")
+
+# Outcome counts reported by upsert_users()
+USER_SYNC_COUNTS = ("inserted", "updated", "unchanged", "deactivated")
+
+
+def user_content_hash(user: dict[str, Any]) -> str:
+    """
+    Hash the content columns of a source user record.
+
+    Args:
+        user: User dictionary as returned by BigQueryClient.extract_users().
+
+    Returns:
+        str: Hex MD5 digest of the content columns (NULLs included).
+    """
+    values = [user.get(column) for column in USER_CONTENT_COLUMNS]
+    payload = json.dumps(values, default=str, separators=(",", ":"))
+    return hashlib.md5(payload.encode()).hexdigest()
+
 
 def ensure_uuid_string(tenant_id: str) -> str:
     """
@@ -114,12 +185,18 @@ def create_sqlalchemy_url(tenant_id: str | None = None, async_driver: bool = Fal
 
 
 
-def get_async_engine(tenant_id: str | None = None) -> Any:
+def get_async_engine(
+    tenant_id: str | None = None,
+    pool_size: int = 1,
+    max_overflow: int = 0,
+) -> Any:
     """
-    Get a fresh async database engine (no pooling for serverless).
+    Create a new async database engine.
 
     Args:
         tenant_id: The tenant ID for tenant-specific database connection.
+        pool_size: Connections kept open by the engine's pool.
+        max_overflow: Extra connections opened under concurrent use.
 
     Returns:
         AsyncEngine instance for database connections.
@@ -129,17 +206,113 @@ def get_async_engine(tenant_id: str | None = None) -> Any:
     return create_async_engine(
         url,
         pool_pre_ping=True,
-        pool_size=1,
-        max_overflow=0,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle=int(ENGINE_MAX_AGE),
         echo=os.getenv("DATABASE_ECHO", "false").lower() == "true",
     )
 
 
+class _CachedEngine:
+    """A tenant engine cached on the warm instance, with its usage bookkeeping."""
+
+    __slots__ = (
+        "created_at",
+        "engine",
+        "last_used",
+        "leases",
+        "loop",
+        "retired",
+        "session_maker",
+    )
+
+    def __init__(self, engine: Any, loop: asyncio.AbstractEventLoop) -> None:
+        self.engine = engine
+        self.loop = loop
+        self.session_maker = async_sessionmaker(
+            bind=engine,
+            class_=AsyncSession,
+            autoflush=False,
+            autocommit=False,
+            expire_on_commit=False,
+        )
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.leases = 0
+        self.retired = False
+
+
+_engine_cache: dict[str | None, _CachedEngine] = {}
+
+
+async def _acquire_engine(tenant_id: str | None) -> _CachedEngine:
+    """
+    Return the cached engine for a tenant, creating or replacing it as needed.
+
+    Expired engines are swept first: engines unused for ENGINE_IDLE_TIMEOUT
+    seconds are disposed, engines older than ENGINE_MAX_AGE are replaced
+    (and disposed once their last session closes), and engines created on a
+    different event loop are dropped, since asyncpg connections cannot be
+    used across loops.
+    """
+    loop = asyncio.get_running_loop()
+    now = time.monotonic()
+
+    for key, cached in list(_engine_cache.items()):
+        if cached.loop is not loop:
+            # Connections belong to another (usually closed) loop; let them go
+            del _engine_cache[key]
+        elif now - cached.created_at > ENGINE_MAX_AGE:
+            del _engine_cache[key]
+            cached.retired = True
+            if not cached.leases:
+                await cached.engine.dispose()
+        elif not cached.leases and now - cached.last_used > ENGINE_IDLE_TIMEOUT:
+            del _engine_cache[key]
+            await cached.engine.dispose()
+
+    cached = _engine_cache.get(tenant_id)
+    if cached is None:
+        engine = get_async_engine(
+            tenant_id=tenant_id,
+            pool_size=ENGINE_POOL_SIZE,
+            max_overflow=ENGINE_MAX_OVERFLOW,
+        )
+        cached = _engine_cache[tenant_id] = _CachedEngine(engine, loop)
+        logger.info(f"Created cached database engine for tenant {tenant_id}")
+
+    cached.leases += 1
+    cached.last_used = now
+    return cached
+
+
+async def _release_engine(cached: _CachedEngine) -> None:
+    """Return a session's lease, disposing a retired engine once it is unused."""
+    cached.leases -= 1
+    cached.last_used = time.monotonic()
+    if cached.retired and not cached.leases:
+        await cached.engine.dispose()
+
+
+async def dispose_engines() -> None:
+    """Dispose every cached engine created on the running event loop."""
+    loop = asyncio.get_running_loop()
+    for key, cached in list(_engine_cache.items()):
+        del _engine_cache[key]
+        if cached.loop is loop and not cached.leases:
+            await cached.engine.dispose()
+        else:
+            cached.retired = True
+
+
 @asynccontextmanager
 async def get_db_session(tenant_id: str | None = None) -> Any:
     """
     Async context manager for database sessions.
-    Creates a fresh connection per invocation (serverless pattern).
+
+    Sessions draw connections from the tenant's cached engine, so repeated
+    calls within a job (and across invocations on a warm instance) reuse
+    pooled connections instead of reconnecting each time.
 
     Args:
         tenant_id: The tenant ID for tenant-specific database connection.
@@ -148,15 +321,8 @@ async def get_db_session(tenant_id: str | None = None) -> Any:
     Yields:
         AsyncSession: Database session for executing queries.
     """
-    engine = get_async_engine(tenant_id=tenant_id)
-    session_maker = async_sessionmaker(
-        bind=engine,
-        class_=AsyncSession,
-        autoflush=False,
-        autocommit=False,
-        expire_on_commit=False,
-    )
-    session = session_maker()
+    cached = await _acquire_engine(tenant_id)
+    session = cached.session_maker()
     try:
         yield session
     except Exception as e:
@@ -165,7 +331,492 @@ async def get_db_session(tenant_id: str | None = None) -> Any:
         raise
     finally:
         await session.close()
-        await engine.dispose()
+        await _release_engine(cached)
+
+
+class EventBatchWriter:
+    """
+    Appends event batches to a single event table within an open transaction.
+
+    Instances are created by FunctionsRepository.open_event_writer(), which
+    owns the session and decides whether to commit or roll back on exit.
+    With the "copy" load method each write() is streamed with binary COPY in
+    chunks of COPY_BATCH_SIZE rows; with "insert" it is split into multi-row
+    INSERT statements of INSERT_BATCH_SIZE rows. Both run on the session's
+    connection, so they share the replace transaction. Writes are serialized
+    with a lock because one table can receive batches from several producers
+    (e.g. search events reclassified out of no_search_results).
+    write() takes row dictionaries; write_arrow() takes Arrow record batches
+    and loads them without materializing a dictionary per row.
+
+    When a replace range is given (partitioned event tables), rows are
+    routed into one staging table per event_date. prepare_swap() then
+    builds the event table's indexes on every staging table, and, once
+    those are committed, swap_partitions() replaces each day's partition
+    with its staging table. Otherwise rows go straight into the event table.
+
+    Attributes:
+        event_type: Target event table name.
+        load_method: "copy" or "insert".
+        count: Number of events written so far.
+        day_stats: Per event_date ``row_count`` and ``max_event_timestamp``
+            of the rows written, used for ingestion watermarks.
+        aborted: True once abort() has been called.
+    """
+
+    INSERT_BATCH_SIZE = 500
+    COPY_BATCH_SIZE = 10000
+    JSONB_COLUMNS = frozenset({"items_json", "raw_data"})
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        event_type: str,
+        tenant_uuid_str: str,
+        load_method: str = "copy",
+        replace_range: tuple[date, date] | None = None,
+    ) -> None:
+        """
+        Initialize the writer.
+
+        Args:
+            session: Session holding the replace transaction.
+            event_type: Target event table name (already validated).
+            tenant_uuid_str: Normalized tenant UUID stamped on every row.
+            load_method: "copy" or "insert" (already validated).
+            replace_range: Inclusive (start_date, end_date) whose daily
+                partitions are replaced via staging tables, or None to write
+                directly into the event table.
+        """
+        self.event_type = event_type
+        self.load_method = load_method
+        self.count = 0
+        self.aborted = False
+        self._session = session
+        self._tenant_uuid_str = tenant_uuid_str
+        self._replace_range = replace_range
+        self._stage_tables: dict[date, str] = {}
+        self._stage_suffix = uuid.uuid4().hex[:8]
+        self.day_stats: dict[date, dict[str, Any]] = {}
+        self._lock = asyncio.Lock()
+
+    async def write(self, events: list[dict[str, Any]]) -> int:
+        """
+        Insert a batch of events.
+
+        Args:
+            events: Event dictionaries as produced by the BigQuery client.
+
+        Returns:
+            int: Number of events inserted by this call.
+        """
+        if not events:
+            return 0
+
+        batch_size = (
+            self.COPY_BATCH_SIZE
+            if self.load_method == "copy"
+            else self.INSERT_BATCH_SIZE
+        )
+
+        async with self._lock:
+            for i in range(0, len(events), batch_size):
+                batch = [self._normalize(ev) for ev in events[i : i + batch_size]]
+                self._record_day_stats(batch)
+                if self._replace_range is None:
+                    await self._load(self.event_type, batch)
+                    continue
+
+                by_day: dict[Any, list[dict[str, Any]]] = {}
+                for record in batch:
+                    by_day.setdefault(record.get("event_date"), []).append(record)
+                for day, rows in by_day.items():
+                    await self._load(await self._table_for_day(day), rows)
+
+            self.count += len(events)
+
+        return len(events)
+
+    async def write_arrow(self, batch: pa.RecordBatch) -> int:
+        """
+        Insert a columnar batch of events.
+
+        Arrow-native counterpart of write(): event dates are converted, days
+        split and statistics computed with vectorized Arrow kernels, and
+        COPY records are built column by column instead of from per-row
+        dictionaries.
+
+        Args:
+            batch: Events with the BigQuery client's column names.
+
+        Returns:
+            int: Number of events inserted by this call.
+        """
+        if batch.num_rows == 0:
+            return 0
+
+        batch_size = (
+            self.COPY_BATCH_SIZE
+            if self.load_method == "copy"
+            else self.INSERT_BATCH_SIZE
+        )
+
+        async with self._lock:
+            for offset in range(0, batch.num_rows, batch_size):
+                chunk = self._normalize_arrow(batch.slice(offset, batch_size))
+                self._record_arrow_day_stats(chunk)
+                if self._replace_range is None:
+                    await self._load_arrow(self.event_type, chunk)
+                    continue
+
+                event_dates = chunk.column("event_date")
+                for day in pc.unique(event_dates).to_pylist():
+                    if day is None:
+                        rows = chunk.filter(pc.is_null(event_dates))
+                    else:
+                        rows = chunk.filter(
+                            pc.equal(event_dates, pa.scalar(day, pa.date32()))
+                        )
+                    await self._load_arrow(await self._table_for_day(day), rows)
+
+            self.count += batch.num_rows
+
+        return batch.num_rows
+
+    def abort(self) -> None:
+        """Mark the writer as failed so its transaction is rolled back."""
+        self.aborted = True
+
+    async def prepare_swap(self) -> None:
+        """
+        Get every staging table in the replace range ready to be attached.
+
+        Days without any loaded rows get an empty staging table, so stale
+        events are removed exactly as the DELETE-based replace would. The
+        event table's indexes (and primary key) are then built on each
+        staging table after its load, so ATTACH PARTITION adopts them
+        instead of building them while the event table is locked. Runs in
+        the load transaction; the caller commits before swap_partitions().
+        """
+        if self._replace_range is None:
+            return
+
+        start_date, end_date = self._replace_range
+        day = start_date
+        while day <= end_date:
+            if day not in self._stage_tables:
+                await self._create_stage_table(day)
+            day += timedelta(days=1)
+
+        result = await self._session.execute(
+            text("""
+                SELECT pg_get_indexdef(i.indexrelid) AS indexdef,
+                       pg_get_constraintdef(c.oid) AS constraintdef
+                FROM pg_index i
+                LEFT JOIN pg_constraint c
+                    ON c.conindid = i.indexrelid AND c.conrelid = i.indrelid
+                WHERE i.indrelid = CAST(:table_name AS regclass)
+            """),
+            {"table_name": self.event_type},
+        )
+        definitions = result.all()
+
+        for stage_table in self._stage_tables.values():
+            for indexdef, constraintdef in definitions:
+                if constraintdef is not None:
+                    statement = f'ALTER TABLE "{stage_table}" ADD {constraintdef}'
+                else:
+                    statement = _INDEXDEF_TARGET.sub(
+                        lambda m, table=stage_table: (
+                            f'CREATE {m.group(1) or ""}INDEX ON "{table}" '
+                        ),
+                        indexdef,
+                    )
+                await self._session.execute(text(statement))
+
+    async def swap_partitions(self) -> None:
+        """
+        Replace every daily partition in the replace range with its staging table.
+
+        Must run after prepare_swap() has been committed. Each day is swapped
+        in its own short transaction: dropping the old partition takes an
+        exclusive lock on the event table, which is released at that day's
+        commit. Each staging table carries a CHECK constraint matching its
+        partition bounds and already has the event table's indexes, so
+        ATTACH PARTITION neither scans nor indexes it.
+
+        If a swap fails, days already swapped keep the new data, the
+        remaining staging tables are dropped and the error is re-raised.
+        """
+        if self._replace_range is None:
+            return
+
+        start_date, end_date = self._replace_range
+        day = start_date
+        try:
+            while day <= end_date:
+                stage_table = self._stage_tables[day]
+                partition = self._partition_name(day)
+                next_day = day + timedelta(days=1)
+
+                await self._session.execute(
+                    text(f'DROP TABLE IF EXISTS "{partition}"')
+                )
+                await self._session.execute(
+                    text(f'ALTER TABLE "{stage_table}" RENAME TO "{partition}"')
+                )
+                await self._session.execute(
+                    text(f"""
+                        ALTER TABLE {self.event_type} ATTACH PARTITION "{partition}"
+                        FOR VALUES FROM ('{day.isoformat()}') TO ('{next_day.isoformat()}')
+                    """)
+                )
+                await self._session.execute(
+                    text(f'ALTER TABLE "{partition}" DROP CONSTRAINT stage_range')
+                )
+                await self._session.commit()
+                del self._stage_tables[day]
+                day = next_day
+        except Exception:
+            await self._session.rollback()
+            await self._drop_stage_tables()
+            raise
+
+        logger.info(
+            f"Swapped {(end_date - start_date).days + 1} {self.event_type} partitions"
+        )
+
+    async def _drop_stage_tables(self) -> None:
+        """Drop staging tables that were not swapped in (best effort)."""
+        for stage_table in list(self._stage_tables.values()):
+            try:
+                await self._session.execute(
+                    text(f'DROP TABLE IF EXISTS "{stage_table}"')
+                )
+                await self._session.commit()
+            except Exception:
+                await self._session.rollback()
+                logger.warning(f"Could not drop staging table {stage_table}")
+        self._stage_tables.clear()
+
+    def _record_day_stats(self, batch: list[dict[str, Any]]) -> None:
+        """Accumulate per-day row counts and the latest event timestamp."""
+        for record in batch:
+            stats = self.day_stats.setdefault(
+                record.get("event_date"),
+                {"row_count": 0, "max_event_timestamp": None},
+            )
+            stats["row_count"] += 1
+            ts = record.get("event_timestamp")
+            current = stats["max_event_timestamp"]
+            if ts is not None and (current is None or int(ts) > int(current)):
+                stats["max_event_timestamp"] = ts
+
+    def _record_arrow_day_stats(self, batch: pa.RecordBatch) -> None:
+        """Columnar version of _record_day_stats() for a normalized batch."""
+        table = pa.table(
+            {
+                "event_date": batch.column("event_date"),
+                "ts": pc.cast(batch.column("event_timestamp"), pa.int64()),
+            }
+        )
+        grouped = table.group_by("event_date").aggregate(
+            [("ts", "count", pc.CountOptions(mode="all")), ("ts", "max")]
+        )
+        for day, row_count, max_ts in zip(
+            grouped.column("event_date").to_pylist(),
+            grouped.column("ts_count").to_pylist(),
+            grouped.column("ts_max").to_pylist(),
+            strict=True,
+        ):
+            stats = self.day_stats.setdefault(
+                day, {"row_count": 0, "max_event_timestamp": None}
+            )
+            stats["row_count"] += row_count
+            current = stats["max_event_timestamp"]
+            if max_ts is not None and (current is None or max_ts > int(current)):
+                stats["max_event_timestamp"] = str(max_ts)
+
+    def _partition_name(self, day: date) -> str:
+        """Daily partition name, matching ensure_event_partitions()."""
+        return f"{self.event_type}_{day:%Y%m%d}"
+
+    async def _table_for_day(self, day: Any) -> str:
+        """
+        Resolve the table a row for ``day`` should be loaded into.
+
+        Days inside the replace range get a (lazily created) staging table.
+        Rows dated outside the range are appended to the event table itself,
+        as the DELETE-based replace did, after making sure their partition
+        exists.
+        """
+        start_date, end_date = self._replace_range
+        if isinstance(day, date) and start_date <= day <= end_date:
+            if day not in self._stage_tables:
+                await self._create_stage_table(day)
+            return self._stage_tables[day]
+
+        await self._session.execute(
+            text("SELECT ensure_event_partitions(:table_name, :day, :day)"),
+            {"table_name": self.event_type, "day": day},
+        )
+        return self.event_type
+
+    async def _create_stage_table(self, day: date) -> str:
+        """
+        Create an empty staging table shaped like the event table for one day.
+
+        Generated columns (items_search_text, event_time) are included so they are
+        computed during the load and match the parent on ATTACH PARTITION.
+        Indexes are left out so the load does not maintain them row by row;
+        prepare_swap() builds them once the day is loaded.
+        """
+        stage_table = f"{self._partition_name(day)}_stage_{self._stage_suffix}"
+        next_day = day + timedelta(days=1)
+
+        await self._session.execute(
+            text(f"""
+                CREATE TABLE "{stage_table}" (
+                    LIKE {self.event_type} INCLUDING DEFAULTS INCLUDING GENERATED
+                        INCLUDING STORAGE,
+                    CONSTRAINT stage_range CHECK (
+                        event_date >= DATE '{day.isoformat()}'
+                        AND event_date < DATE '{next_day.isoformat()}'
+                    )
+                )
+            """)
+        )
+        self._stage_tables[day] = stage_table
+        return stage_table
+
+    async def _load(self, table_name: str, batch: list[dict[str, Any]]) -> None:
+        """Load normalized events into ``table_name`` with the configured method."""
+        if self.load_method == "copy":
+            await self._copy_batch(table_name, batch)
+        else:
+            await self._insert_batch(table_name, batch)
+
+    def _normalize(self, event: dict[str, Any]) -> dict[str, Any]:
+        """Stamp the tenant ID and convert YYYYMMDD event dates to ``date``."""
+        ev_copy = dict(event)
+        ev_copy["tenant_id"] = self._tenant_uuid_str
+
+        if isinstance(ev_copy.get("event_date"), str):
+            ev_date = ev_copy["event_date"]
+            if len(ev_date) == 8 and ev_date.isdigit():
+                ev_copy["event_date"] = date(
+                    int(ev_date[:4]), int(ev_date[4:6]), int(ev_date[6:8])
+                )
+
+        return ev_copy
+
+    async def _load_arrow(self, table_name: str, batch: pa.RecordBatch) -> None:
+        """Load a normalized columnar batch into ``table_name``."""
+        if self.load_method == "copy":
+            columns, records = self.arrow_to_records(batch, self._tenant_uuid_str)
+            await self._copy_records(table_name, columns, records)
+        else:
+            rows = batch.to_pylist()
+            for row in rows:
+                row["tenant_id"] = self._tenant_uuid_str
+            await self._insert_batch(table_name, rows)
+
+    @staticmethod
+    def _normalize_arrow(batch: pa.RecordBatch) -> pa.RecordBatch:
+        """Convert YYYYMMDD string event dates to ``date32``."""
+        index = batch.schema.get_field_index("event_date")
+        if index < 0 or not pa.types.is_string(batch.schema.field(index).type):
+            return batch
+
+        event_dates = pc.cast(
+            pc.strptime(batch.column(index), format="%Y%m%d", unit="s"),
+            pa.date32(),
+        )
+        columns = list(batch.columns)
+        columns[index] = event_dates
+        return pa.RecordBatch.from_arrays(columns, names=batch.schema.names)
+
+    @staticmethod
+    def rows_to_records(
+        batch: list[dict[str, Any]],
+    ) -> tuple[list[str], list[tuple[Any, ...]]]:
+        """Build COPY records from normalized event dictionaries."""
+        columns = list(batch[0].keys())
+        records = [tuple(record.get(col) for col in columns) for record in batch]
+        return columns, records
+
+    @staticmethod
+    def arrow_to_records(
+        batch: pa.RecordBatch, tenant_uuid_str: str
+    ) -> tuple[list[str], list[tuple[Any, ...]]]:
+        """
+        Build COPY records from a normalized columnar batch.
+
+        Each column is converted to Python values in one call, then the
+        columns are zipped into row tuples with the tenant ID appended.
+
+        Args:
+            batch: Batch already passed through _normalize_arrow().
+            tenant_uuid_str: Tenant ID stamped on every row.
+
+        Returns:
+            tuple: Column names (including ``tenant_id``) and row tuples.
+        """
+        columns = [*batch.schema.names, "tenant_id"]
+        records = list(
+            zip(*(column.to_pylist() for column in batch.columns), repeat(tenant_uuid_str))
+        )
+        return columns, records
+
+    async def _copy_batch(self, table_name: str, batch: list[dict[str, Any]]) -> None:
+        """
+        Load normalized events with binary COPY on the session's connection.
+
+        JSONB columns are passed as their JSON text, which asyncpg's jsonb
+        codec accepts directly, so no per-value CAST is needed.
+        """
+        columns, records = self.rows_to_records(batch)
+        await self._copy_records(table_name, columns, records)
+
+    async def _copy_records(
+        self, table_name: str, columns: list[str], records: list[tuple[Any, ...]]
+    ) -> None:
+        """Stream row tuples into ``table_name`` with binary COPY."""
+        connection = await self._session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            table_name, records=records, columns=columns
+        )
+
+    async def _insert_batch(
+        self, table_name: str, batch: list[dict[str, Any]]
+    ) -> None:
+        """Insert normalized events with a single multi-row VALUES statement."""
+        columns = list(batch[0].keys())
+        columns_str = ", ".join(columns)
+
+        values_clauses = []
+        params: dict[str, Any] = {}
+
+        for idx, record in enumerate(batch):
+            prefix = f"e{idx}_"
+            col_placeholders = []
+            for col in columns:
+                param_key = f"{prefix}{col}"
+                if col in self.JSONB_COLUMNS:
+                    col_placeholders.append(f"CAST(:{param_key} AS jsonb)")
+                else:
+                    col_placeholders.append(f":{param_key}")
+                params[param_key] = record.get(col)
+
+            values_clauses.append(f"({', '.join(col_placeholders)})")
+
+        insert_stmt = text(f"""
+            INSERT INTO "{table_name}" ({columns_str})
+            VALUES {", ".join(values_clauses)}
+        """)
+
+        await self._session.execute(insert_stmt, params)
 
 
 class FunctionsRepository:
@@ -227,6 +878,7 @@ class FunctionsRepository:
                 - data_types: List of data types to process
                 - start_date: Start date for data ingestion
                 - end_date: End date for data ingestion
+                - incremental: Optional incremental flag (default False)
                 - progress: Optional progress tracking dictionary
                 - records_processed: Optional initial records dictionary
 
@@ -254,11 +906,13 @@ class FunctionsRepository:
             stmt = text("""
                 INSERT INTO processing_jobs (
                     job_id, tenant_id, status, data_types,
-                    start_date, end_date, progress, records_processed, created_at
+                    start_date, end_date, incremental, progress, records_processed,
+                    created_at
                 )
                 VALUES (
                     :job_id, :tenant_id, :status, CAST(:data_types AS jsonb),
-                    :start_date, :end_date, CAST(:progress AS jsonb), CAST(:records_processed AS jsonb), NOW()
+                    :start_date, :end_date, :incremental, CAST(:progress AS jsonb),
+                    CAST(:records_processed AS jsonb), NOW()
                 )
                 RETURNING *
             """)
@@ -272,6 +926,7 @@ class FunctionsRepository:
                     "data_types": data_types_json,
                     "start_date": job_data["start_date"],
                     "end_date": job_data["end_date"],
+                    "incremental": job_data.get("incremental", False),
                     "progress": progress_json,
                     "records_processed": records_processed_json,
                 },
@@ -366,9 +1021,10 @@ class FunctionsRepository:
         """
         Replace event data for a specific event type and date range.
 
-        Deletes existing events for the date range and inserts new events
-        in batches. This ensures idempotent data ingestion - re-running
-        the same job produces the same result.
+        Replaces the stored events for the date range with the given events
+        in a single transaction (see open_event_writer()). This ensures
+        idempotent data ingestion - re-running the same job produces the
+        same result.
 
         Args:
             tenant_id: Tenant ID for data isolation (normalized internally).
@@ -381,123 +1037,422 @@ class FunctionsRepository:
             int: Number of events successfully inserted.
 
         Note:
-            - Deletes existing events for date range before insertion
-            - Processes events in batches of 500 for performance
+            - Swaps in fresh daily partitions for the date range (or deletes
+              existing events on unpartitioned tables)
+            - Loads events with binary COPY (or 500-row INSERTs when
+              INGESTION_EVENT_LOAD_METHOD=insert)
             - Normalizes tenant_id and event_date formats
             - Handles empty event lists gracefully (returns 0)
             - Logs deletion and insertion counts for monitoring
         """
+        async with self.open_event_writer(
+            tenant_id, event_type, start_date, end_date
+        ) as writer:
+            await writer.write(events_data)
+        return writer.count
+
+    @asynccontextmanager
+    async def open_event_writer(
+        self,
+        tenant_id: str,
+        event_type: str,
+        start_date: date,
+        end_date: date,
+        load_method: str | None = None,
+    ) -> AsyncIterator["EventBatchWriter"]:
+        """
+        Open a transactional writer that replaces one event type's date range.
+
+        The returned writer appends batches inside a single transaction, which
+        is committed when the context exits. This lets callers stream
+        arbitrarily large extracts without holding them in memory while
+        keeping the replace atomic per day: readers see either a day's old
+        events or its new ones.
+
+        Event tables are range-partitioned by day, so rows are loaded into
+        per-day staging tables, which are indexed and committed on exit;
+        each day's partition is then swapped for its staging table in a
+        short transaction of its own. Re-ingesting a day therefore costs
+        the same as a fresh load and leaves no dead tuples behind. Tables
+        created before partitioning was introduced fall back to deleting the
+        range up front inside the single load transaction (run
+        scripts/init_db.py to convert them).
+
+        Args:
+            tenant_id: Tenant ID for data isolation (normalized internally).
+            event_type: Event type name (e.g., "purchase", "add_to_cart").
+            start_date: Start date of the range to replace (inclusive).
+            end_date: End date of the range to replace (inclusive).
+            load_method: "copy" or "insert"; defaults to
+                INGESTION_EVENT_LOAD_METHOD ("copy").
+
+        Yields:
+            EventBatchWriter: Writer bound to the open transaction.
+
+        Raises:
+            ValueError: If event_type or load_method is not valid.
+
+        Note:
+            - If the writer is aborted or the block raises, the transaction
+              is rolled back and the previously stored range is kept
+            - The connection is held for the lifetime of the context
+            - Swapping takes a brief exclusive lock on the event table once
+              per day; loading and indexing do not block readers
+        """
         if event_type not in self.VALID_EVENT_TYPES:
             msg = f"Invalid event_type: {event_type!r}"
             raise ValueError(msg)
 
+        load_method = load_method or EVENT_LOAD_METHOD
+        if load_method not in EVENT_LOAD_METHODS:
+            msg = f"Invalid load_method: {load_method!r}"
+            raise ValueError(msg)
+
         tenant_uuid_str = ensure_uuid_string(tenant_id)
 
         async with get_db_session(tenant_id=self.tenant_id) as session:
-            # Delete existing data
-            del_stmt = text(f"""
-                DELETE FROM {event_type}
-                WHERE tenant_id = :tenant_id
-                AND event_date BETWEEN :start_date AND :end_date
-            """)
+            partitioned_result = await session.execute(
+                text("""
+                    SELECT EXISTS (
+                        SELECT 1
+                        FROM pg_partitioned_table pt
+                        JOIN pg_class c ON c.oid = pt.partrelid
+                        WHERE c.relname = :table_name
+                        AND c.relnamespace = 'public'::regnamespace
+                    )
+                """),
+                {"table_name": event_type},
+            )
+            partitioned = bool(partitioned_result.scalar())
+
+            if not partitioned:
+                logger.warning(
+                    f"{event_type} is not partitioned by day; replacing with DELETE. "
+                    "Run scripts/init_db.py for this tenant to convert it."
+                )
+                del_stmt = text(f"""
+                    DELETE FROM {event_type}
+                    WHERE tenant_id = :tenant_id
+                    AND event_date BETWEEN :start_date AND :end_date
+                """)
+
+                delete_result = await session.execute(
+                    del_stmt,
+                    {
+                        "tenant_id": tenant_uuid_str,
+                        "start_date": start_date,
+                        "end_date": end_date,
+                    },
+                )
+                deleted_count = delete_result.rowcount or 0
+                logger.info(f"Deleted {deleted_count} existing {event_type} events")
+
+            writer = EventBatchWriter(
+                session,
+                event_type,
+                tenant_uuid_str,
+                load_method,
+                replace_range=(start_date, end_date) if partitioned else None,
+            )
+            yield writer
+
+            if writer.aborted:
+                await session.rollback()
+                logger.warning(
+                    f"Rolled back {event_type} replace after {writer.count} events"
+                )
+                return
+
+            if partitioned:
+                await writer.prepare_swap()
+            await session.commit()
+            if partitioned:
+                await writer.swap_partitions()
+
+            logger.info(f"Inserted {writer.count} {event_type} events")
+
+    async def get_event_watermarks(
+        self, start_date: date, end_date: date
+    ) -> dict[tuple[str, date], dict[str, Any]]:
+        """
+        Get ingestion watermarks for every event type within a date range.
+
+        Args:
+            start_date: First day (inclusive).
+            end_date: Last day (inclusive).
+
+        Returns:
+            dict[tuple[str, date], dict[str, Any]]: Watermark rows keyed by
+            ``(event_type, event_date)``. Empty if the watermark table does
+            not exist (databases provisioned before incremental ingestion).
+        """
+        async with get_db_session(tenant_id=self.tenant_id) as session:
+            exists = await session.execute(
+                text("SELECT to_regclass('public.event_ingestion_watermarks') IS NOT NULL")
+            )
+            if not exists.scalar():
+                logger.warning(
+                    "event_ingestion_watermarks table not found; "
+                    "incremental ingestion will re-extract every day"
+                )
+                return {}
 
-            delete_result = await session.execute(
-                del_stmt,
+            result = await session.execute(
+                text("""
+                    SELECT event_type, event_date, row_count, max_event_timestamp,
+                           source_last_modified, source_intraday, ingested_at
+                    FROM event_ingestion_watermarks
+                    WHERE tenant_id = :tenant_id
+                    AND event_date BETWEEN :start_date AND :end_date
+                """),
                 {
-                    "tenant_id": tenant_uuid_str,
+                    "tenant_id": self.tenant_id,
                     "start_date": start_date,
                     "end_date": end_date,
                 },
             )
-            deleted_count = delete_result.rowcount or 0
-            logger.info(f"Deleted {deleted_count} existing {event_type} events")
+            return {
+                (row["event_type"], row["event_date"]): dict(row)
+                for row in result.mappings()
+            }
+
+    async def upsert_event_watermarks(
+        self, job_id: str, watermarks: list[dict[str, Any]]
+    ) -> int:
+        """
+        Record what was ingested per event type and day.
 
-            if not events_data:
-                await session.commit()
+        Args:
+            job_id: Ingestion job that produced the data.
+            watermarks: Dictionaries with event_type, event_date, row_count,
+                max_event_timestamp, source_last_modified and source_intraday.
+
+        Returns:
+            int: Number of watermark rows written (0 if the watermark table
+            does not exist).
+        """
+        if not watermarks:
+            return 0
+
+        async with get_db_session(tenant_id=self.tenant_id) as session:
+            exists = await session.execute(
+                text("SELECT to_regclass('public.event_ingestion_watermarks') IS NOT NULL")
+            )
+            if not exists.scalar():
                 return 0
 
-            JSONB_COLUMNS = frozenset({"items_json", "raw_data"})
+            stmt = text("""
+                INSERT INTO event_ingestion_watermarks (
+                    tenant_id, event_type, event_date, row_count,
+                    max_event_timestamp, source_last_modified, source_intraday,
+                    job_id, ingested_at
+                )
+                VALUES (
+                    :tenant_id, :event_type, :event_date, :row_count,
+                    :max_event_timestamp, :source_last_modified, :source_intraday,
+                    :job_id, NOW()
+                )
+                ON CONFLICT (tenant_id, event_type, event_date) DO UPDATE SET
+                    row_count = EXCLUDED.row_count,
+                    max_event_timestamp = EXCLUDED.max_event_timestamp,
+                    source_last_modified = EXCLUDED.source_last_modified,
+                    source_intraday = EXCLUDED.source_intraday,
+                    job_id = EXCLUDED.job_id,
+                    ingested_at = NOW()
+            """)
 
-            total = len(events_data)
-            batch_size = 500
+            await session.execute(
+                stmt,
+                [
+                    {"tenant_id": self.tenant_id, "job_id": job_id, **watermark}
+                    for watermark in watermarks
+                ],
+            )
+            await session.commit()
+            return len(watermarks)
 
-            for i in range(0, total, batch_size):
-                batch = events_data[i : i + batch_size]
+    async def refresh_converted_sessions(self, start_date: date, end_date: date) -> int:
+        """
+        Re-derive converted_sessions for sessions with purchases in a date range.
 
-                normalized_batch = []
-                for ev in batch:
-                    ev_copy = dict(ev)
-                    ev_copy["tenant_id"] = tenant_uuid_str
+        Args:
+            start_date: First day (inclusive) of the replaced purchase data.
+            end_date: Last day (inclusive).
 
-                    if isinstance(ev_copy.get("event_date"), str):
-                        ev_date = ev_copy["event_date"]
-                        if len(ev_date) == 8 and ev_date.isdigit():
-                            ev_copy["event_date"] = date(
-                                int(ev_date[:4]), int(ev_date[4:6]), int(ev_date[6:8])
-                            )
+        Returns:
+            int: Number of converted_sessions rows written (0 if the table
+            does not exist).
+        """
+        async with get_db_session(tenant_id=self.tenant_id) as session:
+            exists = await session.execute(
+                text("SELECT to_regclass('public.converted_sessions') IS NOT NULL")
+            )
+            if not exists.scalar():
+                logger.warning(
+                    "converted_sessions table not found; conversions not refreshed"
+                )
+                return 0
 
-                    normalized_batch.append(ev_copy)
+            result = await session.execute(
+                text(
+                    "SELECT refresh_converted_sessions(:tenant_id, :start_date, :end_date)"
+                ),
+                {
+                    "tenant_id": self.tenant_id,
+                    "start_date": start_date,
+                    "end_date": end_date,
+                },
+            )
+            rows = result.scalar() or 0
+            await session.commit()
+            return rows
 
-                if normalized_batch:
-                    columns = list(normalized_batch[0].keys())
-                    columns_str = ", ".join(columns)
+    async def refresh_sessions(self, start_date: date, end_date: date) -> int:
+        """
+        Rebuild the sessions fact rows of sessions with events in a date range.
 
-                    values_clauses = []
-                    params: dict[str, Any] = {}
+        Args:
+            start_date: First day (inclusive) of the replaced event data.
+            end_date: Last day (inclusive).
 
-                    for idx, record in enumerate(normalized_batch):
-                        prefix = f"e{idx}_"
-                        col_placeholders = []
-                        for col in columns:
-                            param_key = f"{prefix}{col}"
-                            if col in JSONB_COLUMNS:
-                                col_placeholders.append(f"CAST(:{param_key} AS jsonb)")
-                            else:
-                                col_placeholders.append(f":{param_key}")
-                            params[param_key] = record.get(col)
+        Returns:
+            int: Number of sessions rows written (0 if the table does not exist).
+        """
+        async with get_db_session(tenant_id=self.tenant_id) as session:
+            exists = await session.execute(
+                text("SELECT to_regclass('public.sessions') IS NOT NULL")
+            )
+            if not exists.scalar():
+                logger.warning("sessions table not found; session facts not refreshed")
+                return 0
 
-                        values_clauses.append(f"({', '.join(col_placeholders)})")
+            result = await session.execute(
+                text("SELECT refresh_sessions(:tenant_id, :start_date, :end_date)"),
+                {
+                    "tenant_id": self.tenant_id,
+                    "start_date": start_date,
+                    "end_date": end_date,
+                },
+            )
+            rows = result.scalar() or 0
+            await session.commit()
+            return rows
 
-                    insert_stmt = text(f"""
-                        INSERT INTO {event_type} ({columns_str})
-                        VALUES {", ".join(values_clauses)}
-                    """)
+    async def refresh_daily_branch_stats(self, start_date: date, end_date: date) -> int:
+        """
+        Rebuild the dashboard rollups for a date range from the event tables.
+
+        Args:
+            start_date: First day (inclusive).
+            end_date: Last day (inclusive).
 
-                    await session.execute(insert_stmt, params)
+        Returns:
+            int: Number of daily_branch_stats rows written (0 if the rollup
+            tables do not exist).
+        """
+        async with get_db_session(tenant_id=self.tenant_id) as session:
+            exists = await session.execute(
+                text("SELECT to_regclass('public.daily_branch_stats') IS NOT NULL")
+            )
+            if not exists.scalar():
+                logger.warning(
+                    "daily_branch_stats table not found; dashboard rollups not refreshed"
+                )
+                return 0
 
+            result = await session.execute(
+                text(
+                    "SELECT refresh_daily_branch_stats(:tenant_id, :start_date, :end_date)"
+                ),
+                {
+                    "tenant_id": self.tenant_id,
+                    "start_date": start_date,
+                    "end_date": end_date,
+                },
+            )
+            rows = result.scalar() or 0
             await session.commit()
-            logger.info(f"Inserted {total} {event_type} events")
-            return total
+            return rows
+
+    async def refresh_user_identities(
+        self, start_date: date | None = None, end_date: date | None = None
+    ) -> int:
+        """
+        Record event identities for a date range and re-resolve them to users.
+
+        Task functions join events to users through user_identities, so this
+        runs after events are loaded (with their range) and after users are
+        upserted (without a range, re-resolving every known identity).
+
+        Args:
+            start_date: First day (inclusive) whose event identities are
+                recorded, or None to only re-resolve.
+            end_date: Last day (inclusive), or None.
+
+        Returns:
+            int: Number of identities whose resolved user changed (0 if the
+            user_identities table does not exist).
+        """
+        async with get_db_session(tenant_id=self.tenant_id) as session:
+            exists = await session.execute(
+                text("SELECT to_regclass('public.user_identities') IS NOT NULL")
+            )
+            if not exists.scalar():
+                logger.warning(
+                    "user_identities table not found; event users not resolved"
+                )
+                return 0
+
+            result = await session.execute(
+                text(
+                    "SELECT refresh_user_identities(:tenant_id, :start_date, :end_date)"
+                ),
+                {
+                    "tenant_id": self.tenant_id,
+                    "start_date": start_date,
+                    "end_date": end_date,
+                },
+            )
+            changed = result.scalar() or 0
+            await session.commit()
+            return changed
 
     async def upsert_users(
         self, tenant_id: str, users_data: list[dict[str, Any]]
-    ) -> tuple[int, int]:
+    ) -> tuple[dict[str, int], int]:
         """
-        Upsert user records in batches with conflict resolution.
+        Delta-sync user records against the source user table.
 
-        Inserts new users or updates existing ones based on tenant_id and user_id.
-        Processes data in batches to handle large datasets efficiently.
-        Batch failures are isolated and don't stop the entire operation.
+        Each row carries a hash of its content columns. Existing users are
+        only rewritten when the hash differs (or the user was deactivated),
+        so a nightly sync of an unchanged source touches no rows. After every
+        batch succeeded, users missing from the source are soft-deactivated
+        (is_active = false). Batch failures are isolated and don't stop the
+        entire operation, but skip the deactivation step.
 
         Args:
             tenant_id: Tenant ID for data isolation (normalized internally).
-            users_data: List of user dictionaries with keys: user_id, user_name,
-                       buying_company_name, buying_company_erp_id, email,
-                       office_phone, cell_phone.
+            users_data: The complete source user list, as dictionaries with
+                       keys: user_id, user_name, buying_company_name,
+                       buying_company_erp_id, email, office_phone, cell_phone.
 
         Returns:
-            tuple[int, int]: (count of users processed, count of batch errors)
+            tuple[dict[str, int], int]: (counts of users inserted, updated,
+            unchanged and deactivated, count of batch errors)
         """
+        counts = dict.fromkeys(USER_SYNC_COUNTS, 0)
         if not users_data:
-            return 0, 0
+            return counts, 0
 
         tenant_uuid_str = ensure_uuid_string(tenant_id)
         batch_size = 500
-        total = 0
         errors = 0
 
-        for i in range(0, len(users_data), batch_size):
-            batch = users_data[i : i + batch_size]
+        # One row per user_id (last wins): a batch may not update a row twice
+        users = list({user.get("user_id"): user for user in users_data}.values())
+
+        for i in range(0, len(users), batch_size):
+            batch = users[i : i + batch_size]
             batch_num = i // batch_size + 1
 
             values_clauses = []
@@ -509,22 +1464,22 @@ class FunctionsRepository:
                     :{prefix}tenant_id, :{prefix}user_id, :{prefix}user_name,
                     :{prefix}buying_company_name, :{prefix}buying_company_erp_id,
                     :{prefix}email, :{prefix}office_phone, :{prefix}cell_phone,
-                    true, NOW()
+                    :{prefix}content_hash, true, NOW()
                 )""")
 
                 params[f"{prefix}tenant_id"] = tenant_uuid_str
                 params[f"{prefix}user_id"] = user.get("user_id")
-                params[f"{prefix}user_name"] = user.get("user_name")
-                params[f"{prefix}buying_company_name"] = user.get("buying_company_name")
-                params[f"{prefix}buying_company_erp_id"] = user.get("buying_company_erp_id")
-                params[f"{prefix}email"] = user.get("email")
-                params[f"{prefix}office_phone"] = user.get("office_phone")
-                params[f"{prefix}cell_phone"] = user.get("cell_phone")
+                for column in USER_CONTENT_COLUMNS:
+                    params[f"{prefix}{column}"] = user.get(column)
+                params[f"{prefix}content_hash"] = user_content_hash(user)
 
+            # Rows skipped by the WHERE of DO UPDATE are not returned;
+            # xmax = 0 marks freshly inserted rows
             stmt = text(f"""
                 INSERT INTO users (tenant_id, user_id, user_name,
                     buying_company_name, buying_company_erp_id,
-                    email, office_phone, cell_phone, is_active, updated_at)
+                    email, office_phone, cell_phone, content_hash,
+                    is_active, updated_at)
                 VALUES {", ".join(values_clauses)}
                 ON CONFLICT (tenant_id, user_id) DO UPDATE SET
                     user_name = EXCLUDED.user_name,
@@ -533,23 +1488,82 @@ class FunctionsRepository:
                     email = EXCLUDED.email,
                     office_phone = EXCLUDED.office_phone,
                     cell_phone = EXCLUDED.cell_phone,
+                    content_hash = EXCLUDED.content_hash,
                     is_active = EXCLUDED.is_active,
                     updated_at = NOW()
+                WHERE users.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+                   OR NOT users.is_active
+                RETURNING (xmax = 0) AS inserted
             """)
 
             try:
                 async with get_db_session(tenant_id=self.tenant_id) as session:
                     result = await session.execute(stmt, params)
+                    written = result.scalars().all()
                     await session.commit()
-                    batch_count = result.rowcount or len(batch)
-                    total += batch_count
-                    logger.debug(f"Upserted user batch {batch_num}: {batch_count} rows")
+                    inserted = sum(1 for is_insert in written if is_insert)
+                    counts["inserted"] += inserted
+                    counts["updated"] += len(written) - inserted
+                    counts["unchanged"] += len(batch) - len(written)
+                    logger.debug(
+                        f"Synced user batch {batch_num}: {inserted} inserted, "
+                        f"{len(written) - inserted} updated, "
+                        f"{len(batch) - len(written)} unchanged"
+                    )
             except Exception as e:
                 errors += 1
                 logger.warning(f"Error upserting user batch {batch_num}: {e}")
 
-        logger.info(f"Upserted {total} users ({errors} batch errors)")
-        return total, errors
+        # Only a complete sync tells which users left the source
+        if errors:
+            logger.warning("Skipping user deactivation after batch errors")
+        else:
+            try:
+                async with get_db_session(tenant_id=self.tenant_id) as session:
+                    result = await session.execute(
+                        text("""
+                            UPDATE users u
+                            SET is_active = false,
+                                updated_at = NOW()
+                            WHERE u.tenant_id = :tenant_id
+                            AND u.is_active
+                            AND u.user_id IS NOT NULL
+                            AND NOT EXISTS (
+                                SELECT 1
+                                FROM unnest(CAST(:user_ids AS varchar[])) AS src(user_id)
+                                WHERE src.user_id = u.user_id
+                            )
+                        """),
+                        {
+                            "tenant_id": tenant_uuid_str,
+                            "user_ids": [
+                                str(user["user_id"])
+                                for user in users
+                                if user.get("user_id") is not None
+                            ],
+                        },
+                    )
+                    await session.commit()
+                    counts["deactivated"] = result.rowcount or 0
+            except Exception as e:
+                errors += 1
+                logger.warning(f"Error deactivating users missing from source: {e}")
+
+        logger.info(
+            f"Synced users: {counts['inserted']} inserted, {counts['updated']} updated, "
+            f"{counts['unchanged']} unchanged, {counts['deactivated']} deactivated "
+            f"({errors} batch errors)"
+        )
+
+        # Events carry web user / customer ids; point them at the new user rows
+        if counts["inserted"] or counts["updated"] or counts["deactivated"]:
+            try:
+                changed = await self.refresh_user_identities()
+                logger.info(f"Re-resolved {changed} event identities")
+            except Exception as e:
+                logger.warning(f"Failed to refresh user identities: {e}")
+
+        return counts, errors
 
     async def upsert_locations(
         self, tenant_id: str, locations_data: list[dict[str, Any]]
@@ -587,13 +1601,10 @@ class FunctionsRepository:
         total = 0
         errors = 0
 
-        # Prepare all rows with tenant_id
-        rows = []
-        for loc in locations_data:
-            loc["tenant_id"] = tenant_uuid_str
-            if loc.get("warehouse_id"):
-                loc["warehouse_id"] = str(loc["warehouse_id"])
-            rows.append(loc)
+        # Row tuples in LOCATION_COLUMNS order; absent columns bind as NULL
+        rows = [
+            tuple(loc.get(col) for col in LOCATION_COLUMNS) for loc in locations_data
+        ]
 
         # Process each batch in a SEPARATE session to isolate failures
         for i in range(0, len(rows), batch_size):
@@ -602,19 +1613,21 @@ class FunctionsRepository:
 
             # Build multi-row VALUES clause for batch insert
             values_clauses = []
-            params = {}
+            params: dict[str, Any] = {"tenant_id": tenant_uuid_str}
 
-            for idx, loc in enumerate(batch):
+            for idx, row in enumerate(batch):
                 prefix = f"l{idx}_"
                 values_clauses.append(f"""(
-                    :{prefix}tenant_id, :{prefix}warehouse_id, :{prefix}warehouse_code, :{prefix}warehouse_name,
+                    :tenant_id, :{prefix}warehouse_id, :{prefix}warehouse_code, :{prefix}warehouse_name,
                     :{prefix}city, :{prefix}state, :{prefix}country,
                     :{prefix}address1, :{prefix}address2, :{prefix}zip, true, NOW()
                 )""")
 
-                # Add all location fields with prefix
-                for key, value in loc.items():
-                    params[f"{prefix}{key}"] = value
+                params.update(
+                    zip([prefix + col for col in LOCATION_COLUMNS], row, strict=True)
+                )
+                if row[0] is not None:
+                    params[f"{prefix}warehouse_id"] = str(row[0])
 
             stmt = text(f"""
                 INSERT INTO locations (tenant_id, warehouse_id, warehouse_code, warehouse_name,
@@ -653,11 +1666,16 @@ class FunctionsRepository:
 
 
     async def get_tenant_bigquery_config(self, tenant_id: str) -> dict[str, Any] | None:
-        """Get BigQuery config for a tenant, including optional user table reference."""
+        """
+        Get BigQuery config for a tenant, including optional user table reference.
+
+        The config_version key (tenant_config.updated_at) changes whenever
+        the auth service stores new configurations.
+        """
         async with get_db_session(tenant_id=self.tenant_id) as session:
             stmt = text("""
                 SELECT bigquery_project_id, bigquery_dataset_id, bigquery_credentials,
-                       bigquery_enabled, user_table
+                       bigquery_enabled, user_table, updated_at
                 FROM tenant_config
                 WHERE id = :tenant_id AND is_active = true
             """)
@@ -673,6 +1691,7 @@ class FunctionsRepository:
                     "project_id": row["bigquery_project_id"],
                     "dataset_id": row["bigquery_dataset_id"],
                     "service_account": credentials,
+                    "config_version": row["updated_at"].isoformat(),
                 }
 
                 if row.get("user_table"):
@@ -682,11 +1701,11 @@ class FunctionsRepository:
             return None
 
     async def get_tenant_sftp_config(self, tenant_id: str) -> dict[str, Any] | None:
-        """Get SFTP config for a tenant."""
+        """Get SFTP config for a tenant, with its config_version (see get_tenant_bigquery_config)."""
         async with get_db_session(tenant_id=self.tenant_id) as session:
             # Query tenant_config with explicit tenant_id for consistency with data_service
             stmt = text("""
-                SELECT sftp_config, sftp_enabled
+                SELECT sftp_config, sftp_enabled, updated_at
                 FROM tenant_config
                 WHERE id = :tenant_id AND is_active = true
             """)
@@ -696,8 +1715,8 @@ class FunctionsRepository:
             if row and row.get("sftp_enabled") and row.get("sftp_config"):
                 config = row["sftp_config"]
                 if isinstance(config, str):
-                    return json.loads(config)
-                return config
+                    config = json.loads(config)
+                return {**config, "config_version": row["updated_at"].isoformat()}
             return None
 
     # ======================================
@@ -0,0 +1,87 @@
+"""
+DataFrame to database row conversion for the Functions worker.
+
+Location sheets (SFTP) and user tables (BigQuery) arrive as pandas
+DataFrames and are written as parameter rows. Missing values (NaN, NaT,
+pd.NA) must become None and pandas Timestamps must become datetime objects
+for the database driver. Both are normalized column by column here, and
+rows are zipped from the normalized columns, instead of checking every cell
+in Python.
+"""
+
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+
+def normalize_column(series: pd.Series) -> np.ndarray:
+    """
+    Convert a column into an object array of driver-ready Python values.
+
+    Args:
+        series: DataFrame column.
+
+    Returns:
+        np.ndarray: Object array with None for missing values, datetime for
+        timestamps and Python scalars for numeric values.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        values = np.asarray(series.dt.to_pydatetime(), dtype=object)
+    else:
+        values = series.to_numpy(dtype=object, copy=True)
+        # Timestamps inside object columns (e.g. a mixed Excel column)
+        if pd.api.types.infer_dtype(series, skipna=True) in ("datetime", "mixed"):
+            values = np.array(
+                [v.to_pydatetime() if isinstance(v, pd.Timestamp) else v for v in values],
+                dtype=object,
+            )
+
+    missing = series.isna().to_numpy()
+    if missing.any():
+        values[missing] = None
+    return values
+
+
+def dataframe_rows(
+    df: pd.DataFrame, columns: Sequence[str] | None = None
+) -> list[tuple[Any, ...]]:
+    """
+    Convert a DataFrame into row tuples.
+
+    Args:
+        df: Source DataFrame.
+        columns: Columns to emit, in order (default: all columns). Columns
+            missing from ``df`` are emitted as None.
+
+    Returns:
+        list[tuple[Any, ...]]: One tuple per row, in ``columns`` order.
+    """
+    columns = list(df.columns) if columns is None else list(columns)
+    none_column = np.full(len(df), None, dtype=object)
+    arrays = [
+        normalize_column(df[col]) if col in df.columns else none_column
+        for col in columns
+    ]
+    return list(zip(*arrays, strict=True)) if arrays else [() for _ in range(len(df))]
+
+
+def dataframe_records(
+    df: pd.DataFrame, columns: Sequence[str] | None = None
+) -> list[dict[str, Any]]:
+    """
+    Convert a DataFrame into row dictionaries.
+
+    Drop-in replacement for ``df.where(pd.notna(df), None).to_dict("records")``
+    followed by per-cell Timestamp conversion.
+
+    Args:
+        df: Source DataFrame.
+        columns: Columns to emit (default: all columns).
+
+    Returns:
+        list[dict[str, Any]]: One dictionary per row.
+    """
+    columns = list(df.columns) if columns is None else list(columns)
+    return [dict(zip(columns, row, strict=True)) for row in dataframe_rows(df, columns)]
@@ -29,6 +29,9 @@ class CreateIngestionJobRequest(BaseModel):
                    - "users": SFTP user data download
                    - "locations": SFTP location data download
                    Defaults to all three if not specified.
+        incremental: Only re-extract event days whose BigQuery shard changed
+                    since the last ingestion or that are still intraday.
+                    Defaults to False (replace the whole date range).
 
     Example:
         >>> request = CreateIngestionJobRequest(
@@ -41,6 +44,7 @@ class CreateIngestionJobRequest(BaseModel):
     start_date: date | None = None
     end_date: date | None = None
     data_types: list[str] | None = ["events", "users", "locations"]
+    incremental: bool = False
 
     def __init__(self, **data: Any) -> None:
         """
@@ -129,5 +133,6 @@ class CreateIngestionJobRequest(BaseModel):
             "start_date": self.start_date.isoformat() if self.start_date else None,
             "end_date": self.end_date.isoformat() if self.end_date else None,
             "data_types": self.data_types,
+            "incremental": self.incremental,
         }
 
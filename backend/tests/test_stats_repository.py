@@ -0,0 +1,78 @@
+"""Tests for StatsRepository results served through the StatsCache."""
+
+from contextlib import asynccontextmanager
+import importlib
+from typing import Any
+
+import pytest
+
+from services.analytics_service.database.stats_cache import StatsCache, stats_cache
+from services.analytics_service.database.stats_repository import StatsRepository
+
+# The package re-exports ``stats_cache`` (the instance), shadowing the submodule
+stats_cache_module = importlib.import_module(
+    "services.analytics_service.database.stats_cache"
+)
+stats_repository_module = importlib.import_module(
+    "services.analytics_service.database.stats_repository"
+)
+
+
+class _FakeResult:
+    def __init__(self, value: Any) -> None:
+        self._value = value
+
+    def scalar(self) -> Any:
+        return self._value
+
+    def mappings(self) -> "_FakeResult":
+        return self
+
+    def all(self) -> list[Any]:
+        return []
+
+
+class _FakeSession:
+    def __init__(self, calls: list[str]) -> None:
+        self.calls = calls
+
+    async def execute(self, statement: Any, params: dict[str, Any]) -> _FakeResult:
+        sql = str(statement)
+        self.calls.append(sql)
+        if "processing_jobs" in sql:
+            return _FakeResult(None)
+        return _FakeResult({"purchases": 3})
+
+
+@pytest.fixture
+def calls(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    executed: list[str] = []
+
+    @asynccontextmanager
+    async def fake_session(service_name: str, tenant_id: str | None = None):
+        yield _FakeSession(executed)
+
+    monkeypatch.setattr(stats_repository_module, "get_async_db_session", fake_session)
+    monkeypatch.setattr(stats_cache_module, "get_async_db_session", fake_session)
+    return executed
+
+
+def test_repository_uses_shared_cache() -> None:
+    assert StatsRepository().cache is stats_cache
+
+
+@pytest.mark.asyncio
+async def test_overview_stats_served_from_cache(
+    calls: list[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = StatsCache(ttl=300, max_entries=16, poll_interval=60)
+    monkeypatch.setattr(StatsRepository, "cache", cache)
+    repo = StatsRepository()
+
+    first = await repo.get_overview_stats("tenant-1", "2024-01-01", "2024-01-31")
+    second = await repo.get_overview_stats("tenant-1", "2024-01-01", "2024-01-31")
+
+    assert first == second == {"purchases": 3}
+    assert sum("get_dashboard_overview_stats" in sql for sql in calls) == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
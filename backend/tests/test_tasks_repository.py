@@ -0,0 +1,41 @@
+"""Tests for the keyset pagination cursors of the TasksRepository."""
+
+import json
+
+import pytest
+
+from services.analytics_service.database.tasks_repository import (
+    decode_cursor,
+    encode_cursor,
+)
+
+POSITION = {"z": False, "n": 1704412824000000, "t": None, "k": "abc:"}
+FILTERS = {
+    "query": "drill",
+    "location_id": "B1",
+    "start_date": "2024-01-01",
+    "end_date": "2024-01-31",
+}
+
+
+def test_cursor_round_trip() -> None:
+    cursor = encode_cursor(POSITION, "event_timestamp", "desc", FILTERS)
+
+    position = decode_cursor(cursor, "event_timestamp", "desc", dict(FILTERS))
+
+    assert json.loads(position) == POSITION
+
+
+def test_cursor_rejects_different_sort() -> None:
+    cursor = encode_cursor(POSITION, "event_timestamp", "desc", FILTERS)
+
+    with pytest.raises(ValueError, match="sort"):
+        decode_cursor(cursor, "event_timestamp", "asc", FILTERS)
+
+
+@pytest.mark.parametrize("field", sorted(FILTERS))
+def test_cursor_rejects_different_filters(field: str) -> None:
+    cursor = encode_cursor(POSITION, "event_timestamp", "desc", FILTERS)
+
+    with pytest.raises(ValueError, match="filters"):
+        decode_cursor(cursor, "event_timestamp", "desc", {**FILTERS, field: "changed"})